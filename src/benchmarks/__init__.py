@@ -0,0 +1,8 @@
+from .metrics import ResourceMonitor, StageTimer, percentile, summarize
+
+__all__ = [
+    'ResourceMonitor',
+    'StageTimer',
+    'percentile',
+    'summarize',
+]
@@ -0,0 +1,143 @@
+from typing import Dict, Any, List, Optional
+from difflib import SequenceMatcher
+from pathlib import Path
+import argparse
+import json
+import logging
+import time
+
+from ..main import load_config
+from ..extractors.azure_docintel_extractor import AzureDocIntelExtractor
+from ..extractors.image_normalizer import ImageNormalizer
+from .metrics import summarize
+from .pipeline_benchmark import DEFAULT_FILES_DIR
+
+logger = logging.getLogger(__name__)
+
+def mean_word_confidence(result: Any) -> Optional[float]:
+    """Average OCR confidence over all words of an analysis."""
+    confidences = [
+        word.confidence
+        for page in (result.pages or [])
+        for word in (page.words or [])
+        if word.confidence is not None
+    ]
+    return round(sum(confidences) / len(confidences), 4) if confidences else None
+
+def text_agreement(reference: str, candidate: str) -> float:
+    """Share of words the two OCR texts have in common, in order."""
+    return round(SequenceMatcher(None, reference.split(), candidate.split(), autojunk=False).ratio(), 4)
+
+def _analyze(extractor: AzureDocIntelExtractor, file_path: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    result = extractor.extract(file_path).raw_response
+    return {
+        'seconds': time.perf_counter() - started,
+        'content': result.content or '',
+        'confidence': mean_word_confidence(result)
+    }
+
+def run_benchmark(file_paths: List[str],
+                  normalizer: ImageNormalizer,
+                  docintel_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Measure what image normalization saves and what it costs in OCR quality.
+
+    Upload bytes and normalization time are always measured. With a
+    Document Intelligence configuration, every image is also analyzed as-is
+    and normalized, comparing analyze latency, mean word confidence and the
+    agreement of the normalized OCR text with the original's. The normalized
+    analyze time includes normalization, so it is the end-to-end cost.
+
+    Args:
+        file_paths: Image files
+        normalizer: Normalizer under test
+        docintel_config: Optional 'azure_docint' configuration for live analysis
+
+    Returns:
+        Report with totals and per-file measurements
+    """
+    original_extractor = normalized_extractor = None
+    if docintel_config is not None:
+        base_config = {k: v for k, v in docintel_config.items() if k != 'image_normalization'}
+        original_extractor = AzureDocIntelExtractor.from_config(base_config)
+        normalized_extractor = AzureDocIntelExtractor.from_config(base_config)
+        normalized_extractor.image_normalizer = normalizer
+
+    files = {}
+    normalize_seconds, original_latency, normalized_latency = [], [], []
+    original_bytes = upload_bytes = 0
+    for file_path in file_paths:
+        started = time.perf_counter()
+        normalized = normalizer.normalize_file(file_path)
+        normalize_seconds.append(time.perf_counter() - started)
+        original_bytes += normalized.original_bytes
+        upload_bytes += len(normalized.data)
+        report = {
+            'original_bytes': normalized.original_bytes,
+            'upload_bytes': len(normalized.data),
+            'size': list(normalized.size),
+            'changed': normalized.changed
+        }
+
+        if original_extractor is not None:
+            original = _analyze(original_extractor, file_path)
+            candidate = _analyze(normalized_extractor, file_path)
+            original_latency.append(original['seconds'])
+            normalized_latency.append(candidate['seconds'])
+            report.update({
+                'original_seconds': round(original['seconds'], 3),
+                'normalized_seconds': round(candidate['seconds'], 3),
+                'original_confidence': original['confidence'],
+                'normalized_confidence': candidate['confidence'],
+                'text_agreement': text_agreement(original['content'], candidate['content'])
+            })
+        files[Path(file_path).name] = report
+
+    report = {
+        'images': len(files),
+        'settings': normalizer.checkpoint_config(),
+        'original_bytes': original_bytes,
+        'upload_bytes': upload_bytes,
+        'bytes_ratio': round(upload_bytes / original_bytes, 3) if original_bytes else 0.0,
+        'normalize_seconds': summarize(normalize_seconds),
+        'files': files
+    }
+    if original_latency:
+        report['analyze_seconds'] = {
+            'original': summarize(original_latency),
+            'normalized': summarize(normalized_latency)
+        }
+        agreements = [f['text_agreement'] for f in files.values()]
+        report['mean_text_agreement'] = round(sum(agreements) / len(agreements), 4)
+    return report
+
+def main():
+    """Compare uploading the sample photos as-is and normalized:
+
+        python -m src.benchmarks.image_normalization_benchmark --target-dpi 150
+
+    Add ``--live`` to also analyze both versions with the configured
+    Document Intelligence resource and compare latency and OCR quality.
+    """
+    parser = argparse.ArgumentParser(description="Image normalization benchmark")
+    parser.add_argument("--files", nargs="+", help="Image files (default: files/image*.jpg)")
+    parser.add_argument("--live", action="store_true", help="Analyze with Document Intelligence")
+    parser.add_argument("--target-dpi", type=int, default=200)
+    parser.add_argument("--color", action="store_true", help="Keep colour instead of converting to grayscale")
+    parser.add_argument("--jpeg-quality", type=int, default=85)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    file_paths = args.files or sorted(str(p) for p in DEFAULT_FILES_DIR.glob("image*.jpg"))
+    normalizer = ImageNormalizer(target_dpi=args.target_dpi, grayscale=not args.color,
+                                 jpeg_quality=args.jpeg_quality)
+    docintel_config = load_config()['azure_docint'] if args.live else None
+
+    report = run_benchmark(file_paths, normalizer, docintel_config)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+from typing import Dict, Any, List, Sequence, Callable
+from collections import defaultdict
+import functools
+import os
+import resource
+import sys
+import threading
+import time
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Percentile with linear interpolation between closest ranks.
+
+    Args:
+        values: Samples
+        q: Percentile between 0 and 100
+
+    Returns:
+        The percentile, or 0.0 for no samples
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """Count, mean, p50/p95/p99 and max of latency samples (seconds)."""
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values), 4) if values else 0.0,
+        'p50': round(percentile(values, 50), 4),
+        'p95': round(percentile(values, 95), 4),
+        'p99': round(percentile(values, 99), 4),
+        'max': round(max(values), 4) if values else 0.0
+    }
+
+def _maxrss_mb(usage: resource.struct_rusage) -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return usage.ru_maxrss / divisor
+
+class ResourceMonitor:
+    """Wall time, CPU time and peak memory of a benchmark run.
+
+    CPU time includes reaped child processes (process-pool stages). Peak
+    RSS is the high-water mark of this process and of its largest child,
+    so benchmarks should run in a fresh process.
+    """
+
+    def start(self) -> None:
+        self._wall = time.perf_counter()
+        self._self = resource.getrusage(resource.RUSAGE_SELF)
+        self._children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    def stop(self) -> Dict[str, Any]:
+        """Resource usage since start()."""
+        wall = time.perf_counter() - self._wall
+        usage_self = resource.getrusage(resource.RUSAGE_SELF)
+        usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        user = (usage_self.ru_utime - self._self.ru_utime) + (usage_children.ru_utime - self._children.ru_utime)
+        system = (usage_self.ru_stime - self._self.ru_stime) + (usage_children.ru_stime - self._children.ru_stime)
+        cores = os.cpu_count() or 1
+        return {
+            'wall_seconds': round(wall, 3),
+            'cpu_user_seconds': round(user, 3),
+            'cpu_system_seconds': round(system, 3),
+            'cpu_utilization': round((user + system) / wall, 3) if wall > 0 else 0.0,
+            'cpu_utilization_per_core': round((user + system) / wall / cores, 3) if wall > 0 else 0.0,
+            'cores': cores,
+            'peak_rss_mb': round(_maxrss_mb(usage_self), 1),
+            'peak_rss_children_mb': round(_maxrss_mb(usage_children), 1)
+        }
+
+class StageTimer:
+    """Records per-stage latencies by wrapping methods of a pipeline instance."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    def wrap(self, obj: Any, method_name: str, stage: str) -> None:
+        """Replace ``obj.method_name`` with a timed version recorded under ``stage``."""
+        method: Callable = getattr(obj, method_name)
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - started)
+
+        setattr(obj, method_name, timed)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Latency summary per stage."""
+        with self._lock:
+            return {stage: summarize(values) for stage, values in self.samples.items()}
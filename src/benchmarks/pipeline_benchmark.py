@@ -0,0 +1,390 @@
+from typing import Optional, Dict, Any, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import copy
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import time
+import yaml
+
+from ..main import load_config, build_pipeline
+from ..llm_extractors.azure_openai_extractor import AzureOpenAIExtractor
+from ..pipeline.extraction_pipeline import ExtractionPipeline
+from ..core.adaptive_concurrency import limiter_stats
+from ..mock_services import FaultProfile, Recordings, MockDocIntelServer, MockOpenAIServer
+from ..mock_services.faults import LATENCY_DISTRIBUTIONS
+from .metrics import ResourceMonitor, StageTimer, summarize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FILES_DIR = Path(__file__).parent.parent.parent / "files"
+SUPPORTED_EXTENSIONS = ('.pdf', '.png', '.jpg', '.jpeg', '.tif', '.tiff')
+MODES = ('sequential', 'threads', 'staged')
+
+# Metrics compared against a baseline: (path, direction where larger is worse)
+COMPARED_METRICS = [
+    (('invoices_per_sec',), False),
+    (('latency', 'p95'), True),
+    (('resources', 'peak_rss_mb'), True),
+    (('resources', 'cpu_user_seconds'), True),
+    (('tokens', 'per_invoice'), True),
+]
+
+SYNTHETIC_LINES = [
+    "Pacific Power & Light", "Account Number: 123456789", "Invoice Number: INV-2024-001",
+    "Statement Date: 03/01/2024", "Service Period: 02/01/2024 - 02/29/2024",
+    "John Smith, 123 Main St, Portland, OR 97201", "Meter P171644707",
+    "Total Usage 1,234.56 kWh", "Basic Charge $25.95", "Energy Charge $1,208.61",
+    "Total Amount Due $1,234.56"
+]
+
+SYNTHETIC_RESPONSES = {
+    'account_info': {
+        "account_number": "123456789", "invoice_number": "INV-2024-001", "invoice_date": "2024-03-01",
+        "billing_period_start": "2024-02-01", "billing_period_end": "2024-02-29",
+        "vendor_name": "Pacific Power & Light", "customer_name": "John Smith",
+        "service_address": "123 Main St, Portland, OR 97201", "meter_numbers": ["P171644707"],
+        "subtotals": {"Electric Power": 1234.56}, "total_amount": 1234.56, "commodities": ["Electric Power"]
+    },
+    'determinants': {"determinants": [
+        {"name": "Total Usage", "commodity": "Electric Power", "value": "1234.56", "unit": "kWh",
+         "meter_number": "P171644707"}
+    ]},
+    'charges': {"charges": [
+        {"name": "Basic Charge", "amount": 25.95, "category": "Fixed", "commodity": "Electric Power",
+         "determinant_name": None, "meter_number": "P171644707", "currency": "USD"},
+        {"name": "Energy Charge", "amount": 1208.61, "category": "Energy", "commodity": "Electric Power",
+         "determinant_name": "Total Usage", "meter_number": "P171644707", "currency": "USD"}
+    ]},
+    'normalize_charges': {"Basic Charge": "Basic Charge", "Energy Charge": "Energy Charge"}
+}
+
+def build_corpus(files_dir: Path, replicas: int = 1) -> List[str]:
+    """Sample invoice paths, each repeated ``replicas`` times."""
+    files = sorted(str(p) for p in files_dir.iterdir() if p.suffix.lower() in SUPPORTED_EXTENSIONS)
+    if not files:
+        raise ValueError(f"No sample invoices found in {files_dir}")
+    return files * replicas
+
+def synthetic_recordings(root_dir: str, prompts_dir: Path = AzureOpenAIExtractor.DEFAULT_PROMPTS_DIR) -> Recordings:
+    """Recordings with a fixed one-page analysis and valid responses per prompt."""
+    prompts = {}
+    for yaml_file in prompts_dir.glob("*.yaml"):
+        with open(yaml_file) as f:
+            prompts[yaml_file.stem] = yaml.safe_load(f)
+
+    recordings = Recordings(root_dir)
+    recordings.save_docintel(b'', {
+        'apiVersion': '2024-11-30',
+        'modelId': 'prebuilt-layout',
+        'content': "\n".join(SYNTHETIC_LINES),
+        'pages': [{
+            'pageNumber': 1, 'width': 8.5, 'height': 11, 'unit': 'inch', 'spans': [], 'words': [],
+            'lines': [
+                {'content': line, 'polygon': [1.0, 0.5 + i * 0.4, 6.0, 0.5 + i * 0.4, 6.0, 0.8 + i * 0.4, 1.0, 0.8 + i * 0.4],
+                 'spans': []}
+                for i, line in enumerate(SYNTHETIC_LINES)
+            ]
+        }],
+        'tables': [],
+        'paragraphs': [],
+        'languages': []
+    })
+    for prompt_name, response in SYNTHETIC_RESPONSES.items():
+        if prompt_name in prompts:
+            messages = [{"role": "system", "content": prompts[prompt_name]['system']}]
+            recordings.save_chat(messages, json.dumps(response))
+    return recordings
+
+def record_responses(pipeline: ExtractionPipeline, recordings: Recordings) -> None:
+    """Save the real service responses seen by a pipeline as recordings."""
+    text_extractor = pipeline.text_extractor
+    extract = text_extractor.extract
+
+    def recording_extract(file_path: str):
+        result = extract(file_path)
+        with open(file_path, 'rb') as f:
+            recordings.save_docintel(f.read(), result.raw_response)
+        return result
+
+    text_extractor.extract = recording_extract
+
+    completions = pipeline.data_extractor.client.chat.completions
+    create = completions.create
+
+    def recording_create(*args, **kwargs):
+        response = create(*args, **kwargs)
+        recordings.save_chat(kwargs['messages'], response.choices[0].message.content)
+        return response
+
+    completions.create = recording_create
+
+def _mock_config(config: Dict[str, Any], docintel_url: str, openai_url: str,
+                 checkpoints: bool, templates: bool, stream: bool = False) -> Dict[str, Any]:
+    config = copy.deepcopy(config)
+    config['azure_docint'].update({'endpoint': docintel_url, 'key': 'benchmark'})
+    config['azure_openai'].update({'endpoint': openai_url, 'api_key': 'benchmark'})
+    # Learned charge names start empty in every run, so runs stay comparable
+    config['azure_openai'].setdefault('charge_names', {})['mapping_file'] = None
+    config['azure_openai'].setdefault('streaming', {})['enabled'] = stream
+    config.setdefault('checkpoints', {})['enabled'] = checkpoints
+    config.setdefault('templates', {})['enabled'] = templates
+    return config
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmark(file_paths: List[str],
+                  mode: str = 'sequential',
+                  concurrency: int = 1,
+                  recordings_dir: Optional[str] = None,
+                  docintel_faults: Optional[FaultProfile] = None,
+                  openai_faults: Optional[FaultProfile] = None,
+                  poll_interval: float = 0.05,
+                  checkpoints: bool = False,
+                  templates: bool = False,
+                  stream: bool = False,
+                  config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run the pipeline over a corpus against the mock services.
+
+    Args:
+        file_paths: Documents to process
+        mode: 'sequential', 'threads' (pipeline.process on a thread pool) or
+              'staged' (pipeline.process_many)
+        concurrency: Threads for 'threads' mode
+        recordings_dir: Recorded responses; synthetic responses when None
+        docintel_faults: Latency/failure profile of the Document Intelligence mock
+        openai_faults: Latency/failure profile of the OpenAI mock
+        poll_interval: Retry-After suggested for analyze polling
+        checkpoints: Keep stage checkpoints enabled (replicas then hit the cache)
+        templates: Keep template extraction enabled
+        stream: Stream the charges responses and report time to first charge
+        config: Optional configuration (defaults to default_config.yaml)
+
+    Returns:
+        Benchmark report
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode}")
+    config = config or load_config()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        recordings = Recordings(recordings_dir) if recordings_dir else synthetic_recordings(tmp_dir)
+
+        docintel = MockDocIntelServer(recordings, docintel_faults, poll_interval=poll_interval)
+        openai = MockOpenAIServer(recordings, faults=openai_faults)
+        with docintel, openai:
+            pipeline = build_pipeline(_mock_config(config, docintel.url, openai.url, checkpoints, templates, stream))
+            timer = StageTimer()
+            if mode != 'staged':
+                timer.wrap(pipeline, 'extract_text', 'ocr')
+                timer.wrap(pipeline, 'preprocess', 'preprocess')
+                timer.wrap(pipeline, 'extract_data', 'llm')
+                timer.wrap(pipeline, 'validate', 'validate')
+
+            usage_before = pipeline.data_extractor.usage_snapshot()
+            monitor = ResourceMonitor()
+            monitor.start()
+            totals, errors = _run(pipeline, file_paths, mode, concurrency, config, timer)
+            resources = monitor.stop()
+            usage = pipeline.data_extractor.usage_snapshot()
+            stream_latencies = pipeline.data_extractor.stream_latencies
+            mock_stats = {'docintel': docintel.stats(), 'openai': openai.stats()}
+
+    succeeded = len(file_paths) - len(errors)
+    tokens = {key: usage[key] - usage_before[key] for key in usage}
+    tokens['per_invoice'] = round(tokens['total_tokens'] / succeeded, 1) if succeeded else 0.0
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': _git_commit(),
+        'settings': {
+            'mode': mode,
+            'concurrency': concurrency,
+            'documents': len(file_paths),
+            'recordings': recordings_dir or 'synthetic',
+            'docintel_faults': (docintel_faults or FaultProfile()).to_dict(),
+            'openai_faults': (openai_faults or FaultProfile()).to_dict(),
+            'checkpoints': checkpoints,
+            'templates': templates,
+            'stream': stream
+        },
+        'invoices': succeeded,
+        'failed': len(errors),
+        'errors': errors[:20],
+        'invoices_per_sec': round(succeeded / resources['wall_seconds'], 3) if resources['wall_seconds'] else 0.0,
+        'latency': summarize(totals),
+        'stages': timer.summary(),
+        'resources': resources,
+        'tokens': tokens,
+        'charges_stream': {name: summarize(values) for name, values in stream_latencies.items()},
+        'concurrency_limits': limiter_stats(),
+        'mock_services': mock_stats
+    }
+
+def _run(pipeline: ExtractionPipeline,
+         file_paths: List[str],
+         mode: str,
+         concurrency: int,
+         config: Dict[str, Any],
+         timer: StageTimer) -> Tuple[List[float], List[str]]:
+    totals: List[float] = []
+    errors: List[str] = []
+
+    if mode == 'staged':
+        for result in pipeline.process_many(file_paths, config.get('stages', {})):
+            for stage, seconds in result.stage_seconds.items():
+                timer.record(stage, seconds)
+            if result.ok:
+                totals.append(sum(result.stage_seconds.values()))
+            else:
+                errors.append(f"{result.file_path}: {result.error}")
+        return totals, errors
+
+    def process(file_path: str) -> None:
+        started = time.perf_counter()
+        try:
+            pipeline.process(file_path)
+            totals.append(time.perf_counter() - started)
+        except Exception as e:
+            errors.append(f"{file_path}: {type(e).__name__}: {str(e)}")
+
+    if mode == 'threads':
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(process, file_paths))
+    else:
+        for file_path in file_paths:
+            process(file_path)
+    return totals, errors
+
+def _metric(report: Dict[str, Any], path: tuple) -> Optional[float]:
+    value: Any = report
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.10) -> List[str]:
+    """Regressions of a report against a baseline report.
+
+    Args:
+        current: Report of the run under test
+        baseline: Report of the reference run
+        tolerance: Relative change allowed before a metric counts as regressed
+
+    Returns:
+        Descriptions of the regressed metrics (empty if none)
+    """
+    paths = list(COMPARED_METRICS)
+    for stage in current.get('stages', {}):
+        paths.append((('stages', stage, 'p95'), True))
+
+    regressions = []
+    for path, larger_is_worse in paths:
+        new, old = _metric(current, path), _metric(baseline, path)
+        if new is None or old is None or old == 0:
+            continue
+        change = (new - old) / old
+        if (larger_is_worse and change > tolerance) or (not larger_is_worse and change < -tolerance):
+            regressions.append(f"{'.'.join(path)}: {old} -> {new} ({change:+.1%})")
+    return regressions
+
+def main():
+    """End-to-end throughput and latency benchmark of the extraction pipeline.
+
+    Runs the full ExtractionPipeline over the sample invoices (replicated N
+    times) against the local mock services, serving recorded or synthetic
+    responses, and writes a JSON report that can be compared with a
+    baseline:
+
+        python -m src.benchmarks.pipeline_benchmark --synthetic --replicas 5 \\
+            --mode threads --concurrency 8 --output bench.json --baseline main.json
+
+    Record responses from the real services once with ``--record DIR``, then
+    benchmark against them with ``--recordings DIR``.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the extraction pipeline against mock services")
+    parser.add_argument("--files-dir", default=str(DEFAULT_FILES_DIR))
+    parser.add_argument("--replicas", type=int, default=1, help="Times each sample file is processed")
+    parser.add_argument("--mode", choices=MODES, default='sequential')
+    parser.add_argument("--concurrency", type=int, default=4, help="Threads for --mode threads")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--recordings", help="Directory of recorded service responses")
+    source.add_argument("--synthetic", action="store_true", help="Serve synthetic responses (default)")
+    source.add_argument("--record", help="Run against the real services and save recordings here")
+    parser.add_argument("--docintel-latency", type=float, default=3.0)
+    parser.add_argument("--openai-latency", type=float, default=2.0)
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default='lognormal')
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=None, help="Mock service capacity")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--checkpoints", action="store_true", help="Keep stage checkpoints enabled")
+    parser.add_argument("--templates", action="store_true", help="Keep template extraction enabled")
+    parser.add_argument("--stream", action="store_true", help="Stream charges responses")
+    parser.add_argument("--output", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Report to compare against; exits 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    file_paths = build_corpus(Path(args.files_dir), args.replicas)
+
+    if args.record:
+        pipeline = build_pipeline(load_config())
+        record_responses(pipeline, Recordings(args.record))
+        for file_path in dict.fromkeys(file_paths):
+            try:
+                pipeline.process(file_path)
+            except Exception as e:
+                logger.error(f"Recording failed for {file_path}: {str(e)}")
+        return
+
+    def profile(latency: float) -> FaultProfile:
+        return FaultProfile(
+            latency=args.distribution,
+            latency_mean=latency,
+            latency_sigma=args.sigma,
+            throttle_rate=args.throttle_rate,
+            timeout_rate=args.timeout_rate,
+            max_concurrency=args.max_concurrency,
+            seed=args.seed
+        )
+
+    report = run_benchmark(
+        file_paths,
+        mode=args.mode,
+        concurrency=args.concurrency,
+        recordings_dir=args.recordings,
+        docintel_faults=profile(args.docintel_latency),
+        openai_faults=profile(args.openai_latency),
+        checkpoints=args.checkpoints,
+        templates=args.templates,
+        stream=args.stream
+    )
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_results(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            logger.warning(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
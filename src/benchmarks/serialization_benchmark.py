@@ -0,0 +1,104 @@
+from typing import Dict, Any
+from pathlib import Path
+import argparse
+import json
+import logging
+import tempfile
+import time
+
+from ..core import serialization
+from ..core.models.invoice import Invoice
+from ..core.models.synthetic import make_invoices
+from ..core.serialization import NDJSONSink
+
+logger = logging.getLogger(__name__)
+
+def _rate(count: int, seconds: float) -> float:
+    return round(count / seconds, 1) if seconds > 0 else 0.0
+
+def run_benchmark(count: int = 100000, per_file_sample: int = 2000) -> Dict[str, Any]:
+    """Time exporting and reloading invoices as NDJSON and as one JSON file each.
+
+    The per-file path (stdlib ``json.dump(indent=2)``, as save_json used to
+    write) is timed on a sample and extrapolated to ``count`` invoices.
+
+    Args:
+        count: Invoices exported and reloaded through NDJSON
+        per_file_sample: Invoices written and read back as individual files
+
+    Returns:
+        Report with seconds and invoices per second for each path
+    """
+    invoices = make_invoices(count)
+    sample = invoices[:min(per_file_sample, count)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ndjson_path = Path(tmp_dir) / "invoices.ndjson"
+        started = time.perf_counter()
+        with NDJSONSink(str(ndjson_path)) as sink:
+            for invoice in invoices:
+                sink.write(invoice)
+        ndjson_write = time.perf_counter() - started
+        ndjson_bytes = ndjson_path.stat().st_size
+
+        started = time.perf_counter()
+        loaded = sum(1 for _ in Invoice.iter_ndjson(str(ndjson_path)))
+        ndjson_load = time.perf_counter() - started
+        assert loaded == count
+
+        files_dir = Path(tmp_dir) / "files"
+        files_dir.mkdir()
+        started = time.perf_counter()
+        paths = []
+        for invoice in sample:
+            path = files_dir / f"{Path(invoice.source_file).stem}_extracted.json"
+            with open(path, 'w') as f:
+                json.dump(invoice.to_json(), f, indent=2)
+            paths.append(path)
+        files_write = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for path in paths:
+            with open(path) as f:
+                Invoice.from_json(json.load(f))
+        files_load = time.perf_counter() - started
+
+    scale = count / len(sample) if sample else 0.0
+    return {
+        'invoices': count,
+        'backend': 'orjson' if serialization.HAS_ORJSON else 'json',
+        'ndjson': {
+            'write_seconds': round(ndjson_write, 3),
+            'load_seconds': round(ndjson_load, 3),
+            'write_per_sec': _rate(count, ndjson_write),
+            'load_per_sec': _rate(count, ndjson_load),
+            'bytes': ndjson_bytes
+        },
+        'json_files': {
+            'sample': len(sample),
+            'write_seconds_extrapolated': round(files_write * scale, 3),
+            'load_seconds_extrapolated': round(files_load * scale, 3),
+            'write_per_sec': _rate(len(sample), files_write),
+            'load_per_sec': _rate(len(sample), files_load)
+        }
+    }
+
+def main():
+    """Compare NDJSON export/reload with one indented JSON file per invoice:
+
+        python -m src.benchmarks.serialization_benchmark --invoices 100000
+    """
+    parser = argparse.ArgumentParser(description="Invoice serialization benchmark")
+    parser.add_argument("--invoices", type=int, default=100000)
+    parser.add_argument("--per-file-sample", type=int, default=2000)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.invoices, args.per_file_sample)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
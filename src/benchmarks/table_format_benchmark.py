@@ -0,0 +1,116 @@
+from typing import Dict, Any, List, Optional
+from pathlib import Path
+import argparse
+import json
+import logging
+
+from azure.ai.documentintelligence.models import AnalyzeResult
+
+from ..main import load_config
+from ..extractors.azure_docintel_extractor import AzureDocIntelExtractor
+from ..mock_services import Recordings
+from ..preprocessors.basic_preprocessor_v2 import BasicPreprocessorV2
+from ..preprocessors.token_estimator import estimate_tokens
+from .pipeline_benchmark import DEFAULT_FILES_DIR, build_corpus
+
+logger = logging.getLogger(__name__)
+
+FORMATS = BasicPreprocessorV2.TABLE_FORMATS
+
+def load_analyze_results(file_paths: List[str],
+                         recordings: Optional[Recordings] = None,
+                         extractor: Optional[AzureDocIntelExtractor] = None) -> Dict[str, AnalyzeResult]:
+    """Analysis of each file, from recordings or from Document Intelligence.
+
+    Files without an exact recording are skipped, since the recordings
+    fallback would measure another document.
+    """
+    results = {}
+    for file_path in file_paths:
+        if extractor is not None:
+            results[file_path] = extractor.extract(file_path).raw_response
+            continue
+        with open(file_path, 'rb') as f:
+            recorded = recordings.docintel(f.read(), fallback=False)
+        if recorded is None:
+            logger.warning(f"No recording for {file_path}, skipping")
+            continue
+        results[file_path] = AnalyzeResult(recorded)
+    return results
+
+def run_benchmark(analyze_results: Dict[str, AnalyzeResult], formats: List[str] = FORMATS) -> Dict[str, Any]:
+    """Tokens per page of the preprocessed text in each table format.
+
+    Args:
+        analyze_results: Analysis per file path
+        formats: Table formats to compare
+
+    Returns:
+        Report with totals per format and per-file token counts
+    """
+    preprocessors = {name: BasicPreprocessorV2(table_format=name) for name in formats}
+    totals = {name: {'tokens': 0, 'chars': 0} for name in formats}
+    files = {}
+    pages = 0
+
+    for file_path, result in analyze_results.items():
+        page_count = len(result.pages or []) or 1
+        pages += page_count
+        file_report = {'pages': page_count, 'tables': len(result.tables or [])}
+        for name, preprocessor in preprocessors.items():
+            text = preprocessor.process(result)
+            tokens = estimate_tokens(text)
+            totals[name]['tokens'] += tokens
+            totals[name]['chars'] += len(text)
+            file_report[name] = tokens
+        files[Path(file_path).name] = file_report
+
+    baseline = totals.get('grid', {}).get('tokens')
+    for total in totals.values():
+        total['tokens_per_page'] = round(total['tokens'] / pages, 1) if pages else 0.0
+        if baseline:
+            total['vs_grid'] = round(total['tokens'] / baseline, 3)
+
+    return {
+        'documents': len(files),
+        'pages': pages,
+        'formats': totals,
+        'files': files
+    }
+
+def main():
+    """Compare the token cost of the table formats over the sample invoices.
+
+    Preprocesses the Document Intelligence analysis of every file in
+    files/ with each table format and reports tokens per page:
+
+        python -m src.benchmarks.table_format_benchmark --recordings recordings/ --output tables.json
+
+    Use ``--live`` to analyze the files with the configured Document
+    Intelligence resource instead of recordings (see pipeline_benchmark
+    ``--record``).
+    """
+    parser = argparse.ArgumentParser(description="Tokens per page of each table format")
+    parser.add_argument("--files-dir", default=str(DEFAULT_FILES_DIR))
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--recordings", help="Directory of recorded service responses")
+    source.add_argument("--live", action="store_true", help="Analyze the files with Document Intelligence")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    file_paths = build_corpus(Path(args.files_dir))
+    if args.live:
+        extractor = AzureDocIntelExtractor.from_config(load_config()['azure_docint'])
+        analyze_results = load_analyze_results(file_paths, extractor=extractor)
+    else:
+        analyze_results = load_analyze_results(file_paths, recordings=Recordings(args.recordings))
+
+    report = run_benchmark(analyze_results, args.formats)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
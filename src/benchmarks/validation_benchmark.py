@@ -0,0 +1,87 @@
+from typing import Dict, Any, List, Tuple
+import argparse
+import json
+import time
+
+import jsonschema
+
+from ..core.models.invoice import Invoice
+from ..core.models.synthetic import make_invoices
+from ..validators.json_validator import JSONValidator
+
+def legacy_validate(validator: JSONValidator, invoice: Invoice) -> Tuple[bool, List[str]]:
+    """The previous validation path: jsonschema.validate per invoice, determinant and charge.
+
+    Each call checks the schema and builds a new validator. The projections
+    stand in for the ``.dict()`` methods the models do not have.
+    """
+    errors = []
+    try:
+        jsonschema.validate(instance=invoice.to_json(), schema=validator.INVOICE_SCHEMA,
+                            format_checker=jsonschema.FormatChecker())
+        for det in invoice.determinants:
+            jsonschema.validate(instance=vars(det), schema=validator.DETERMINANT_SCHEMA,
+                                format_checker=jsonschema.FormatChecker())
+        for charge in invoice.charges:
+            charge_json = {k: v for k, v in vars(charge).items() if k != 'determinant'}
+            jsonschema.validate(instance=charge_json, schema=validator.CHARGE_SCHEMA,
+                                format_checker=jsonschema.FormatChecker())
+    except jsonschema.ValidationError as e:
+        errors.append(f"Schema validation failed: {e.message}")
+    errors.extend(validator.validate_determinants(invoice.determinants, check_schema=False))
+    errors.extend(validator.validate_charges(invoice.charges, invoice.determinants, check_schema=False))
+    errors.extend(validator.validate_totals(invoice.charges, invoice.subtotals, invoice.total_amount))
+    return len(errors) == 0, errors
+
+def run_benchmark(count: int = 5000) -> Dict[str, Any]:
+    """Invoices per second of the legacy and the compiled validation paths.
+
+    Args:
+        count: Synthetic invoices validated by each path
+
+    Returns:
+        Report with seconds, throughput and invalid counts per path
+    """
+    invoices = make_invoices(count)
+    validator = JSONValidator()
+
+    started = time.perf_counter()
+    legacy = [legacy_validate(validator, invoice) for invoice in invoices]
+    legacy_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    compiled = validator.validate_batch(invoices)
+    compiled_seconds = time.perf_counter() - started
+
+    def report(results: List[Tuple[bool, List[str]]], seconds: float) -> Dict[str, Any]:
+        return {
+            'seconds': round(seconds, 3),
+            'invoices_per_sec': round(count / seconds, 1) if seconds > 0 else 0.0,
+            'invalid': sum(1 for valid, _ in results if not valid)
+        }
+
+    return {
+        'invoices': count,
+        'legacy': report(legacy, legacy_seconds),
+        'compiled': report(compiled, compiled_seconds),
+        'speedup': round(legacy_seconds / compiled_seconds, 2) if compiled_seconds > 0 else None
+    }
+
+def main():
+    """Compare per-call jsonschema.validate with the compiled JSONValidator:
+
+        python -m src.benchmarks.validation_benchmark --invoices 5000
+    """
+    parser = argparse.ArgumentParser(description="JSON schema validation benchmark")
+    parser.add_argument("--invoices", type=int, default=5000)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.invoices)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+from typing import Optional, Dict, Any, Iterator
+from contextlib import contextmanager
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def is_throttle_error(error: BaseException) -> bool:
+    """Whether an exception signals throttling (HTTP 429) or a timeout.
+
+    Works for openai.RateLimitError / APITimeoutError and Azure
+    HttpResponseError without importing either SDK.
+    """
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status_code in (408, 429, 503):
+        return True
+    return isinstance(error, TimeoutError) or 'Timeout' in type(error).__name__
+
+class Slot:
+    """A held limiter slot; set ``units`` to the work done by the request.
+
+    Latency is compared per unit, so for endpoints whose requests vary in
+    size (e.g. documents of many pages) a large request is not mistaken
+    for a latency spike.
+    """
+
+    def __init__(self):
+        self.units = 1.0
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on concurrent requests to one service endpoint.
+
+    Every successful request with normal latency raises the limit by
+    ``increase_step / limit``, roughly one extra slot per limit's worth of
+    completions. Throttling (429), timeouts and latency spikes cut it by
+    ``decrease_factor``. Only requests started after the previous cut can
+    cause another, so a burst of 429s from one window counts once. Latency
+    spikes are measured against an exponentially weighted moving average
+    of successful request latencies, per unit of work where requests
+    report their size.
+    """
+
+    def __init__(self,
+                 name: str,
+                 initial_limit: float = 4,
+                 min_limit: float = 1,
+                 max_limit: float = 64,
+                 increase_step: float = 1.0,
+                 decrease_factor: float = 0.5,
+                 latency_spike_factor: float = 2.0,
+                 latency_tolerance: float = 0.05,
+                 ewma_alpha: float = 0.1):
+        """Initialize the limiter.
+
+        Args:
+            name: Endpoint name used in logs and metrics (e.g., 'openai')
+            initial_limit: Starting number of concurrent requests
+            min_limit: Lower bound of the limit
+            max_limit: Upper bound of the limit
+            increase_step: Additive increase per limit's worth of successes
+            decrease_factor: Multiplier applied on throttling or latency spikes
+            latency_spike_factor: Latency above this multiple of the moving
+                                  average counts as congestion
+            latency_tolerance: Seconds above the average ignored as jitter
+            ewma_alpha: Weight of the newest sample in the latency average
+        """
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_spike_factor = latency_spike_factor
+        self.latency_tolerance = latency_tolerance
+        self.ewma_alpha = ewma_alpha
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._ewma_latency: Optional[float] = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+        self.successes = 0
+        self.throttled = 0
+        self.errors = 0
+        self.decreases = 0
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return max(int(self._limit), 1)
+
+    @contextmanager
+    def slot(self) -> Iterator[Slot]:
+        """Hold one request slot while calling the endpoint.
+
+        Exceptions raised inside the block are recorded (throttling and
+        timeouts reduce the limit) and re-raised. The block may set
+        ``units`` on the yielded Slot to the size of the request.
+        """
+        started = self.acquire()
+        held = Slot()
+        try:
+            yield held
+        except BaseException as e:
+            self.release(started, throttled=is_throttle_error(e), failed=True)
+            raise
+        self.release(started, units=held.units)
+
+    def acquire(self) -> float:
+        """Block until a slot is free; returns the request start time."""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+        return time.monotonic()
+
+    def release(self,
+                started: float,
+                throttled: bool = False,
+                failed: bool = False,
+                units: float = 1.0) -> None:
+        """Free a slot and adapt the limit to the request outcome.
+
+        Args:
+            started: Value returned by acquire()
+            throttled: The request was throttled or timed out
+            failed: The request failed (other errors do not change the limit)
+            units: Size of the request (e.g. pages); latency is compared per unit
+        """
+        latency = (time.monotonic() - started) / max(units, 1.0)
+        with self._condition:
+            self._in_flight -= 1
+
+            if throttled:
+                self.throttled += 1
+                self._decrease(started, "throttled")
+            elif failed:
+                self.errors += 1
+            else:
+                self.successes += 1
+                baseline = self._ewma_latency
+                if baseline is not None and latency > max(baseline * self.latency_spike_factor,
+                                                          baseline + self.latency_tolerance):
+                    self._decrease(started, f"latency {latency:.2f}s vs {baseline:.2f}s")
+                else:
+                    self._limit = min(self._limit + self.increase_step / self._limit, self.max_limit)
+                self._ewma_latency = latency if baseline is None else (
+                    self.ewma_alpha * latency + (1 - self.ewma_alpha) * baseline
+                )
+
+            self._condition.notify_all()
+
+    def _decrease(self, started: float, reason: str) -> None:
+        # Requests already in flight at the last cut saw the old limit
+        if started < self._last_decrease:
+            return
+        self._limit = max(self._limit * self.decrease_factor, self.min_limit)
+        self._last_decrease = time.monotonic()
+        self.decreases += 1
+        logger.info(f"Concurrency for {self.name} reduced to {self.limit} ({reason})")
+
+    def stats(self) -> Dict[str, Any]:
+        """Current limit and counters, for metrics."""
+        with self._condition:
+            return {
+                'limit': self.limit,
+                'in_flight': self._in_flight,
+                'ewma_latency': round(self._ewma_latency, 3) if self._ewma_latency is not None else None,
+                'successes': self.successes,
+                'throttled': self.throttled,
+                'errors': self.errors,
+                'decreases': self.decreases
+            }
+
+    @classmethod
+    def from_config(cls, name: str, config: Dict[str, Any]) -> 'AdaptiveConcurrencyLimiter':
+        """Create a limiter from an 'adaptive_concurrency' configuration section."""
+        return cls(
+            name=name,
+            initial_limit=config.get('initial_limit', 4),
+            min_limit=config.get('min_limit', 1),
+            max_limit=config.get('max_limit', 64),
+            increase_step=config.get('increase_step', 1.0),
+            decrease_factor=config.get('decrease_factor', 0.5),
+            latency_spike_factor=config.get('latency_spike_factor', 2.0),
+            latency_tolerance=config.get('latency_tolerance', 0.05),
+            ewma_alpha=config.get('ewma_alpha', 0.1)
+        )
+
+# One limiter per endpoint, shared by all extractors in the process
+_limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(name: str, config: Optional[Dict[str, Any]] = None) -> AdaptiveConcurrencyLimiter:
+    """Get the shared limiter for an endpoint, creating it on first use.
+
+    Args:
+        name: Endpoint name (e.g., 'docintel', 'openai')
+        config: Settings used when the limiter is created
+
+    Returns:
+        The process-wide limiter for that endpoint
+    """
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = AdaptiveConcurrencyLimiter.from_config(name, config or {})
+        return _limiters[name]
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every shared limiter, keyed by endpoint name."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
@@ -0,0 +1,118 @@
+from typing import Optional, Dict, Any
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+def hash_file(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def hash_text(text: str) -> str:
+    """SHA-256 of a string."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def config_hash(*parts: Any) -> str:
+    """Stable SHA-256 over JSON-serializable key parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def component_fingerprint(component: Any) -> Dict[str, Any]:
+    """Describe a pipeline component's configuration for checkpoint keys.
+
+    Components may define ``checkpoint_config()`` returning everything that
+    affects their output. Otherwise the class name and the component's simple
+    attributes (strings, numbers, booleans) are used.
+    """
+    config = getattr(component, 'checkpoint_config', None)
+    if callable(config):
+        settings = config()
+    else:
+        settings = {
+            k: v for k, v in vars(component).items()
+            if not k.startswith('_') and isinstance(v, (str, int, float, bool, type(None)))
+        }
+    return {
+        'class': f"{type(component).__module__}.{type(component).__qualname__}",
+        'config': settings
+    }
+
+class CheckpointStore:
+    """File-based store for the outputs of individual pipeline stages.
+
+    Each entry is addressed by a stage name and a key derived from the stage
+    input hash plus the stage's configuration, so changing a prompt or a
+    preprocessor setting only invalidates the stages that depend on it.
+    Entries are JSON files written atomically under
+    ``<root>/<stage>/<key[:2]>/<key>.json``.
+    """
+
+    def __init__(self, root_dir: str):
+        """Initialize the checkpoint store.
+
+        Args:
+            root_dir: Directory holding the checkpoint files
+        """
+        self.root_dir = Path(root_dir)
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, stage: str, key: str) -> Path:
+        return self.root_dir / stage / key[:2] / f"{key}.json"
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        """Load a stage output, or None if it has not been computed.
+
+        Args:
+            stage: Stage name (e.g., 'ocr', 'preprocess', 'prompt', 'invoice')
+            key: Checkpoint key for the stage input and configuration
+
+        Returns:
+            The stored JSON value, or None
+        """
+        path = self._path(stage, key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except json.JSONDecodeError:
+            logger.warning(f"Discarding corrupt checkpoint: {path}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        """Store a stage output.
+
+        Args:
+            stage: Stage name
+            key: Checkpoint key for the stage input and configuration
+            value: JSON-serializable stage output
+        """
+        path = self._path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'CheckpointStore':
+        """Create a checkpoint store from the 'checkpoints' configuration section."""
+        return cls(root_dir=config.get('dir', '.checkpoints'))
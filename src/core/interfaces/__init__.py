@@ -2,10 +2,13 @@ from .text_extractor import TextExtractor
 from .text_preprocessor import TextPreprocessor
 from .data_extractor import DataExtractor
 from .validator import Validator
+from .work_queue import WorkQueue, Lease
 
 __all__ = [
     'TextExtractor',
     'TextPreprocessor',
     'DataExtractor',
     'Validator',
+    'WorkQueue',
+    'Lease',
 ] 
\ No newline at end of file
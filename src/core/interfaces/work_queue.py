@@ -0,0 +1,104 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Any, List, Iterable, Optional
+
+# Task states
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+TASK_STATES = (PENDING, LEASED, DONE, FAILED)
+
+@dataclass(frozen=True)
+class Lease:
+    """A task leased to one worker until ``expires_at``.
+
+    ``token`` is a fencing token: it increases every time the task is
+    leased, so a worker whose lease expired and was taken over can no
+    longer renew it or commit a result.
+    """
+    task_id: str
+    worker_id: str
+    token: int
+    expires_at: float
+    attempts: int
+
+class WorkQueue(ABC):
+    """Abstract base class for shared stores of invoice tasks.
+
+    This interface defines the contract between workers on one or many
+    machines pulling tasks from the same queue. Implementations should
+    guarantee:
+    1. A task is leased to at most one worker at a time
+    2. Tasks whose lease expires (e.g., the worker died) are leased again
+    3. A result is committed at most once, and only by the current lease holder
+    """
+
+    @abstractmethod
+    def enqueue(self, task_ids: Iterable[str]) -> int:
+        """Add tasks; tasks already known are left untouched.
+
+        Args:
+            task_ids: Task identifiers (invoice file paths)
+
+        Returns:
+            Number of newly added tasks
+        """
+        pass
+
+    @abstractmethod
+    def lease(self, worker_id: str, lease_seconds: float, limit: int = 1) -> List[Lease]:
+        """Lease available tasks, including those whose lease has expired.
+
+        Args:
+            worker_id: Identifier of the leasing worker
+            lease_seconds: Time the worker has before the tasks are released
+            limit: Maximum number of tasks to lease
+
+        Returns:
+            The leases, possibly empty
+        """
+        pass
+
+    @abstractmethod
+    def heartbeat(self, lease: Lease, lease_seconds: float) -> Optional[Lease]:
+        """Extend a lease.
+
+        Returns:
+            The extended lease, or None if it has been lost
+        """
+        pass
+
+    @abstractmethod
+    def complete(self, lease: Lease, result: Dict[str, Any]) -> bool:
+        """Commit the result of a task.
+
+        Returns:
+            True if the result was committed, False if the lease was lost
+            and the result must be discarded
+        """
+        pass
+
+    @abstractmethod
+    def fail(self, lease: Lease, error: str, retry: bool = True) -> bool:
+        """Record a failed attempt, releasing the task for a retry or failing it.
+
+        Returns:
+            False if the lease was lost
+        """
+        pass
+
+    @abstractmethod
+    def requeue_failed(self) -> int:
+        """Give failed tasks a fresh set of attempts.
+
+        Returns:
+            Number of re-queued tasks
+        """
+        pass
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Number of tasks in each of TASK_STATES."""
+        pass
@@ -24,3 +24,31 @@ class ExtractionResult:
         required_fields = {'page_count', 'language', 'file_path'}
         if not all(field in self.metadata for field in required_fields):
             raise ValueError(f"Metadata must contain: {required_fields}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dictionary."""
+        raw_response = self.raw_response
+        if hasattr(raw_response, 'as_dict'):
+            raw_response = raw_response.as_dict()
+        return {
+            'raw_text': self.raw_text,
+            'metadata': self.metadata,
+            'raw_response': raw_response
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ExtractionResult':
+        """Create an extraction result from its dictionary form.
+
+        A serialized Document Intelligence response is restored as an
+        AnalyzeResult so preprocessors can consume it unchanged.
+        """
+        raw_response = data.get('raw_response')
+        if isinstance(raw_response, dict):
+            from azure.ai.documentintelligence.models import AnalyzeResult
+            raw_response = AnalyzeResult(raw_response)
+        return cls(
+            raw_text=data['raw_text'],
+            metadata=data['metadata'],
+            raw_response=raw_response
+        )
@@ -1,11 +1,12 @@
 from dataclasses import dataclass, field
 from datetime import date
-from typing import List, Dict, Optional, Union, Any
-import json
+from typing import List, Dict, Optional, Union, Any, Iterator
 import os
 from pathlib import Path
 from deepdiff import DeepDiff
 
+from .. import serialization
+
 @dataclass
 class Determinant:
     """Measured quantity used for billing calculations."""
@@ -222,8 +223,8 @@ class Invoice:
         json_path = out_path / f"{file_stem}_extracted.json"
         
         # Save JSON file
-        with open(json_path, 'w') as f:
-            json.dump(self.to_json(), f, indent=2)
+        with open(json_path, 'wb') as f:
+            f.write(serialization.dumps(self.to_json(), indent=True))
             
         return str(json_path)
     
@@ -237,17 +238,41 @@ class Invoice:
         Returns:
             Invoice object
         """
-        with open(json_path, 'r') as f:
-            data = json.load(f)
+        with open(json_path, 'rb') as f:
+            data = serialization.loads(f.read())
+        
+        return cls.from_json(data)
+
+    @classmethod
+    def iter_ndjson(cls, ndjson_path: str) -> Iterator['Invoice']:
+        """Load invoices one at a time from an NDJSON file written by NDJSONSink.
+        
+        Args:
+            ndjson_path: Path to NDJSON file with one to_json() record per line
+            
+        Yields:
+            Invoice objects
+        """
+        for data in serialization.iter_ndjson(ndjson_path):
+            yield cls.from_json(data)
+    
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'Invoice':
+        """Create an invoice from the dictionary produced by to_json().
+        
+        Args:
+            data: Dictionary in the to_json() layout
+            
+        Returns:
+            Invoice object
+        """
+        data = {**data, 'account_info': dict(data['account_info'])}
             
-        # Convert dates from ISO format strings
+        # Convert dates from ISO format strings (fromisoformat is much faster than strptime)
         for date_field in ['invoice_date', 'billing_period_start', 'billing_period_end', 
                           'due_date', 'extraction_date']:
             if date_field in data['account_info'] and data['account_info'][date_field]:
-                data['account_info'][date_field] = datetime.strptime(
-                    data['account_info'][date_field], 
-                    '%Y-%m-%d'
-                ).date()
+                data['account_info'][date_field] = date.fromisoformat(data['account_info'][date_field])
                 
         # Create Determinant objects
         determinants = [Determinant(**d) for d in data['determinants']]
@@ -0,0 +1,37 @@
+from typing import List
+from datetime import date
+
+from .invoice import Invoice, Determinant, Charge
+
+def make_invoices(count: int, charges_per_invoice: int = 12) -> List[Invoice]:
+    """Synthetic invoices with a realistic number of determinants and charges."""
+    invoices = []
+    for i in range(count):
+        determinants = [
+            Determinant(name="Total Usage", value=1000.0 + i, unit="kWh", meter=f"M{i}", commodity="Electric Power"),
+            Determinant(name="Peak Demand", value=42.5, unit="kW", meter=f"M{i}", commodity="Electric Power"),
+        ]
+        charges = [
+            Charge(name=f"Charge {j}", amount=round(10.0 + j * 1.25, 2), category="Usage",
+                   commodity="Electric Power", meter_number=f"M{i}")
+            for j in range(charges_per_invoice)
+        ]
+        invoices.append(Invoice(
+            account_number=f"{100000 + i}",
+            invoice_number=f"INV-{i}",
+            invoice_date=date(2024, 3, 1),
+            billing_period_start=date(2024, 2, 1),
+            billing_period_end=date(2024, 2, 29),
+            vendor_name="Pacific Power & Light",
+            customer_name="John Smith",
+            service_address="123 Main St",
+            meter_numbers=[f"M{i}"],
+            determinants=determinants,
+            charges=charges,
+            subtotals={"Electric Power": sum(c.amount for c in charges)},
+            total_amount=sum(c.amount for c in charges),
+            source_file=f"invoice_{i}.pdf",
+            extraction_date=date(2024, 3, 5),
+            commodities=["Electric Power"]
+        ))
+    return invoices
@@ -0,0 +1,119 @@
+from typing import Dict, Any, Optional
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+def operation_key(data: bytes, *parts: Any) -> str:
+    """Key of an analyze request: the uploaded bytes and the request options."""
+    digest = hashlib.sha256(data)
+    for part in parts:
+        digest.update(b'\0' + str(part).encode('utf-8'))
+    return digest.hexdigest()
+
+class OperationStore:
+    """SQLite store of continuation tokens of in-flight long-running operations.
+
+    A token is saved as soon as an analysis has been submitted and removed
+    once its result has been received, so a worker restarted in between
+    resumes polling the same operation instead of uploading (and paying for)
+    the document again. Tokens older than ``max_age`` are ignored, since the
+    service only keeps analysis results for a limited time.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS operations (
+            operation_key TEXT PRIMARY KEY,
+            continuation_token TEXT NOT NULL,
+            description TEXT,
+            created_at REAL NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, db_path: str, max_age: float = 23 * 3600):
+        """Open (or create) the operation database.
+
+        Args:
+            db_path: Path to the SQLite database file
+            max_age: Seconds after submission a token can still be resumed
+                     (Document Intelligence keeps results for 24 hours)
+        """
+        self.db_path = db_path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self) -> None:
+        self._pid = os.getpid()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def _check_fork(self) -> None:
+        # Pre-forked workers inherit the store; SQLite connections must not
+        # cross a fork, so each process opens its own
+        if self._pid != os.getpid():
+            self._open()
+
+    def get(self, key: str) -> Optional[str]:
+        """Continuation token of an unfinished operation, or None.
+
+        Args:
+            key: Operation key from ``operation_key``
+        """
+        with self._lock:
+            self._check_fork()
+            row = self._conn.execute(
+                "SELECT continuation_token, created_at FROM operations WHERE operation_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[1] > self.max_age:
+                self._conn.execute("DELETE FROM operations WHERE operation_key = ?", (key,))
+                return None
+            return row[0]
+
+    def put(self, key: str, continuation_token: str, description: Optional[str] = None) -> None:
+        """Save the token of a submitted operation.
+
+        Args:
+            key: Operation key from ``operation_key``
+            continuation_token: Token returned by the poller
+            description: What was submitted (e.g., the file path), for inspection
+        """
+        with self._lock:
+            self._check_fork()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO operations (operation_key, continuation_token, description, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, continuation_token, description, time.time())
+            )
+
+    def delete(self, key: str) -> None:
+        """Forget an operation once its result has been received or it has failed."""
+        with self._lock:
+            self._check_fork()
+            self._conn.execute("DELETE FROM operations WHERE operation_key = ?", (key,))
+
+    def pending(self) -> int:
+        """Number of operations that were submitted but not completed."""
+        with self._lock:
+            self._check_fork()
+            return self._conn.execute("SELECT COUNT(*) FROM operations").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'OperationStore':
+        """Create a store from the 'azure_docint.operation_store' configuration section."""
+        return cls(
+            db_path=config.get('db_path', '.docintel_operations.db'),
+            max_age=config.get('max_age_hours', 23) * 3600
+        )
@@ -0,0 +1,118 @@
+from typing import Any, Iterator, Union
+from datetime import date, datetime
+from pathlib import Path
+import json
+import logging
+import threading
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+HAS_ORJSON = orjson is not None
+
+def _default(obj: Any) -> Any:
+    """Encode values the JSON encoders do not handle natively."""
+    if isinstance(obj, (date, datetime)):
+        return obj.isoformat()
+    if hasattr(obj, 'to_json'):
+        return obj.to_json()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """Encode a value as UTF-8 JSON.
+
+    Uses orjson when it is installed, otherwise the standard library.
+    Dates and datetimes are written in ISO format by both.
+
+    Args:
+        obj: Value to encode
+        indent: Indent by two spaces instead of writing a single line
+
+    Returns:
+        Encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, default=_default, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, default=_default, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, separators=(',', ':'), default=_default, ensure_ascii=False).encode('utf-8')
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+class NDJSONSink:
+    """Appends records to a newline-delimited JSON file with buffered writes.
+
+    Records are dictionaries or objects with a ``to_json()`` method (such
+    as Invoice). Writes are thread-safe, and each record is one line, so a
+    crash leaves at most the last line incomplete.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1024 * 1024):
+        """Open the sink.
+
+        Args:
+            path: NDJSON file, created or appended to
+            buffer_size: Bytes buffered before writing to the file
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'ab', buffering=buffer_size)
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def write(self, record: Any) -> None:
+        """Append one record."""
+        if hasattr(record, 'to_json'):
+            record = record.to_json()
+        line = dumps(record) + b"\n"
+        with self._lock:
+            self._file.write(line)
+            self.records += 1
+
+    def flush(self) -> None:
+        """Write buffered records to the file."""
+        with self._lock:
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self) -> 'NDJSONSink':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+def iter_ndjson(path: str, buffer_size: int = 1024 * 1024) -> Iterator[Any]:
+    """Decoded records of an NDJSON file, skipping blank lines.
+
+    An incomplete last line (from an interrupted writer) is logged and skipped.
+
+    Args:
+        path: NDJSON file
+        buffer_size: Read buffer size in bytes
+
+    Yields:
+        One decoded value per line
+    """
+    with open(path, 'rb', buffering=buffer_size) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield loads(line)
+            except ValueError:
+                if line.endswith(b"\n"):
+                    raise
+                logger.warning(f"Skipping incomplete last line {line_number} of {path}")
@@ -1,5 +1,10 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Sequence, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+import io
+import logging
 from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import HttpResponseError
 from azure.ai.documentintelligence import DocumentIntelligenceClient
 from azure.ai.documentintelligence.models import AnalyzeResult
 
@@ -7,22 +12,69 @@ from ..core.interfaces.text_extractor import TextExtractor
 from ..core.models.extraction_result import ExtractionResult
 from ..preprocessors.basic_preprocessor import BasicPreprocessor
 from ..preprocessors.basic_preprocessor_v2 import BasicPreprocessorV2
+from ..core.adaptive_concurrency import AdaptiveConcurrencyLimiter, Slot, get_limiter
+from ..core.operation_store import OperationStore, operation_key
+from .image_normalizer import ImageNormalizer
+from .page_ranges import count_pdf_pages, page_ranges, merge_analyze_results
+
+logger = logging.getLogger(__name__)
 
 class AzureDocIntelExtractor(TextExtractor):
     """Azure Document Intelligence implementation of the TextExtractor interface."""
     
-    def __init__(self, endpoint: str, key: str):
+    def __init__(self,
+                 endpoint: str,
+                 key: str,
+                 concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                 image_normalizer: Optional[ImageNormalizer] = None,
+                 pages_per_range: Optional[int] = None,
+                 min_range_pages: int = 20,
+                 max_range_workers: int = 4,
+                 operation_store: Optional[OperationStore] = None,
+                 polling_interval: Optional[float] = None):
         """Initialize the Azure Document Intelligence client.
         
         Args:
             endpoint: Azure Document Intelligence endpoint
             key: Azure Document Intelligence API key
+            concurrency_limiter: Optional adaptive limit on concurrent analyze calls
+            image_normalizer: Optional orientation, grayscale, resolution and
+                              size normalization of image files before upload
+            pages_per_range: Split PDFs into page ranges of this size that are
+                             analyzed concurrently; None analyzes them whole
+            min_range_pages: Smallest PDF page count that is split
+            max_range_workers: Page ranges of one document analyzed at a time
+            operation_store: Optional store of continuation tokens, so analyses
+                             interrupted by a restart are resumed rather than resubmitted
+            polling_interval: Seconds between result polls when the service
+                              does not ask for a delay; None uses the SDK default
         """
         self.client = DocumentIntelligenceClient(
             endpoint=endpoint, 
             credential=AzureKeyCredential(key)
         )
-        self.preprocessor = BasicPreprocessorV2()
+        # raw_text keeps the grid table layout that templates are learned on
+        self.preprocessor = BasicPreprocessorV2(table_format="grid")
+        self.model_id = "prebuilt-layout"
+        self.concurrency_limiter = concurrency_limiter
+        self.image_normalizer = image_normalizer
+        self.pages_per_range = pages_per_range
+        self.min_range_pages = min_range_pages
+        self.max_range_workers = max_range_workers
+        self.operation_store = operation_store
+        self.polling_interval = polling_interval
+
+    def checkpoint_config(self) -> Dict[str, Any]:
+        """Settings affecting the OCR result, for checkpoint keys."""
+        config = {'model_id': self.model_id}
+        if self.image_normalizer:
+            config['image_normalization'] = self.image_normalizer.checkpoint_config()
+        if self.pages_per_range:
+            config['page_ranges'] = {
+                'pages_per_range': self.pages_per_range,
+                'min_pages': self.min_range_pages
+            }
+        return config
 
     def extract(self, file_path: str) -> ExtractionResult:
         """Extract text and layout information from a document.
@@ -33,25 +85,154 @@ class AzureDocIntelExtractor(TextExtractor):
         Returns:
             ExtractionResult containing the extracted text and metadata
         """
-        # Read and analyze document
-        with open(file_path, "rb") as f:
+        # Photos and scans are uploaded oriented, in grayscale and at a bounded resolution
+        normalized = None
+        if self.image_normalizer and self.image_normalizer.is_image(file_path):
+            normalized = self.image_normalizer.normalize_file(file_path)
+        
+        metadata = {"file_path": file_path}
+        if normalized:
+            result = self._analyze(normalized.data, file_path)
+            metadata["upload_bytes"] = len(normalized.data)
+            metadata["original_bytes"] = normalized.original_bytes
+        elif self.pages_per_range and file_path.lower().endswith(".pdf"):
+            with open(file_path, "rb") as f:
+                result, ranges = self._analyze_pdf(f.read(), file_path)
+            if ranges:
+                metadata["page_ranges"] = ranges
+        else:
+            with open(file_path, "rb") as f:
+                result = self._analyze(f.read(), file_path)
+        return self._extraction_result(result, metadata)
+
+    def extract_images(self, image_paths: Sequence[str]) -> ExtractionResult:
+        """Extract one document from photographed or scanned pages.
+        
+        The images are combined in memory into a single multi-page PDF, so
+        the pages are analyzed in one request and numbered in the given
+        order. Pages are normalized with the configured image normalizer, or
+        with default settings when there is none.
+        
+        Args:
+            image_paths: Page image files, first page first
+            
+        Returns:
+            ExtractionResult for the whole document; metadata 'page_files'
+            lists the image of each page
+        """
+        normalizer = self.image_normalizer or ImageNormalizer()
+        images = []
+        for image_path in image_paths:
+            with open(image_path, "rb") as f:
+                images.append(f.read())
+        bundle = normalizer.bundle(images)
+        
+        result = self._analyze(bundle.data, image_paths[0])
+        if len(result.pages) != len(image_paths):
+            logger.warning(f"Analysis returned {len(result.pages)} pages for {len(image_paths)} images")
+        return self._extraction_result(result, {
+            "file_path": image_paths[0],
+            "page_files": list(image_paths),
+            "upload_bytes": len(bundle.data),
+            "original_bytes": bundle.original_bytes
+        })
+
+    def _analyze_pdf(self, data: bytes, description: str) -> Tuple[AnalyzeResult, List[str]]:
+        """Analyze a PDF, in concurrent page ranges when it is long enough.
+        
+        Every range uploads the whole file and selects its pages with the
+        service's ``pages`` parameter, so page numbers stay document-wide and
+        no PDF library is needed. The partial results are merged into one.
+        
+        Returns:
+            The analysis and the page ranges it was made of (empty when the
+            document was analyzed whole)
+        """
+        page_count = count_pdf_pages(data)
+        if not page_count or page_count < self.min_range_pages:
+            return self._analyze(data, description), []
+        
+        ranges = page_ranges(page_count, self.pages_per_range)
+        logger.info(f"Analyzing {page_count} pages in {len(ranges)} ranges")
+        with ThreadPoolExecutor(max_workers=min(self.max_range_workers, len(ranges))) as executor:
+            parts = list(executor.map(
+                lambda pages: self._analyze(data, description, pages=pages).as_dict(),
+                ranges
+            ))
+        return AnalyzeResult(merge_analyze_results(parts)), ranges
+
+    def _analyze(self, data: bytes, description: str, pages: Optional[str] = None) -> AnalyzeResult:
+        """Analyze a document; the limiter slot is held until the analysis completes.
+        
+        The limiter compares the latency per analyzed page, so a long PDF
+        is not taken for a latency spike and does not cut the limit.
+        
+        With an operation store, the continuation token of the submitted
+        analysis is kept until its result arrives, and an analysis of the
+        same bytes and options left unfinished by an earlier process is
+        resumed instead of submitted again.
+        
+        Args:
+            data: Document bytes to upload
+            description: What is analyzed (the file path), for logs and the operation store
+            pages: Optional page range, e.g. '1-10'
+        """
+        polling = {} if self.polling_interval is None else {"polling_interval": self.polling_interval}
+        key = operation_key(data, self.model_id, pages) if self.operation_store else None
+        
+        limiter = self.concurrency_limiter.slot() if self.concurrency_limiter else nullcontext(Slot())
+        with limiter as slot:
+            token = self.operation_store.get(key) if key else None
+            if token:
+                logger.info(f"Resuming analysis of {description}")
+                try:
+                    result = self.client.begin_analyze_document(
+                        self.model_id, continuation_token=token, **polling
+                    ).result()
+                    self.operation_store.delete(key)
+                    slot.units = self._page_count(result)
+                    return result
+                except HttpResponseError as e:
+                    # Expired or failed operations are submitted again
+                    logger.warning(f"Could not resume analysis of {description}: {e}")
+                    self.operation_store.delete(key)
+            
             poller = self.client.begin_analyze_document(
-                "prebuilt-layout",
-                analyze_request=f,
-                content_type="application/octet-stream"
+                self.model_id,
+                analyze_request=io.BytesIO(data),
+                content_type="application/octet-stream",
+                **({"pages": pages} if pages else {}),
+                **polling
             )
-        result = poller.result()
+            if key:
+                self.operation_store.put(key, poller.continuation_token(), description)
+            try:
+                result = poller.result()
+            except HttpResponseError:
+                # A failed analysis cannot be resumed; a retry submits it again
+                if key:
+                    self.operation_store.delete(key)
+                raise
+            if key:
+                self.operation_store.delete(key)
+            slot.units = self._page_count(result)
+            return result
+
+    @staticmethod
+    def _page_count(result: AnalyzeResult) -> int:
+        return len(getattr(result, 'pages', None) or []) or 1
 
+    def _extraction_result(self, result: AnalyzeResult, metadata: Dict[str, Any]) -> ExtractionResult:
         # Preprocess the result to format tables and text
         processed_text = self.preprocessor.process(result)
-
+        
         # Create extraction result
         return ExtractionResult(
             raw_text=processed_text,
             metadata={
                 "page_count": len(result.pages),
                 "language": result.languages[0] if result.languages else "unknown",
-                "file_path": file_path
+                **metadata
             },
             raw_response=result
         )
@@ -61,7 +242,9 @@ class AzureDocIntelExtractor(TextExtractor):
         """Create an extractor instance from configuration.
         
         Args:
-            config: Dictionary containing 'endpoint' and 'key'
+            config: Dictionary containing 'endpoint' and 'key', and optionally
+                    'adaptive_concurrency' limiter, 'image_normalization',
+                    'page_ranges' and 'operation_store' settings and 'polling_interval'
             
         Returns:
             Configured AzureDocIntelExtractor instance
@@ -70,9 +253,31 @@ class AzureDocIntelExtractor(TextExtractor):
         if not all(k in config for k in required_keys):
             raise ValueError(f"Config must contain: {required_keys}")
             
+        concurrency_limiter = None
+        if 'adaptive_concurrency' in config:
+            concurrency_limiter = get_limiter('docintel', config['adaptive_concurrency'])
+            
+        image_normalizer = None
+        normalization_config = config.get('image_normalization', {})
+        if normalization_config.get('enabled'):
+            image_normalizer = ImageNormalizer.from_config(normalization_config)
+            
+        operation_store = None
+        operation_config = config.get('operation_store', {})
+        if operation_config.get('enabled'):
+            operation_store = OperationStore.from_config(operation_config)
+            
+        range_config = config.get('page_ranges', {})
         return AzureDocIntelExtractor(
             endpoint=config['endpoint'],
-            key=config['key']
+            key=config['key'],
+            concurrency_limiter=concurrency_limiter,
+            image_normalizer=image_normalizer,
+            pages_per_range=range_config.get('pages_per_range', 10) if range_config.get('enabled') else None,
+            min_range_pages=range_config.get('min_pages', 20),
+            max_range_workers=range_config.get('max_workers', 4),
+            operation_store=operation_store,
+            polling_interval=config.get('polling_interval')
         )
 
     @property
@@ -0,0 +1,199 @@
+from typing import Dict, Any, Sequence, Tuple
+from dataclasses import dataclass
+from pathlib import Path
+import io
+import logging
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.heif'}
+
+# Document Intelligence input limits
+MAX_DIMENSION = 10000
+MIN_DIMENSION = 50
+
+EXIF_ORIENTATION = 0x0112
+
+@dataclass
+class NormalizedImage:
+    """Upload bytes of an image or page bundle and what normalization changed."""
+    data: bytes
+    content_type: str
+    original_bytes: int
+    size: Tuple[int, int]
+    changed: bool
+
+class ImageNormalizer:
+    """Prepares photographed and scanned pages for upload to Document Intelligence.
+
+    Applies the EXIF orientation, converts to grayscale, downscales pages
+    captured above ``target_dpi`` and re-encodes them, lowering the JPEG
+    quality (and then the resolution) until the upload fits ``max_bytes``.
+    The resolution is estimated from the longer side of the image, assuming
+    it shows a whole page of ``page_inches``. Bilevel scans are kept
+    lossless as PNG. The original bytes are uploaded unchanged when
+    normalizing would not make them smaller and needs no rotation.
+    """
+
+    def __init__(self,
+                 target_dpi: int = 200,
+                 page_inches: float = 11.0,
+                 grayscale: bool = True,
+                 jpeg_quality: int = 85,
+                 min_jpeg_quality: int = 50,
+                 max_bytes: int = 4 * 1024 * 1024):
+        """Initialize the normalizer.
+
+        Args:
+            target_dpi: Resolution pages are downscaled to
+            page_inches: Length of the longer page side, for estimating the resolution
+            grayscale: Convert colour images to grayscale
+            jpeg_quality: Initial JPEG quality
+            min_jpeg_quality: Lowest JPEG quality before the resolution is reduced
+            max_bytes: Upload size limit (4 MB on the free tier)
+        """
+        self.target_dpi = target_dpi
+        self.page_inches = page_inches
+        self.grayscale = grayscale
+        self.jpeg_quality = jpeg_quality
+        self.min_jpeg_quality = min_jpeg_quality
+        self.max_bytes = max_bytes
+
+    def checkpoint_config(self) -> Dict[str, Any]:
+        """Settings affecting the uploaded bytes, for OCR checkpoint keys."""
+        return {
+            'target_dpi': self.target_dpi,
+            'page_inches': self.page_inches,
+            'grayscale': self.grayscale,
+            'jpeg_quality': self.jpeg_quality,
+            'min_jpeg_quality': self.min_jpeg_quality,
+            'max_bytes': self.max_bytes
+        }
+
+    @staticmethod
+    def is_image(file_path: str) -> bool:
+        return Path(file_path).suffix.lower() in IMAGE_SUFFIXES
+
+    def normalize_file(self, file_path: str) -> NormalizedImage:
+        """Normalize an image file."""
+        with open(file_path, 'rb') as f:
+            return self.normalize(f.read())
+
+    def normalize(self, data: bytes) -> NormalizedImage:
+        """Normalize encoded image bytes.
+
+        Args:
+            data: Encoded image
+
+        Returns:
+            The image to upload
+        """
+        with Image.open(io.BytesIO(data)) as source:
+            source_format, source_size = source.format, source.size
+            content_type = Image.MIME.get(source_format, 'application/octet-stream')
+            # Multi-page TIFFs are uploaded as they are rather than reduced to one page
+            if getattr(source, 'n_frames', 1) > 1:
+                return NormalizedImage(data, content_type, len(data), source_size, changed=False)
+            rotated = source.getexif().get(EXIF_ORIENTATION, 1) != 1
+            image = self.prepare(source)
+
+        if image.mode == '1':
+            encoded, encoded_type = self._encode_png(image), 'image/png'
+        else:
+            encoded, image = self._encode_jpeg(image)
+            encoded_type = 'image/jpeg'
+
+        if len(encoded) >= len(data) and not rotated and len(data) <= self.max_bytes:
+            return NormalizedImage(data, content_type, len(data), source_size, changed=False)
+        return NormalizedImage(encoded, encoded_type, len(data), image.size, changed=True)
+
+    def bundle(self, images: Sequence[bytes]) -> NormalizedImage:
+        """Combine page images into one multi-page PDF, in the given order.
+
+        Every page is normalized like a single image. The JPEG quality is
+        lowered step by step if the PDF exceeds ``max_bytes``.
+
+        Args:
+            images: Encoded page images, first page first
+
+        Returns:
+            The PDF to upload; ``size`` is that of the first page
+        """
+        if not images:
+            raise ValueError("No page images to bundle")
+        pages = []
+        for data in images:
+            with Image.open(io.BytesIO(data)) as source:
+                pages.append(self.prepare(source))
+        # Page size in the PDF follows the estimated scan resolution
+        resolution = max(pages[0].size) / self.page_inches
+
+        quality = self.jpeg_quality
+        while True:
+            buffer = io.BytesIO()
+            pages[0].save(buffer, format='PDF', save_all=True, append_images=pages[1:],
+                          resolution=resolution, quality=quality)
+            if buffer.tell() <= self.max_bytes or quality <= self.min_jpeg_quality:
+                break
+            quality = max(self.min_jpeg_quality, quality - 10)
+        if buffer.tell() > self.max_bytes:
+            logger.warning(f"Bundle of {len(pages)} pages exceeds {self.max_bytes} bytes")
+        return NormalizedImage(buffer.getvalue(), 'application/pdf', sum(len(data) for data in images),
+                               pages[0].size, changed=True)
+
+    def prepare(self, image: Image.Image) -> Image.Image:
+        """Orient, convert and downscale a decoded image."""
+        image = ImageOps.exif_transpose(image)
+
+        if image.mode == '1':
+            return image
+        if self.grayscale and image.mode != 'L':
+            image = image.convert('L')
+        elif image.mode not in ('L', 'RGB'):
+            image = image.convert('RGB')
+
+        scale = min(1.0, self.target_dpi * self.page_inches / max(image.size), MAX_DIMENSION / max(image.size))
+        if scale < 1.0:
+            image = self._resize(image, scale)
+        return image
+
+    @staticmethod
+    def _resize(image: Image.Image, scale: float) -> Image.Image:
+        size = tuple(max(MIN_DIMENSION, round(side * scale)) for side in image.size)
+        return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    @staticmethod
+    def _encode_png(image: Image.Image) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG', optimize=True)
+        return buffer.getvalue()
+
+    def _encode_jpeg(self, image: Image.Image) -> Tuple[bytes, Image.Image]:
+        quality = self.jpeg_quality
+        while True:
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=quality, optimize=True)
+            encoded = buffer.getvalue()
+            if len(encoded) <= self.max_bytes:
+                return encoded, image
+            if quality > self.min_jpeg_quality:
+                quality = max(self.min_jpeg_quality, quality - 10)
+            elif min(image.size) * 0.8 >= MIN_DIMENSION:
+                image = self._resize(image, 0.8)
+            else:
+                logger.warning(f"Could not encode image within {self.max_bytes} bytes")
+                return encoded, image
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ImageNormalizer':
+        """Create a normalizer from the 'azure_docint.image_normalization' configuration section."""
+        return cls(
+            target_dpi=config.get('target_dpi', 200),
+            page_inches=config.get('page_inches', 11.0),
+            grayscale=config.get('grayscale', True),
+            jpeg_quality=config.get('jpeg_quality', 85),
+            min_jpeg_quality=config.get('min_jpeg_quality', 50),
+            max_bytes=config.get('max_bytes', 4 * 1024 * 1024)
+        )
@@ -0,0 +1,92 @@
+from typing import Dict, Any, List, Optional
+import re
+
+_PAGE_COUNT = re.compile(rb'/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b', re.DOTALL)
+_PAGE = re.compile(rb'/Type\s*/Page\b(?!s)')
+_ELEMENT_REF = re.compile(r'^/(\w+)/(\d+)$')
+
+# Top-level collections of an analyzeResult whose entries are concatenated
+MERGED_COLLECTIONS = (
+    'pages', 'paragraphs', 'tables', 'figures', 'sections', 'lists',
+    'keyValuePairs', 'styles', 'languages', 'documents', 'warnings'
+)
+
+def count_pdf_pages(data: bytes) -> Optional[int]:
+    """Page count of a PDF from its page tree, without a PDF library.
+
+    Uses the largest ``/Count`` of a ``/Pages`` node (the root's), falling
+    back to counting ``/Page`` objects. Returns None for non-PDF data and
+    for PDFs whose page tree is inside compressed object streams.
+    """
+    if not data.startswith(b'%PDF'):
+        return None
+    counts = [int(a or b) for a, b in _PAGE_COUNT.findall(data)]
+    if counts:
+        return max(counts)
+    return len(_PAGE.findall(data)) or None
+
+def page_ranges(page_count: int, pages_per_range: int) -> List[str]:
+    """Values of the analyze ``pages`` parameter covering a document, e.g. ['1-10', '11-12']."""
+    return [
+        f"{first}-{min(first + pages_per_range - 1, page_count)}"
+        for first in range(1, page_count + 1, pages_per_range)
+    ]
+
+def _shift(value: Any, offset: int, element_offsets: Dict[str, int]) -> Any:
+    """Copy of an analyzeResult fragment with spans and element references moved."""
+    if isinstance(value, list):
+        return [_shift(item, offset, element_offsets) for item in value]
+    if not isinstance(value, dict):
+        return value
+    shifted = {}
+    for key, item in value.items():
+        if key in ('span', 'spans') and offset:
+            spans = [item] if key == 'span' else item
+            moved = [{**span, 'offset': span['offset'] + offset} for span in spans]
+            shifted[key] = moved[0] if key == 'span' else moved
+        elif key == 'elements' and isinstance(item, list):
+            shifted[key] = [_shift_element(ref, element_offsets) for ref in item]
+        else:
+            shifted[key] = _shift(item, offset, element_offsets)
+    return shifted
+
+def _shift_element(ref: Any, element_offsets: Dict[str, int]) -> Any:
+    match = _ELEMENT_REF.match(ref) if isinstance(ref, str) else None
+    if not match:
+        return ref
+    collection, index = match.groups()
+    return f"/{collection}/{int(index) + element_offsets.get(collection, 0)}"
+
+def merge_analyze_results(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine analyzeResults of consecutive page ranges into one.
+
+    The contents are joined with a newline, and every span offset and
+    ``/collection/index`` element reference of a later part is moved past
+    the earlier parts, so the merged result reads like one analysis of the
+    whole document. Page numbers are already document-wide when ranges are
+    analyzed with the ``pages`` parameter and are kept.
+
+    Args:
+        parts: analyzeResult dictionaries in page order
+
+    Returns:
+        The merged analyzeResult dictionary
+    """
+    merged = {key: value for key, value in parts[0].items()
+              if key not in MERGED_COLLECTIONS and key != 'content'}
+    contents = []
+    collections: Dict[str, List[Any]] = {}
+    offset = 0
+    for part in parts:
+        element_offsets = {key: len(items) for key, items in collections.items()}
+        for key in MERGED_COLLECTIONS:
+            if key in part:
+                collections.setdefault(key, []).extend(_shift(part[key], offset, element_offsets))
+        content = part.get('content', '')
+        contents.append(content)
+        offset += len(content) + 1
+
+    merged['content'] = '\n'.join(contents)
+    merged.update(collections)
+    merged['pages'] = sorted(merged.get('pages', []), key=lambda page: page['pageNumber'])
+    return merged
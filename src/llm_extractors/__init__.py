@@ -1,7 +1,14 @@
 from .azure_openai_extractor import AzureOpenAIExtractor
+from .azure_openai_batch import (
+    AzureOpenAIBatchExtractor, AzureOpenAIBatchService, LocalBatchService, BatchExtractionResult
+)
 #from .anthropic_extractor import AnthropicExtractor
 
 __all__ = [
-    'AzureOpenAIExtractor',]
+    'AzureOpenAIExtractor',
+    'AzureOpenAIBatchExtractor',
+    'AzureOpenAIBatchService',
+    'LocalBatchService',
+    'BatchExtractionResult',]
 #    'AnthropicExtractor'
 #]
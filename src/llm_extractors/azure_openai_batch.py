@@ -0,0 +1,416 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+import json
+import logging
+import shutil
+import time
+import uuid
+
+from ..core.models.invoice import Invoice, Determinant, Charge
+from ..core.exceptions import ExtractionError
+from .azure_openai_extractor import AzureOpenAIExtractor
+
+logger = logging.getLogger(__name__)
+
+# Batch states after which no more results will arrive
+TERMINAL_STATES = ('completed', 'failed', 'expired', 'cancelled')
+
+@dataclass
+class BatchResponse:
+    """Result of one request in a batch job."""
+    custom_id: str
+    content: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchService(ABC):
+    """Submits JSONL files of chat completion requests as batch jobs."""
+
+    @abstractmethod
+    def submit(self, input_path: Path) -> str:
+        """Upload a JSONL request file and start a batch job.
+
+        Args:
+            input_path: File with one request per line
+
+        Returns:
+            Batch job identifier
+        """
+        pass
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """Current state of a batch job (e.g., 'in_progress', 'completed')."""
+        pass
+
+    @abstractmethod
+    def results(self, batch_id: str) -> List[BatchResponse]:
+        """Responses of a finished batch job, including failed requests."""
+        pass
+
+def _parse_output_line(line: str) -> BatchResponse:
+    """Parse a line of a batch output or error file."""
+    record = json.loads(line)
+    custom_id = record['custom_id']
+    if record.get('error'):
+        error = record['error']
+        return BatchResponse(custom_id, error=f"{error.get('code')}: {error.get('message')}")
+
+    response = record.get('response') or {}
+    if response.get('status_code') != 200:
+        return BatchResponse(custom_id, error=f"HTTP {response.get('status_code')}: {response.get('body')}")
+    return BatchResponse(custom_id, content=response['body']['choices'][0]['message']['content'])
+
+class AzureOpenAIBatchService(BatchService):
+    """Azure OpenAI Batch API (files + batches endpoints)."""
+
+    def __init__(self, client: Any, completion_window: str = "24h"):
+        """Initialize the service.
+
+        Args:
+            client: AzureOpenAI client with an API version supporting batches
+            completion_window: Time the service has to finish a batch
+        """
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, input_path: Path) -> str:
+        with open(input_path, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/chat/completions",
+            completion_window=self.completion_window
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> List[BatchResponse]:
+        batch = self.client.batches.retrieve(batch_id)
+        responses = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = self.client.files.content(file_id).text
+            responses.extend(_parse_output_line(line) for line in content.splitlines() if line.strip())
+        return responses
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'AzureOpenAIBatchService':
+        """Create the service from the 'azure_openai' section merged with 'batch_api'."""
+        from openai import AzureOpenAI
+
+        client = AzureOpenAI(
+            api_key=config['api_key'],
+            api_version=config.get('batch_api_version', '2024-10-21'),
+            azure_endpoint=config['endpoint']
+        )
+        return cls(client, completion_window=config.get('completion_window', '24h'))
+
+class LocalBatchService(BatchService):
+    """File-based stand-in for the batch service, for offline runs and tests.
+
+    Each submitted batch gets a directory holding a copy of the input and
+    an output file in the Batch API format. Responses come from
+    ``responder``, which receives a request body (model and messages) and
+    returns the message content. A batch reports 'in_progress' on its first
+    status check so callers exercise their polling loop.
+    """
+
+    def __init__(self, work_dir: str, responder: Callable[[Dict[str, Any]], str]):
+        """Initialize the local service.
+
+        Args:
+            work_dir: Directory for batch input and output files
+            responder: Produces the response content for a request body
+        """
+        self.work_dir = Path(work_dir)
+        self.responder = responder
+        self._polled: set = set()
+
+    def submit(self, input_path: Path) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        batch_dir = self.work_dir / batch_id
+        batch_dir.mkdir(parents=True)
+        shutil.copy(input_path, batch_dir / "input.jsonl")
+
+        with open(input_path) as f, open(batch_dir / "output.jsonl", 'w') as out:
+            for line in f:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                record = {'custom_id': request['custom_id'], 'response': None, 'error': None}
+                try:
+                    content = self.responder(request['body'])
+                    record['response'] = {
+                        'status_code': 200,
+                        'body': {'choices': [{'message': {'role': 'assistant', 'content': content}}]}
+                    }
+                except Exception as e:
+                    record['error'] = {'code': type(e).__name__, 'message': str(e)}
+                out.write(json.dumps(record) + "\n")
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        if not (self.work_dir / batch_id).exists():
+            raise ValueError(f"Unknown batch: {batch_id}")
+        if batch_id not in self._polled:
+            self._polled.add(batch_id)
+            return 'in_progress'
+        return 'completed'
+
+    def results(self, batch_id: str) -> List[BatchResponse]:
+        with open(self.work_dir / batch_id / "output.jsonl") as f:
+            return [_parse_output_line(line) for line in f if line.strip()]
+
+@dataclass
+class BatchExtractionResult:
+    """Outcome of one document extracted in bulk mode."""
+    source_file: str
+    invoice: Optional[Invoice] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+@dataclass
+class _Document:
+    """Parsed prompt results of one document between waves."""
+    source_file: str
+    text: str
+    chunks: List[str] = field(default_factory=list)
+    account_info: Optional[Dict[str, Any]] = None
+    determinants: List[Determinant] = field(default_factory=list)
+    charges: List[Charge] = field(default_factory=list)
+    error: Optional[str] = None
+
+class AzureOpenAIBatchExtractor:
+    """Bulk invoice extraction through the Azure OpenAI Batch API.
+
+    Prompts for all documents are serialized into JSONL batch jobs and
+    submitted in waves, because the charges prompt needs the extracted
+    determinants:
+
+    1. account_info and determinants for every document
+    2. charges for documents whose first wave succeeded
+    3. normalize_charges (optional) for documents with charges
+
+    Prompts, parsing, chunking of long invoices and invoice assembly are
+    shared with the synchronous AzureOpenAIExtractor, including its
+    checkpointed prompt responses, so bulk and synchronous runs produce the
+    same invoices. The determinants and charges prompts are sent once per
+    chunk. Request ids have the form ``"<document index>:<prompt name>"``,
+    followed by ``":<chunk index>"`` for chunked prompts.
+    """
+
+    def __init__(self,
+                 extractor: AzureOpenAIExtractor,
+                 batch_service: BatchService,
+                 work_dir: str = ".batches",
+                 deployment: Optional[str] = None,
+                 poll_interval: float = 60.0,
+                 timeout: Optional[float] = None,
+                 max_requests_per_batch: int = 50000,
+                 normalize_charges: bool = True):
+        """Initialize the bulk extractor.
+
+        Args:
+            extractor: Synchronous extractor providing prompts and parsing
+            batch_service: Service running the batch jobs
+            work_dir: Directory for the JSONL request files
+            deployment: Optional batch deployment name (defaults to the
+                        extractor's deployment)
+            poll_interval: Seconds between batch status checks
+            timeout: Optional seconds to wait for a wave before failing it
+            max_requests_per_batch: Requests per submitted batch job
+            normalize_charges: Run the normalize_charges wave
+        """
+        self.extractor = extractor
+        self.batch_service = batch_service
+        self.work_dir = Path(work_dir)
+        self.deployment = deployment or extractor.deployment
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_requests_per_batch = max_requests_per_batch
+        self.normalize_charges = normalize_charges
+
+    def extract_batch(self, documents: Sequence[Tuple[str, str]]) -> List[BatchExtractionResult]:
+        """Extract invoices for many documents with batch jobs.
+
+        Args:
+            documents: (preprocessed text, source file) pairs
+
+        Returns:
+            One BatchExtractionResult per document, in input order
+        """
+        docs = [_Document(source_file=source_file, text=text, chunks=self.extractor.split_text(text))
+                for text, source_file in documents]
+        chunked = sum(len(doc.chunks) > 1 for doc in docs)
+        if chunked:
+            logger.info(f"Splitting {chunked} long documents into chunks")
+
+        # Wave 1: prompts that only need the invoice text
+        responses = self._run_wave(
+            [(f"{i}:account_info", 'account_info', doc.text) for i, doc in enumerate(docs)] +
+            [(f"{i}:determinants:{c}", 'determinants', chunk)
+             for i, doc in enumerate(docs) for c, chunk in enumerate(doc.chunks)]
+        )
+        for i, doc in enumerate(docs):
+            try:
+                doc.account_info = self.extractor.parse_account_info(self._response(responses, f"{i}:account_info"))
+                doc.determinants = self.extractor.merge_determinants([
+                    self.extractor.parse_determinants(self._response(responses, f"{i}:determinants:{c}"))
+                    for c in range(len(doc.chunks))
+                ], doc.chunks)
+            except Exception as e:
+                doc.error = f"Failed to extract account info or determinants: {str(e)}"
+
+        # Wave 2: charges, which reference the determinants
+        responses = self._run_wave([
+            (f"{i}:charges:{c}", 'charges', self.extractor.charges_content(chunk, doc.determinants))
+            for i, doc in enumerate(docs) if doc.error is None
+            for c, chunk in enumerate(doc.chunks)
+        ])
+        for i, doc in enumerate(docs):
+            if doc.error is None:
+                try:
+                    doc.charges = self.extractor.merge_charges([
+                        self.extractor.parse_charges(self._response(responses, f"{i}:charges:{c}"), doc.determinants)
+                        for c in range(len(doc.chunks))
+                    ], doc.chunks)
+                except Exception as e:
+                    doc.error = f"Failed to extract charges: {str(e)}"
+
+        if self.normalize_charges:
+            self._normalize_charge_names(docs)
+
+        results = []
+        for doc in docs:
+            if doc.error is None:
+                try:
+                    invoice = self.extractor.build_invoice(
+                        doc.account_info, doc.determinants, doc.charges, doc.source_file
+                    )
+                    results.append(BatchExtractionResult(doc.source_file, invoice=invoice))
+                    continue
+                except Exception as e:
+                    doc.error = f"Failed to build invoice: {str(e)}"
+            logger.error(f"Bulk extraction failed for {doc.source_file}: {doc.error}")
+            results.append(BatchExtractionResult(doc.source_file, error=doc.error))
+        return results
+
+    def _normalize_charge_names(self, docs: List[_Document]) -> None:
+        # Wave 3: only names unknown to the local normalizer are sent; like the
+        # synchronous extractor, failures keep the original names
+        name_mappings, unseen = {}, {}
+        for i, doc in enumerate(docs):
+            if doc.error is None and doc.charges:
+                name_mappings[i], names = self.extractor.name_normalizer.resolve(charge.name for charge in doc.charges)
+                if names:
+                    unseen[i] = sorted(names)
+        
+        fallback = unseen if self.extractor.charge_names_llm_fallback else {}
+        responses = self._run_wave([
+            (f"{i}:normalize_charges", 'normalize_charges', json.dumps(names)) for i, names in fallback.items()
+        ])
+        for i in fallback:
+            try:
+                response = self._response(responses, f"{i}:normalize_charges")
+                name_mappings[i].update(self.extractor.learn_charge_names(unseen[i], response))
+            except Exception as e:
+                logger.warning(f"Charge name normalization failed for {docs[i].source_file}: {str(e)}")
+        
+        for i, name_mapping in name_mappings.items():
+            docs[i].charges = self.extractor.apply_charge_names(docs[i].charges, name_mapping)
+
+    def _run_wave(self, requests: List[Tuple[str, str, str]]) -> Dict[str, BatchResponse]:
+        """Run (request id, prompt name, content) requests as batch jobs."""
+        responses: Dict[str, BatchResponse] = {}
+        pending: List[Tuple[str, str, str]] = []
+        for custom_id, prompt_name, content in requests:
+            cached = self.extractor.get_checkpointed_response(prompt_name, content)
+            if cached is not None:
+                responses[custom_id] = BatchResponse(custom_id, content=cached)
+            else:
+                pending.append((custom_id, prompt_name, content))
+
+        if not pending:
+            return responses
+        logger.info(f"Submitting {len(pending)} batch requests ({len(responses)} checkpointed)")
+
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        batch_ids = []
+        for start in range(0, len(pending), self.max_requests_per_batch):
+            input_path = self._write_requests(pending[start:start + self.max_requests_per_batch])
+            batch_ids.append(self.batch_service.submit(input_path))
+
+        contents = {custom_id: (prompt_name, content) for custom_id, prompt_name, content in pending}
+        for batch_id in batch_ids:
+            status = self._wait(batch_id)
+            if status != 'completed':
+                logger.warning(f"Batch {batch_id} ended with status '{status}'")
+            for response in self.batch_service.results(batch_id):
+                responses[response.custom_id] = response
+                if response.content is not None and response.custom_id in contents:
+                    prompt_name, content = contents[response.custom_id]
+                    self.extractor.checkpoint_response(prompt_name, content, response.content)
+        return responses
+
+    def _write_requests(self, requests: List[Tuple[str, str, str]]) -> Path:
+        input_path = self.work_dir / f"requests_{uuid.uuid4().hex}.jsonl"
+        with open(input_path, 'w') as f:
+            for custom_id, prompt_name, content in requests:
+                f.write(json.dumps({
+                    'custom_id': custom_id,
+                    'method': 'POST',
+                    'url': '/chat/completions',
+                    'body': {
+                        'model': self.deployment,
+                        'messages': self.extractor.build_messages(prompt_name, content),
+                        'temperature': 0.0,
+                        'response_format': {'type': 'json_object'}
+                    }
+                }) + "\n")
+        return input_path
+
+    def _wait(self, batch_id: str) -> str:
+        started = time.monotonic()
+        while True:
+            status = self.batch_service.status(batch_id)
+            if status in TERMINAL_STATES:
+                return status
+            if self.timeout is not None and time.monotonic() - started > self.timeout:
+                raise ExtractionError(f"Batch {batch_id} did not finish within {self.timeout}s (status '{status}')")
+            logger.info(f"Batch {batch_id} is {status}")
+            time.sleep(self.poll_interval)
+
+    @staticmethod
+    def _response(responses: Dict[str, BatchResponse], custom_id: str) -> str:
+        response = responses.get(custom_id)
+        request = custom_id.split(':', 1)[1]
+        if response is None:
+            raise ExtractionError(f"No batch response for '{request}'")
+        if response.error is not None:
+            raise ExtractionError(f"Batch request '{request}' failed: {response.error}")
+        return response.content
+
+    @classmethod
+    def from_config(cls,
+                    config: Dict[str, Any],
+                    extractor: AzureOpenAIExtractor,
+                    batch_service: BatchService) -> 'AzureOpenAIBatchExtractor':
+        """Create a bulk extractor from the 'batch_api' configuration section."""
+        return cls(
+            extractor=extractor,
+            batch_service=batch_service,
+            work_dir=config.get('work_dir', '.batches'),
+            deployment=config.get('deployment'),
+            poll_interval=config.get('poll_interval', 60.0),
+            timeout=config.get('timeout'),
+            max_requests_per_batch=config.get('max_requests_per_batch', 50000),
+            normalize_charges=config.get('normalize_charges', True)
+        )
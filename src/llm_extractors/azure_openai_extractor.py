@@ -1,14 +1,34 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Iterator, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
 from openai import AzureOpenAI
 import json
 import yaml
 import logging
+import threading
+import time
 from pathlib import Path
 
 from ..core.interfaces.data_extractor import DataExtractor
 from ..core.models.invoice import Invoice, Determinant, Charge
 from ..core.exceptions import ExtractionError, ValidationError
+from ..core.checkpoint_store import CheckpointStore, config_hash
+from ..core.adaptive_concurrency import AdaptiveConcurrencyLimiter, Slot, get_limiter
+from .text_chunker import (chunk_text, chunk_overlaps, merge_chunk_results, charge_key, determinant_key,
+                           charge_in_text, determinant_in_text)
+from .charge_name_normalizer import ChargeNameNormalizer
+from .incremental_json import IncrementalArrayParser
+
+T = TypeVar('T')
+
+# Completion tokens per unit of work reported to the concurrency limiter; the
+# latency of a call grows with the tokens generated, not with the prompt
+TOKENS_PER_LIMITER_UNIT = 100
+
+def completion_units(completion_tokens: Optional[int]) -> float:
+    """Size of a chat completion for the adaptive concurrency limiter."""
+    return max((completion_tokens or 0) / TOKENS_PER_LIMITER_UNIT, 1.0)
 
 class AzureOpenAIExtractor(DataExtractor):
     """Azure OpenAI implementation of the DataExtractor interface."""
@@ -19,7 +39,15 @@ class AzureOpenAIExtractor(DataExtractor):
                  api_key: str, 
                  endpoint: str, 
                  deployment: str,
-                 prompts_dir: Optional[Path] = None):
+                 prompts_dir: Optional[Path] = None,
+                 concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+                 chunk_max_tokens: Optional[int] = None,
+                 chunk_overlap_tokens: int = 0,
+                 chunk_workers: int = 4,
+                 name_normalizer: Optional[ChargeNameNormalizer] = None,
+                 charge_names_llm_fallback: bool = True,
+                 stream_charges: bool = False,
+                 on_charge: Optional[Callable[[Charge], None]] = None):
         """Initialize the Azure OpenAI client.
         
         Args:
@@ -27,6 +55,21 @@ class AzureOpenAIExtractor(DataExtractor):
             endpoint: Azure OpenAI endpoint URL
             deployment: Model deployment name
             prompts_dir: Optional custom directory containing prompt YAML files
+            concurrency_limiter: Optional adaptive limit on concurrent API calls
+            chunk_max_tokens: Token budget per request for the determinants and
+                              charges prompts; longer invoices are split on page
+                              and table boundaries. None sends the whole text.
+            chunk_overlap_tokens: Trailing context repeated at the start of the
+                                  next chunk
+            chunk_workers: Chunks of one invoice processed in parallel
+            name_normalizer: Local charge name normalizer with its learned
+                             mapping; defaults to an in-memory one
+            charge_names_llm_fallback: Ask the 'normalize_charges' prompt about
+                                       names the normalizer has never seen
+            stream_charges: Stream the 'charges' response and parse charges as
+                            their JSON objects complete
+            on_charge: Optional callback receiving each streamed charge (before
+                       name normalization), e.g. for early validation or persistence
         """
         self.client = AzureOpenAI(
             api_key=api_key,
@@ -36,6 +79,18 @@ class AzureOpenAIExtractor(DataExtractor):
         self.deployment = deployment
         self.prompts_dir = prompts_dir or self.DEFAULT_PROMPTS_DIR
         self.prompts = self._load_prompts()
+        self.checkpoint_store: Optional[CheckpointStore] = None
+        self.concurrency_limiter = concurrency_limiter
+        self.chunk_max_tokens = chunk_max_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+        self.chunk_workers = chunk_workers
+        self.name_normalizer = name_normalizer or ChargeNameNormalizer()
+        self.charge_names_llm_fallback = charge_names_llm_fallback
+        self.stream_charges = stream_charges
+        self.on_charge = on_charge
+        self.stream_latencies: Dict[str, List[float]] = {'first_charge': [], 'total': []}
+        self.usage = {'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0}
+        self._usage_lock = threading.Lock()
     
     def _load_prompts(self) -> Dict[str, Dict[str, str]]:
         """Load prompts from YAML files."""
@@ -54,46 +109,181 @@ class AzureOpenAIExtractor(DataExtractor):
         """
         self.prompts[prompt_name] = prompt_content
 
-    def _call_azure_openai(self, prompt_name: str, content: str) -> str:
-        """Make API call to Azure OpenAI using named prompt."""
+    def set_checkpoint_store(self, checkpoint_store: Optional[CheckpointStore]) -> None:
+        """Persist prompt responses so unchanged prompts are not re-sent.
+        
+        Responses are keyed by the prompt content, the deployment and the
+        user content, so editing one prompt only re-runs that prompt (and
+        prompts whose input depends on its output).
+        
+        Args:
+            checkpoint_store: Store for prompt responses, or None to disable
+        """
+        self.checkpoint_store = checkpoint_store
+
+    def checkpoint_config(self) -> Dict[str, Any]:
+        """Configuration affecting extracted invoices, used for checkpoint keys."""
+        return {
+            'deployment': self.deployment,
+            'prompts': self.prompts,
+            'chunk_max_tokens': self.chunk_max_tokens,
+            'chunk_overlap_tokens': self.chunk_overlap_tokens
+        }
+
+    def build_messages(self, prompt_name: str, content: str) -> List[Dict[str, str]]:
+        """Chat messages for a named prompt and its user content."""
         if prompt_name not in self.prompts:
             raise ValueError(f"Unknown prompt: {prompt_name}")
-            
+        
         prompt = self.prompts[prompt_name]
+        return [
+            {"role": "system", "content": prompt["system"]},
+            {"role": "user", "content": "INVOICE TEXT: \n\n" + content}
+        ]
+
+    def get_checkpointed_response(self, prompt_name: str, content: str) -> Optional[str]:
+        """Previously stored response for a prompt and content, if any."""
+        if self.checkpoint_store is None:
+            return None
+        cached = self.checkpoint_store.get('prompt', self._prompt_checkpoint_key(prompt_name, content))
+        return cached['response'] if cached is not None else None
+
+    def checkpoint_response(self, prompt_name: str, content: str, response_content: str) -> None:
+        """Store a prompt response when a checkpoint store is configured."""
+        if self.checkpoint_store is None:
+            return
+        self.checkpoint_store.put('prompt', self._prompt_checkpoint_key(prompt_name, content), {
+            'prompt_name': prompt_name,
+            'response': response_content
+        })
+
+    def usage_snapshot(self) -> Dict[str, int]:
+        """API calls and token usage accumulated by this extractor."""
+        with self._usage_lock:
+            return dict(self.usage)
+
+    def _record_usage(self, usage: Any) -> None:
+        with self._usage_lock:
+            self.usage['calls'] += 1
+            if usage is not None:
+                for key in ('prompt_tokens', 'completion_tokens', 'total_tokens'):
+                    self.usage[key] += getattr(usage, key, 0) or 0
+
+    def _prompt_checkpoint_key(self, prompt_name: str, content: str) -> str:
+        return config_hash(self.prompts[prompt_name], self.deployment, content)
+
+    def _call_azure_openai(self, prompt_name: str, content: str) -> str:
+        """Make API call to Azure OpenAI using named prompt."""
+        messages = self.build_messages(prompt_name, content)
+        prompt = self.prompts[prompt_name]
+        
+        cached = self.get_checkpointed_response(prompt_name, content)
+        if cached is not None:
+            logging.info(f"Using checkpointed response for '{prompt_name}'")
+            return cached
+        
         try:
             # Log the prompt and user content
             logging.info(f"\nPrompt '{prompt_name}':")
             logging.info(f"System: {prompt['system']}")
             logging.info(f"User: {content}\n")
             
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=[
-                    {"role": "system", "content": prompt["system"]},
-                    {"role": "user", "content": "INVOICE TEXT: \n\n" + content}
-                ],
-                temperature=0.0,
-                response_format={"type": "json_object"}
-            )
+            limiter = self.concurrency_limiter.slot() if self.concurrency_limiter else nullcontext(Slot())
+            with limiter as slot:
+                response = self.client.chat.completions.create(
+                    model=self.deployment,
+                    messages=messages,
+                    temperature=0.0,
+                    response_format={"type": "json_object"}
+                )
+                # Long completions (charges) are not latency spikes of short ones
+                slot.units = completion_units(getattr(getattr(response, 'usage', None), 'completion_tokens', None))
             print("RESPONSE:", response)
+            self._record_usage(getattr(response, 'usage', None))
             response_content = response.choices[0].message.content
             
             # Log the response
             logging.info(f"Response from {prompt_name}:")
             logging.info(f"{response_content}\n")
             
+            self.checkpoint_response(prompt_name, content, response_content)
+            
             return response_content
         except Exception as e:
             raise ExtractionError(f"Azure OpenAI API call failed: {str(e)}")
 
+    def _stream_azure_openai(self, prompt_name: str, content: str) -> Iterator[str]:
+        """Stream the response content of a named prompt as it is generated.
+        
+        The concurrency slot is held until the stream is consumed, and the
+        complete response is checkpointed like a non-streamed one.
+        """
+        messages = self.build_messages(prompt_name, content)
+        
+        cached = self.get_checkpointed_response(prompt_name, content)
+        if cached is not None:
+            logging.info(f"Using checkpointed response for '{prompt_name}'")
+            yield cached
+            return
+        
+        pieces = []
+        try:
+            limiter = self.concurrency_limiter.slot() if self.concurrency_limiter else nullcontext(Slot())
+            with limiter as slot:
+                stream = self.client.chat.completions.create(
+                    model=self.deployment,
+                    messages=messages,
+                    temperature=0.0,
+                    response_format={"type": "json_object"},
+                    stream=True
+                )
+                usage = None
+                for chunk in stream:
+                    # Usage arrives on the last chunk when the service reports it
+                    usage = getattr(chunk, 'usage', None) or usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        pieces.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+                # Without reported usage, each streamed piece is about one token
+                slot.units = completion_units(getattr(usage, 'completion_tokens', None) or len(pieces))
+            self._record_usage(usage)
+        except Exception as e:
+            raise ExtractionError(f"Azure OpenAI API call failed: {str(e)}")
+        
+        response_content = ''.join(pieces)
+        logging.info(f"Response from {prompt_name}:")
+        logging.info(f"{response_content}\n")
+        self.checkpoint_response(prompt_name, content, response_content)
+
     def extract(self, text: str, source_file: str) -> Invoice:
         """Extract structured data from preprocessed text."""
+        return self.normalize_invoice(self.extract_raw(text, source_file))
+
+    def extract_raw(self, text: str, source_file: str) -> Invoice:
+        """Extract an invoice with charge names as they appear on the document.
+        
+        The result depends only on the text and the extractor configuration,
+        not on the learned charge name mapping; ``normalize_invoice`` applies
+        that mapping.
+        """
         # Extract components in sequence
         account_info = self.extract_account_info(text)
         determinants = self.extract_determinants(text)
-        charges = self.extract_charges(text, determinants)
+        charges = self.extract_charges(text, determinants, normalize_names=False)
         
-        # Create Invoice object
+        return self.build_invoice(account_info, determinants, charges, source_file)
+
+    def normalize_invoice(self, invoice: Invoice) -> Invoice:
+        """Replace an invoice's charge names with their normalized names."""
+        invoice.charges = self._normalize_charge_names(invoice.charges)
+        return invoice
+
+    def build_invoice(self,
+                      account_info: Dict[str, Any],
+                      determinants: List[Determinant],
+                      charges: List[Charge],
+                      source_file: str) -> Invoice:
+        """Assemble an Invoice from the parsed prompt results."""
         return Invoice(
             **account_info,
             determinants=determinants,
@@ -107,128 +297,225 @@ class AzureOpenAIExtractor(DataExtractor):
         """Extract account and billing information."""
         try:
             response = self._call_azure_openai('account_info', text)
-            account_data = self._parse_json_response(response)
-            
-            # Convert date strings to datetime.date objects
-            date_fields = ['invoice_date', 'billing_period_start', 'billing_period_end']
-            for field in date_fields:
-                if field in account_data:
-                    account_data[field] = datetime.strptime(account_data[field], '%Y-%m-%d').date()
-            
-            # Required fields for Invoice model
-            required_fields = {
-                'account_number', 'invoice_number', 'invoice_date',
-                'billing_period_start', 'billing_period_end', 'vendor_name',
-                'customer_name', 'service_address', 'meter_numbers',
-                'subtotals', 'total_amount', 'commodities'
-            }
-            
-            # Validate all required fields are present
-            missing_fields = required_fields - set(account_data.keys())
-            if missing_fields:
-                raise ExtractionError(f"Missing required account info fields: {missing_fields}")
-            
-            return account_data
+            return self.parse_account_info(response)
         except Exception as e:
             raise ExtractionError(f"Failed to extract account info: {str(e)}")
 
+    def parse_account_info(self, response: str) -> Dict[str, Any]:
+        """Parse the 'account_info' prompt response."""
+        account_data = self._parse_json_response(response)
+        
+        # Convert date strings to datetime.date objects
+        date_fields = ['invoice_date', 'billing_period_start', 'billing_period_end']
+        for field in date_fields:
+            if field in account_data:
+                account_data[field] = datetime.strptime(account_data[field], '%Y-%m-%d').date()
+        
+        # Required fields for Invoice model
+        required_fields = {
+            'account_number', 'invoice_number', 'invoice_date',
+            'billing_period_start', 'billing_period_end', 'vendor_name',
+            'customer_name', 'service_address', 'meter_numbers',
+            'subtotals', 'total_amount', 'commodities'
+        }
+        
+        # Validate all required fields are present
+        missing_fields = required_fields - set(account_data.keys())
+        if missing_fields:
+            raise ExtractionError(f"Missing required account info fields: {missing_fields}")
+        
+        return account_data
+
+    def split_text(self, text: str) -> List[str]:
+        """Chunks of the invoice text sent in separate requests."""
+        if self.chunk_max_tokens is None:
+            return [text]
+        return chunk_text(text, self.chunk_max_tokens, self.chunk_overlap_tokens)
+
+    def merge_determinants(self, results: List[List[Determinant]], chunks: List[str]) -> List[Determinant]:
+        """Merge the determinants extracted per chunk, dropping those seen twice in an overlap."""
+        return merge_chunk_results(results, determinant_key,
+                                   chunk_overlaps(chunks, self.chunk_overlap_tokens), determinant_in_text)
+
+    def merge_charges(self, results: List[List[Charge]], chunks: List[str]) -> List[Charge]:
+        """Merge the charges extracted per chunk, dropping those seen twice in an overlap."""
+        return merge_chunk_results(results, charge_key,
+                                   chunk_overlaps(chunks, self.chunk_overlap_tokens), charge_in_text)
+
+    def _map_chunks(self, func: Callable[[str], List[T]], chunks: List[str]) -> List[List[T]]:
+        """Apply func to every chunk, in parallel when there are several."""
+        if len(chunks) == 1:
+            return [func(chunks[0])]
+        logging.info(f"Processing {len(chunks)} chunks")
+        with ThreadPoolExecutor(max_workers=min(self.chunk_workers, len(chunks))) as executor:
+            return list(executor.map(func, chunks))
+
     def extract_determinants(self, text: str) -> List[Determinant]:
         """Extract measured quantities used for billing calculations."""
         try:
-            response = self._call_azure_openai('determinants', text)
-            determinants_data = self._parse_json_response(response)
-            
-            # Handle wrapped response
-            if isinstance(determinants_data, dict):
-                if 'determinants' in determinants_data:
-                    determinants_data = determinants_data['determinants']
-                elif len(determinants_data) == 1:
-                    determinants_data = list(determinants_data.values())[0]
-            
-            # Ensure we have a list
-            if not isinstance(determinants_data, list):
-                determinants_data = [determinants_data]
-            
-            # Create Determinant objects with numeric conversion
-            determinants = []
-            for d in determinants_data:
-                try:
-                    # Convert value to float, handling potential string formats
-                    value = d.get('value')
-                    if isinstance(value, str):
-                        value = float(value.replace(',', ''))
-                    
-                    determinants.append(Determinant(
-                        name=d.get('name'),
-                        value=value,
-                        unit=d.get('unit', 'N/A'),
-                        commodity=d.get('commodity'),
-                        meter=d.get('meter_number', 'N/A')
-                    ))
-                except (ValueError, TypeError) as e:
-                    raise ExtractionError(f"Invalid determinant value format: {d.get('value')}")
-            
-            return determinants
+            chunks = self.split_text(text)
+            results = self._map_chunks(
+                lambda chunk: self.parse_determinants(self._call_azure_openai('determinants', chunk)),
+                chunks
+            )
+            return self.merge_determinants(results, chunks)
         except Exception as e:
             raise ExtractionError(f"Failed to extract determinants: {str(e)}")
 
-    def extract_charges(self, text: str, determinants: List[Determinant]) -> List[Charge]:
-        """Extract billing charges and associate with determinants."""
-        determinant_context = "\n".join(
-            f"- {d.name}: {d.value} {d.unit}" for d in determinants
-        )
+    def parse_determinants(self, response: str) -> List[Determinant]:
+        """Parse the 'determinants' prompt response."""
+        determinants_data = self._parse_json_response(response)
         
-        try:
-            response = self._call_azure_openai('charges', f"{determinant_context}\n\n{text}")
-            charges_data = self._parse_json_response(response)
-            
-            # Handle wrapped response
-            if isinstance(charges_data, dict):
-                if 'charges' in charges_data:
-                    charges_data = charges_data['charges']
-                elif len(charges_data) == 1:
-                    charges_data = list(charges_data.values())[0]
-            
-            # Ensure we have a list
-            if not isinstance(charges_data, list):
-                charges_data = [charges_data]
-            
-            charges = []
-            for charge_data in charges_data:
-                # All keys should already be lowercase from the prompt
-                cleaned_data = {
-                    'name': charge_data.get('name'),
-                    'amount': charge_data.get('amount'),
-                    'category': charge_data.get('category'),
-                    'commodity': charge_data.get('commodity'),
-                    'meter_number': charge_data.get('meter_number'),
-                    'currency': charge_data.get('currency', 'USD'),
-                }
-                
-                # Remove None values
-                cleaned_data = {k: v for k, v in cleaned_data.items() if v is not None}
-                
-                # Validate required fields
-                required_fields = {'name', 'amount', 'category', 'commodity'}
-                missing_fields = required_fields - set(cleaned_data.keys())
-                if missing_fields:
-                    raise ExtractionError(f"Missing required fields for charge: {missing_fields}")
-                
-                # Handle determinant association
-                if det_name := charge_data.get('determinant_name'):
-                    cleaned_data['determinant'] = next(
-                        (d for d in determinants if d.name == det_name), None
-                    )
+        # Handle wrapped response
+        if isinstance(determinants_data, dict):
+            if 'determinants' in determinants_data:
+                determinants_data = determinants_data['determinants']
+            elif len(determinants_data) == 1:
+                determinants_data = list(determinants_data.values())[0]
+        
+        # Ensure we have a list
+        if not isinstance(determinants_data, list):
+            determinants_data = [determinants_data]
+        
+        # Create Determinant objects with numeric conversion
+        determinants = []
+        for d in determinants_data:
+            try:
+                # Convert value to float, handling potential string formats
+                value = d.get('value')
+                if isinstance(value, str):
+                    value = float(value.replace(',', ''))
                 
-                charges.append(Charge(**cleaned_data))
+                determinants.append(Determinant(
+                    name=d.get('name'),
+                    value=value,
+                    unit=d.get('unit', 'N/A'),
+                    commodity=d.get('commodity'),
+                    meter=d.get('meter_number', 'N/A')
+                ))
+            except (ValueError, TypeError) as e:
+                raise ExtractionError(f"Invalid determinant value format: {d.get('value')}")
+        
+        return determinants
+
+    def extract_charges(self,
+                        text: str,
+                        determinants: List[Determinant],
+                        normalize_names: bool = True) -> List[Charge]:
+        """Extract billing charges and associate with determinants."""
+        try:
+            if self.stream_charges:
+                extract_chunk = lambda chunk: list(self.iter_charges(chunk, determinants))
+            else:
+                extract_chunk = lambda chunk: self.parse_charges(
+                    self._call_azure_openai('charges', self.charges_content(chunk, determinants)),
+                    determinants
+                )
+            chunks = self.split_text(text)
+            results = self._map_chunks(extract_chunk, chunks)
+            charges = self.merge_charges(results, chunks)
             
             # Normalize charge names
-            charges = self._normalize_charge_names(charges)
+            if normalize_names:
+                charges = self._normalize_charge_names(charges)
             
             return charges
         except Exception as e:
             raise ExtractionError(f"Failed to extract charges: {str(e)}")
 
+    def iter_charges(self, text: str, determinants: List[Determinant]) -> Iterator[Charge]:
+        """Stream the 'charges' prompt, yielding each charge as soon as it is complete.
+        
+        Charges are also passed to ``on_charge`` when set. Names are not
+        normalized yet, and with chunking a charge straddling two chunks can
+        be yielded twice; ``extract_charges`` returns the merged list.
+        """
+        parser = IncrementalArrayParser(array_key='charges')
+        pieces = []
+        emitted = 0
+        started = time.perf_counter()
+        first_charge = None
+        
+        for piece in self._stream_azure_openai('charges', self.charges_content(text, determinants)):
+            pieces.append(piece)
+            for charge_data in parser.feed(piece):
+                charge = self._build_charge(charge_data, determinants)
+                if first_charge is None:
+                    first_charge = time.perf_counter() - started
+                    logging.info(f"First charge after {first_charge:.3f}s")
+                emitted += 1
+                if self.on_charge is not None:
+                    self.on_charge(charge)
+                yield charge
+        
+        if not parser.array_closed:
+            # Not a 'charges' array (e.g. a single charge object): parse the whole response
+            for charge in self.parse_charges(''.join(pieces), determinants)[emitted:]:
+                if first_charge is None:
+                    first_charge = time.perf_counter() - started
+                if self.on_charge is not None:
+                    self.on_charge(charge)
+                yield charge
+        
+        total = time.perf_counter() - started
+        with self._usage_lock:
+            if first_charge is not None:
+                self.stream_latencies['first_charge'].append(first_charge)
+            self.stream_latencies['total'].append(total)
+
+    def charges_content(self, text: str, determinants: List[Determinant]) -> str:
+        """User content of the 'charges' prompt: determinant context plus invoice text."""
+        determinant_context = "\n".join(
+            f"- {d.name}: {d.value} {d.unit}" for d in determinants
+        )
+        return f"{determinant_context}\n\n{text}"
+
+    def parse_charges(self, response: str, determinants: List[Determinant]) -> List[Charge]:
+        """Parse the 'charges' prompt response, linking charges to determinants."""
+        charges_data = self._parse_json_response(response)
+        
+        # Handle wrapped response
+        if isinstance(charges_data, dict):
+            if 'charges' in charges_data:
+                charges_data = charges_data['charges']
+            elif len(charges_data) == 1:
+                charges_data = list(charges_data.values())[0]
+        
+        # Ensure we have a list
+        if not isinstance(charges_data, list):
+            charges_data = [charges_data]
+        
+        return [self._build_charge(charge_data, determinants) for charge_data in charges_data]
+
+    def _build_charge(self, charge_data: Dict[str, Any], determinants: List[Determinant]) -> Charge:
+        """Create a Charge from one element of the 'charges' response."""
+        # All keys should already be lowercase from the prompt
+        cleaned_data = {
+            'name': charge_data.get('name'),
+            'amount': charge_data.get('amount'),
+            'category': charge_data.get('category'),
+            'commodity': charge_data.get('commodity'),
+            'meter_number': charge_data.get('meter_number'),
+            'currency': charge_data.get('currency', 'USD'),
+        }
+        
+        # Remove None values
+        cleaned_data = {k: v for k, v in cleaned_data.items() if v is not None}
+        
+        # Validate required fields
+        required_fields = {'name', 'amount', 'category', 'commodity'}
+        missing_fields = required_fields - set(cleaned_data.keys())
+        if missing_fields:
+            raise ExtractionError(f"Missing required fields for charge: {missing_fields}")
+        
+        # Handle determinant association
+        if det_name := charge_data.get('determinant_name'):
+            cleaned_data['determinant'] = next(
+                (d for d in determinants if d.name == det_name), None
+            )
+        
+        return Charge(**cleaned_data)
+
     def _parse_json_response(self, response: str) -> Dict[str, Any]:
         """Parse and validate JSON response."""
         try:
@@ -256,12 +543,27 @@ class AzureOpenAIExtractor(DataExtractor):
             prompts_dir = Path(config['prompts_dir'])
             if not prompts_dir.exists():
                 raise ValueError(f"Prompts directory not found: {prompts_dir}")
+        
+        concurrency_limiter = None
+        if 'adaptive_concurrency' in config:
+            concurrency_limiter = get_limiter('openai', config['adaptive_concurrency'])
+        
+        chunking = config.get('chunking', {})
+        charge_names = config.get('charge_names', {})
+        streaming = config.get('streaming', {})
             
         return cls(
             api_key=config['api_key'],
             endpoint=config['endpoint'],
             deployment=config['deployment'],
-            prompts_dir=prompts_dir
+            prompts_dir=prompts_dir,
+            concurrency_limiter=concurrency_limiter,
+            chunk_max_tokens=chunking.get('max_tokens'),
+            chunk_overlap_tokens=chunking.get('overlap_tokens', 0),
+            chunk_workers=chunking.get('max_workers', 4),
+            name_normalizer=ChargeNameNormalizer.from_config(charge_names),
+            charge_names_llm_fallback=charge_names.get('llm_fallback', True),
+            stream_charges=streaming.get('enabled', False)
         )
 
     @property
@@ -312,39 +614,44 @@ class AzureOpenAIExtractor(DataExtractor):
             return response
 
     def _normalize_charge_names(self, charges: List[Charge]) -> List[Charge]:
-        """Normalize charge names using LLM to standardize formatting."""
+        """Normalize charge names locally, asking the LLM only about unseen names."""
         if not charges:
             return charges
         
-        # Extract all unique charge names
-        charge_names = list({charge.name for charge in charges})
+        name_mapping, unseen = self.name_normalizer.resolve(charge.name for charge in charges)
         
-        try:
-            # Call LLM to normalize names
-            response = self._call_azure_openai(
-                'normalize_charges', 
-                json.dumps(charge_names)
+        if unseen and self.charge_names_llm_fallback:
+            try:
+                response = self._call_azure_openai('normalize_charges', json.dumps(sorted(unseen)))
+                name_mapping.update(self.learn_charge_names(unseen, response))
+            except Exception as e:
+                # Unseen names are kept as extracted
+                logging.warning(f"Charge name normalization failed: {str(e)}")
+        
+        return self.apply_charge_names(charges, name_mapping)
+
+    def learn_charge_names(self, unseen: List[str], response: str) -> Dict[str, str]:
+        """Store the 'normalize_charges' answers for unseen names in the learned mapping."""
+        answers = self._parse_json_response(response)
+        if not isinstance(answers, dict):
+            raise ExtractionError(f"Expected a JSON object of name mappings, got: {answers!r}")
+        return self.name_normalizer.learn({name: answers[name] for name in unseen if name in answers})
+
+    def apply_charge_names(self, charges: List[Charge], name_mapping: Dict[str, str]) -> List[Charge]:
+        """Create new charges with names replaced through a mapping."""
+        normalized_charges = []
+        for charge in charges:
+            new_charge = Charge(
+                name=name_mapping.get(charge.name, charge.name),
+                amount=charge.amount,
+                category=charge.category,
+                commodity=charge.commodity,
+                currency=charge.currency,
+                determinant=charge.determinant,
+                unit_rate=charge.unit_rate,
+                meter_number=charge.meter_number,
+                notes=charge.notes
             )
-            name_mapping = self._parse_json_response(response)
-            
-            # Create new charges with normalized names
-            normalized_charges = []
-            for charge in charges:
-                new_charge = Charge(
-                    name=name_mapping.get(charge.name, charge.name),
-                    amount=charge.amount,
-                    category=charge.category,
-                    commodity=charge.commodity,
-                    currency=charge.currency,
-                    determinant=charge.determinant,
-                    unit_rate=charge.unit_rate,
-                    meter_number=charge.meter_number,
-                    notes=charge.notes
-                )
-                normalized_charges.append(new_charge)
-            
-            return normalized_charges
+            normalized_charges.append(new_charge)
         
-        except Exception as e:
-            logging.warning(f"Charge name normalization failed: {str(e)}")
-            return charges  # Return original charges if normalization fails
+        return normalized_charges
@@ -0,0 +1,179 @@
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from pathlib import Path
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+_MONTH = (r"\b(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+          r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)(?:\.|\b)")
+_NUMERIC_DATE = r"\d{1,2}/\d{1,2}(?:/\d{2,4})?|\d{4}-\d{2}-\d{2}"
+_MONTH_DATE = rf"{_MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?(?:,?\s*\d{{4}})?|{_MONTH}\s+\d{{4}}"
+_DATE = rf"(?:{_NUMERIC_DATE}|{_MONTH_DATE})"
+_RANGE_SEPARATOR = r"\s*(?:-|–|—|to|thru|through)\s*"
+
+# Applied in order; each pattern is removed from the name
+_STRIP_PATTERNS = [
+    # Parenthetical or bracketed text containing a date, e.g. "(6/1/23-6/15/23)"
+    re.compile(rf"\s*[\(\[][^()\[\]]*?(?:{_DATE})[^()\[\]]*[\)\]]", re.IGNORECASE),
+    # Bare date ranges and dates, with an optional leading "from"/"for"
+    re.compile(rf"\s*\b(?:from\s+|for\s+)?{_DATE}(?:{_RANGE_SEPARATOR}{_DATE})?\b", re.IGNORECASE),
+    # Period labels, e.g. "Period 2", "Billing Period 1", "(1 of 2)", "for 15 days"
+    re.compile(r"\s*\b(?:billing\s+|service\s+)?period\s*#?\d+\b", re.IGNORECASE),
+    re.compile(r"\s*\(\s*\d+\s+of\s+\d+\s*\)", re.IGNORECASE),
+    re.compile(r"\s*\bfor\s+\d+\s+days?\b", re.IGNORECASE),
+]
+_EMPTY_BRACKETS = re.compile(r"\s*(?:\(\s*\)|\[\s*\])")
+# Separators or connectors left dangling at either end after stripping
+_DANGLING_END = re.compile(r"(?:\s*(?:[-–—:,;/]|\b(?:from|for|to|thru|through)\b))+\s*$", re.IGNORECASE)
+_DANGLING_START = re.compile(r"^\s*(?:[-–—:,;/]\s*)+")
+
+def canonical_whitespace(name: str) -> str:
+    """Name with runs of whitespace collapsed to single spaces."""
+    return ' '.join(str(name).split())
+
+def strip_period_labels(name: str) -> str:
+    """Apply the normalize_charges rules that need no model.
+
+    Removes date ranges (parenthetical or bare) and billing period labels,
+    keeping meter numbers, rate identifiers and the rest of the name.
+
+    Args:
+        name: Charge name as printed on the invoice
+
+    Returns:
+        The name without date and period labels, whitespace-collapsed
+    """
+    stripped = canonical_whitespace(name)
+    for pattern in _STRIP_PATTERNS:
+        stripped = pattern.sub('', stripped)
+    stripped = _EMPTY_BRACKETS.sub('', stripped)
+    stripped = _DANGLING_START.sub('', _DANGLING_END.sub('', stripped))
+    stripped = canonical_whitespace(stripped)
+    # Never reduce a name to nothing
+    return stripped or canonical_whitespace(name)
+
+def name_key(name: str) -> str:
+    """Case- and whitespace-insensitive lookup key of a charge name."""
+    return canonical_whitespace(name).casefold()
+
+class ChargeNameNormalizer:
+    """Local charge name normalization backed by a persistent learned mapping.
+
+    Names are resolved, in order, through the learned mapping (keyed
+    case-insensitively, so differently cased spellings share the first
+    spelling seen), then through the deterministic rules of
+    ``strip_period_labels``. Only names that are neither known nor changed
+    by the rules are returned as unseen, for the caller to send to the LLM
+    and ``learn`` the answers.
+    """
+
+    def __init__(self, mapping_file: Optional[str] = None):
+        """Initialize the normalizer.
+
+        Args:
+            mapping_file: JSON file holding the learned mapping, or None to
+                          keep it in memory only
+        """
+        self.mapping_file = Path(mapping_file) if mapping_file else None
+        self.mapping: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        if self.mapping_file is not None and self.mapping_file.exists():
+            self.mapping = self._read()
+
+    def resolve(self, names: Iterable[str]) -> Tuple[Dict[str, str], List[str]]:
+        """Normalize names locally.
+
+        Args:
+            names: Charge names as extracted
+
+        Returns:
+            Mapping of resolved names to normalized names, and the names
+            that need the LLM
+        """
+        resolved, unseen = {}, []
+        changed = False
+        with self._lock:
+            for name in dict.fromkeys(names):
+                key = name_key(name)
+                if key in self.mapping:
+                    resolved[name] = self.mapping[key]
+                    continue
+                stripped = strip_period_labels(name)
+                known = self.mapping.get(name_key(stripped))
+                if known is None and stripped == canonical_whitespace(name):
+                    unseen.append(name)
+                    continue
+                normalized = known or stripped
+                resolved[name] = normalized
+                changed |= self._remember(name, normalized)
+        if changed:
+            self._save()
+        return resolved, unseen
+
+    def learn(self, answers: Dict[str, Any]) -> Dict[str, str]:
+        """Store LLM normalizations of unseen names.
+
+        Answers are passed through the local rules as well, and map onto an
+        existing spelling when one is known.
+
+        Args:
+            answers: Mapping of original names to normalized names
+
+        Returns:
+            Mapping of original names to the stored normalized names
+        """
+        learned = {}
+        with self._lock:
+            for name, normalized in answers.items():
+                if not isinstance(normalized, str) or not normalized.strip():
+                    continue
+                normalized = strip_period_labels(normalized)
+                normalized = self.mapping.get(name_key(normalized), normalized)
+                self._remember(name, normalized)
+                learned[name] = normalized
+        if learned:
+            self._save()
+        return learned
+
+    def _remember(self, name: str, normalized: str) -> bool:
+        """Map a name and its normalized form; True when the mapping changed."""
+        before = len(self.mapping)
+        self.mapping.setdefault(name_key(normalized), normalized)
+        self.mapping.setdefault(name_key(name), normalized)
+        return len(self.mapping) != before
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self.mapping_file) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable charge name mapping {self.mapping_file}: {str(e)}")
+            return {}
+
+    def _save(self) -> None:
+        """Write the mapping, merging entries written by other processes."""
+        if self.mapping_file is None:
+            return
+        with self._lock:
+            mapping = self._read() if self.mapping_file.exists() else {}
+            mapping.update(self.mapping)
+            self.mapping = mapping
+            self.mapping_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.mapping_file.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(mapping, f, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.mapping_file)
+            except BaseException:
+                Path(tmp_path).unlink(missing_ok=True)
+                raise
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ChargeNameNormalizer':
+        """Create a normalizer from the 'charge_names' configuration section."""
+        return cls(mapping_file=config.get('mapping_file'))
@@ -0,0 +1,91 @@
+from typing import Any, List, Optional
+import json
+
+class IncrementalArrayParser:
+    """Parses the elements of a JSON array while the document is still streaming.
+
+    The array is either the top-level value or the value of ``array_key``
+    in the top-level object, e.g. ``{"charges": [{...}, {...}]}``. Every
+    call to ``feed`` returns the object elements completed by the new text,
+    so callers can act on the first elements long before the document ends.
+    Elements are decoded with ``json.loads`` exactly as a full parse would.
+    """
+
+    def __init__(self, array_key: Optional[str] = None):
+        """Initialize the parser.
+
+        Args:
+            array_key: Key of the array in the top-level object, or None to
+                       only accept a top-level array
+        """
+        self.array_key = array_key
+        self.buffer = ''
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.string_start = 0
+        self.last_key: Optional[str] = None
+        self.array_depth: Optional[int] = None
+        self.element_start: Optional[int] = None
+        self.array_closed = False
+
+    @property
+    def found_array(self) -> bool:
+        """Whether the start of the array has been seen."""
+        return self.array_depth is not None
+
+    def feed(self, text: str) -> List[Any]:
+        """Add streamed text.
+
+        Args:
+            text: Next piece of the JSON document
+
+        Returns:
+            Elements of the array completed by this text, in order
+
+        Raises:
+            json.JSONDecodeError: If a completed element is not valid JSON
+        """
+        self.buffer += text
+        elements = []
+        buffer = self.buffer
+        for i in range(self.pos, len(buffer)):
+            char = buffer[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.array_depth is None:
+                        self.last_key = buffer[self.string_start + 1:i]
+                continue
+
+            if char == '"':
+                self.in_string = True
+                self.string_start = i
+            elif char in '[{':
+                if char == '[' and self._is_target_array():
+                    self.array_depth = self.depth
+                elif self.array_depth is not None and not self.array_closed and self.depth == self.array_depth + 1 and char == '{':
+                    self.element_start = i
+                self.depth += 1
+            elif char in ']}':
+                self.depth -= 1
+                if self.array_depth is not None and not self.array_closed:
+                    if self.depth == self.array_depth + 1 and char == '}' and self.element_start is not None:
+                        elements.append(json.loads(buffer[self.element_start:i + 1]))
+                        self.element_start = None
+                    elif self.depth == self.array_depth:
+                        self.array_closed = True
+        self.pos = len(buffer)
+        return elements
+
+    def _is_target_array(self) -> bool:
+        if self.array_depth is not None:
+            return False
+        if self.depth == 0:
+            return True
+        return self.depth == 1 and self.array_key is not None and self.last_key == self.array_key
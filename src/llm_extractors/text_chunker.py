@@ -0,0 +1,186 @@
+from typing import Any, Callable, Hashable, List, Optional, Sequence, TypeVar
+from collections import Counter
+import re
+
+from ..core import PAGE_TOKEN, TABLE_START_TOKEN
+from ..core.models.invoice import Charge, Determinant
+from ..preprocessors.token_estimator import estimate_tokens
+
+T = TypeVar('T')
+
+# Zero-width split points before each page and table marker
+_BOUNDARY = re.compile(f"(?={re.escape(PAGE_TOKEN)}|{re.escape(TABLE_START_TOKEN)})")
+
+# Amounts and quantities as printed, e.g. 1,234.50 or $(12.00)
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+def split_segments(text: str) -> List[str]:
+    """Split preprocessed text before every page and table marker.
+
+    Each segment starts with its marker (except possibly the first), so
+    tables are never cut in half.
+    """
+    return [segment for segment in _BOUNDARY.split(text) if segment]
+
+def _split_lines(segment: str, max_tokens: int) -> List[str]:
+    """Pack the lines of an oversized segment into pieces of at most max_tokens."""
+    pieces, current, current_tokens = [], [], 0
+    for line in segment.splitlines(keepends=True):
+        tokens = estimate_tokens(line)
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append(''.join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += tokens
+    if current:
+        pieces.append(''.join(current))
+    return pieces
+
+def _tail(text: str, max_tokens: int) -> str:
+    """Trailing whole lines of text totalling at most max_tokens."""
+    lines = text.splitlines(keepends=True)
+    tail, tokens = [], 0
+    for line in reversed(lines):
+        tokens += estimate_tokens(line)
+        if tokens > max_tokens:
+            break
+        tail.append(line)
+    return ''.join(reversed(tail))
+
+def chunk_text(text: str, max_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """Split preprocessed text into chunks of about max_tokens tokens.
+
+    Chunks are built from whole pages and tables; only a single page or
+    table larger than the budget is split between lines. Each chunk after
+    the first repeats the trailing lines of the previous one, so rows that
+    straddle a boundary are seen whole by one of them. The overlap counts
+    toward the budget of the chunk repeating it.
+
+    Args:
+        text: Preprocessed invoice text
+        max_tokens: Token budget per chunk
+        overlap_tokens: Tokens of trailing context carried into the next chunk
+
+    Returns:
+        The chunks; ``[text]`` when the text fits the budget
+
+    Raises:
+        ValueError: If the overlap leaves no room for new text in a chunk
+    """
+    if overlap_tokens >= max_tokens:
+        raise ValueError(f"overlap_tokens ({overlap_tokens}) must be less than max_tokens ({max_tokens})")
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    # A segment must fit next to the overlap repeated from the previous chunk
+    segment_tokens = max_tokens - overlap_tokens
+    segments = []
+    for segment in split_segments(text):
+        if estimate_tokens(segment) > segment_tokens:
+            segments.extend(_split_lines(segment, segment_tokens))
+        else:
+            segments.append(segment)
+
+    chunks, current, current_tokens = [], [], 0
+    for segment in segments:
+        tokens = estimate_tokens(segment)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(''.join(current))
+            overlap = _tail(chunks[-1], overlap_tokens) if overlap_tokens else ''
+            current = [overlap] if overlap else []
+            current_tokens = estimate_tokens(overlap) if overlap else 0
+        current.append(segment)
+        current_tokens += tokens
+    if current:
+        chunks.append(''.join(current))
+    return chunks
+
+def chunk_overlaps(chunks: Sequence[str], overlap_tokens: int) -> List[str]:
+    """Text each chunk repeats from the end of the previous one.
+
+    Args:
+        chunks: Chunks returned by chunk_text
+        overlap_tokens: The overlap_tokens passed to chunk_text
+
+    Returns:
+        One overlap per chunk, '' for the first and where nothing is repeated
+    """
+    overlaps = ['']
+    for previous, chunk in zip(chunks, chunks[1:]):
+        overlap = _tail(previous, overlap_tokens) if overlap_tokens else ''
+        overlaps.append(overlap if overlap and chunk.startswith(overlap) else '')
+    return overlaps
+
+def merge_chunk_results(results: Sequence[Sequence[T]],
+                        key: Callable[[T], Hashable],
+                        overlaps: Optional[Sequence[str]] = None,
+                        locate: Optional[Callable[[T, str], bool]] = None) -> List[T]:
+    """Merge items extracted from overlapping chunks.
+
+    Only the overlap between neighbouring chunks is seen twice, so an item
+    is dropped as a duplicate only when the previous chunk extracted an
+    item with the same key and the item is found in the text the two
+    chunks share. An invoice listing the same item again elsewhere (e.g. a
+    tax line per meter period, or a summary page repeating a charge) keeps
+    every occurrence.
+
+    Args:
+        results: Items extracted per chunk, in chunk order
+        key: Identity of an item
+        overlaps: Text each chunk shares with the previous one, from
+                  chunk_overlaps; without it any item sharing a key with
+                  the previous chunk is dropped
+        locate: Whether an item is found in a text; without it every item
+                of a chunk with a non-empty overlap may be dropped
+
+    Returns:
+        The merged items
+    """
+    merged = []
+    previous = Counter()
+    for index, items in enumerate(results):
+        overlap = overlaps[index] if overlaps is not None and index < len(overlaps) else None
+        current = Counter()
+        for item in items:
+            item_key = key(item)
+            current[item_key] += 1
+            in_overlap = overlap is None or (overlap != '' and (locate is None or locate(item, overlap)))
+            if previous[item_key] > 0 and in_overlap:
+                previous[item_key] -= 1
+                continue
+            merged.append(item)
+        previous = current
+    return merged
+
+def _normalize_name(name: Any) -> str:
+    return ' '.join(str(name or '').lower().split())
+
+def _normalize_number(value: Any) -> Any:
+    try:
+        return round(float(str(value).replace(',', '').replace('$', '')), 4)
+    except (TypeError, ValueError):
+        return value
+
+def charge_key(charge: Charge) -> Hashable:
+    """Identity of a charge across chunks."""
+    return (_normalize_name(charge.name), _normalize_number(charge.amount),
+            _normalize_name(charge.commodity), charge.meter_number)
+
+def determinant_key(determinant: Determinant) -> Hashable:
+    """Identity of a determinant across chunks."""
+    return (_normalize_name(determinant.name), _normalize_number(determinant.value),
+            _normalize_name(determinant.unit), determinant.meter)
+
+def _mentions_number(value: Any, text: str) -> bool:
+    number = _normalize_number(value)
+    if not isinstance(number, float):
+        return str(value) in text
+    return any(_normalize_number(match) == abs(number) for match in _NUMBER.findall(text))
+
+def charge_in_text(charge: Charge, text: str) -> bool:
+    """Whether the amount of a charge is printed in text."""
+    return _mentions_number(charge.amount, text)
+
+def determinant_in_text(determinant: Determinant, text: str) -> bool:
+    """Whether the value of a determinant is printed in text."""
+    return _mentions_number(determinant.value, text)
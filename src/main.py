@@ -1,6 +1,6 @@
 import logging
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 import json
 import yaml
 from azure.identity import DefaultAzureCredential
@@ -9,13 +9,26 @@ from .core.interfaces.text_extractor import TextExtractor
 from .core.interfaces.text_preprocessor import TextPreprocessor
 from .core.interfaces.data_extractor import DataExtractor
 from .core.interfaces.validator import Validator
+from .core.models.invoice import Invoice
 
 from .extractors.azure_docintel_extractor import AzureDocIntelExtractor
 from .preprocessors.basic_preprocessor import BasicPreprocessor
 from .preprocessors.basic_preprocessor_v2 import BasicPreprocessorV2
+from .preprocessors.advanced_preprocessor import AdvancedPreprocessor
 from .llm_extractors.azure_openai_extractor import AzureOpenAIExtractor
+from .llm_extractors.azure_openai_batch import (
+    AzureOpenAIBatchExtractor, AzureOpenAIBatchService, BatchExtractionResult
+)
 from .validators.business_rules_validator import BusinessRulesValidator
+from .validators.history_validator import HistoricalAnomalyValidator
+from .template_extractors.template_extractor import TemplateExtractor
 from .pipeline.extraction_pipeline import ExtractionPipeline
+from .core.checkpoint_store import CheckpointStore
+from .pipeline.dedupe_index import DedupeIndex
+from .pipeline.batch_runner import BatchRunner
+from .pipeline.queue_worker import QueueWorker
+from .pipeline.staged_pipeline import StagedResult
+from .pipeline.worker_pool import PreforkWorkerPool, WorkerResult
 
 # Configure logging
 logging.basicConfig(
@@ -39,24 +52,137 @@ def load_config() -> Dict[str, Any]:
     with open(config_path) as f:
         return yaml.safe_load(f)
 
+def build_preprocessor(config: Dict[str, Any]) -> TextPreprocessor:
+    """Create the preprocessor named by 'preprocessors.type'."""
+    preprocessor_config = config.get('preprocessors', {})
+    preprocessor_type = preprocessor_config.get('type', 'basic_v2')
+    if preprocessor_type == 'basic_v2':
+        return BasicPreprocessorV2.from_config(config)
+    if preprocessor_type == 'basic':
+        return BasicPreprocessor.from_config(preprocessor_config.get('basic', {}))
+    if preprocessor_type == 'advanced':
+        # Loads the spaCy and transformer models; PreforkWorkerPool loads them once for all workers
+        return AdvancedPreprocessor.from_config(preprocessor_config.get('advanced', {}))
+    raise ValueError(f"Unknown preprocessor type: {preprocessor_type}")
+
+def build_pipeline(config: Dict[str, Any]) -> ExtractionPipeline:
+    """Create the extraction pipeline from configuration."""
+    # Initialize pipeline components
+    text_extractor = AzureDocIntelExtractor.from_config(config['azure_docint'])
+    preprocessor = build_preprocessor(config)
+    data_extractor = AzureOpenAIExtractor.from_config(config['azure_openai'])
+    validator = BusinessRulesValidator.from_config(config.get('validators', {}).get('business_rules', {}))
+    history_config = config.get('validators', {}).get('history', {})
+    if history_config.get('enabled'):
+        validator = HistoricalAnomalyValidator.from_config(history_config, base_validator=validator)
+    
+    template_config = config.get('templates', {})
+    template_extractor = None
+    if template_config.get('enabled'):
+        template_extractor = TemplateExtractor.from_config(template_config)
+    
+    checkpoint_config = config.get('checkpoints', {})
+    checkpoint_store = None
+    if checkpoint_config.get('enabled'):
+        checkpoint_store = CheckpointStore.from_config(checkpoint_config)
+    
+    dedupe_config = config.get('dedupe', {})
+    dedupe_index = None
+    if dedupe_config.get('enabled'):
+        dedupe_index = DedupeIndex.from_config(dedupe_config)
+    
+    # Create pipeline
+    return ExtractionPipeline(
+        text_extractor=text_extractor,
+        preprocessor=preprocessor,
+        data_extractor=data_extractor,
+        validator=validator,
+        template_extractor=template_extractor,
+        checkpoint_store=checkpoint_store,
+        dedupe_index=dedupe_index
+    )
+
+def process_batch(file_paths: List[str]) -> List[WorkerResult]:
+    """Process many invoices with pre-forked workers sharing one pipeline.
+
+    The adaptive concurrency limiters live in each worker process, so the
+    calls in flight to each Azure service can reach the worker count times
+    their ``max_limit``.
+    """
+    config = load_config()
+    pool = PreforkWorkerPool.from_config(config, lambda: build_pipeline(config))
+    with pool:
+        results = pool.map(file_paths)
+    
+    for result in results:
+        if not result.ok:
+            logger.error(f"Failed to process {result.file_path}: {result.error}")
+    return results
+
+def run_batch_job(file_paths: List[str], retry_failed: bool = False) -> Dict[str, int]:
+    """Process invoices with durable progress, resuming an interrupted batch."""
+    config = load_config()
+    runner = BatchRunner.from_config(config.get('jobs', {}), build_pipeline(config))
+    return runner.run(file_paths, retry_failed=retry_failed)
+
+def run_queue_worker(file_paths: Optional[List[str]] = None, stop_when_empty: bool = True) -> Dict[str, int]:
+    """Process invoices from the shared work queue; run on as many nodes as needed."""
+    config = load_config()
+    worker = QueueWorker.from_config(config.get('work_queue', {}), build_pipeline(config))
+    if file_paths:
+        worker.queue.enqueue(file_paths)
+    return worker.run(stop_when_empty=stop_when_empty)
+
+def process_staged(file_paths: List[str]) -> List[StagedResult]:
+    """Process invoices as connected stages with per-stage concurrency limits."""
+    config = load_config()
+    pipeline = build_pipeline(config)
+    results = []
+    for result in pipeline.process_many(file_paths, config.get('stages', {})):
+        if not result.ok:
+            logger.error(f"Failed to process {result.file_path}: {result.error}")
+        results.append(result)
+    return results
+
+def process_bulk(file_paths: List[str]) -> List[BatchExtractionResult]:
+    """Process invoices with the Azure OpenAI Batch API (for backfills)."""
+    config = load_config()
+    pipeline = build_pipeline(config)
+    batch_config = config.get('batch_api', {})
+    batch_service = AzureOpenAIBatchService.from_config({**config['azure_openai'], **batch_config})
+    bulk_extractor = AzureOpenAIBatchExtractor.from_config(
+        batch_config, pipeline.data_extractor, batch_service
+    )
+    
+    # OCR and preprocessing run synchronously; only the LLM prompts are batched
+    documents = []
+    results = []
+    for file_path in file_paths:
+        try:
+            extraction_result = pipeline.extract_text(file_path)
+            documents.append((pipeline.preprocess(extraction_result), file_path))
+        except Exception as e:
+            logger.error(f"Failed to process {file_path}: {str(e)}")
+            results.append(BatchExtractionResult(file_path, error=str(e)))
+    
+    for result in bulk_extractor.extract_batch(documents):
+        if result.ok:
+            pipeline.validate(result.invoice)
+        results.append(result)
+    return results
+
+def process_images(image_paths: List[str]) -> Invoice:
+    """Process the photographed pages of one invoice, in page order, as a single document."""
+    config = load_config()
+    return build_pipeline(config).process_images(image_paths)
+
 def main():
     try:
         # Load configuration
         config = load_config()
         
-        # Initialize pipeline components
-        text_extractor = AzureDocIntelExtractor.from_config(config['azure_docint'])
-        preprocessor = BasicPreprocessorV2()
-        data_extractor = AzureOpenAIExtractor.from_config(config['azure_openai'])
-        validator = BusinessRulesValidator()
-        
         # Create pipeline
-        pipeline = ExtractionPipeline(
-            text_extractor=text_extractor,
-            preprocessor=preprocessor,
-            data_extractor=data_extractor,
-            validator=validator
-        )
+        pipeline = build_pipeline(config)
         
         # Process invoice
         logger.info(f"Processing invoice: {FILE_PATH}")
@@ -0,0 +1,14 @@
+from .faults import FaultProfile, FaultInjector
+from .recordings import Recordings
+from .base import MockServer
+from .docintel_server import MockDocIntelServer
+from .openai_server import MockOpenAIServer
+
+__all__ = [
+    'FaultProfile',
+    'FaultInjector',
+    'Recordings',
+    'MockServer',
+    'MockDocIntelServer',
+    'MockOpenAIServer',
+]
@@ -0,0 +1,53 @@
+import argparse
+import logging
+import time
+
+from .faults import FaultProfile, LATENCY_DISTRIBUTIONS
+from .recordings import Recordings
+from .docintel_server import MockDocIntelServer
+from .openai_server import MockOpenAIServer
+
+def main():
+    parser = argparse.ArgumentParser(description="Run mock Document Intelligence and Azure OpenAI servers")
+    parser.add_argument("--recordings", required=True, help="Directory of recorded responses")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--docintel-port", type=int, default=8701)
+    parser.add_argument("--openai-port", type=int, default=8702)
+    parser.add_argument("--docintel-latency", type=float, default=3.0, help="Mean analysis time (seconds)")
+    parser.add_argument("--openai-latency", type=float, default=2.0, help="Mean completion time (seconds)")
+    parser.add_argument("--distribution", choices=LATENCY_DISTRIBUTIONS, default='lognormal')
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    def profile(latency: float) -> FaultProfile:
+        return FaultProfile(
+            latency=args.distribution,
+            latency_mean=latency,
+            latency_sigma=args.sigma,
+            throttle_rate=args.throttle_rate,
+            timeout_rate=args.timeout_rate,
+            error_rate=args.error_rate,
+            max_concurrency=args.max_concurrency,
+            seed=args.seed
+        )
+
+    recordings = Recordings(args.recordings)
+    docintel = MockDocIntelServer(recordings, profile(args.docintel_latency), host=args.host, port=args.docintel_port)
+    openai = MockOpenAIServer(recordings, faults=profile(args.openai_latency), host=args.host, port=args.openai_port)
+    with docintel, openai:
+        try:
+            while True:
+                time.sleep(60)
+                logging.info(f"docintel: {docintel.stats()} openai: {openai.stats()}")
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
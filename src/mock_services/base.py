@@ -0,0 +1,167 @@
+from typing import Optional, Dict, Any
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from collections import Counter
+import json
+import logging
+import threading
+import time
+
+from .faults import FaultProfile, FaultInjector, THROTTLE, TIMEOUT, ERROR
+
+logger = logging.getLogger(__name__)
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.mock._dispatch(self, 'GET')
+
+    def do_POST(self):
+        self.server.mock._dispatch(self, 'POST')
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+class MockServer:
+    """Base class for local HTTP stand-ins of the Azure services.
+
+    Runs a ThreadingHTTPServer on a background thread and applies the
+    FaultProfile to incoming requests: capacity limits and throttling are
+    answered with 429 and Retry-After, timeouts stall the connection, and
+    errors are answered with 500. Subclasses implement ``handle`` and call
+    ``admit`` for the requests that faults apply to.
+
+    Point a service's 'endpoint' setting at ``url`` to run the unchanged
+    extractors against the mock, e.g. for load tests::
+
+        with MockDocIntelServer(recordings, FaultProfile(latency_mean=2.0)) as docintel:
+            extractor = AzureDocIntelExtractor(docintel.url, "key")
+    """
+
+    def __init__(self,
+                 faults: Optional[FaultProfile] = None,
+                 host: str = "127.0.0.1",
+                 port: int = 0):
+        """Initialize the server.
+
+        Args:
+            faults: Optional latency and failure profile
+            host: Interface to bind
+            port: Port to bind, 0 for any free port
+        """
+        self.faults = FaultInjector(faults or FaultProfile())
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.max_in_flight = 0
+        self.status_counts: Counter = Counter()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server, usable as a service endpoint."""
+        return f"http://{self.host}:{self.port}/"
+
+    def start(self) -> 'MockServer':
+        """Start serving on a background thread."""
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name=f"{type(self).__name__}-{self.port}", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"{type(self).__name__} listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'MockServer':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Response counts by status code and peak concurrency."""
+        with self._lock:
+            return {
+                'status_counts': dict(self.status_counts),
+                'in_flight': self._in_flight,
+                'max_in_flight': self.max_in_flight
+            }
+
+    def handle(self, handler: BaseHTTPRequestHandler, method: str, body: bytes) -> None:
+        """Serve a request; call admit() first for requests subject to faults."""
+        raise NotImplementedError
+
+    def admit(self, handler: BaseHTTPRequestHandler, in_flight: Optional[int] = None) -> bool:
+        """Apply fault injection to a request.
+
+        Args:
+            handler: Request handler
+            in_flight: Work in progress including this request, compared
+                       against max_concurrency (defaults to open requests)
+
+        Returns:
+            True if the request should be served, False if a fault was sent
+        """
+        fault = self.faults.decide(self._in_flight if in_flight is None else in_flight)
+        if fault == THROTTLE:
+            retry_after = self.faults.profile.retry_after
+            self.send_json(handler, 429, {
+                'error': {'code': '429', 'message': f"Rate limit exceeded. Retry after {retry_after} seconds."}
+            }, headers={'Retry-After': str(retry_after)})
+            return False
+        if fault == TIMEOUT:
+            time.sleep(self.faults.profile.timeout_seconds)
+            handler.close_connection = True
+            self._count('timeout')
+            return False
+        if fault == ERROR:
+            self.send_json(handler, 500, {'error': {'code': 'InternalServerError', 'message': 'Injected failure'}})
+            return False
+        return True
+
+    def send_json(self,
+                  handler: BaseHTTPRequestHandler,
+                  status: int,
+                  body: Any,
+                  headers: Optional[Dict[str, str]] = None) -> None:
+        """Write a JSON response."""
+        payload = json.dumps(body).encode('utf-8')
+        self._count(status)
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _count(self, status: Any) -> None:
+        with self._lock:
+            self.status_counts[status] += 1
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            self.handle(handler, method, body)
+        except Exception as e:
+            logger.exception(f"Mock handler failed: {str(e)}")
+            self.send_json(handler, 500, {'error': {'code': 'InternalServerError', 'message': str(e)}})
+        finally:
+            with self._lock:
+                self._in_flight -= 1
@@ -0,0 +1,153 @@
+from typing import Optional, Dict, Any
+from http.server import BaseHTTPRequestHandler
+from datetime import datetime, timezone
+import base64
+import json
+import re
+import threading
+import time
+import uuid
+
+from .base import MockServer
+from .faults import FaultProfile
+from .recordings import Recordings
+
+ANALYZE_PATH = re.compile(r'^(?P<prefix>/[^?]*?)/documentModels/(?P<model>[^/:?]+):analyze')
+RESULT_PATH = re.compile(r'^(?P<prefix>/[^?]*?)/documentModels/(?P<model>[^/:?]+)/analyzeResults/(?P<id>[^/?]+)')
+
+# Finished operations are kept this long for late polls
+OPERATION_TTL = 300.0
+
+def _timestamp(value: float) -> str:
+    return datetime.fromtimestamp(value, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+class MockDocIntelServer(MockServer):
+    """Local stand-in for the Document Intelligence analyze API.
+
+    Speaks the long-running operation protocol used by
+    DocumentIntelligenceClient.begin_analyze_document: the analyze POST is
+    answered with 202 and an Operation-Location header, and polling that
+    location reports 'running' until the sampled latency has passed, then
+    'succeeded' with the recorded analyzeResult. Faults apply to the
+    analyze POST; max_concurrency counts running analyses.
+    """
+
+    def __init__(self,
+                 recordings: Optional[Recordings] = None,
+                 faults: Optional[FaultProfile] = None,
+                 poll_interval: float = 1.0,
+                 host: str = "127.0.0.1",
+                 port: int = 0):
+        """Initialize the server.
+
+        Args:
+            recordings: Recorded analyze results to serve
+            faults: Optional latency and failure profile; the latency is the
+                    analysis time of each document
+            poll_interval: Retry-After seconds suggested to polling clients
+            host: Interface to bind
+            port: Port to bind, 0 for any free port
+        """
+        super().__init__(faults=faults, host=host, port=port)
+        self.recordings = recordings
+        self.poll_interval = poll_interval
+        self._operations: Dict[str, Dict[str, Any]] = {}
+        self._operations_lock = threading.Lock()
+
+    def running(self) -> int:
+        """Number of analyses that have not finished yet."""
+        now = time.time()
+        with self._operations_lock:
+            return sum(1 for op in self._operations.values() if op['ready_at'] > now)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats['running'] = self.running()
+        return stats
+
+    def handle(self, handler: BaseHTTPRequestHandler, method: str, body: bytes) -> None:
+        path = handler.path
+        match = RESULT_PATH.match(path)
+        if method == 'GET' and match:
+            self._poll(handler, match.group('id'))
+            return
+
+        match = ANALYZE_PATH.match(path)
+        if method == 'POST' and match:
+            self._analyze(handler, match.group('prefix'), match.group('model'), path, body)
+            return
+
+        self.send_json(handler, 404, {'error': {'code': 'NotFound', 'message': f"Unknown path: {path}"}})
+
+    def _analyze(self, handler: BaseHTTPRequestHandler, prefix: str, model_id: str, path: str, body: bytes) -> None:
+        if not self.admit(handler, self.running() + 1):
+            return
+
+        document = body
+        if handler.headers.get('Content-Type', '').startswith('application/json'):
+            request = json.loads(body or b'{}')
+            document = base64.b64decode(request.get('base64Source', '')) if 'base64Source' in request else body
+
+        result = self.recordings.docintel(document) if self.recordings else None
+        if result is None:
+            result = self._empty_result(model_id)
+
+        now = time.time()
+        operation_id = uuid.uuid4().hex
+        with self._operations_lock:
+            self._purge(now)
+            self._operations[operation_id] = {
+                'created': now,
+                'ready_at': now + self.faults.sample_latency(),
+                'result': result
+            }
+
+        query = path.split('?', 1)[1] if '?' in path else ''
+        api_version = re.search(r'api-version=([^&]+)', query)
+        location = f"{self.url.rstrip('/')}{prefix}/documentModels/{model_id}/analyzeResults/{operation_id}"
+        if api_version:
+            location += f"?api-version={api_version.group(1)}"
+
+        self.send_json(handler, 202, {}, headers={
+            'Operation-Location': location,
+            'Retry-After': str(self.poll_interval),
+            'apim-request-id': operation_id
+        })
+
+    def _poll(self, handler: BaseHTTPRequestHandler, operation_id: str) -> None:
+        with self._operations_lock:
+            operation = self._operations.get(operation_id)
+        if operation is None:
+            self.send_json(handler, 404, {'error': {'code': 'NotFound', 'message': 'Unknown operation'}})
+            return
+
+        now = time.time()
+        body = {
+            'status': 'running',
+            'createdDateTime': _timestamp(operation['created']),
+            'lastUpdatedDateTime': _timestamp(now)
+        }
+        if now >= operation['ready_at']:
+            body['status'] = 'succeeded'
+            body['analyzeResult'] = operation['result']
+        self.send_json(handler, 200, body, headers={'Retry-After': str(self.poll_interval)})
+
+    def _purge(self, now: float) -> None:
+        expired = [k for k, op in self._operations.items() if op['ready_at'] + OPERATION_TTL < now]
+        for key in expired:
+            del self._operations[key]
+
+    @staticmethod
+    def _empty_result(model_id: str) -> Dict[str, Any]:
+        return {
+            'apiVersion': '2024-11-30',
+            'modelId': model_id,
+            'stringIndexType': 'textElements',
+            'content': '',
+            'pages': [],
+            'tables': [],
+            'paragraphs': [],
+            'styles': [],
+            'languages': [],
+            'contentFormat': 'text'
+        }
@@ -0,0 +1,103 @@
+from typing import Optional, Dict, Any
+from dataclasses import dataclass, asdict
+import math
+import random
+import threading
+
+# Fault decisions returned by FaultInjector.decide()
+THROTTLE = 'throttle'
+TIMEOUT = 'timeout'
+ERROR = 'error'
+
+LATENCY_DISTRIBUTIONS = ('constant', 'uniform', 'normal', 'lognormal', 'exponential')
+
+@dataclass
+class FaultProfile:
+    """Latency and failure behaviour of a mock service.
+
+    Attributes:
+        latency: Latency distribution ('constant', 'uniform', 'normal',
+                 'lognormal' or 'exponential')
+        latency_mean: Mean latency in seconds
+        latency_sigma: Spread of the distribution (seconds for 'uniform' and
+                       'normal', log-space sigma for 'lognormal')
+        throttle_rate: Fraction of requests answered with 429
+        retry_after: Retry-After seconds sent with 429 responses
+        timeout_rate: Fraction of requests that stall and never answer
+        timeout_seconds: How long a stalled request holds the connection
+        error_rate: Fraction of requests answered with 500
+        max_concurrency: Optional capacity; requests beyond it get 429
+        seed: Random seed, for reproducible runs
+    """
+    latency: str = 'constant'
+    latency_mean: float = 0.0
+    latency_sigma: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    timeout_rate: float = 0.0
+    timeout_seconds: float = 30.0
+    error_rate: float = 0.0
+    max_concurrency: Optional[int] = None
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {self.latency}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'FaultProfile':
+        """Create a profile from a dictionary with the attribute names as keys."""
+        return cls(**{k: v for k, v in config.items() if k in cls.__dataclass_fields__})
+
+class FaultInjector:
+    """Draws latencies and fault decisions from a FaultProfile.
+
+    All draws come from one seeded generator, so a run with the same seed
+    and request order sees the same latencies and faults.
+    """
+
+    def __init__(self, profile: FaultProfile):
+        self.profile = profile
+        self._random = random.Random(profile.seed)
+        self._lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        """Draw a latency in seconds."""
+        p = self.profile
+        with self._lock:
+            if p.latency == 'constant' or p.latency_mean <= 0:
+                value = p.latency_mean
+            elif p.latency == 'uniform':
+                value = self._random.uniform(p.latency_mean - p.latency_sigma, p.latency_mean + p.latency_sigma)
+            elif p.latency == 'normal':
+                value = self._random.gauss(p.latency_mean, p.latency_sigma)
+            elif p.latency == 'lognormal':
+                # Parameterized so that the distribution mean is latency_mean
+                mu = math.log(p.latency_mean) - p.latency_sigma ** 2 / 2
+                value = self._random.lognormvariate(mu, p.latency_sigma)
+            else:
+                value = self._random.expovariate(1.0 / p.latency_mean)
+        return max(value, 0.0)
+
+    def decide(self, in_flight: int = 0) -> Optional[str]:
+        """Pick the fault for a request, or None to serve it normally.
+
+        Args:
+            in_flight: Requests currently in progress, checked against
+                       max_concurrency
+        """
+        p = self.profile
+        if p.max_concurrency is not None and in_flight > p.max_concurrency:
+            return THROTTLE
+        with self._lock:
+            draw = self._random.random()
+        if draw < p.throttle_rate:
+            return THROTTLE
+        if draw < p.throttle_rate + p.timeout_rate:
+            return TIMEOUT
+        if draw < p.throttle_rate + p.timeout_rate + p.error_rate:
+            return ERROR
+        return None
@@ -0,0 +1,134 @@
+from typing import Optional, Dict, Any, List, Callable
+from http.server import BaseHTTPRequestHandler
+import json
+import re
+import time
+import uuid
+
+from .base import MockServer
+from .faults import FaultProfile
+from .recordings import Recordings
+
+CHAT_PATH = re.compile(r'^/openai/deployments/(?P<deployment>[^/?]+)/chat/completions')
+
+# Characters per streamed chunk
+STREAM_CHUNK_SIZE = 16
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(len(text) // 4, 1) if text else 0
+
+class MockOpenAIServer(MockServer):
+    """Local stand-in for the Azure OpenAI chat completions API.
+
+    Serves ``/openai/deployments/<deployment>/chat/completions`` with
+    recorded contents, or contents produced by ``responder`` for requests
+    without a recording. Streaming requests (``stream: true``) are answered
+    with server-sent event chunks. Usage reports estimated token counts.
+    """
+
+    def __init__(self,
+                 recordings: Optional[Recordings] = None,
+                 responder: Optional[Callable[[Dict[str, Any]], str]] = None,
+                 faults: Optional[FaultProfile] = None,
+                 first_token_fraction: float = 0.2,
+                 host: str = "127.0.0.1",
+                 port: int = 0):
+        """Initialize the server.
+
+        Args:
+            recordings: Recorded completion contents to serve
+            responder: Optional fallback producing the content for a request body
+            faults: Optional latency and failure profile
+            first_token_fraction: Share of the latency spent before the first
+                                  streamed chunk
+            host: Interface to bind
+            port: Port to bind, 0 for any free port
+        """
+        super().__init__(faults=faults, host=host, port=port)
+        self.recordings = recordings
+        self.responder = responder
+        self.first_token_fraction = first_token_fraction
+
+    def handle(self, handler: BaseHTTPRequestHandler, method: str, body: bytes) -> None:
+        match = CHAT_PATH.match(handler.path)
+        if method != 'POST' or not match:
+            self.send_json(handler, 404, {'error': {'code': 'NotFound', 'message': f"Unknown path: {handler.path}"}})
+            return
+        if not self.admit(handler):
+            return
+
+        request = json.loads(body or b'{}')
+        messages = request.get('messages', [])
+        content = self.recordings.chat(messages) if self.recordings else None
+        if content is None and self.responder is not None:
+            content = self.responder(request)
+        if content is None:
+            self.send_json(handler, 404, {'error': {'code': 'NotFound', 'message': 'No recorded response for request'}})
+            return
+
+        latency = self.faults.sample_latency()
+        prompt_tokens = sum(estimate_tokens(str(m.get('content', ''))) for m in messages)
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': estimate_tokens(content),
+            'total_tokens': prompt_tokens + estimate_tokens(content)
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = match.group('deployment')
+
+        if request.get('stream'):
+            self._stream(handler, completion_id, model, content, latency, usage)
+            return
+
+        time.sleep(latency)
+        self.send_json(handler, 200, {
+            'id': completion_id,
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': usage
+        })
+
+    def _stream(self,
+                handler: BaseHTTPRequestHandler,
+                completion_id: str,
+                model: str,
+                content: str,
+                latency: float,
+                usage: Dict[str, int]) -> None:
+        pieces = [content[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(content), STREAM_CHUNK_SIZE)] or ['']
+        delay = latency * (1 - self.first_token_fraction) / len(pieces)
+
+        self._count(200)
+        handler.send_response(200)
+        handler.send_header('Content-Type', 'text/event-stream')
+        handler.send_header('Connection', 'close')
+        handler.end_headers()
+        handler.close_connection = True
+
+        def event(choices: List[Dict[str, Any]], **extra: Any) -> None:
+            chunk = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': int(time.time()),
+                'model': model,
+                'choices': choices,
+                **extra
+            }
+            handler.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+            handler.wfile.flush()
+
+        time.sleep(latency * self.first_token_fraction)
+        for i, piece in enumerate(pieces):
+            delta = {'role': 'assistant', 'content': piece} if i == 0 else {'content': piece}
+            event([{'index': 0, 'delta': delta, 'finish_reason': None}])
+            time.sleep(delay)
+        event([{'index': 0, 'delta': {}, 'finish_reason': 'stop'}], usage=usage)
+        handler.wfile.write(b"data: [DONE]\n\n")
+        handler.wfile.flush()
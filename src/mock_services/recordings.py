@@ -0,0 +1,96 @@
+from typing import Optional, Dict, Any, List
+from pathlib import Path
+import hashlib
+import json
+import os
+import tempfile
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _messages_key(messages: List[Dict[str, Any]]) -> str:
+    return _sha256(json.dumps(messages, sort_keys=True).encode('utf-8'))
+
+class Recordings:
+    """Recorded service responses served by the mock services.
+
+    Layout under ``root_dir``:
+
+    - ``docintel/<sha256 of document>.json``: analyzeResult dictionaries
+    - ``chat/<sha256 of messages>.json``: chat completion contents
+    - ``chat/system/<sha256 of system prompt>.json``: latest content per
+      system prompt, served for unseen documents
+
+    Documents without a recording get any recorded analyze result, so a
+    handful of recordings can drive a load test over many files.
+    """
+
+    def __init__(self, root_dir: str):
+        """Initialize the recordings.
+
+        Args:
+            root_dir: Directory holding the recorded responses
+        """
+        self.root_dir = Path(root_dir)
+
+    def docintel(self, document: bytes, fallback: bool = True) -> Optional[Dict[str, Any]]:
+        """Recorded analyzeResult for a document.
+
+        Args:
+            document: Document bytes as sent to the service
+            fallback: Serve any recording when the document has none
+
+        Returns:
+            The analyzeResult dictionary, or None
+        """
+        docintel_dir = self.root_dir / "docintel"
+        path = docintel_dir / f"{_sha256(document)}.json"
+        if not path.exists():
+            if not fallback:
+                return None
+            path = next(iter(sorted(docintel_dir.glob("*.json"))), None) if docintel_dir.exists() else None
+        return self._load(path)['analyze_result'] if path else None
+
+    def save_docintel(self, document: bytes, analyze_result: Any) -> None:
+        """Record the analysis of a document.
+
+        Args:
+            document: Document bytes as sent to the service
+            analyze_result: AnalyzeResult (or its dictionary form)
+        """
+        if hasattr(analyze_result, 'as_dict'):
+            analyze_result = analyze_result.as_dict()
+        self._save(self.root_dir / "docintel" / f"{_sha256(document)}.json", {'analyze_result': analyze_result})
+
+    def chat(self, messages: List[Dict[str, Any]]) -> Optional[str]:
+        """Recorded completion content for the messages, falling back to the system prompt."""
+        path = self.root_dir / "chat" / f"{_messages_key(messages)}.json"
+        if not path.exists():
+            system = next((m['content'] for m in messages if m.get('role') == 'system'), None)
+            if system is None:
+                return None
+            path = self.root_dir / "chat" / "system" / f"{_sha256(system.encode('utf-8'))}.json"
+            if not path.exists():
+                return None
+        return self._load(path)['content']
+
+    def save_chat(self, messages: List[Dict[str, Any]], content: str) -> None:
+        """Record a chat completion content for its request messages."""
+        record = {'messages': messages, 'content': content}
+        self._save(self.root_dir / "chat" / f"{_messages_key(messages)}.json", record)
+        system = next((m['content'] for m in messages if m.get('role') == 'system'), None)
+        if system is not None:
+            self._save(self.root_dir / "chat" / "system" / f"{_sha256(system.encode('utf-8'))}.json", record)
+
+    @staticmethod
+    def _load(path: Path) -> Dict[str, Any]:
+        with open(path) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _save(path: Path, value: Dict[str, Any]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
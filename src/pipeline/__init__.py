@@ -1,5 +1,32 @@
 from .extraction_pipeline import ExtractionPipeline
+from .worker_pool import PreforkWorkerPool, WorkerResult
+from ..core.checkpoint_store import CheckpointStore
+from .dedupe_index import DedupeIndex
+from ..core.operation_store import OperationStore
+from .job_store import JobStore, Job
+from .batch_runner import BatchRunner
+from .work_queue import SQLiteWorkQueue, work_queue_from_config
+from .queue_worker import QueueWorker
+from ..core.adaptive_concurrency import AdaptiveConcurrencyLimiter, get_limiter, limiter_stats
+from .staged_pipeline import StagedPipeline, StageConfig, StagedResult
 
 __all__ = [
     'ExtractionPipeline',
+    'PreforkWorkerPool',
+    'WorkerResult',
+    'CheckpointStore',
+    'DedupeIndex',
+    'OperationStore',
+    'JobStore',
+    'Job',
+    'BatchRunner',
+    'SQLiteWorkQueue',
+    'work_queue_from_config',
+    'QueueWorker',
+    'StagedPipeline',
+    'StageConfig',
+    'StagedResult',
+    'AdaptiveConcurrencyLimiter',
+    'get_limiter',
+    'limiter_stats',
 ]
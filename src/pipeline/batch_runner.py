@@ -0,0 +1,152 @@
+from typing import Optional, Dict, Any, Iterable
+from concurrent.futures import ThreadPoolExecutor
+import logging
+
+from ..core.models.extraction_result import ExtractionResult
+from ..core.models.invoice import Invoice
+from ..core.serialization import NDJSONSink
+from .extraction_pipeline import ExtractionPipeline
+from .job_store import JobStore, Job, QUEUED, OCR_DONE, LLM_DONE
+from ..core.adaptive_concurrency import limiter_stats
+
+logger = logging.getLogger(__name__)
+
+class BatchRunner:
+    """Runs a batch of invoices through the pipeline with durable progress.
+
+    Each file moves through the JobStore states queued -> ocr_done ->
+    llm_done -> validated (or failed). Stage outputs are committed as soon
+    as a stage finishes, so restarting the runner on the same job database
+    continues each file from its last completed stage.
+
+    With ``concurrency`` above one, jobs run on a thread pool. The
+    extractors' adaptive concurrency limiters then decide how many
+    Document Intelligence and OpenAI calls are actually in flight, so the
+    thread count only needs to be an upper bound.
+    """
+
+    def __init__(self,
+                 pipeline: ExtractionPipeline,
+                 job_store: JobStore,
+                 max_attempts: int = 3,
+                 output_dir: Optional[str] = None,
+                 concurrency: int = 1,
+                 output_ndjson: Optional[str] = None):
+        """Initialize the batch runner.
+
+        Args:
+            pipeline: Pipeline providing the individual stages
+            job_store: Durable store of per-file progress
+            max_attempts: Attempts after which failed jobs are no longer re-queued
+            output_dir: Optional directory for the extracted invoice JSON files
+            concurrency: Maximum number of jobs processed at once
+            output_ndjson: Optional NDJSON file to which every validated
+                           invoice is appended
+        """
+        self.pipeline = pipeline
+        self.job_store = job_store
+        self.max_attempts = max_attempts
+        self.output_dir = output_dir
+        self.concurrency = concurrency
+        self.output_ndjson = output_ndjson
+        self._sink: Optional[NDJSONSink] = None
+
+    def run(self,
+            file_paths: Optional[Iterable[str]] = None,
+            retry_failed: bool = False
+            ) -> Dict[str, int]:
+        """Queue files and process every pending job.
+
+        Args:
+            file_paths: Optional files to add to the queue; files that are
+                        already known keep their progress
+            retry_failed: Re-queue failed jobs (below max_attempts) first
+
+        Returns:
+            Number of jobs in each state after the run
+        """
+        if file_paths is not None:
+            added = self.job_store.enqueue(file_paths)
+            logger.info(f"Queued {added} new files")
+
+        if retry_failed:
+            requeued = self.job_store.requeue_failed(self.max_attempts)
+            logger.info(f"Re-queued {requeued} failed files")
+
+        jobs = self.job_store.pending()
+        if self.output_ndjson:
+            self._sink = NDJSONSink(self.output_ndjson)
+        try:
+            if self.concurrency > 1:
+                with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch") as executor:
+                    list(executor.map(self.run_job, jobs))
+            else:
+                for job in jobs:
+                    self.run_job(job)
+        finally:
+            if self._sink is not None:
+                self._sink.close()
+                logger.info(f"Appended {self._sink.records} invoices to {self.output_ndjson}")
+                self._sink = None
+
+        counts = self.job_store.counts()
+        logger.info(f"Batch finished: {counts}")
+        concurrency = limiter_stats()
+        if concurrency:
+            logger.info(f"Adaptive concurrency: {concurrency}")
+        return counts
+
+    def run_job(self, job: Job) -> Optional[Invoice]:
+        """Run the remaining stages of one job.
+
+        Args:
+            job: Job as loaded from the store
+
+        Returns:
+            The validated invoice, or None if the job failed
+        """
+        file_path = job.file_path
+        self.job_store.start_attempt(file_path)
+
+        try:
+            # Invoices are validated before they are stored as llm_done, so a
+            # resumed job keeps its validation errors instead of validating again
+            if job.state == LLM_DONE:
+                invoice = Invoice.from_json(job.invoice)
+            elif job.state == QUEUED and (duplicate := self.pipeline.find_duplicate(file_path)) is not None:
+                invoice = duplicate
+                self.pipeline.validate(invoice)
+                self.job_store.mark_llm_done(file_path, invoice.to_json())
+            else:
+                if job.state == OCR_DONE:
+                    extraction_result = ExtractionResult.from_dict(job.ocr_result)
+                else:
+                    extraction_result = self.pipeline.extract_text(file_path)
+                    self.job_store.mark_ocr_done(file_path, extraction_result.to_dict())
+
+                invoice = self.pipeline.extract_invoice(extraction_result, file_path)
+                self.job_store.mark_llm_done(file_path, invoice.to_json())
+
+            if self.output_dir:
+                invoice.save_json(self.output_dir)
+            if self._sink is not None:
+                self._sink.write(invoice)
+            self.job_store.mark_validated(file_path, invoice.to_json())
+            return invoice
+
+        except Exception as e:
+            logger.error(f"Job failed for {file_path}: {str(e)}")
+            self.job_store.mark_failed(file_path, f"{type(e).__name__}: {str(e)}")
+            return None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], pipeline: ExtractionPipeline) -> 'BatchRunner':
+        """Create a batch runner from the 'jobs' configuration section."""
+        return cls(
+            pipeline=pipeline,
+            job_store=JobStore.from_config(config),
+            max_attempts=config.get('max_attempts', 3),
+            output_dir=config.get('output_dir'),
+            concurrency=config.get('concurrency', 1),
+            output_ndjson=config.get('output_ndjson')
+        )
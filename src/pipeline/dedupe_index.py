@@ -0,0 +1,452 @@
+from typing import Optional, Dict, Any, List, Tuple
+from dataclasses import dataclass
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from deepdiff import DeepDiff
+
+from ..core.models.invoice import Invoice
+from ..core.checkpoint_store import hash_file, hash_text
+from .minhash import (
+    MinHasher, word_shingles, number_tokens, similarity, lsh_parameters, band_keys,
+    pack_signature, unpack_signature
+)
+
+logger = logging.getLogger(__name__)
+
+# How a duplicate was recognized
+MATCH_FILE = 'file'
+MATCH_TEXT = 'text'
+MATCH_INVOICE_NUMBER = 'invoice_number'
+MATCH_NEAR_TEXT = 'near_text'
+
+# Invoice fields that differ between any two documents
+_DIFF_EXCLUDED = [
+    "root['account_info']['source_file']",
+    "root['account_info']['extraction_date']",
+    "root['metadata']"
+]
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_text(text: str) -> str:
+    """OCR text with case and whitespace differences removed."""
+    return _WHITESPACE.sub(' ', text.casefold()).strip()
+
+@dataclass
+class SimilarDocument:
+    """An indexed document whose OCR text resembles a new one."""
+    file_hash: str
+    source_file: str
+    invoice: str
+    text_similarity: float
+    number_similarity: float
+
+class DedupeIndex:
+    """SQLite index of extracted invoices for skipping resubmitted documents.
+
+    Documents are matched in three layers, cheapest first:
+
+    1. The SHA-256 of the file, before OCR (same bytes, any file name)
+    2. The hash of the normalized OCR text, before the LLM calls
+    3. The (account number, invoice number) pair of the extracted invoice
+
+    A file or text match returns the invoice extracted from the original
+    document and is recorded in the ``duplicates`` table. The duplicate's own
+    hashes are added as aliases of the original, so a later copy of it is
+    caught by the first layer.
+
+    The third layer only runs after the LLM, on a document whose text differs
+    from every indexed one, so a corrected or reissued invoice may reuse the
+    number. Its new extraction is kept and indexed, and the match is only
+    recorded in ``duplicates``.
+
+    With a ``similarity_threshold``, the second layer also finds near
+    duplicates (re-scans, added stamps) through MinHash signatures of the
+    word shingles of the text, bucketed by LSH bands so a lookup reads a few
+    buckets instead of every document. A near duplicate whose text and
+    numbers are both at least ``reuse_threshold`` similar reuses the earlier
+    extraction. Less similar ones are extracted again, and the differences
+    from the earlier extraction are recorded in ``similar_documents``.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            file_hash TEXT PRIMARY KEY,
+            text_hash TEXT,
+            account_number TEXT,
+            invoice_number TEXT,
+            source_file TEXT NOT NULL,
+            invoice TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_documents_text ON documents (text_hash);
+        CREATE INDEX IF NOT EXISTS idx_documents_invoice ON documents (account_number, invoice_number);
+        CREATE TABLE IF NOT EXISTS duplicates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_path TEXT NOT NULL,
+            match TEXT NOT NULL,
+            original_file TEXT NOT NULL,
+            detected_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS signatures (
+            file_hash TEXT PRIMARY KEY,
+            text_signature BLOB NOT NULL,
+            number_signature BLOB NOT NULL
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS lsh_buckets (
+            band INTEGER NOT NULL,
+            bucket INTEGER NOT NULL,
+            file_hash TEXT NOT NULL,
+            PRIMARY KEY (band, bucket, file_hash)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS lsh_settings (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS similar_documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            file_path TEXT NOT NULL,
+            original_file TEXT NOT NULL,
+            similarity REAL NOT NULL,
+            differences TEXT NOT NULL,
+            detected_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self,
+                 db_path: str,
+                 similarity_threshold: Optional[float] = None,
+                 reuse_threshold: float = 0.9,
+                 num_perm: int = 128,
+                 shingle_size: int = 3,
+                 max_candidates: int = 50):
+        """Open (or create) the index database.
+
+        Args:
+            db_path: Path to the SQLite database file
+            similarity_threshold: Estimated Jaccard similarity from which
+                                  documents are near duplicates, None to
+                                  match exact text only
+            reuse_threshold: Similarity of both text and numbers from which
+                             the earlier extraction is reused
+            num_perm: MinHash signature length
+            shingle_size: Words per shingle
+            max_candidates: Most LSH candidates compared per lookup
+
+        Raises:
+            ValueError: If the database was built with other MinHash settings
+        """
+        self.db_path = db_path
+        self.similarity_threshold = similarity_threshold
+        self.reuse_threshold = reuse_threshold
+        self.shingle_size = shingle_size
+        self.max_candidates = max_candidates
+        self._hasher = None
+        if similarity_threshold is not None:
+            self._hasher = MinHasher(num_perm)
+            self.bands, self.rows = lsh_parameters(similarity_threshold, num_perm)
+        self._signatures: Dict[str, Tuple[Tuple[int, ...], Tuple[int, ...]]] = {}
+        self._signatures_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._open()
+        if self._hasher is not None:
+            self._check_lsh_settings()
+
+    def _open(self) -> None:
+        self._pid = os.getpid()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def _check_fork(self) -> None:
+        # Pre-forked workers inherit the index; each process opens its own connection
+        if self._pid != os.getpid():
+            self._open()
+
+    def _check_lsh_settings(self) -> None:
+        settings = {
+            'num_perm': str(self._hasher.num_perm),
+            'seed': str(self._hasher.seed),
+            'bands': str(self.bands),
+            'rows': str(self.rows),
+            'shingle_size': str(self.shingle_size)
+        }
+        with self._lock:
+            stored = dict(self._conn.execute("SELECT name, value FROM lsh_settings").fetchall())
+            if not stored:
+                self._conn.executemany("INSERT INTO lsh_settings (name, value) VALUES (?, ?)", settings.items())
+            elif stored != settings:
+                raise ValueError(
+                    f"Dedupe index {self.db_path} was built with MinHash settings {stored}, "
+                    f"not {settings}; use a new db_path after changing them"
+                )
+
+    def _signature_pair(self, raw_text: str, text_hash: str) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        """Text and number signatures of a document, cached between lookup and add."""
+        with self._signatures_lock:
+            cached = self._signatures.get(text_hash)
+        if cached is not None:
+            return cached
+        normalized = normalize_text(raw_text)
+        pair = (
+            self._hasher.signature(word_shingles(normalized, self.shingle_size)),
+            self._hasher.signature(number_tokens(normalized))
+        )
+        with self._signatures_lock:
+            if len(self._signatures) >= 256:
+                self._signatures.pop(next(iter(self._signatures)))
+            self._signatures[text_hash] = pair
+        return pair
+
+    def _most_similar(self,
+                      text_signature: Tuple[int, ...],
+                      number_signature: Tuple[int, ...],
+                      file_path: str) -> Optional[SimilarDocument]:
+        """Most similar indexed document at or above the similarity threshold."""
+        candidates = set()
+        for band, bucket in enumerate(band_keys(text_signature, self.bands, self.rows)):
+            rows = self._conn.execute(
+                "SELECT file_hash FROM lsh_buckets WHERE band = ? AND bucket = ? LIMIT ?",
+                (band, bucket, self.max_candidates)
+            ).fetchall()
+            candidates.update(row[0] for row in rows)
+            if len(candidates) >= self.max_candidates:
+                break
+
+        best = None
+        for file_hash in candidates:
+            row = self._conn.execute(
+                "SELECT d.source_file, d.invoice, s.text_signature, s.number_signature "
+                "FROM signatures s JOIN documents d ON d.file_hash = s.file_hash WHERE s.file_hash = ?",
+                (file_hash,)
+            ).fetchone()
+            if row is None or row['source_file'] == file_path:
+                continue
+            text_similarity = similarity(text_signature, unpack_signature(row['text_signature']))
+            if text_similarity < self.similarity_threshold:
+                continue
+            if best is None or text_similarity > best.text_similarity:
+                best = SimilarDocument(
+                    file_hash=file_hash,
+                    source_file=row['source_file'],
+                    invoice=row['invoice'],
+                    text_similarity=text_similarity,
+                    number_similarity=similarity(number_signature, unpack_signature(row['number_signature']))
+                )
+        return best
+
+    @staticmethod
+    def _text_hash(raw_text: str) -> Optional[str]:
+        normalized = normalize_text(raw_text or '')
+        # Blank scans would all match each other
+        return hash_text(normalized) if normalized else None
+
+    @staticmethod
+    def _invoice_key(invoice: Invoice) -> Optional[tuple]:
+        key = (str(invoice.account_number or '').strip(), str(invoice.invoice_number or '').strip())
+        return key if all(part and part != 'N/A' for part in key) else None
+
+    def lookup_file(self, file_path: str) -> Optional[Invoice]:
+        """Invoice previously extracted from a file with the same contents.
+
+        Args:
+            file_path: Path to the invoice document
+
+        Returns:
+            The earlier invoice with ``source_file`` set to file_path, or None
+        """
+        file_hash = hash_file(file_path)
+        with self._lock:
+            self._check_fork()
+            row = self._conn.execute(
+                "SELECT * FROM documents WHERE file_hash = ?", (file_hash,)
+            ).fetchone()
+            if row is None or row['source_file'] == file_path:
+                return None
+            return self._duplicate(row, file_path, MATCH_FILE)
+
+    def lookup_text(self, raw_text: str, file_path: str) -> Optional[Invoice]:
+        """Invoice previously extracted from a document with the same OCR text.
+
+        With near-duplicate detection enabled, a document whose text and
+        numbers are both at least ``reuse_threshold`` similar also matches.
+
+        Args:
+            raw_text: OCR text of the document
+            file_path: Path to the invoice document
+
+        Returns:
+            The earlier invoice with ``source_file`` set to file_path, or None
+        """
+        text_hash = self._text_hash(raw_text)
+        if text_hash is None:
+            return None
+        with self._lock:
+            self._check_fork()
+            row = self._conn.execute(
+                "SELECT * FROM documents WHERE text_hash = ? AND source_file != ? LIMIT 1",
+                (text_hash, file_path)
+            ).fetchone()
+            if row is not None:
+                self._alias(row, hash_file(file_path), text_hash, file_path)
+                return self._duplicate(row, file_path, MATCH_TEXT)
+        if self._hasher is None:
+            return None
+
+        text_signature, number_signature = self._signature_pair(raw_text, text_hash)
+        with self._lock:
+            self._check_fork()
+            similar = self._most_similar(text_signature, number_signature, file_path)
+            if similar is None or min(similar.text_similarity, similar.number_similarity) < self.reuse_threshold:
+                return None
+            row = self._conn.execute(
+                "SELECT * FROM documents WHERE file_hash = ?", (similar.file_hash,)
+            ).fetchone()
+            self._alias(row, hash_file(file_path), text_hash, file_path)
+            logger.info(
+                f"{file_path} is {similar.text_similarity:.0%} similar to {similar.source_file} "
+                f"({similar.number_similarity:.0%} of numbers)"
+            )
+            return self._duplicate(row, file_path, MATCH_NEAR_TEXT)
+
+    def add(self, file_path: str, raw_text: str, invoice: Invoice) -> Invoice:
+        """Index a newly extracted invoice.
+
+        Args:
+            file_path: Path to the invoice document
+            raw_text: OCR text of the document
+            invoice: Extracted invoice
+
+        Returns:
+            ``invoice``, also when another document had the same account and
+            invoice number (recorded as a duplicate)
+        """
+        file_hash = hash_file(file_path)
+        text_hash = self._text_hash(raw_text)
+        key = self._invoice_key(invoice)
+        signatures = None
+        if self._hasher is not None and text_hash is not None:
+            signatures = self._signature_pair(raw_text, text_hash)
+        with self._lock:
+            self._check_fork()
+            if key is not None:
+                row = self._conn.execute(
+                    "SELECT * FROM documents WHERE account_number = ? AND invoice_number = ? "
+                    "AND file_hash != ? AND source_file != ? LIMIT 1",
+                    (*key, file_hash, file_path)
+                ).fetchone()
+                if row is not None:
+                    self._record_duplicate(row, file_path, MATCH_INVOICE_NUMBER)
+                    logger.info(
+                        f"{file_path} has the invoice number of {row['source_file']} "
+                        f"but different text, keeping its own extraction"
+                    )
+
+            account_number, invoice_number = key or (None, None)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (file_hash, text_hash, account_number, invoice_number, "
+                "source_file, invoice, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (file_hash, text_hash, account_number, invoice_number, file_path,
+                 json.dumps(invoice.to_json()), time.time())
+            )
+            if signatures is not None:
+                self._add_signatures(file_hash, file_path, invoice, *signatures)
+        return invoice
+
+    def _add_signatures(self,
+                        file_hash: str,
+                        file_path: str,
+                        invoice: Invoice,
+                        text_signature: Tuple[int, ...],
+                        number_signature: Tuple[int, ...]) -> None:
+        similar = self._most_similar(text_signature, number_signature, file_path)
+        if similar is not None and similar.file_hash != file_hash:
+            differences = DeepDiff(
+                json.loads(similar.invoice), invoice.to_json(),
+                ignore_order=True, exclude_paths=_DIFF_EXCLUDED
+            )
+            self._conn.execute(
+                "INSERT INTO similar_documents (file_path, original_file, similarity, differences, detected_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (file_path, similar.source_file, similar.text_similarity, differences.to_json(), time.time())
+            )
+            logger.info(
+                f"{file_path} is {similar.text_similarity:.0%} similar to {similar.source_file}, "
+                f"extraction {'differs' if differences else 'matches'}"
+            )
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO signatures (file_hash, text_signature, number_signature) VALUES (?, ?, ?)",
+            (file_hash, pack_signature(text_signature), pack_signature(number_signature))
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO lsh_buckets (band, bucket, file_hash) VALUES (?, ?, ?)",
+            [(band, bucket, file_hash)
+             for band, bucket in enumerate(band_keys(text_signature, self.bands, self.rows))]
+        )
+
+    def similar_documents(self) -> List[Dict[str, Any]]:
+        """Near duplicates extracted again, with the differences from the earlier extraction."""
+        with self._lock:
+            self._check_fork()
+            rows = self._conn.execute(
+                "SELECT file_path, original_file, similarity, differences, detected_at "
+                "FROM similar_documents ORDER BY id"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _alias(self, row: sqlite3.Row, file_hash: str, text_hash: Optional[str], file_path: str) -> None:
+        self._conn.execute(
+            "INSERT OR IGNORE INTO documents (file_hash, text_hash, account_number, invoice_number, "
+            "source_file, invoice, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (file_hash, text_hash, row['account_number'], row['invoice_number'], file_path,
+             row['invoice'], time.time())
+        )
+
+    def _record_duplicate(self, row: sqlite3.Row, file_path: str, match: str) -> None:
+        self._conn.execute(
+            "INSERT INTO duplicates (file_path, match, original_file, detected_at) VALUES (?, ?, ?, ?)",
+            (file_path, match, row['source_file'], time.time())
+        )
+
+    def _duplicate(self, row: sqlite3.Row, file_path: str, match: str) -> Invoice:
+        self._record_duplicate(row, file_path, match)
+        logger.info(f"{file_path} duplicates {row['source_file']} ({match} match), reusing its extraction")
+        invoice = Invoice.from_json(json.loads(row['invoice']))
+        invoice.source_file = file_path
+        return invoice
+
+    def duplicates(self) -> List[Dict[str, Any]]:
+        """Recorded duplicates, oldest first."""
+        with self._lock:
+            self._check_fork()
+            rows = self._conn.execute(
+                "SELECT file_path, match, original_file, detected_at FROM duplicates ORDER BY id"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'DedupeIndex':
+        """Create a dedupe index from the 'dedupe' configuration section."""
+        near_config = config.get('near_duplicates', {})
+        return cls(
+            db_path=config.get('db_path', '.dedupe.db'),
+            similarity_threshold=near_config.get('threshold', 0.7) if near_config.get('enabled') else None,
+            reuse_threshold=near_config.get('reuse_threshold', 0.9),
+            num_perm=near_config.get('num_perm', 128),
+            shingle_size=near_config.get('shingle_size', 3),
+            max_candidates=near_config.get('max_candidates', 50)
+        )
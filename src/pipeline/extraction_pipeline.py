@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any, Iterable, Iterator, Sequence
 from pathlib import Path
 import logging
 
@@ -11,6 +11,15 @@ from ..core.interfaces.validator import Validator
 from ..core.models.extraction_result import ExtractionResult
 from ..core.models.invoice import Invoice
 from ..core.exceptions import ExtractionError, PreprocessingError, ValidationError
+from ..template_extractors.template_extractor import TemplateExtractor
+from ..core.checkpoint_store import (
+    CheckpointStore, hash_file, hash_text, config_hash, component_fingerprint
+)
+from .dedupe_index import DedupeIndex
+
+if TYPE_CHECKING:
+    # staged_pipeline imports this module
+    from .staged_pipeline import StagedResult
 
 class ExtractionPipeline:
     """Orchestrates the invoice data extraction process.
@@ -27,7 +36,10 @@ class ExtractionPipeline:
         text_extractor: TextExtractor,
         preprocessor: TextPreprocessor,
         data_extractor: DataExtractor,
-        validator: Optional[Validator] = None
+        validator: Optional[Validator] = None,
+        template_extractor: Optional[TemplateExtractor] = None,
+        checkpoint_store: Optional[CheckpointStore] = None,
+        dedupe_index: Optional[DedupeIndex] = None
     ):
         """Initialize the extraction pipeline.
         
@@ -36,11 +48,25 @@ class ExtractionPipeline:
             preprocessor: Component for preprocessing extracted text
             data_extractor: Component for extracting structured data
             validator: Optional component for validating extracted data
+            template_extractor: Optional component extracting known vendor
+                                layouts without LLM calls
+            checkpoint_store: Optional store persisting each stage's output so
+                              re-runs only recompute stages whose input or
+                              configuration changed
+            dedupe_index: Optional index returning the earlier extraction for
+                          resubmitted documents instead of processing them again
         """
         self.text_extractor = text_extractor
         self.preprocessor = preprocessor
         self.data_extractor = data_extractor
         self.validator = validator
+        self.template_extractor = template_extractor
+        self.checkpoint_store = checkpoint_store
+        self.dedupe_index = dedupe_index
+        
+        # Prompt responses are checkpointed individually by the extractor
+        if checkpoint_store is not None and hasattr(data_extractor, 'set_checkpoint_store'):
+            data_extractor.set_checkpoint_store(checkpoint_store)
 
     def process(self, file_path: str) -> Invoice:
         """Process an invoice file through the extraction pipeline.
@@ -58,26 +84,218 @@ class ExtractionPipeline:
             ValidationError: If extracted data fails validation
         """
         try:
+            # Resubmitted files skip OCR and the LLM
+            invoice = self.find_duplicate(file_path)
+            if invoice is not None:
+                self.validate(invoice)
+                return invoice
+            
             # Extract text from document
-            extraction_result = self.text_extractor.extract(file_path)
+            extraction_result = self.extract_text(file_path)
+            
+            # Extract and validate structured data with source file path
+            return self.extract_invoice(extraction_result, file_path)
             
-            # Preprocess extracted text
-            processed_text = self.preprocessor.process(extraction_result)
+        except Exception as e:
+            logger.error(f"Pipeline processing failed: {str(e)}")
+            raise
+
+    def process_images(self, image_paths: Sequence[str]) -> Invoice:
+        """Process the page images of one invoice as a single document.
+        
+        Args:
+            image_paths: Page image files, first page first
             
-            # Extract structured data with source file path
-            invoice = self.data_extractor.extract(processed_text, file_path)
+        Returns:
+            Invoice object containing extracted and validated data, with the
+            first image as its source file
             
-            # Validate if validator provided
-            if self.validator:
-                is_valid, validation_errors = self.validator.validate(invoice)
-                invoice.validation_errors = validation_errors
-                
-            return invoice
+        Raises:
+            FileNotFoundError: If an image file cannot be found
+            ExtractionError: If text or data extraction fails
+        """
+        try:
+            extraction_result = self.extract_images(image_paths)
+            return self.extract_invoice(extraction_result, image_paths[0])
             
         except Exception as e:
             logger.error(f"Pipeline processing failed: {str(e)}")
             raise
 
+    def process_many(self,
+                     file_paths: Iterable[str],
+                     stage_config: Optional[Dict[str, Any]] = None
+                     ) -> Iterator['StagedResult']:
+        """Process many invoices as connected stages with separate concurrency limits.
+        
+        Args:
+            file_paths: Paths to the invoice documents
+            stage_config: Optional 'stages' configuration (see StagedPipeline)
+            
+        Returns:
+            Iterator of StagedResult in completion order
+        """
+        from .staged_pipeline import StagedPipeline
+        return StagedPipeline.from_config(stage_config or {}, self).run(file_paths)
+
+    def extract_invoice(self, extraction_result: ExtractionResult, file_path: str) -> Invoice:
+        """Extract and validate an invoice from the OCR result, via a template or the LLM.
+        
+        Each invoice is validated exactly once; callers must not validate
+        the result again, as a history validator would then compare it
+        with statistics that already include it.
+        
+        Args:
+            extraction_result: Result of the text extraction stage
+            file_path: Path to the invoice document
+            
+        Returns:
+            Extracted invoice with its validation errors
+        """
+        invoice = self.extract_without_llm(extraction_result, file_path)
+        if invoice is not None:
+            return invoice
+        
+        # Preprocess extracted text
+        processed_text = self.preprocess(extraction_result)
+        
+        # Extract structured data with source file path
+        invoice = self.extract_data(processed_text, file_path)
+        return self.record_llm_invoice(extraction_result, file_path, invoice)
+
+    def extract_without_llm(self, extraction_result: ExtractionResult, file_path: str) -> Optional[Invoice]:
+        """Reuse an earlier extraction of the same text or apply a known template.
+        
+        Returns:
+            The validated invoice, or None if the document needs the LLM
+        """
+        # Documents with the same OCR text as an earlier one skip the LLM
+        if self.dedupe_index:
+            duplicate = self.dedupe_index.lookup_text(extraction_result.raw_text, file_path)
+            if duplicate is not None:
+                self.validate(duplicate)
+                return duplicate
+        
+        # Known vendor layouts are extracted without the LLM
+        if self.template_extractor:
+            invoice = self.template_extractor.extract(extraction_result, file_path)
+            if invoice is not None and self.validate(invoice):
+                return self.index_invoice(extraction_result, file_path, invoice)
+        return None
+
+    def record_llm_invoice(self, extraction_result: ExtractionResult, file_path: str, invoice: Invoice) -> Invoice:
+        """Validate an LLM-extracted invoice, learn its template and add it to the dedupe index.
+        
+        Returns:
+            The invoice to use (see index_invoice)
+        """
+        # Learn the layout from invoices that pass validation
+        if self.validate(invoice) and self.template_extractor:
+            self.template_extractor.learn(extraction_result, invoice)
+            
+        return self.index_invoice(extraction_result, file_path, invoice)
+
+    def find_duplicate(self, file_path: str) -> Optional[Invoice]:
+        """Invoice extracted earlier from a file with the same contents, if indexed."""
+        if self.dedupe_index is None:
+            return None
+        return self.dedupe_index.lookup_file(file_path)
+
+    def index_invoice(self, extraction_result: ExtractionResult, file_path: str, invoice: Invoice) -> Invoice:
+        """Add a newly extracted invoice to the dedupe index.
+        
+        Returns:
+            ``invoice``
+        """
+        if self.dedupe_index is None:
+            return invoice
+        return self.dedupe_index.add(file_path, extraction_result.raw_text, invoice)
+
+    def extract_text(self, file_path: str) -> ExtractionResult:
+        """Run the text extraction (OCR) stage, reusing a checkpoint if present."""
+        if self.checkpoint_store is None:
+            return self.text_extractor.extract(file_path)
+        
+        key = config_hash(hash_file(file_path), component_fingerprint(self.text_extractor))
+        cached = self.checkpoint_store.get('ocr', key)
+        if cached is not None:
+            extraction_result = ExtractionResult.from_dict(cached)
+            extraction_result.metadata['file_path'] = file_path
+            return extraction_result
+        
+        extraction_result = self.text_extractor.extract(file_path)
+        self.checkpoint_store.put('ocr', key, extraction_result.to_dict())
+        return extraction_result
+
+    def extract_images(self, image_paths: Sequence[str]) -> ExtractionResult:
+        """Run the text extraction stage on page images analyzed as one document."""
+        extract_images = getattr(self.text_extractor, 'extract_images', None)
+        if extract_images is None:
+            raise ExtractionError(f"{type(self.text_extractor).__name__} cannot combine page images")
+        if self.checkpoint_store is None:
+            return extract_images(image_paths)
+        
+        key = config_hash([hash_file(path) for path in image_paths], component_fingerprint(self.text_extractor))
+        cached = self.checkpoint_store.get('ocr', key)
+        if cached is not None:
+            extraction_result = ExtractionResult.from_dict(cached)
+            extraction_result.metadata['file_path'] = image_paths[0]
+            extraction_result.metadata['page_files'] = list(image_paths)
+            return extraction_result
+        
+        extraction_result = extract_images(image_paths)
+        self.checkpoint_store.put('ocr', key, extraction_result.to_dict())
+        return extraction_result
+
+    def preprocess(self, extraction_result: ExtractionResult) -> str:
+        """Run the preprocessing stage, reusing a checkpoint if present."""
+        if self.checkpoint_store is None:
+            return self.preprocessor.process(extraction_result)
+        
+        key = config_hash(hash_text(extraction_result.raw_text), component_fingerprint(self.preprocessor))
+        cached = self.checkpoint_store.get('preprocess', key)
+        if cached is not None:
+            return cached['text']
+        
+        processed_text = self.preprocessor.process(extraction_result)
+        self.checkpoint_store.put('preprocess', key, {'text': processed_text})
+        return processed_text
+
+    def extract_data(self, processed_text: str, file_path: str) -> Invoice:
+        """Run the data extraction stage, reusing a checkpoint if present.
+        
+        The checkpointed invoice is stored before validation, so changed
+        business rules are always applied on re-runs. Extractors with an
+        ``extract_raw``/``normalize_invoice`` pair have the invoice stored
+        before charge names are normalized, and the current name mapping is
+        applied to it on every read, so learning a name invalidates nothing.
+        """
+        if self.checkpoint_store is None:
+            return self.data_extractor.extract(processed_text, file_path)
+        
+        extract = getattr(self.data_extractor, 'extract_raw', None)
+        normalize = getattr(self.data_extractor, 'normalize_invoice', None)
+        if extract is None or normalize is None:
+            extract, normalize = self.data_extractor.extract, None
+        
+        key = config_hash(hash_text(processed_text), component_fingerprint(self.data_extractor))
+        cached = self.checkpoint_store.get('invoice', key)
+        if cached is not None:
+            invoice = Invoice.from_json(cached)
+            invoice.source_file = file_path
+        else:
+            invoice = extract(processed_text, file_path)
+            self.checkpoint_store.put('invoice', key, invoice.to_json())
+        return normalize(invoice) if normalize is not None else invoice
+
+    def validate(self, invoice: Invoice) -> bool:
+        """Validate an invoice in place, returning whether it passed."""
+        if not self.validator:
+            return True
+        is_valid, validation_errors = self.validator.validate(invoice)
+        invoice.validation_errors = validation_errors
+        return is_valid
+
     @classmethod
     def from_config(cls, config: Dict[str, Any]) -> 'ExtractionPipeline':
         """Create a pipeline instance from configuration.
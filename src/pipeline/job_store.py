@@ -0,0 +1,187 @@
+from typing import Optional, Dict, Any, List, Iterable
+from dataclasses import dataclass
+import json
+import sqlite3
+import threading
+import time
+
+# Job states, in processing order
+QUEUED = 'queued'
+OCR_DONE = 'ocr_done'
+LLM_DONE = 'llm_done'
+VALIDATED = 'validated'
+FAILED = 'failed'
+
+JOB_STATES = (QUEUED, OCR_DONE, LLM_DONE, VALIDATED, FAILED)
+
+@dataclass
+class Job:
+    """A file tracked by the job store."""
+    file_path: str
+    state: str
+    attempts: int = 0
+    error: Optional[str] = None
+    ocr_result: Optional[Dict[str, Any]] = None
+    invoice: Optional[Dict[str, Any]] = None
+
+class JobStore:
+    """SQLite-backed store of per-file batch progress.
+
+    Every completed stage is committed together with its output (the OCR
+    result after 'ocr_done', the extracted invoice after 'llm_done'), so a
+    job interrupted by a crash, deploy or quota exhaustion resumes from its
+    last completed stage without paying for that work again. Failed jobs
+    keep their stage outputs and are resumed from the same point when
+    re-queued.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            file_path TEXT PRIMARY KEY,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            ocr_result TEXT,
+            invoice TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state);
+    """
+
+    def __init__(self, db_path: str):
+        """Open (or create) the job database.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def _execute(self, sql: str, params: Iterable[Any] = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params))
+
+    def enqueue(self, file_paths: Iterable[str]) -> int:
+        """Add files to the queue; files already known are left untouched.
+
+        Args:
+            file_paths: Paths of the invoice documents
+
+        Returns:
+            Number of newly queued files
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                added = 0
+                for file_path in file_paths:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO jobs (file_path, state, created_at, updated_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (file_path, QUEUED, now, now)
+                    )
+                    added += cursor.rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def get(self, file_path: str) -> Optional[Job]:
+        """Look up the job for a file."""
+        row = self._execute("SELECT * FROM jobs WHERE file_path = ?", (file_path,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def pending(self, limit: Optional[int] = None) -> List[Job]:
+        """Jobs that still have stages to run, oldest first."""
+        sql = "SELECT * FROM jobs WHERE state IN (?, ?, ?) ORDER BY created_at, file_path"
+        params = [QUEUED, OCR_DONE, LLM_DONE]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [self._to_job(row) for row in self._execute(sql, params).fetchall()]
+
+    def start_attempt(self, file_path: str) -> None:
+        """Count an attempt before work on a job begins."""
+        self._execute(
+            "UPDATE jobs SET attempts = attempts + 1, updated_at = ? WHERE file_path = ?",
+            (time.time(), file_path)
+        )
+
+    def mark_ocr_done(self, file_path: str, ocr_result: Dict[str, Any]) -> None:
+        """Record a completed OCR stage with its ExtractionResult dictionary."""
+        self._update(file_path, OCR_DONE, ocr_result=json.dumps(ocr_result))
+
+    def mark_llm_done(self, file_path: str, invoice: Dict[str, Any]) -> None:
+        """Record a completed data extraction stage with the invoice dictionary."""
+        self._update(file_path, LLM_DONE, invoice=json.dumps(invoice))
+
+    def mark_validated(self, file_path: str, invoice: Dict[str, Any]) -> None:
+        """Record a finished job with the validated invoice dictionary."""
+        self._update(file_path, VALIDATED, invoice=json.dumps(invoice), error=None)
+
+    def mark_failed(self, file_path: str, error: str) -> None:
+        """Record a failure; stage outputs completed so far are kept."""
+        self._update(file_path, FAILED, error=error)
+
+    def requeue_failed(self, max_attempts: Optional[int] = None) -> int:
+        """Re-queue failed jobs at their last completed stage.
+
+        Args:
+            max_attempts: Optional limit; jobs with more attempts stay failed
+
+        Returns:
+            Number of re-queued jobs
+        """
+        sql = (
+            "UPDATE jobs SET state = CASE "
+            "WHEN invoice IS NOT NULL THEN ? "
+            "WHEN ocr_result IS NOT NULL THEN ? "
+            "ELSE ? END, updated_at = ? "
+            "WHERE state = ?"
+        )
+        params = [LLM_DONE, OCR_DONE, QUEUED, time.time(), FAILED]
+        if max_attempts is not None:
+            sql += " AND attempts < ?"
+            params.append(max_attempts)
+        return self._execute(sql, params).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs in each state."""
+        counts = {state: 0 for state in JOB_STATES}
+        for row in self._execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state"):
+            counts[row['state']] = row['n']
+        return counts
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _update(self, file_path: str, state: str, **columns: Any) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        sql = f"UPDATE jobs SET state = ?, updated_at = ?{', ' if columns else ''}{assignments} WHERE file_path = ?"
+        self._execute(sql, [state, time.time(), *columns.values(), file_path])
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            file_path=row['file_path'],
+            state=row['state'],
+            attempts=row['attempts'],
+            error=row['error'],
+            ocr_result=json.loads(row['ocr_result']) if row['ocr_result'] else None,
+            invoice=json.loads(row['invoice']) if row['invoice'] else None
+        )
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'JobStore':
+        """Create a job store from the 'jobs' configuration section."""
+        return cls(db_path=config.get('db_path', 'jobs.db'))
@@ -0,0 +1,128 @@
+from typing import Iterable, List, Set, Tuple
+from array import array
+from functools import lru_cache
+import hashlib
+import random
+import re
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+_NUMBER = re.compile(r'\d(?:[\d,./:-]*\d)?')
+
+def word_shingles(normalized_text: str, size: int = 3) -> Set[str]:
+    """Overlapping runs of ``size`` words, the features compared between documents.
+
+    Args:
+        normalized_text: Text with case and whitespace normalized
+        size: Words per shingle
+    """
+    words = normalized_text.split()
+    if len(words) <= size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def number_tokens(normalized_text: str) -> Set[str]:
+    """Amounts, dates, readings and other numbers of a text.
+
+    Successive bills of one account share most of their wording but few of
+    their numbers, so these tell a re-scan apart from next month's invoice.
+    """
+    return set(_NUMBER.findall(normalized_text))
+
+class MinHasher:
+    """Computes MinHash signatures estimating the Jaccard similarity of feature sets.
+
+    Each of ``num_perm`` universal hash functions maps every feature to a
+    32-bit value; the signature keeps the minimum per function, and the
+    fraction of equal positions in two signatures estimates the similarity
+    of the sets. The seed fixes the functions, so signatures stay comparable
+    across runs.
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        """Initialize the hash functions.
+
+        Args:
+            num_perm: Number of hash functions (signature length)
+            seed: Seed of the hash function parameters
+        """
+        self.num_perm = num_perm
+        self.seed = seed
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, features: Iterable[str]) -> Tuple[int, ...]:
+        """MinHash signature of a feature set, empty for an empty set."""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=4).digest(), 'little')
+            for feature in features
+        ]
+        if not hashes:
+            return ()
+        return tuple(
+            min((a * h + b) % MERSENNE_PRIME for h in hashes) & MAX_HASH
+            for a, b in self._permutations
+        )
+
+def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures of the same hasher."""
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+def pack_signature(signature: Tuple[int, ...]) -> bytes:
+    return array('I', signature).tobytes()
+
+def unpack_signature(data: bytes) -> Tuple[int, ...]:
+    values = array('I')
+    values.frombytes(data)
+    return tuple(values)
+
+def _collision_probability(s: float, bands: int, rows: int) -> float:
+    return 1.0 - (1.0 - s ** rows) ** bands
+
+@lru_cache(maxsize=None)
+def lsh_parameters(threshold: float, num_perm: int, steps: int = 100) -> Tuple[int, int]:
+    """Band and row counts placing the LSH detection threshold near ``threshold``.
+
+    Two signatures share a bucket when all ``rows`` values of at least one
+    band are equal, which happens with probability ``1 - (1 - s^rows)^bands``
+    for similarity ``s``. The split minimizing the combined false positive
+    and false negative area around the threshold is chosen.
+
+    Args:
+        threshold: Similarity at which documents should become candidates
+        num_perm: Signature length
+        steps: Integration steps
+
+    Returns:
+        (bands, rows) with bands * rows <= num_perm
+    """
+    best, best_error = (1, num_perm), float('inf')
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            false_positive = sum(
+                _collision_probability(threshold * (i + 0.5) / steps, bands, rows)
+                for i in range(steps)
+            ) * threshold / steps
+            false_negative = sum(
+                1.0 - _collision_probability(threshold + (1 - threshold) * (i + 0.5) / steps, bands, rows)
+                for i in range(steps)
+            ) * (1 - threshold) / steps
+            if false_positive + false_negative < best_error:
+                best, best_error = (bands, rows), false_positive + false_negative
+    return best
+
+def band_keys(signature: Tuple[int, ...], bands: int, rows: int) -> List[int]:
+    """Bucket key of each band of a signature, as signed 64-bit integers for SQLite."""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(pack_signature(signature[band * rows:(band + 1) * rows]), digest_size=8).digest(),
+            'little', signed=True
+        )
+        for band in range(bands)
+    ]
@@ -0,0 +1,282 @@
+from typing import Optional, Dict, Any, Set
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+
+from ..core.interfaces.work_queue import WorkQueue, Lease, PENDING, LEASED
+from ..core.models.invoice import Invoice
+from ..core.serialization import NDJSONSink
+from .extraction_pipeline import ExtractionPipeline
+from .work_queue import work_queue_from_config
+
+logger = logging.getLogger(__name__)
+
+# Outcomes counted by QueueWorker.run
+COMPLETED = 'completed'
+FAILED_ATTEMPT = 'failed'
+LOST = 'lost'
+
+def default_worker_id() -> str:
+    """Host, process and a random suffix, unique across nodes and restarts."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+class QueueWorker:
+    """Pulls invoice tasks from a shared WorkQueue and runs them through the pipeline.
+
+    Start one worker per process on as many nodes as needed; they
+    coordinate only through the queue, so throughput grows with the number
+    of workers until the Azure quotas (enforced by the adaptive concurrency
+    limiters) are reached. Leases of running tasks are renewed by a
+    heartbeat thread. If a worker dies, its leases expire and the tasks are
+    leased to another worker; with a checkpoint store on shared storage the
+    new worker resumes from the completed stages instead of starting over.
+
+    Results are committed with the lease's fencing token, and only
+    committed results are written to ``output_dir`` or ``output_ndjson``,
+    so each invoice is recorded exactly once even when a stalled worker
+    finishes a task that was taken over.
+
+    The fencing covers only the queue result and these outputs. What the
+    pipeline itself stores while processing (account history, dedupe
+    entries, learned templates and charge names, checkpoints) is written
+    before the commit and is not rolled back when the lease turns out to
+    be lost. A task processed again writes them again: history and dedupe
+    documents are keyed by invoice and file so they are not counted twice,
+    but the second attempt may be logged as a duplicate of the first and
+    a learned template may merge the same invoice twice.
+    """
+
+    def __init__(self,
+                 pipeline: ExtractionPipeline,
+                 queue: WorkQueue,
+                 worker_id: Optional[str] = None,
+                 concurrency: int = 4,
+                 lease_seconds: float = 300.0,
+                 heartbeat_seconds: Optional[float] = None,
+                 poll_seconds: float = 5.0,
+                 output_dir: Optional[str] = None,
+                 output_ndjson: Optional[str] = None):
+        """Initialize the worker.
+
+        Args:
+            pipeline: Pipeline processing each invoice
+            queue: Shared work queue
+            worker_id: Identifier recorded on leases (default: host, pid and random suffix)
+            concurrency: Tasks processed at once by this worker
+            lease_seconds: Lease duration; a dead worker's tasks are re-leased after it
+            heartbeat_seconds: Interval of lease renewals (default: a third of lease_seconds)
+            poll_seconds: Wait before asking an empty queue again
+            output_dir: Optional directory for the extracted invoice JSON files
+            output_ndjson: Optional NDJSON file to which every committed invoice is appended
+        """
+        self.pipeline = pipeline
+        self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds or lease_seconds / 3
+        self.poll_seconds = poll_seconds
+        self.output_dir = output_dir
+        self.output_ndjson = output_ndjson
+        self._lock = threading.Lock()
+        self._active: Dict[str, Lease] = {}
+        # Tasks whose lease a heartbeat found taken over
+        self._lost: Set[str] = set()
+        self._stop = threading.Event()
+        self._stats: Counter = Counter()
+        self._sink: Optional[NDJSONSink] = None
+
+    def stop(self) -> None:
+        """Ask the worker to finish its running tasks and return from run()."""
+        self._stop.set()
+
+    def run(self, stop_when_empty: bool = True) -> Dict[str, int]:
+        """Process tasks until the queue is drained or stop() is called.
+
+        Args:
+            stop_when_empty: Return once no task is pending or leased by any
+                             worker; otherwise keep polling for new tasks
+
+        Returns:
+            Number of tasks this worker completed, failed and lost
+        """
+        self._stop.clear()
+        self._stats = Counter({COMPLETED: 0, FAILED_ATTEMPT: 0, LOST: 0})
+        if self.output_ndjson:
+            self._sink = NDJSONSink(self.output_ndjson)
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name=f"heartbeat-{self.worker_id}", daemon=True)
+        heartbeat.start()
+        logger.info(f"Worker {self.worker_id} started with {self.concurrency} slots")
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="queue")
+        try:
+            for future in [executor.submit(self._slot_loop, stop_when_empty) for _ in range(self.concurrency)]:
+                future.result()
+        finally:
+            # Also reached on KeyboardInterrupt: running tasks finish, no new ones are leased
+            self._stop.set()
+            executor.shutdown(wait=True)
+            heartbeat.join()
+            if self._sink is not None:
+                self._sink.close()
+                self._sink = None
+
+        stats = dict(self._stats)
+        logger.info(f"Worker {self.worker_id} finished: {stats}, queue: {self.queue.counts()}")
+        return stats
+
+    def run_task(self, lease: Lease) -> Optional[Invoice]:
+        """Process one leased task and commit its result.
+
+        Args:
+            lease: Lease on the task
+
+        Returns:
+            The invoice if its result was committed, otherwise None
+        """
+        with self._lock:
+            self._active[lease.task_id] = lease
+            self._lost.discard(lease.task_id)
+        try:
+            invoice = self.pipeline.process(lease.task_id)
+        except Exception as e:
+            logger.error(f"Task failed for {lease.task_id} (attempt {lease.attempts}): {str(e)}")
+            error = f"{type(e).__name__}: {str(e)}"
+            # A missing file will not appear on a retry
+            retry = not isinstance(e, FileNotFoundError)
+            if self._was_lost(lease) or not self.queue.fail(self._release(lease), error, retry=retry):
+                logger.warning(f"Lease on {lease.task_id} was lost before its failure was recorded")
+            self._count(FAILED_ATTEMPT)
+            return None
+
+        if self._was_lost(lease) or not self.queue.complete(self._release(lease), invoice.to_json()):
+            logger.warning(f"Lease on {lease.task_id} was lost; discarding the result")
+            self._count(LOST)
+            return None
+        if self.output_dir:
+            invoice.save_json(self.output_dir)
+        if self._sink is not None:
+            self._sink.write(invoice)
+        self._count(COMPLETED)
+        return invoice
+
+    def _slot_loop(self, stop_when_empty: bool) -> None:
+        while not self._stop.is_set():
+            try:
+                leases = self.queue.lease(self.worker_id, self.lease_seconds)
+            except Exception as e:
+                # E.g., the shared database stayed locked beyond its busy timeout
+                logger.warning(f"Could not lease a task: {str(e)}")
+                self._stop.wait(self.poll_seconds)
+                continue
+            if leases:
+                self.run_task(leases[0])
+                continue
+            if stop_when_empty:
+                counts = self.queue.counts()
+                # Leases held by other workers may still expire and come back
+                if counts[PENDING] == 0 and counts[LEASED] == 0:
+                    return
+            self._stop.wait(self.poll_seconds)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(self.heartbeat_seconds):
+            self._renew_leases()
+
+    def _renew_leases(self) -> None:
+        with self._lock:
+            leases = list(self._active.values())
+        for lease in leases:
+            try:
+                renewed = self.queue.heartbeat(lease, self.lease_seconds)
+            except Exception as e:
+                # The next beat tries again, well before the lease runs out
+                logger.warning(f"Could not renew lease on {lease.task_id}: {str(e)}")
+                continue
+            with self._lock:
+                if lease.task_id not in self._active:
+                    continue
+                if renewed is None:
+                    # Stop renewing; run_task discards the result
+                    logger.warning(f"Lease on {lease.task_id} expired and was taken over")
+                    del self._active[lease.task_id]
+                    self._lost.add(lease.task_id)
+                else:
+                    self._active[lease.task_id] = renewed
+
+    def _was_lost(self, lease: Lease) -> bool:
+        with self._lock:
+            if lease.task_id not in self._lost:
+                return False
+            self._lost.discard(lease.task_id)
+            return True
+
+    def _release(self, lease: Lease) -> Lease:
+        # Stop renewing; the latest lease carries the same fencing token
+        with self._lock:
+            return self._active.pop(lease.task_id, lease)
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self._stats[outcome] += 1
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], pipeline: ExtractionPipeline,
+                    queue: Optional[WorkQueue] = None) -> 'QueueWorker':
+        """Create a worker from the 'work_queue' configuration section."""
+        return cls(
+            pipeline=pipeline,
+            queue=queue or work_queue_from_config(config),
+            worker_id=config.get('worker_id'),
+            concurrency=config.get('concurrency', 4),
+            lease_seconds=config.get('lease_seconds', 300.0),
+            heartbeat_seconds=config.get('heartbeat_seconds'),
+            poll_seconds=config.get('poll_seconds', 5.0),
+            output_dir=config.get('output_dir'),
+            output_ndjson=config.get('output_ndjson')
+        )
+
+def main():
+    """Queue invoices and run a worker; start the same command on every node:
+
+        python -m src.pipeline.queue_worker --enqueue files/*.pdf
+        python -m src.pipeline.queue_worker --follow
+
+    All workers must use the same 'work_queue.db_path'.
+    """
+    from ..main import load_config, build_pipeline
+
+    parser = argparse.ArgumentParser(description="Leased work queue worker")
+    parser.add_argument("--enqueue", nargs="+", default=[], help="Invoice files to add to the queue")
+    parser.add_argument("--enqueue-only", action="store_true", help="Only add the files, do not process")
+    parser.add_argument("--follow", action="store_true", help="Keep polling when the queue is empty")
+    parser.add_argument("--retry-failed", action="store_true", help="Give failed tasks new attempts first")
+    parser.add_argument("--worker-id")
+    args = parser.parse_args()
+
+    config = load_config()
+    queue_config = config.get('work_queue', {})
+    queue = work_queue_from_config(queue_config)
+    if args.enqueue:
+        logger.info(f"Queued {queue.enqueue(args.enqueue)} new files")
+    if args.retry_failed:
+        logger.info(f"Re-queued {queue.requeue_failed()} failed files")
+    if args.enqueue_only:
+        print(json.dumps(queue.counts()))
+        return
+
+    worker = QueueWorker.from_config(queue_config, build_pipeline(config), queue)
+    if args.worker_id:
+        worker.worker_id = args.worker_id
+    try:
+        print(json.dumps(worker.run(stop_when_empty=not args.follow)))
+    except KeyboardInterrupt:
+        logger.info(f"Worker {worker.worker_id} interrupted")
+
+if __name__ == "__main__":
+    main()
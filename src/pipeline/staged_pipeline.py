@@ -0,0 +1,367 @@
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, List
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+
+from ..core.models.extraction_result import ExtractionResult
+from ..core.models.invoice import Invoice
+from .extraction_pipeline import ExtractionPipeline
+from ..core.adaptive_concurrency import limiter_stats
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the input on a stage queue
+_END = object()
+
+# Pipeline used by process-pool stage workers (set by the worker initializer)
+_process_pipeline: Optional[ExtractionPipeline] = None
+
+@dataclass
+class StageConfig:
+    """Capacity settings for one pipeline stage.
+
+    Attributes:
+        concurrency: Maximum number of items processed at once
+        executor: 'thread' for I/O-bound stages, 'process' for CPU-bound ones
+        queue_size: Capacity of the stage's input queue; a full queue blocks
+                    the upstream stage (backpressure)
+    """
+    concurrency: int = 1
+    executor: str = 'thread'
+    queue_size: int = 16
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'StageConfig':
+        return cls(
+            concurrency=config.get('concurrency', 1),
+            executor=config.get('executor', 'thread'),
+            queue_size=config.get('queue_size', 16)
+        )
+
+@dataclass
+class StagedResult:
+    """Outcome of one file processed by the staged pipeline."""
+    file_path: str
+    invoice: Optional[Invoice] = None
+    error: Optional[str] = None
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+@dataclass
+class _WorkItem:
+    """State of a file as it moves through the stages."""
+    file_path: str
+    extraction_result: Optional[ExtractionResult] = None
+    processed_text: Optional[str] = None
+    invoice: Optional[Invoice] = None
+    validated: bool = False
+    error: Optional[str] = None
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+def _init_process_worker(pipeline: ExtractionPipeline) -> None:
+    global _process_pipeline
+    _process_pipeline = pipeline
+
+def _preprocess_in_process(extraction_result: ExtractionResult) -> str:
+    return _process_pipeline.preprocess(extraction_result)
+
+class _Stage:
+    """A pipeline stage: bounded input queue, worker threads and statistics."""
+
+    def __init__(self,
+                 name: str,
+                 func: Callable[['_WorkItem'], None],
+                 config: StageConfig,
+                 process_func: Optional[Callable[[Any], Any]] = None):
+        self.name = name
+        self.func = func
+        self.config = config
+        self.process_func = process_func
+        self.input: queue.Queue = queue.Queue(maxsize=config.queue_size)
+        self.output: Optional[queue.Queue] = None
+        self.downstream_workers = 1
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._running_workers = 0
+        self._started_at = 0.0
+        self._finished_at: Optional[float] = None
+        self.in_flight = 0
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+
+    def start(self) -> None:
+        self._started_at = time.perf_counter()
+        self._running_workers = self.config.concurrency
+        for i in range(self.config.concurrency):
+            thread = threading.Thread(target=self._work, name=f"stage-{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self) -> None:
+        try:
+            self._work_items()
+        finally:
+            # Downstream stages are released even if this worker dies
+            with self._lock:
+                self._running_workers -= 1
+                last_worker = self._running_workers == 0
+            if last_worker:
+                self._finished_at = time.perf_counter()
+                for _ in range(self.downstream_workers):
+                    self.output.put(_END)
+
+    def _work_items(self) -> None:
+        while True:
+            item = self.input.get()
+            if item is _END:
+                break
+
+            if item.error is None:
+                with self._lock:
+                    self.in_flight += 1
+                started = time.perf_counter()
+                try:
+                    self.func(item)
+                except Exception as e:
+                    item.error = f"{self.name}: {type(e).__name__}: {str(e)}"
+                    logger.error(f"Stage {self.name} failed for {item.file_path}: {str(e)}")
+                elapsed = time.perf_counter() - started
+                item.stage_seconds[self.name] = elapsed
+                with self._lock:
+                    self.in_flight -= 1
+                    self.busy_seconds += elapsed
+                    self.processed += 1
+                    if item.error is not None:
+                        self.failed += 1
+
+            # Blocks while the next stage's queue is full
+            self.output.put(item)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput and utilization of the stage."""
+        elapsed = (self._finished_at or time.perf_counter()) - self._started_at
+        capacity = elapsed * self.config.concurrency
+        with self._lock:
+            return {
+                'executor': self.config.executor,
+                'concurrency': self.config.concurrency,
+                'queue_depth': self.input.qsize(),
+                'queue_size': self.config.queue_size,
+                'in_flight': self.in_flight,
+                'processed': self.processed,
+                'failed': self.failed,
+                'busy_seconds': round(self.busy_seconds, 3),
+                'utilization': round(self.busy_seconds / capacity, 3) if capacity > 0 else 0.0
+            }
+
+class StagedPipeline:
+    """Runs many invoices through the pipeline as connected stages.
+
+    OCR, preprocessing, LLM extraction and validation each get their own
+    executor and concurrency limit, connected by bounded queues. A slow
+    stage fills its input queue, which blocks the stage in front of it, so
+    work in progress stays bounded while every stage runs at its own
+    capacity:
+
+    - ocr: Document Intelligence calls plus template matching (threads)
+    - preprocess: CPU-bound text preprocessing (processes by default)
+    - llm: Azure OpenAI extraction, skipped for template hits (threads)
+    - validate: validation, template learning and dedupe indexing (threads)
+
+    Each invoice is validated once: template and repeated-text hits in the
+    ocr stage, everything else in the validate stage.
+
+    Process-pool stages fork from the parent before any stage thread starts,
+    so the pipeline (and loaded models) are inherited rather than pickled.
+    """
+
+    STAGES = ('ocr', 'preprocess', 'llm', 'validate')
+
+    DEFAULT_CONFIG = {
+        'ocr': StageConfig(concurrency=8, executor='thread', queue_size=16),
+        'preprocess': StageConfig(concurrency=4, executor='process', queue_size=16),
+        'llm': StageConfig(concurrency=8, executor='thread', queue_size=16),
+        'validate': StageConfig(concurrency=1, executor='thread', queue_size=64),
+    }
+
+    def __init__(self,
+                 pipeline: ExtractionPipeline,
+                 stage_config: Optional[Dict[str, StageConfig]] = None,
+                 report_interval: Optional[float] = None):
+        """Initialize the staged pipeline.
+
+        Args:
+            pipeline: Pipeline providing the stage implementations
+            stage_config: Optional per-stage settings overriding DEFAULT_CONFIG
+            report_interval: Optional seconds between logged stage statistics
+        """
+        self.pipeline = pipeline
+        self.stage_config = {**self.DEFAULT_CONFIG, **(stage_config or {})}
+        self.report_interval = report_interval
+        self._stages: Dict[str, _Stage] = {}
+        self._feed_error: Optional[BaseException] = None
+
+    def run(self, file_paths: Iterable[str]) -> Iterator[StagedResult]:
+        """Process files, yielding results in completion order.
+
+        Args:
+            file_paths: Paths of the invoice documents
+
+        Yields:
+            StagedResult for every input file
+
+        Raises:
+            Exception: Raised by ``file_paths``, after the results of the
+                       files read before it
+        """
+        stages = self._build_stages()
+        self._stages = {stage.name: stage for stage in stages}
+        self._feed_error = None
+        results: queue.Queue = queue.Queue()
+
+        for stage, downstream in zip(stages, stages[1:]):
+            stage.output = downstream.input
+            stage.downstream_workers = downstream.config.concurrency
+        stages[-1].output = results
+
+        # Fork process pools while this is still the only running thread
+        for stage in stages:
+            if stage.config.executor == 'process':
+                stage.executor = self._start_process_pool(stage.config.concurrency)
+
+        stop_reporting = threading.Event()
+        try:
+            for stage in stages:
+                stage.start()
+
+            feeder = threading.Thread(
+                target=self._feed, args=(file_paths, stages[0]), name="stage-feeder", daemon=True
+            )
+            feeder.start()
+
+            if self.report_interval:
+                threading.Thread(
+                    target=self._report, args=(stop_reporting,), name="stage-report", daemon=True
+                ).start()
+
+            while True:
+                item = results.get()
+                if item is _END:
+                    break
+                yield StagedResult(
+                    file_path=item.file_path,
+                    invoice=item.invoice,
+                    error=item.error,
+                    stage_seconds=item.stage_seconds
+                )
+            if self._feed_error is not None:
+                raise self._feed_error
+        finally:
+            stop_reporting.set()
+            for stage in stages:
+                if stage.executor is not None:
+                    stage.executor.shutdown(wait=False, cancel_futures=True)
+            self._log_stats()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage queue depth, in-flight count and utilization of the current run."""
+        return {name: stage.stats() for name, stage in self._stages.items()}
+
+    def _build_stages(self) -> List[_Stage]:
+        return [
+            _Stage('ocr', self._ocr, self.stage_config['ocr']),
+            _Stage('preprocess', self._preprocess, self.stage_config['preprocess']),
+            _Stage('llm', self._llm, self.stage_config['llm']),
+            _Stage('validate', self._validate, self.stage_config['validate']),
+        ]
+
+    def _start_process_pool(self, workers: int) -> Optional[ProcessPoolExecutor]:
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            logger.warning("Process stages need the 'fork' start method; using threads")
+            return None
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_process_worker,
+            initargs=(self.pipeline,)
+        )
+        # With fork, the first submit starts every worker process
+        executor.submit(time.sleep, 0).result()
+        return executor
+
+    def _feed(self, file_paths: Iterable[str], first_stage: _Stage) -> None:
+        try:
+            for file_path in file_paths:
+                first_stage.input.put(_WorkItem(file_path=file_path))
+        except BaseException as e:
+            # Re-raised by run() once the files fed so far have drained
+            logger.error(f"Reading the input files failed: {str(e)}")
+            self._feed_error = e
+        finally:
+            for _ in range(first_stage.config.concurrency):
+                first_stage.input.put(_END)
+
+    def _report(self, stop: threading.Event) -> None:
+        while not stop.wait(self.report_interval):
+            self._log_stats()
+
+    def _log_stats(self) -> None:
+        logger.info(f"Stage statistics: {self.stats()}")
+        concurrency = limiter_stats()
+        if concurrency:
+            logger.info(f"Adaptive concurrency: {concurrency}")
+
+    def _ocr(self, item: _WorkItem) -> None:
+        # Resubmitted documents reuse their earlier extraction
+        item.invoice = self.pipeline.find_duplicate(item.file_path)
+        if item.invoice is not None:
+            return
+        item.extraction_result = self.pipeline.extract_text(item.file_path)
+        # Repeated text and known vendor layouts skip preprocessing and the LLM
+        item.invoice = self.pipeline.extract_without_llm(item.extraction_result, item.file_path)
+        item.validated = item.invoice is not None
+
+    def _preprocess(self, item: _WorkItem) -> None:
+        if item.invoice is not None:
+            return
+        executor = self._stages['preprocess'].executor
+        if executor is not None:
+            item.processed_text = executor.submit(_preprocess_in_process, item.extraction_result).result()
+        else:
+            item.processed_text = self.pipeline.preprocess(item.extraction_result)
+
+    def _llm(self, item: _WorkItem) -> None:
+        if item.invoice is not None:
+            return
+        item.invoice = self.pipeline.extract_data(item.processed_text, item.file_path)
+
+    def _validate(self, item: _WorkItem) -> None:
+        if item.extraction_result is None:
+            # Resubmitted file
+            self.pipeline.validate(item.invoice)
+        elif not item.validated:
+            item.invoice = self.pipeline.record_llm_invoice(item.extraction_result, item.file_path, item.invoice)
+        # Release the OCR result early; results are yielded without it
+        item.extraction_result = None
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], pipeline: ExtractionPipeline) -> 'StagedPipeline':
+        """Create a staged pipeline from the 'stages' configuration section."""
+        stage_config = {
+            name: StageConfig.from_config(config[name]) for name in cls.STAGES if name in config
+        }
+        return cls(
+            pipeline=pipeline,
+            stage_config=stage_config,
+            report_interval=config.get('report_interval')
+        )
@@ -0,0 +1,218 @@
+from typing import Optional, Dict, Any, List, Iterable
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from ..core.interfaces.work_queue import WorkQueue, Lease, PENDING, LEASED, DONE, FAILED, TASK_STATES
+
+class SQLiteWorkQueue(WorkQueue):
+    """WorkQueue backed by one SQLite database shared by all workers.
+
+    Leasing, heartbeats and commits are single conditional statements or
+    short ``BEGIN IMMEDIATE`` transactions, so any number of worker
+    processes, on one machine or on several mounting the same storage, can
+    share the queue without a broker. Every lease increments the task's
+    fencing token; heartbeats, results and failures only apply while the
+    token still matches, so a worker that stalled past its lease cannot
+    overwrite the work of the worker that took the task over.
+
+    WAL mode needs shared memory between the processes and therefore only
+    works on a single machine; for a database on a network file system use
+    ``journal_mode='DELETE'`` (and a file system with working locks).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tasks (
+            task_id TEXT PRIMARY KEY,
+            state TEXT NOT NULL,
+            lease_owner TEXT,
+            lease_token INTEGER NOT NULL DEFAULT 0,
+            lease_expires REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            result TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks (state, lease_expires);
+    """
+
+    def __init__(self,
+                 db_path: str,
+                 max_attempts: int = 3,
+                 journal_mode: str = 'WAL',
+                 busy_timeout: float = 30.0):
+        """Open (or create) the queue database.
+
+        Args:
+            db_path: Path to the SQLite database file
+            max_attempts: Leases after which a task that keeps failing or
+                          expiring is marked failed
+            journal_mode: SQLite journal mode; 'DELETE' for network file systems
+            busy_timeout: Seconds to wait for another worker's write lock
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.journal_mode = journal_mode
+        self.busy_timeout = busy_timeout
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self) -> None:
+        self._pid = os.getpid()
+        self._conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                                     check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+        self._conn.execute("PRAGMA synchronous=NORMAL" if self.journal_mode.upper() == 'WAL'
+                           else "PRAGMA synchronous=FULL")
+        self._conn.executescript(self.SCHEMA)
+
+    def _check_fork(self) -> None:
+        # Pre-forked workers inherit the queue; SQLite connections must not
+        # cross a fork, so each process opens its own
+        if self._pid != os.getpid():
+            self._open()
+
+    def _execute(self, sql: str, params: Iterable[Any] = ()) -> sqlite3.Cursor:
+        with self._lock:
+            self._check_fork()
+            return self._conn.execute(sql, tuple(params))
+
+    def enqueue(self, task_ids: Iterable[str]) -> int:
+        now = time.time()
+        with self._lock:
+            self._check_fork()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                added = 0
+                for task_id in task_ids:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO tasks (task_id, state, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                        (task_id, PENDING, now, now)
+                    )
+                    added += cursor.rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def lease(self, worker_id: str, lease_seconds: float, limit: int = 1) -> List[Lease]:
+        now = time.time()
+        expires_at = now + lease_seconds
+        with self._lock:
+            self._check_fork()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Tasks whose workers keep dying are not retried forever
+                self._conn.execute(
+                    "UPDATE tasks SET state = ?, lease_owner = NULL, updated_at = ?, "
+                    "error = 'Lease expired after ' || attempts || ' attempts' "
+                    "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+                    (FAILED, now, LEASED, now, self.max_attempts)
+                )
+                rows = self._conn.execute(
+                    "SELECT task_id, lease_token, attempts FROM tasks "
+                    "WHERE state = ? OR (state = ? AND lease_expires < ?) "
+                    "ORDER BY created_at, task_id LIMIT ?",
+                    (PENDING, LEASED, now, limit)
+                ).fetchall()
+                leases = []
+                for row in rows:
+                    self._conn.execute(
+                        "UPDATE tasks SET state = ?, lease_owner = ?, lease_token = lease_token + 1, "
+                        "lease_expires = ?, attempts = attempts + 1, updated_at = ? WHERE task_id = ?",
+                        (LEASED, worker_id, expires_at, now, row['task_id'])
+                    )
+                    leases.append(Lease(row['task_id'], worker_id, row['lease_token'] + 1,
+                                        expires_at, row['attempts'] + 1))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return leases
+
+    def heartbeat(self, lease: Lease, lease_seconds: float) -> Optional[Lease]:
+        expires_at = time.time() + lease_seconds
+        cursor = self._execute(
+            "UPDATE tasks SET lease_expires = ?, updated_at = ? "
+            "WHERE task_id = ? AND lease_token = ? AND state = ?",
+            (expires_at, time.time(), lease.task_id, lease.token, LEASED)
+        )
+        if cursor.rowcount != 1:
+            return None
+        return Lease(lease.task_id, lease.worker_id, lease.token, expires_at, lease.attempts)
+
+    def complete(self, lease: Lease, result: Dict[str, Any]) -> bool:
+        cursor = self._execute(
+            "UPDATE tasks SET state = ?, result = ?, error = NULL, lease_owner = NULL, updated_at = ? "
+            "WHERE task_id = ? AND lease_token = ? AND state = ?",
+            (DONE, json.dumps(result), time.time(), lease.task_id, lease.token, LEASED)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, lease: Lease, error: str, retry: bool = True) -> bool:
+        state = PENDING if retry and lease.attempts < self.max_attempts else FAILED
+        cursor = self._execute(
+            "UPDATE tasks SET state = ?, error = ?, lease_owner = NULL, updated_at = ? "
+            "WHERE task_id = ? AND lease_token = ? AND state = ?",
+            (state, error, time.time(), lease.task_id, lease.token, LEASED)
+        )
+        return cursor.rowcount == 1
+
+    def counts(self) -> Dict[str, int]:
+        counts = {state: 0 for state in TASK_STATES}
+        for row in self._execute("SELECT state, COUNT(*) AS n FROM tasks GROUP BY state"):
+            counts[row['state']] = row['n']
+        return counts
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """State, attempts, error and result of a task."""
+        row = self._execute(
+            "SELECT state, lease_owner, attempts, error, result FROM tasks WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'state': row['state'],
+            'lease_owner': row['lease_owner'],
+            'attempts': row['attempts'],
+            'error': row['error'],
+            'result': json.loads(row['result']) if row['result'] else None
+        }
+
+    def requeue_failed(self) -> int:
+        return self._execute(
+            "UPDATE tasks SET state = ?, attempts = 0, updated_at = ? WHERE state = ?",
+            (PENDING, time.time(), FAILED)
+        ).rowcount
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'SQLiteWorkQueue':
+        """Create a queue from the 'work_queue' configuration section."""
+        return cls(
+            db_path=config.get('db_path', 'work_queue.db'),
+            max_attempts=config.get('max_attempts', 3),
+            journal_mode=config.get('journal_mode', 'WAL'),
+            busy_timeout=config.get('busy_timeout', 30.0)
+        )
+
+# Work queue backends by their 'work_queue.backend' name
+WORK_QUEUE_BACKENDS = {
+    'sqlite': SQLiteWorkQueue
+}
+
+def work_queue_from_config(config: Dict[str, Any]) -> WorkQueue:
+    """Create the work queue backend named in the 'work_queue' configuration section."""
+    backend = config.get('backend', 'sqlite')
+    if backend not in WORK_QUEUE_BACKENDS:
+        raise ValueError(f"Unknown work queue backend: {backend}")
+    return WORK_QUEUE_BACKENDS[backend].from_config(config)
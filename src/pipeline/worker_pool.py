@@ -0,0 +1,166 @@
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, List
+from dataclasses import dataclass
+import gc
+import os
+import sys
+import logging
+import multiprocessing
+
+from ..core.models.invoice import Invoice
+from .extraction_pipeline import ExtractionPipeline
+
+logger = logging.getLogger(__name__)
+
+# Pipeline built by the parent before forking. Workers inherit it through the
+# fork, so the NLP model weights are shared copy-on-write instead of reloaded.
+_worker_pipeline: Optional[ExtractionPipeline] = None
+
+@dataclass
+class WorkerResult:
+    """Outcome of processing a single file in a pool worker."""
+    file_path: str
+    invoice: Optional[Invoice] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def _init_worker(torch_threads: Optional[int]) -> None:
+    """Initializer run once in every forked worker."""
+    # The parent disabled collection while it built the pipeline; the frozen
+    # objects stay in the permanent generation, so re-enabling is safe here.
+    gc.enable()
+
+    # One worker per core: stop each worker's torch from spawning a thread per core
+    if torch_threads and 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(torch_threads)
+
+def _process_in_worker(file_path: str) -> WorkerResult:
+    """Process one file with the inherited pipeline."""
+    try:
+        return WorkerResult(file_path=file_path, invoice=_worker_pipeline.process(file_path))
+    except Exception as e:
+        return WorkerResult(file_path=file_path, error=f"{type(e).__name__}: {str(e)}")
+
+class PreforkWorkerPool:
+    """Process pool that shares one loaded pipeline across forked workers.
+
+    The pipeline (and with it any heavy preprocessor such as
+    AdvancedPreprocessor) is built once in the parent. The garbage collector
+    is disabled while building and the resulting heap is moved to the
+    permanent generation with ``gc.freeze()`` before forking, so neither
+    collections nor reference-count updates of GC headers in the workers
+    dirty the shared pages.
+
+    Clients that hold network connections should not be used in the parent
+    before ``start()``; sockets must not be shared between workers.
+    """
+
+    def __init__(
+        self,
+        pipeline_factory: Callable[[], ExtractionPipeline],
+        workers: Optional[int] = None,
+        max_tasks_per_child: Optional[int] = None,
+        torch_threads_per_worker: Optional[int] = 1
+    ):
+        """Initialize the worker pool.
+
+        Args:
+            pipeline_factory: Callable building the pipeline in the parent process
+            workers: Number of worker processes (defaults to the CPU count)
+            max_tasks_per_child: Optional number of files after which a worker
+                                 is replaced (re-forked from the parent)
+            torch_threads_per_worker: Intra-op thread count for torch in each
+                                      worker, or None to leave torch's default
+        """
+        self.pipeline_factory = pipeline_factory
+        self.workers = workers or os.cpu_count() or 1
+        self.max_tasks_per_child = max_tasks_per_child
+        self.torch_threads_per_worker = torch_threads_per_worker
+        self._pool = None
+
+    def start(self) -> 'PreforkWorkerPool':
+        """Build the pipeline, freeze the heap and fork the workers."""
+        global _worker_pipeline
+
+        if self._pool is not None:
+            return self
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("PreforkWorkerPool requires the 'fork' start method (POSIX only)")
+
+        gc.disable()
+        try:
+            pipeline = self.pipeline_factory()
+
+            # Run lazily initialized model code once so its buffers are shared too
+            warmup = getattr(pipeline.preprocessor, 'warmup', None)
+            if callable(warmup):
+                warmup()
+
+            _worker_pipeline = pipeline
+            gc.collect()
+            gc.freeze()
+
+            logger.info(f"Forking {self.workers} workers ({gc.get_freeze_count()} objects frozen)")
+            self._pool = multiprocessing.get_context('fork').Pool(
+                processes=self.workers,
+                initializer=_init_worker,
+                initargs=(self.torch_threads_per_worker,),
+                maxtasksperchild=self.max_tasks_per_child
+            )
+        finally:
+            gc.enable()
+
+        return self
+
+    def imap_unordered(self, file_paths: Iterable[str], chunksize: int = 1) -> Iterator[WorkerResult]:
+        """Process files in the workers, yielding results as they complete."""
+        if self._pool is None:
+            self.start()
+        return self._pool.imap_unordered(_process_in_worker, file_paths, chunksize)
+
+    def map(self, file_paths: Iterable[str]) -> List[WorkerResult]:
+        """Process files in the workers and return results in input order."""
+        if self._pool is None:
+            self.start()
+        return self._pool.map(_process_in_worker, file_paths, chunksize=1)
+
+    def close(self) -> None:
+        """Wait for outstanding work and shut the workers down."""
+        global _worker_pipeline
+
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        _worker_pipeline = None
+        gc.unfreeze()
+
+    def __enter__(self) -> 'PreforkWorkerPool':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @classmethod
+    def from_config(cls,
+                    config: Dict[str, Any],
+                    pipeline_factory: Callable[[], ExtractionPipeline]
+                    ) -> 'PreforkWorkerPool':
+        """Create a worker pool from the 'app' configuration section.
+
+        Args:
+            config: Full application configuration
+            pipeline_factory: Callable building the pipeline in the parent process
+
+        Returns:
+            Configured (not yet started) PreforkWorkerPool instance
+        """
+        app_config = config.get('app', {})
+        return cls(
+            pipeline_factory=pipeline_factory,
+            workers=app_config.get('workers') or None,
+            max_tasks_per_child=app_config.get('max_tasks_per_child'),
+            torch_threads_per_worker=app_config.get('torch_threads_per_worker', 1)
+        )
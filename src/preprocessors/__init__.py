@@ -1,8 +1,12 @@
 from .basic_preprocessor import BasicPreprocessor
 from .advanced_preprocessor import AdvancedPreprocessor
+from .table_renderers import TABLE_RENDERERS
+from .token_estimator import estimate_tokens
 
 __all__ = [
     'BasicPreprocessor',
     'BasicPreprocessorV2',
     'AdvancedPreprocessor',
+    'TABLE_RENDERERS',
+    'estimate_tokens',
 ]
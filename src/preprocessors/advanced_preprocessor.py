@@ -30,11 +30,23 @@ class AdvancedPreprocessor(TextPreprocessor):
             transformer_model: Transformer model for embeddings
             max_length: Maximum sequence length for transformer
         """
+        self.spacy_model = spacy_model
+        self.transformer_model = transformer_model
         self.nlp = spacy.load(spacy_model)
         self.tokenizer = AutoTokenizer.from_pretrained(transformer_model)
         self.model = AutoModel.from_pretrained(transformer_model)
+        self.model.eval()
         self.max_length = max_length
 
+    def warmup(self) -> None:
+        """Run each model once so lazily allocated state exists up front.
+
+        Called by PreforkWorkerPool before forking so that workers share
+        these allocations copy-on-write instead of creating their own.
+        """
+        self.nlp("Warmup sentence.")
+        self._get_embeddings("Warmup sentence.")
+
     def process(self, content: Union[str, AnalyzeResult]) -> str:
         """Process and format the extracted text with advanced NLP."""
         try:
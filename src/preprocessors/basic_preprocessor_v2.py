@@ -1,11 +1,16 @@
-from typing import Dict, Any, Union
+from typing import Dict, Any, Union, Optional
 from azure.ai.documentintelligence.models import AnalyzeResult, DocumentPage, DocumentSpan, DocumentTable
 from typing import List
 from dataclasses import dataclass
+import logging
 
 from ..core.interfaces.text_preprocessor import TextPreprocessor
 from ..core.exceptions import PreprocessingError
 from ..core import TABLE_START_TOKEN, TABLE_END_TOKEN, PAGE_TOKEN
+from .table_renderers import TABLE_RENDERERS, COMPACT_FORMATS
+from .token_estimator import estimate_tokens
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class DocumentElement:
@@ -17,13 +22,34 @@ class DocumentElement:
 class BasicPreprocessorV2(TextPreprocessor):
     """Enhanced implementation of the TextPreprocessor interface with improved layout handling."""
     
-    def __init__(self, table_format: str = "markdown"):
+    TABLE_FORMATS = ('grid', 'markdown', 'tsv', 'json', 'auto')
+    
+    # Bumped when the rendered output changes, invalidating preprocess checkpoints
+    RENDERER_VERSION = 2
+    
+    def __init__(self, table_format: str = "markdown", token_budget: Optional[int] = None):
         """Initialize the preprocessor.
         
         Args:
-            table_format: Format to use for table markup ("markdown" or "csv")
+            table_format: Format to use for table markup: "grid" (padded, with
+                          row borders), "markdown", "tsv", "json" (one row per
+                          line) or "auto" (cheapest of the compact formats per table)
+            token_budget: Optional token limit for the processed text; when the
+                          configured format exceeds it, tables are re-rendered
+                          in their cheapest format
         """
+        if table_format not in self.TABLE_FORMATS:
+            raise ValueError(f"Unknown table format: {table_format}")
         self.table_format = table_format
+        self.token_budget = token_budget
+
+    def checkpoint_config(self) -> Dict[str, Any]:
+        """Configuration affecting the processed text, used for checkpoint keys."""
+        return {
+            'table_format': self.table_format,
+            'token_budget': self.token_budget,
+            'renderer_version': self.RENDERER_VERSION
+        }
 
     def process(self, content: Union[str, AnalyzeResult]) -> str:
         """Process and format the extracted text."""
@@ -49,7 +75,20 @@ class BasicPreprocessorV2(TextPreprocessor):
         """Process Azure Document Intelligence result."""
         elements = self._collect_document_elements(result)
         elements.sort(key=lambda x: (x.page_num, x.vertical_position))
-        return self._format_document(elements)
+        text = self._format_document(elements)
+        
+        if self.token_budget is None:
+            return text
+        
+        tokens = estimate_tokens(text)
+        if tokens > self.token_budget and self.table_format != 'auto':
+            compact = self._format_document(elements, table_format='auto')
+            compact_tokens = estimate_tokens(compact)
+            logger.info(f"Tables re-rendered compactly: {tokens} -> {compact_tokens} tokens")
+            text, tokens = compact, compact_tokens
+        if tokens > self.token_budget:
+            logger.warning(f"Processed text has {tokens} tokens, over the budget of {self.token_budget}")
+        return text
 
     def _collect_document_elements(self, result: AnalyzeResult) -> list[DocumentElement]:
         """Collect all document elements with their positions."""
@@ -78,7 +117,7 @@ class BasicPreprocessorV2(TextPreprocessor):
         
         return elements
 
-    def _format_document(self, elements: List[DocumentElement]) -> str:
+    def _format_document(self, elements: List[DocumentElement], table_format: Optional[str] = None) -> str:
         """Format the document with elements in correct order."""
         formatted_text = []
         
@@ -91,7 +130,7 @@ class BasicPreprocessorV2(TextPreprocessor):
             
             # Format element based on its type
             if element.type == 'table':
-                formatted_text.append(self._format_table(element.content))
+                formatted_text.append(self._format_table(element.content, table_format))
             elif element.type == 'title':
                 formatted_text.append(f"\n# {element.content}\n")
             elif element.type == 'sectionHeading':
@@ -101,59 +140,14 @@ class BasicPreprocessorV2(TextPreprocessor):
                 
         return '\n'.join(formatted_text)
 
-    def _format_table(self, table: DocumentTable) -> str:
-        """Format table in a structured way with proper alignment and borders."""
-        # Group cells by row index
-        row_cells = {}
-        for cell in table['cells']:
-            row_index = cell['rowIndex']
-            if row_index not in row_cells:
-                row_cells[row_index] = []
-            row_cells[row_index].append(cell)
-        
-        # Get max width for each column first
-        column_widths = {}
-        for row in row_cells.values():
-            for cell in row:
-                col_idx = cell['columnIndex']
-                content_width = len(cell['content'])
-                if col_idx not in column_widths or content_width > column_widths[col_idx]:
-                    column_widths[col_idx] = content_width
-        
-        # Create horizontal separator function
-        def make_separator(widths):
-            return "+".join("-" * (w + 2) for w in widths.values())
-        
-        # Now we can safely create the separator
-        separator = make_separator(column_widths)
-        
-        # Format the table
-        formatted_rows = []
-        formatted_rows.append(TABLE_START_TOKEN)
-        formatted_rows.append(separator)
-        
-        # Format rows with borders
-        for row_idx in sorted(row_cells.keys()):
-            row = sorted(row_cells[row_idx], key=lambda x: x['columnIndex'])
-            formatted_cells = []
-            
-            for cell in row:
-                content = cell['content']
-                col_idx = cell['columnIndex']
-                # Handle column spans
-                if 'columnSpan' in cell and cell['columnSpan'] > 1:
-                    # Calculate total width for spanned columns
-                    total_width = sum(column_widths.get(i, 0) for i in range(col_idx, col_idx + cell['columnSpan']))
-                    formatted_cells.append(content.ljust(total_width))
-                else:
-                    # Normal cell padding
-                    formatted_cells.append(content.ljust(column_widths[col_idx]))
-            
-            formatted_rows.append("| " + " | ".join(formatted_cells) + " |")
-            formatted_rows.append(separator)
-        
-        formatted_rows.append(TABLE_END_TOKEN)
-        return "\n".join(formatted_rows)
+    def _format_table(self, table: DocumentTable, table_format: Optional[str] = None) -> str:
+        """Format a table between table tokens in the configured format."""
+        table_format = table_format or self.table_format
+        if table_format == 'auto':
+            body = min((TABLE_RENDERERS[name](table) for name in COMPACT_FORMATS), key=estimate_tokens)
+        else:
+            body = TABLE_RENDERERS[table_format](table)
+        return "\n".join([TABLE_START_TOKEN, body, TABLE_END_TOKEN])
 
     def _normalize_whitespace(self, text: str) -> str:
         """Normalize whitespace in text."""
@@ -163,8 +157,10 @@ class BasicPreprocessorV2(TextPreprocessor):
     @classmethod
     def from_config(cls, config: Dict[str, Any]) -> 'BasicPreprocessorV2':
         """Create a preprocessor instance from configuration."""
+        basic_config = config.get('preprocessors', {}).get('basic', {})
         return cls(
-            table_format=config.get('preprocessors', {}).get('basic', {}).get('table_format', 'markdown')
+            table_format=basic_config.get('table_format', 'markdown'),
+            token_budget=basic_config.get('token_budget')
         )
 
     @property
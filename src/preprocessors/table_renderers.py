@@ -0,0 +1,95 @@
+from typing import Any, Callable, Dict, List
+import json
+
+def table_grid(table: Any) -> List[List[str]]:
+    """Cell contents of a DocumentTable as a row-major grid.
+
+    Cells spanning several columns keep their content in the first column;
+    the spanned columns are empty. Line breaks inside cells become spaces.
+    """
+    cells = table['cells']
+    if not cells:
+        return []
+    row_count = max(cell['rowIndex'] for cell in cells) + 1
+    column_count = max(cell['columnIndex'] + (cell.get('columnSpan') or 1) for cell in cells)
+
+    grid = [[''] * column_count for _ in range(row_count)]
+    for cell in cells:
+        grid[cell['rowIndex']][cell['columnIndex']] = ' '.join(cell['content'].split())
+    return grid
+
+def render_grid(table: Any) -> str:
+    """Padded grid with a border line after every row (legacy format)."""
+    # Group cells by row index
+    row_cells = {}
+    for cell in table['cells']:
+        row_cells.setdefault(cell['rowIndex'], []).append(cell)
+
+    # Max width of each column
+    column_widths = {}
+    for row in row_cells.values():
+        for cell in row:
+            col_idx = cell['columnIndex']
+            content_width = len(cell['content'])
+            if col_idx not in column_widths or content_width > column_widths[col_idx]:
+                column_widths[col_idx] = content_width
+
+    separator = "+".join("-" * (w + 2) for w in column_widths.values())
+
+    formatted_rows = [separator]
+    for row_idx in sorted(row_cells.keys()):
+        row = sorted(row_cells[row_idx], key=lambda x: x['columnIndex'])
+        formatted_cells = []
+        for cell in row:
+            content = cell['content']
+            col_idx = cell['columnIndex']
+            if 'columnSpan' in cell and cell['columnSpan'] > 1:
+                # Pad spanned cells to the total width of their columns
+                total_width = sum(column_widths.get(i, 0) for i in range(col_idx, col_idx + cell['columnSpan']))
+                formatted_cells.append(content.ljust(total_width))
+            else:
+                formatted_cells.append(content.ljust(column_widths[col_idx]))
+
+        formatted_rows.append("| " + " | ".join(formatted_cells) + " |")
+        formatted_rows.append(separator)
+    return "\n".join(formatted_rows)
+
+def render_markdown(table: Any) -> str:
+    """Minimal markdown: no padding, one separator line after the header row."""
+    grid = table_grid(table)
+    if not grid:
+        return ''
+    rows = ["|" + "|".join(value.replace('|', '\\|') for value in row) + "|" for row in grid]
+    rows.insert(1, "|" + "|".join('-' * len(grid[0])) + "|")
+    return "\n".join(rows)
+
+def render_tsv(table: Any) -> str:
+    """Tab-separated rows."""
+    return "\n".join("\t".join(value.replace('\t', ' ') for value in row) for row in table_grid(table))
+
+def render_json_rows(table: Any) -> str:
+    """One compact JSON value per row.
+
+    When the first row holds distinct, non-empty column names, the other
+    rows become objects keyed by them (empty cells omitted); otherwise
+    every row is an array.
+    """
+    grid = table_grid(table)
+    if not grid:
+        return ''
+    header = grid[0]
+    if len(grid) > 1 and all(header) and len(set(header)) == len(header):
+        rows = [{key: value for key, value in zip(header, row) if value} for row in grid[1:]]
+    else:
+        rows = grid
+    return "\n".join(json.dumps(row, separators=(',', ':'), ensure_ascii=False) for row in rows)
+
+TABLE_RENDERERS: Dict[str, Callable[[Any], str]] = {
+    'grid': render_grid,
+    'markdown': render_markdown,
+    'tsv': render_tsv,
+    'json': render_json_rows,
+}
+
+# Formats considered when the cheapest rendering is chosen per table
+COMPACT_FORMATS = ('markdown', 'tsv', 'json')
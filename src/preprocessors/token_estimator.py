@@ -0,0 +1,69 @@
+from typing import Optional
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Encoding used by GPT-4o
+DEFAULT_ENCODING = "o200k_base"
+
+# Letter runs, digit runs, whitespace runs, runs of one punctuation character
+_PIECES = re.compile(r"[^\W\d_]+|\d+|[ ]+|\s+|([^\w\s])\1*|_+")
+
+_encoders = {}
+
+def _get_encoder(encoding: str):
+    """tiktoken encoder, or None if tiktoken or the encoding is unavailable."""
+    if encoding not in _encoders:
+        try:
+            import tiktoken
+            _encoders[encoding] = tiktoken.get_encoding(encoding)
+        except Exception as e:
+            # Missing package, or the encoding file cannot be downloaded
+            logger.debug(f"tiktoken unavailable, using heuristic token counts: {str(e)}")
+            _encoders[encoding] = None
+    return _encoders[encoding]
+
+def heuristic_token_count(text: str) -> int:
+    """Approximate BPE token count without a tokenizer.
+
+    Mirrors how GPT tokenizers split text: common words are one token
+    (with their leading space), digits are grouped in threes, each
+    punctuation mark is a token, and runs of repeated characters such as
+    padding spaces or ``-----`` borders merge into few tokens.
+    """
+    count = 0
+    for match in _PIECES.finditer(text):
+        piece = match.group(0)
+        n = len(piece)
+        first = piece[0]
+        if first.isalpha():
+            count += (n + 7) // 8
+        elif first.isdigit():
+            count += (n + 2) // 3
+        elif first == ' ':
+            # A single space merges into the following word
+            count += 0 if n == 1 else 1
+        elif first.isspace():
+            count += 1
+        else:
+            count += (n + 15) // 16
+    return count
+
+def estimate_tokens(text: str, encoding: Optional[str] = DEFAULT_ENCODING) -> int:
+    """Token count of text for the LLM.
+
+    Uses tiktoken when it is installed and the encoding is available,
+    otherwise heuristic_token_count.
+
+    Args:
+        text: Text to measure
+        encoding: tiktoken encoding name, or None to force the heuristic
+
+    Returns:
+        Number of tokens
+    """
+    encoder = _get_encoder(encoding) if encoding else None
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return heuristic_token_count(text)
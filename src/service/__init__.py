@@ -0,0 +1,7 @@
+from .extraction_service import ExtractionService, Batch, RequestError
+
+__all__ = [
+    'ExtractionService',
+    'Batch',
+    'RequestError',
+]
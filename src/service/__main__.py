@@ -0,0 +1,31 @@
+import argparse
+import logging
+import time
+
+from ..main import load_config, build_pipeline
+from .extraction_service import ExtractionService
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the invoice extraction service")
+    parser.add_argument("--host", help="Interface to bind (default: service.host)")
+    parser.add_argument("--port", type=int, help="Port to bind (default: service.port)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    config = load_config()
+    service = ExtractionService.from_config(config, build_pipeline(config))
+    if args.host:
+        service.host = args.host
+    if args.port is not None:
+        service.port = args.port
+    with service:
+        try:
+            while True:
+                time.sleep(60)
+                logging.info(f"service: {service.health()}")
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
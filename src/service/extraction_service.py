@@ -0,0 +1,346 @@
+from typing import Optional, Dict, Any, List, Tuple
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+
+from ..core.exceptions import InvoiceExtractorError
+from ..pipeline.extraction_pipeline import ExtractionPipeline
+from ..pipeline.batch_runner import BatchRunner
+from ..core.adaptive_concurrency import limiter_stats
+
+logger = logging.getLogger(__name__)
+
+# Batch states
+BATCH_QUEUED = 'queued'
+BATCH_RUNNING = 'running'
+BATCH_DONE = 'done'
+BATCH_FAILED = 'failed'
+
+_BATCH_PATH = re.compile(r'^/batches/([0-9a-f]{32})$')
+_UNSAFE_NAME = re.compile(r'[^\w.-]+')
+
+class RequestError(Exception):
+    """A request the service rejects, answered with ``status``."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+@dataclass
+class Batch:
+    """A batch job submitted to the service."""
+    batch_id: str
+    file_paths: List[str]
+    retry_failed: bool = False
+    status: str = BATCH_QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.service._dispatch(self, 'GET')
+
+    def do_POST(self):
+        self.server.service._dispatch(self, 'POST')
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+class ExtractionService:
+    """Long-running HTTP service around one warm ExtractionPipeline.
+
+    The pipeline, and with it the SDK clients, prompt registry, templates,
+    checkpoint store and dedupe index, is built once and shared by all
+    requests, so each invoice pays only for its own OCR and LLM calls.
+    Requests are served on a ThreadingHTTPServer; the extractors' adaptive
+    concurrency limiters bound the API calls of concurrent requests.
+
+    Endpoints:
+        GET  /health            Uptime, batch counts and limiter state
+        POST /extract           Process one invoice and return it. The body
+                                is either JSON with 'file_path' (or
+                                'image_paths' for photographed pages) on
+                                the service's file system, or the document
+                                itself with ``?filename=``.
+        POST /batches           Queue JSON {'file_paths': [...],
+                                'retry_failed': false}; returns 202 with the
+                                batch id
+        GET  /batches/<id>      Batch status and per-file job states; add
+                                ``?include=invoices`` for the results
+
+    Batches run one at a time through the BatchRunner, whose job store keeps
+    every file's progress, so files of a batch interrupted by a restart are
+    resumed when submitted again. Batch ids themselves live in memory.
+    """
+
+    def __init__(self,
+                 pipeline: ExtractionPipeline,
+                 batch_runner: BatchRunner,
+                 host: str = "127.0.0.1",
+                 port: int = 8700,
+                 upload_dir: str = ".uploads",
+                 max_upload_bytes: int = 50 * 1024 * 1024):
+        """Initialize the service.
+
+        Args:
+            pipeline: Pipeline serving synchronous requests
+            batch_runner: Runner processing batch jobs with the same pipeline
+            host: Interface to bind
+            port: Port to bind, 0 for any free port
+            upload_dir: Directory where uploaded documents are stored
+            max_upload_bytes: Largest accepted document upload
+        """
+        self.pipeline = pipeline
+        self.batch_runner = batch_runner
+        self.host = host
+        self.port = port
+        self.upload_dir = Path(upload_dir)
+        self.max_upload_bytes = max_upload_bytes
+        self.started_at = time.time()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._batches: Dict[str, Batch] = {}
+        # One batch at a time; the runner parallelizes within a batch
+        self._batch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="service-batch")
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running service."""
+        return f"http://{self.host}:{self.port}/"
+
+    def start(self) -> 'ExtractionService':
+        """Start serving on a background thread."""
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.service = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name=f"ExtractionService-{self.port}", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Extraction service listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving; a running batch is finished first."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self._batch_executor.shutdown(wait=True)
+
+    def __enter__(self) -> 'ExtractionService':
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def health(self) -> Dict[str, Any]:
+        """Service state for monitoring."""
+        with self._lock:
+            batches = {}
+            for batch in self._batches.values():
+                batches[batch.status] = batches.get(batch.status, 0) + 1
+        checkpoint_store = self.pipeline.checkpoint_store
+        return {
+            'status': 'ok',
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'batches': batches,
+            'checkpoints': {'hits': checkpoint_store.hits, 'misses': checkpoint_store.misses}
+                           if checkpoint_store else None,
+            'concurrency': limiter_stats()
+        }
+
+    def extract(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Process one invoice synchronously.
+
+        Args:
+            request: {'file_path': ...} or {'image_paths': [...]}
+
+        Returns:
+            The invoice dictionary
+        """
+        if isinstance(request.get('image_paths'), list) and request['image_paths']:
+            for image_path in request['image_paths']:
+                self._check_file(image_path)
+            invoice = self.pipeline.process_images(request['image_paths'])
+        elif isinstance(request.get('file_path'), str):
+            invoice = self.pipeline.process(self._check_file(request['file_path']))
+        else:
+            raise RequestError(400, "Request must contain 'file_path' or 'image_paths'")
+        return invoice.to_json()
+
+    def save_upload(self, data: bytes, filename: str) -> str:
+        """Store an uploaded document under a content-addressed name.
+
+        Args:
+            data: Document bytes
+            filename: Original file name; its extension is kept
+
+        Returns:
+            Path of the stored document
+        """
+        if not data:
+            raise RequestError(400, "Empty upload")
+        name = _UNSAFE_NAME.sub('_', Path(filename).name) or 'document'
+        path = self.upload_dir / f"{hashlib.sha256(data).hexdigest()[:16]}-{name}"
+        if not path.exists():
+            self.upload_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(path.suffix + '.tmp')
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+        return str(path)
+
+    def submit_batch(self, file_paths: List[str], retry_failed: bool = False) -> Batch:
+        """Queue a batch job.
+
+        Args:
+            file_paths: Invoice files on the service's file system
+            retry_failed: Re-queue previously failed files of the job store
+
+        Returns:
+            The queued batch
+        """
+        if not file_paths or not all(isinstance(p, str) for p in file_paths):
+            raise RequestError(400, "'file_paths' must be a non-empty list of paths")
+        batch = Batch(uuid.uuid4().hex, list(file_paths), retry_failed)
+        with self._lock:
+            self._batches[batch.batch_id] = batch
+        self._batch_executor.submit(self._run_batch, batch)
+        logger.info(f"Queued batch {batch.batch_id} with {len(file_paths)} files")
+        return batch
+
+    def batch_status(self, batch_id: str, include_invoices: bool = False) -> Dict[str, Any]:
+        """Status of a batch and the job state of each of its files.
+
+        Args:
+            batch_id: Id returned when the batch was submitted
+            include_invoices: Add the invoices of finished files
+        """
+        with self._lock:
+            batch = self._batches.get(batch_id)
+        if batch is None:
+            raise RequestError(404, f"Unknown batch: {batch_id}")
+
+        files, counts = [], {}
+        for file_path in batch.file_paths:
+            job = self.batch_runner.job_store.get(file_path)
+            state = job.state if job else BATCH_QUEUED
+            counts[state] = counts.get(state, 0) + 1
+            entry = {'file_path': file_path, 'state': state}
+            if job and job.error:
+                entry['error'] = job.error
+            if include_invoices and job and job.invoice:
+                entry['invoice'] = job.invoice
+            files.append(entry)
+        return {
+            'batch_id': batch.batch_id,
+            'status': batch.status,
+            'submitted_at': batch.submitted_at,
+            'started_at': batch.started_at,
+            'finished_at': batch.finished_at,
+            'error': batch.error,
+            'counts': counts,
+            'files': files
+        }
+
+    def _run_batch(self, batch: Batch) -> None:
+        batch.status, batch.started_at = BATCH_RUNNING, time.time()
+        try:
+            self.batch_runner.run(batch.file_paths, retry_failed=batch.retry_failed)
+            batch.status = BATCH_DONE
+        except Exception as e:
+            logger.exception(f"Batch {batch.batch_id} failed: {str(e)}")
+            batch.status, batch.error = BATCH_FAILED, f"{type(e).__name__}: {str(e)}"
+        finally:
+            batch.finished_at = time.time()
+
+    @staticmethod
+    def _check_file(file_path: Any) -> str:
+        if not isinstance(file_path, str) or not Path(file_path).is_file():
+            raise RequestError(404, f"File not found: {file_path}")
+        return file_path
+
+    def _route(self, method: str, path: str, query: Dict[str, List[str]],
+               content_type: str, body: bytes) -> Tuple[int, Any]:
+        if method == 'GET' and path == '/health':
+            return 200, self.health()
+        if method == 'POST' and path == '/extract':
+            if content_type == 'application/json':
+                return 200, self.extract(self._json(body))
+            filename = query.get('filename', ['document'])[0]
+            return 200, self.extract({'file_path': self.save_upload(body, filename)})
+        if method == 'POST' and path == '/batches':
+            request = self._json(body)
+            batch = self.submit_batch(request.get('file_paths'), bool(request.get('retry_failed')))
+            return 202, {'batch_id': batch.batch_id, 'status_url': f"/batches/{batch.batch_id}"}
+        match = _BATCH_PATH.match(path)
+        if method == 'GET' and match:
+            include = 'invoices' in query.get('include', [])
+            return 200, self.batch_status(match.group(1), include_invoices=include)
+        raise RequestError(404, f"No route for {method} {path}")
+
+    @staticmethod
+    def _json(body: bytes) -> Dict[str, Any]:
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            raise RequestError(400, "Body is not valid JSON")
+        if not isinstance(request, dict):
+            raise RequestError(400, "Body must be a JSON object")
+        return request
+
+    def _dispatch(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        url = urlsplit(handler.path)
+        try:
+            length = int(handler.headers.get('Content-Length') or 0)
+            if length > self.max_upload_bytes:
+                handler.close_connection = True
+                raise RequestError(413, f"Body exceeds {self.max_upload_bytes} bytes")
+            body = handler.rfile.read(length) if length else b''
+            content_type = (handler.headers.get('Content-Type') or '').split(';')[0].strip()
+            status, response = self._route(method, url.path, parse_qs(url.query), content_type, body)
+        except RequestError as e:
+            status, response = e.status, {'error': str(e)}
+        except InvoiceExtractorError as e:
+            status, response = 422, {'error': f"{type(e).__name__}: {str(e)}"}
+        except Exception as e:
+            logger.exception(f"Request {method} {url.path} failed: {str(e)}")
+            status, response = 500, {'error': f"{type(e).__name__}: {str(e)}"}
+        self._send_json(handler, status, response)
+
+    @staticmethod
+    def _send_json(handler: BaseHTTPRequestHandler, status: int, body: Any) -> None:
+        payload = json.dumps(body, default=str).encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], pipeline: ExtractionPipeline) -> 'ExtractionService':
+        """Create the service from the full configuration and a built pipeline."""
+        service_config = config.get('service', {})
+        return cls(
+            pipeline=pipeline,
+            batch_runner=BatchRunner.from_config(config.get('jobs', {}), pipeline),
+            host=service_config.get('host', '127.0.0.1'),
+            port=service_config.get('port', 8700),
+            upload_dir=service_config.get('upload_dir', '.uploads'),
+            max_upload_bytes=service_config.get('max_upload_bytes', 50 * 1024 * 1024)
+        )
@@ -0,0 +1,10 @@
+from .fingerprint import LayoutFingerprint, compute_fingerprint
+from .template_registry import TemplateRegistry
+from .template_extractor import TemplateExtractor
+
+__all__ = [
+    'LayoutFingerprint',
+    'compute_fingerprint',
+    'TemplateRegistry',
+    'TemplateExtractor',
+]
@@ -0,0 +1,143 @@
+from typing import Dict, Any, FrozenSet, Tuple, Iterable
+from dataclasses import dataclass
+import hashlib
+import re
+
+from ..core.models.extraction_result import ExtractionResult
+
+# Words shorter than this are mostly abbreviations and OCR noise
+MIN_TOKEN_LENGTH = 3
+
+@dataclass(frozen=True)
+class LayoutFingerprint:
+    """Vendor/layout signature of a document computed from the OCR result.
+
+    Attributes:
+        header_tokens: Words found in the header band of the first page
+        layout_cells: Header words combined with their coarse grid position
+        table_shapes: Column counts of the tables in the document
+    """
+    header_tokens: FrozenSet[str]
+    layout_cells: FrozenSet[str]
+    table_shapes: Tuple[int, ...]
+
+    @property
+    def fingerprint_id(self) -> str:
+        """Stable identifier for the fingerprint."""
+        digest = hashlib.sha1()
+        digest.update("|".join(sorted(self.header_tokens)).encode())
+        digest.update("|".join(sorted(set(map(str, self.table_shapes)))).encode())
+        return digest.hexdigest()[:16]
+
+    def similarity(self, other: 'LayoutFingerprint') -> float:
+        """Share of this fingerprint's features that are present in another.
+
+        Containment rather than Jaccard is used, so account specific words in
+        the other document (customer name, address) do not lower the score.
+
+        Args:
+            other: Fingerprint of the document being matched
+
+        Returns:
+            Weighted score between 0.0 and 1.0
+        """
+        return (
+            0.6 * _containment(self.header_tokens, other.header_tokens) +
+            0.25 * _containment(self.layout_cells, other.layout_cells) +
+            0.15 * _containment(set(self.table_shapes), set(other.table_shapes))
+        )
+
+    def intersect(self, other: 'LayoutFingerprint') -> 'LayoutFingerprint':
+        """Keep only the features shared with another sample of the same layout."""
+        return LayoutFingerprint(
+            header_tokens=self.header_tokens & other.header_tokens,
+            layout_cells=self.layout_cells & other.layout_cells,
+            table_shapes=tuple(sorted(set(self.table_shapes) & set(other.table_shapes)))
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a YAML/JSON-serializable dictionary."""
+        return {
+            'header_tokens': sorted(self.header_tokens),
+            'layout_cells': sorted(self.layout_cells),
+            'table_shapes': list(self.table_shapes)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LayoutFingerprint':
+        """Create a fingerprint from its dictionary form."""
+        return cls(
+            header_tokens=frozenset(data.get('header_tokens', [])),
+            layout_cells=frozenset(data.get('layout_cells', [])),
+            table_shapes=tuple(data.get('table_shapes', []))
+        )
+
+def compute_fingerprint(extraction_result: ExtractionResult,
+                        header_fraction: float = 0.25,
+                        grid_size: int = 20,
+                        header_lines: int = 15
+                        ) -> LayoutFingerprint:
+    """Compute the layout fingerprint of an extracted document.
+
+    Uses the line polygons of the Document Intelligence result when available
+    and falls back to the first lines of the extracted text otherwise.
+
+    Args:
+        extraction_result: Result of the text extraction stage
+        header_fraction: Top share of the first page treated as header
+        grid_size: Number of grid cells per page axis for line positions
+        header_lines: Lines used as header when no layout is available
+
+    Returns:
+        LayoutFingerprint of the document
+    """
+    header_tokens = set()
+    layout_cells = set()
+    table_shapes = []
+
+    result = extraction_result.raw_response
+    pages = getattr(result, 'pages', None) if result is not None else None
+
+    if pages:
+        page = pages[0]
+        width = getattr(page, 'width', None) or 1.0
+        height = getattr(page, 'height', None) or 1.0
+
+        for line in page.lines or []:
+            polygon = getattr(line, 'polygon', None) or getattr(line, 'bounding_box', None)
+            if not polygon:
+                continue
+            x = min(polygon[0::2]) / width
+            y = min(polygon[1::2]) / height
+            if y > header_fraction:
+                continue
+
+            tokens = _tokens(line.content)
+            header_tokens.update(tokens)
+            layout_cells.update(
+                f"{token}@{int(x * grid_size)},{int(y * grid_size)}" for token in tokens
+            )
+
+        for table in getattr(result, 'tables', None) or []:
+            table_shapes.append(table.column_count)
+    else:
+        for line in extraction_result.raw_text.splitlines()[:header_lines]:
+            header_tokens.update(_tokens(line))
+
+    return LayoutFingerprint(
+        header_tokens=frozenset(header_tokens),
+        layout_cells=frozenset(layout_cells),
+        table_shapes=tuple(sorted(table_shapes))
+    )
+
+def _tokens(text: str) -> Iterable[str]:
+    """Alphabetic tokens of a line; digits are account specific and ignored."""
+    return [t for t in re.findall(r'[a-z]+', text.lower()) if len(t) >= MIN_TOKEN_LENGTH]
+
+def _containment(reference: Iterable, candidate: Iterable) -> float:
+    """Fraction of the reference set contained in the candidate set."""
+    reference = set(reference)
+    candidate = set(candidate)
+    if not reference:
+        return 0.0 if candidate else 1.0
+    return len(reference & candidate) / len(reference)
@@ -0,0 +1,244 @@
+"""Learning and applying line-based extraction rules for invoice templates.
+
+A rule locates a value on a line of the extracted text. It is learned from a
+verified invoice by finding the line that contains the known value and
+generalizing the text in front of it (numbers and padding become wildcards),
+so the same rule matches the next bill of the same layout.
+
+Rule dictionaries have the form::
+
+    {'kind': 'amount', 'pattern': '^\\s*Total\\s*Amount\\s*Due\\s*\\$', 'occurrence': 0}
+
+with optional 'anchor' (pattern of the preceding label line when the value
+sits on its own line) and 'date_format' (for dates) keys.
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import date, datetime
+from functools import lru_cache
+import re
+
+# Capture groups by value kind
+CAPTURES = {
+    'amount': r'(\(?-?\$?\s?[\d,]*\.?\d+\)?-?)',
+    'number': r'(-?[\d,]*\.?\d+)',
+    'identifier': r'([A-Za-z0-9][A-Za-z0-9\-]*)',
+    'text': r'(.+?)',
+}
+
+DATE_FORMATS = [
+    '%m/%d/%Y', '%m/%d/%y', '%Y-%m-%d', '%m-%d-%Y',
+    '%b %d, %Y', '%B %d, %Y', '%b %d %Y', '%d %b %Y',
+]
+
+DATE_DIRECTIVES = {
+    '%m': r'\d{1,2}',
+    '%d': r'\d{1,2}',
+    '%Y': r'\d{4}',
+    '%y': r'\d{2}',
+    '%b': r'[A-Za-z]{3}',
+    '%B': r'[A-Za-z]+',
+}
+
+# Characters of a suffix kept to delimit free-text captures
+SUFFIX_LENGTH = 12
+
+def generalize(text: str) -> str:
+    """Convert literal text into a pattern tolerant to numbers and padding."""
+    parts = []
+    for token in re.findall(r'\d[\d,.]*|\s+|[^\d\s]+', text):
+        if token[0].isdigit():
+            parts.append(r'[\d,.]+')
+        elif token.isspace():
+            parts.append(r'\s*')
+        else:
+            parts.append(re.escape(token))
+    return ''.join(parts)
+
+def normalize_label(text: str) -> str:
+    """Lowercase text with punctuation and padding collapsed, for label matching."""
+    return ' '.join(re.findall(r'[a-z0-9]+', text.lower()))
+
+def learn_rule(lines: List[str],
+               value: Any,
+               kind: str,
+               label: Optional[str] = None
+               ) -> Optional[Dict[str, Any]]:
+    """Learn a rule that extracts a known value from the text lines.
+
+    Args:
+        lines: Lines of the extracted document text
+        value: Verified value (str, float or date depending on kind)
+        kind: One of 'amount', 'number', 'identifier', 'text' or 'date'
+        label: Optional label (charge or determinant name) that must appear
+               on the same line as the value
+
+    Returns:
+        Rule dictionary, or None if the value could not be located
+    """
+    if value is None:
+        return None
+    wanted_label = normalize_label(label) if label else None
+
+    for idx, line in enumerate(lines):
+        if wanted_label and wanted_label not in normalize_label(line):
+            continue
+
+        for variant, date_format in _value_variants(kind, value):
+            for pos in _positions(line, variant, kind):
+                rule = _rule_from_position(lines, idx, pos, variant, kind, date_format)
+                if rule is None:
+                    continue
+
+                # Confirm the rule reproduces the value, and record which match it is
+                for occurrence, (found, line_idx) in enumerate(_find_all(lines, rule)):
+                    if line_idx == idx and _values_equal(kind, found, value):
+                        rule['occurrence'] = occurrence
+                        return rule
+    return None
+
+def apply_rule(lines: List[str], rule: Dict[str, Any]) -> Tuple[Any, Optional[int]]:
+    """Extract a value with a learned rule.
+
+    Args:
+        lines: Lines of the extracted document text
+        rule: Rule dictionary produced by learn_rule
+
+    Returns:
+        Tuple of (value, line index), or (None, None) if the rule does not match
+    """
+    if 'constant' in rule:
+        return rule['constant'], None
+
+    matches = _find_all(lines, rule)
+    occurrence = rule.get('occurrence', 0)
+    if occurrence < len(matches):
+        return matches[occurrence]
+    return None, None
+
+def _positions(line: str, variant: str, kind: str) -> List[int]:
+    """Start positions of a printed value in a line."""
+    if kind in ('amount', 'number', 'date'):
+        # Do not match inside a longer number ("9.30" within "19.30")
+        pattern = r'(?<![\d.,])' + re.escape(variant) + r'(?!\d)'
+    else:
+        pattern = re.escape(variant)
+    return [m.start() for m in re.finditer(pattern, line)]
+
+def _rule_from_position(lines: List[str],
+                        idx: int,
+                        pos: int,
+                        variant: str,
+                        kind: str,
+                        date_format: Optional[str]
+                        ) -> Optional[Dict[str, Any]]:
+    """Build a rule for a value found at a position of a line."""
+    line = lines[idx]
+    prefix = line[:pos]
+    suffix = line[pos + len(variant):]
+    capture = _capture(kind, date_format)
+
+    rule = {'kind': kind}
+    if date_format:
+        rule['date_format'] = date_format
+
+    if kind in ('text', 'identifier') and not prefix.strip() and not suffix.strip():
+        # Value on its own line: anchor on the label line above it
+        if idx == 0 or not lines[idx - 1].strip():
+            return None
+        rule['anchor'] = r'^\s*' + generalize(lines[idx - 1].strip()) + r'\s*$'
+        rule['pattern'] = r'^\s*' + capture + r'\s*$'
+        return rule
+
+    if kind == 'amount':
+        # Keep sign markers in front of the amount inside the capture
+        prefix = prefix.rstrip('$-( ')
+
+    pattern = r'^\s*' + generalize(prefix.lstrip()) + r'\s*' + capture
+    if kind == 'text':
+        delimiter = suffix[:SUFFIX_LENGTH].rstrip()
+        pattern += generalize(delimiter) if delimiter.strip() else r'\s*$'
+    rule['pattern'] = pattern
+    return rule
+
+def _find_all(lines: List[str], rule: Dict[str, Any]) -> List[Tuple[Any, int]]:
+    """All (value, line index) matches of a rule in document order."""
+    regex = _compile(rule['pattern'])
+    anchor = _compile(rule['anchor']) if rule.get('anchor') else None
+
+    matches = []
+    for idx, line in enumerate(lines):
+        if anchor is not None:
+            if idx == 0 or not anchor.search(lines[idx - 1]):
+                continue
+        match = regex.search(line)
+        if not match:
+            continue
+        value = _convert(rule['kind'], match.group(1), rule.get('date_format'))
+        if value is not None:
+            matches.append((value, idx))
+    return matches
+
+def _capture(kind: str, date_format: Optional[str]) -> str:
+    """Capture group for a value kind."""
+    if kind == 'date':
+        parts = re.split(r'(%[a-zA-Z])', date_format)
+        return '(' + ''.join(DATE_DIRECTIVES.get(p, re.escape(p)) for p in parts) + ')'
+    return CAPTURES[kind]
+
+def _convert(kind: str, text: str, date_format: Optional[str] = None) -> Any:
+    """Convert captured text to a typed value (None if it does not parse)."""
+    text = text.strip()
+    try:
+        if kind == 'amount':
+            negative = '-' in text or (text.startswith('(') and text.endswith(')'))
+            amount = float(re.sub(r'[^\d.]', '', text))
+            return -amount if negative else amount
+        if kind == 'number':
+            return float(text.replace(',', ''))
+        if kind == 'date':
+            return datetime.strptime(text, date_format).date()
+        return text or None
+    except ValueError:
+        return None
+
+def _values_equal(kind: str, found: Any, expected: Any) -> bool:
+    """Compare an extracted value with the verified one."""
+    if kind in ('amount', 'number'):
+        try:
+            return abs(float(found) - float(expected)) < 0.005
+        except (TypeError, ValueError):
+            return False
+    if kind == 'date':
+        return found == expected
+    return str(found).strip() == str(expected).strip()
+
+def _value_variants(kind: str, value: Any) -> List[Tuple[str, Optional[str]]]:
+    """Ways a value may be printed on the invoice, most specific first."""
+    if kind == 'date':
+        if isinstance(value, str):
+            value = date.fromisoformat(value)
+        variants = []
+        for fmt in DATE_FORMATS:
+            printed = value.strftime(fmt)
+            variants.append((printed, fmt))
+            unpadded = re.sub(r'\b0(\d)', r'\1', printed)
+            if unpadded != printed:
+                variants.append((unpadded, fmt))
+        return variants
+
+    if kind in ('amount', 'number'):
+        number = abs(float(value)) if kind == 'amount' else float(value)
+        printed = set()
+        for decimals in range(5):
+            for fmt in (f"{{:,.{decimals}f}}", f"{{:.{decimals}f}}"):
+                text = fmt.format(number)
+                if float(text.replace(',', '')) == number:
+                    printed.add(text)
+        return [(text, None) for text in sorted(printed, key=len, reverse=True)]
+
+    return [(str(value).strip(), None)]
+
+@lru_cache(maxsize=4096)
+def _compile(pattern: str) -> 're.Pattern':
+    """Compile and cache a rule pattern."""
+    return re.compile(pattern)
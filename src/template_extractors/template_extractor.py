@@ -0,0 +1,360 @@
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+import logging
+
+from ..core.models.extraction_result import ExtractionResult
+from ..core.models.invoice import Invoice, Determinant, Charge
+from .fingerprint import LayoutFingerprint, compute_fingerprint
+from .rules import learn_rule, apply_rule
+from .template_registry import TemplateRegistry
+
+logger = logging.getLogger(__name__)
+
+class TemplateExtractor:
+    """Extracts invoices of known vendor layouts without calling an LLM.
+
+    Layouts are identified by fingerprinting the Document Intelligence result
+    (header words, their positions and table shapes). For each layout a
+    template of line rules is learned from invoices the LLM extracted and the
+    validator accepted. When a new document matches a template, its fields
+    are read with those rules; if any required field is missing or the
+    extracted charges do not add up to the subtotals and the total amount,
+    None is returned
+    and the caller falls back to the LLM extractor.
+
+    Unlike DataExtractor implementations this class needs the full
+    ExtractionResult (layout information), not only the preprocessed text.
+    """
+
+    # Account fields and how their values are printed
+    FIELD_KINDS = {
+        'account_number': 'text',
+        'invoice_number': 'text',
+        'invoice_date': 'date',
+        'billing_period_start': 'date',
+        'billing_period_end': 'date',
+        'customer_name': 'text',
+        'service_address': 'text',
+        'total_amount': 'amount',
+    }
+
+    def __init__(self,
+                 registry: Optional[TemplateRegistry] = None,
+                 match_threshold: float = 0.8,
+                 learn_threshold: float = 0.5,
+                 tolerance: float = 0.01,
+                 learn: bool = True):
+        """Initialize the template extractor.
+
+        Args:
+            registry: Template registry (defaults to .templates)
+            match_threshold: Minimum fingerprint similarity to use a template
+            learn_threshold: Minimum similarity to merge a new sample into an
+                             existing template instead of creating a new one
+            tolerance: Tolerance for reconciling charges with subtotals and the total
+            learn: Whether learn() may create and update templates
+        """
+        self.registry = registry if registry is not None else TemplateRegistry()
+        self.match_threshold = match_threshold
+        self.learn_threshold = learn_threshold
+        self.tolerance = tolerance
+        self.learn_enabled = learn
+
+    def identify(self, extraction_result: ExtractionResult) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Identify the template of a document.
+
+        Args:
+            extraction_result: Result of the text extraction stage
+
+        Returns:
+            Tuple of (template or None, similarity score)
+        """
+        template, score = self.registry.match(compute_fingerprint(extraction_result))
+        if template is None or score < self.match_threshold:
+            return None, score
+        return template, score
+
+    def extract(self, extraction_result: ExtractionResult, source_file: str) -> Optional[Invoice]:
+        """Extract an invoice with the matching template.
+
+        Args:
+            extraction_result: Result of the text extraction stage
+            source_file: Path of the source document
+
+        Returns:
+            Invoice, or None if no template matches or extraction is incomplete
+        """
+        template, score = self.identify(extraction_result)
+        if template is None:
+            return None
+
+        invoice = self._apply_template(template, extraction_result.raw_text.splitlines(), source_file)
+        if invoice is None:
+            logger.info(f"Template {template['template_id']} incomplete for {source_file}")
+            return None
+
+        invoice.confidence_score = score
+        logger.info(f"Extracted {source_file} with template {template['template_id']} (score {score:.2f})")
+        return invoice
+
+    def learn(self, extraction_result: ExtractionResult, invoice: Invoice) -> bool:
+        """Learn or update a template from a verified invoice.
+
+        The learned template must reproduce the invoice from its own document,
+        otherwise nothing is saved.
+
+        Args:
+            extraction_result: Result of the text extraction stage
+            invoice: Invoice extracted by the LLM and accepted by validation
+
+        Returns:
+            True if a template was saved
+        """
+        if not self.learn_enabled:
+            return False
+
+        lines = extraction_result.raw_text.splitlines()
+        fingerprint = compute_fingerprint(extraction_result)
+        template = self._learn_template(lines, invoice)
+        if template is None:
+            logger.info(f"Could not learn a template from {invoice.source_file}")
+            return False
+
+        existing, score = self.registry.match(fingerprint)
+        if (existing is not None and score >= self.learn_threshold
+                and existing.get('vendor_name') == invoice.vendor_name):
+            template = self._merge_templates(existing, template, fingerprint)
+        else:
+            template['template_id'] = fingerprint.fingerprint_id
+            template['fingerprint'] = fingerprint.to_dict()
+
+        reproduced = self._apply_template(template, lines, invoice.source_file)
+        if (reproduced is None
+                or len(reproduced.charges) != len(invoice.charges)
+                or len(reproduced.determinants) != len(invoice.determinants)):
+            logger.info(f"Learned template does not reproduce {invoice.source_file}; not saved")
+            return False
+
+        self.registry.save(template)
+        return True
+
+    def _apply_template(self,
+                        template: Dict[str, Any],
+                        lines: List[str],
+                        source_file: str
+                        ) -> Optional[Invoice]:
+        """Read an invoice from text lines with a template's rules."""
+        fields = {}
+        for name, rule in template['fields'].items():
+            value, _ = apply_rule(lines, rule)
+            if value is None and 'constant' not in rule:
+                return None
+            fields[name] = value
+
+        meter_numbers = []
+        for rule in template['meter_numbers']:
+            value, _ = apply_rule(lines, rule)
+            if value is None:
+                return None
+            meter_numbers.append(value)
+
+        subtotals = {}
+        for commodity, rule in template['subtotals'].items():
+            value, _ = apply_rule(lines, rule)
+            if value is not None:
+                subtotals[commodity] = value
+
+        # Two rules must not read the same line (duplicate rules from merged samples)
+        determinant_lines = set()
+        determinants = []
+        for spec in template['determinants']:
+            value, line_idx = apply_rule(lines, spec['rule'])
+            if value is None or line_idx in determinant_lines:
+                continue
+            determinant_lines.add(line_idx)
+            determinants.append(Determinant(
+                name=spec['name'],
+                value=value,
+                unit=spec['unit'],
+                commodity=spec['commodity'],
+                meter=self._resolve_meter(spec, meter_numbers)
+            ))
+        if template['determinants'] and not determinants:
+            return None
+
+        charge_lines = set()
+        charges = []
+        for spec in template['charges']:
+            amount, line_idx = apply_rule(lines, spec['rule'])
+            if amount is None or line_idx in charge_lines:
+                continue
+            charge_lines.add(line_idx)
+            charges.append(Charge(
+                name=spec['name'],
+                amount=amount,
+                category=spec['category'],
+                commodity=spec['commodity'],
+                currency=spec.get('currency', 'USD'),
+                determinant=next(
+                    (d for d in determinants if d.name == spec.get('determinant')), None
+                ),
+                meter_number=self._resolve_meter(spec, meter_numbers)
+            ))
+
+        if not self._reconciles(charges, subtotals, fields['total_amount']):
+            return None
+
+        return Invoice(
+            **fields,
+            vendor_name=template['vendor_name'],
+            meter_numbers=meter_numbers,
+            determinants=determinants,
+            charges=charges,
+            subtotals=subtotals,
+            commodities=list(template['commodities']),
+            source_file=source_file,
+            extraction_date=datetime.now().date(),
+            validation_errors=[]
+        )
+
+    def _learn_template(self, lines: List[str], invoice: Invoice) -> Optional[Dict[str, Any]]:
+        """Learn rules for every value of a verified invoice."""
+        fields = {}
+        for name, kind in self.FIELD_KINDS.items():
+            value = getattr(invoice, name)
+            if value is None or value == 'N/A':
+                fields[name] = {'constant': value}
+                continue
+            rule = learn_rule(lines, value, kind)
+            if rule is None:
+                logger.debug(f"No rule found for field {name}")
+                return None
+            fields[name] = rule
+
+        meter_numbers = []
+        for meter in invoice.meter_numbers:
+            rule = learn_rule(lines, meter, 'identifier')
+            if rule is None:
+                return None
+            meter_numbers.append(rule)
+
+        subtotals = {}
+        for commodity, amount in invoice.subtotals.items():
+            rule = learn_rule(lines, amount, 'amount', label=commodity)
+            if rule is None:
+                rule = learn_rule(lines, amount, 'amount')
+            if rule is None:
+                return None
+            subtotals[commodity] = rule
+
+        determinants = []
+        for det in invoice.determinants:
+            rule = learn_rule(lines, det.value, 'number', label=det.name)
+            if rule is None:
+                return None
+            determinants.append({
+                'name': det.name,
+                'unit': det.unit,
+                'commodity': det.commodity,
+                **self._meter_reference('meter', det.meter, invoice.meter_numbers),
+                'rule': rule
+            })
+
+        charges = []
+        for charge in invoice.charges:
+            rule = learn_rule(lines, charge.amount, 'amount', label=charge.name)
+            if rule is None:
+                return None
+            charges.append({
+                'name': charge.name,
+                'category': charge.category,
+                'commodity': charge.commodity,
+                'currency': charge.currency,
+                'determinant': charge.determinant.name if charge.determinant else None,
+                **self._meter_reference('meter_number', charge.meter_number, invoice.meter_numbers),
+                'rule': rule
+            })
+
+        return {
+            'vendor_name': invoice.vendor_name,
+            'samples': 1,
+            'fields': fields,
+            'meter_numbers': meter_numbers,
+            'subtotals': subtotals,
+            'determinants': determinants,
+            'charges': charges,
+            'commodities': list(invoice.commodities),
+        }
+
+    def _merge_templates(self,
+                         existing: Dict[str, Any],
+                         learned: Dict[str, Any],
+                         fingerprint: LayoutFingerprint
+                         ) -> Dict[str, Any]:
+        """Merge a newly learned sample into an existing template.
+
+        Field rules are replaced by the latest sample, determinant and charge
+        rules are united, and the fingerprint keeps only shared features so
+        account specific header words drop out over time.
+        """
+        def merge_specs(old: List[Dict], new: List[Dict]) -> List[Dict]:
+            merged = {(s['name'], s['rule']['pattern'], s['rule'].get('occurrence', 0)): s for s in old}
+            merged.update({(s['name'], s['rule']['pattern'], s['rule'].get('occurrence', 0)): s for s in new})
+            return list(merged.values())
+
+        merged_fingerprint = LayoutFingerprint.from_dict(existing['fingerprint']).intersect(fingerprint)
+        return {
+            **learned,
+            'template_id': existing['template_id'],
+            'samples': existing.get('samples', 1) + 1,
+            'fingerprint': merged_fingerprint.to_dict(),
+            'subtotals': {**existing['subtotals'], **learned['subtotals']},
+            'determinants': merge_specs(existing['determinants'], learned['determinants']),
+            'charges': merge_specs(existing['charges'], learned['charges']),
+            'commodities': sorted(set(existing['commodities']) | set(learned['commodities'])),
+        }
+
+    def _reconciles(self, charges: List[Charge], subtotals: Dict[str, float], total_amount: float) -> bool:
+        """Check that extracted charges add up to the printed subtotals and total.
+
+        A charge line the template has no rule for would otherwise be dropped
+        without notice, so the charges must always account for the total.
+        """
+        if not charges or total_amount is None:
+            return False
+        if abs(sum(c.amount for c in charges) - total_amount) > self.tolerance:
+            return False
+        if subtotals and abs(sum(subtotals.values()) - total_amount) > self.tolerance:
+            return False
+        for commodity, subtotal in subtotals.items():
+            commodity_charges = [c.amount for c in charges if c.commodity.lower() == commodity.lower()]
+            if commodity_charges and abs(sum(commodity_charges) - subtotal) > self.tolerance:
+                return False
+        return True
+
+    @staticmethod
+    def _meter_reference(key: str, meter: Optional[str], meter_numbers: List[str]) -> Dict[str, Any]:
+        """Reference a meter by position so templates carry over between accounts."""
+        if meter in meter_numbers:
+            return {'meter_index': meter_numbers.index(meter)}
+        return {key: meter}
+
+    @staticmethod
+    def _resolve_meter(spec: Dict[str, Any], meter_numbers: List[str]) -> Optional[str]:
+        """Resolve a meter reference against the meters of the current document."""
+        if 'meter_index' in spec:
+            index = spec['meter_index']
+            return meter_numbers[index] if index < len(meter_numbers) else 'N/A'
+        return spec.get('meter', spec.get('meter_number', 'N/A'))
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'TemplateExtractor':
+        """Create a template extractor from the 'templates' configuration section."""
+        registry = TemplateRegistry(config.get('templates_dir'))
+        return cls(
+            registry=registry,
+            match_threshold=config.get('match_threshold', 0.8),
+            learn_threshold=config.get('learn_threshold', 0.5),
+            tolerance=config.get('tolerance', 0.01),
+            learn=config.get('learn', False)
+        )
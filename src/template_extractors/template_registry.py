@@ -0,0 +1,99 @@
+from typing import Dict, Any, List, Optional, Tuple
+from pathlib import Path
+import threading
+import logging
+import yaml
+
+from .fingerprint import LayoutFingerprint
+
+logger = logging.getLogger(__name__)
+
+class TemplateRegistry:
+    """Stores learned vendor templates as YAML files, one per layout.
+
+    A template is a dictionary with the keys 'template_id', 'vendor_name',
+    'samples', 'fingerprint', 'fields', 'meter_numbers', 'subtotals',
+    'determinants', 'charges' and 'commodities'. See TemplateExtractor for
+    how the rules are learned and applied.
+    """
+
+    # Learned from processed invoices, so kept in the working directory like the other stores
+    DEFAULT_TEMPLATES_DIR = Path(".templates")
+
+    def __init__(self, templates_dir: Optional[Path] = None):
+        """Initialize the registry and load existing templates.
+
+        Args:
+            templates_dir: Optional custom directory containing template YAML files
+        """
+        self.templates_dir = Path(templates_dir) if templates_dir else self.DEFAULT_TEMPLATES_DIR
+        self._lock = threading.Lock()
+        self._templates = self._load_templates()
+        self._fingerprints = {
+            template_id: LayoutFingerprint.from_dict(template['fingerprint'])
+            for template_id, template in self._templates.items()
+        }
+
+    def _load_templates(self) -> Dict[str, Dict[str, Any]]:
+        """Load templates from YAML files."""
+        templates = {}
+        if not self.templates_dir.exists():
+            return templates
+        for yaml_file in self.templates_dir.glob("*.yaml"):
+            with open(yaml_file) as f:
+                template = yaml.safe_load(f)
+            templates[template['template_id']] = template
+        return templates
+
+    def match(self, fingerprint: LayoutFingerprint) -> Tuple[Optional[Dict[str, Any]], float]:
+        """Find the template best matching a document fingerprint.
+
+        Args:
+            fingerprint: Fingerprint of the document
+
+        Returns:
+            Tuple of (template, similarity score); template is None if the
+            registry is empty
+        """
+        # save() may replace templates from other threads; match a consistent snapshot
+        with self._lock:
+            candidates = [
+                (self._templates[template_id], template_fingerprint)
+                for template_id, template_fingerprint in self._fingerprints.items()
+            ]
+        best, best_score = None, 0.0
+        for template, template_fingerprint in candidates:
+            score = template_fingerprint.similarity(fingerprint)
+            if score > best_score:
+                best, best_score = template, score
+        return best, best_score
+
+    def save(self, template: Dict[str, Any]) -> None:
+        """Add or replace a template and persist it.
+
+        Args:
+            template: Template dictionary including its 'fingerprint'
+        """
+        with self._lock:
+            self.templates_dir.mkdir(parents=True, exist_ok=True)
+            path = self.templates_dir / f"{template['template_id']}.yaml"
+            tmp_path = path.with_suffix('.yaml.tmp')
+            with open(tmp_path, 'w') as f:
+                yaml.safe_dump(template, f, sort_keys=False)
+            tmp_path.replace(path)
+
+            self._templates[template['template_id']] = template
+            self._fingerprints[template['template_id']] = LayoutFingerprint.from_dict(
+                template['fingerprint']
+            )
+        logger.info(f"Saved template {template['template_id']} ({template.get('vendor_name')})")
+
+    @property
+    def templates(self) -> List[Dict[str, Any]]:
+        """All known templates."""
+        with self._lock:
+            return list(self._templates.values())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._templates)
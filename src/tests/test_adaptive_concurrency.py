@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from ..core import adaptive_concurrency
+from ..core.adaptive_concurrency import AdaptiveConcurrencyLimiter, is_throttle_error
+from ..llm_extractors.azure_openai_extractor import completion_units
+
+class RateLimitError(Exception):
+    status_code = 429
+
+def test_additive_increase_on_success():
+    limiter = AdaptiveConcurrencyLimiter('test', initial_limit=2, max_limit=4)
+    for _ in range(10):
+        with limiter.slot():
+            pass
+    assert limiter.limit == 4
+    assert limiter.stats()['successes'] == 10
+
+def test_multiplicative_decrease_on_throttle():
+    limiter = AdaptiveConcurrencyLimiter('test', initial_limit=8)
+    with pytest.raises(RateLimitError):
+        with limiter.slot():
+            raise RateLimitError("Too Many Requests")
+    assert limiter.limit == 4
+    assert limiter.throttled == 1
+
+def test_one_decrease_per_window():
+    limiter = AdaptiveConcurrencyLimiter('test', initial_limit=8)
+    first = limiter.acquire()
+    second = limiter.acquire()
+    limiter.release(first, throttled=True, failed=True)
+    limiter.release(second, throttled=True, failed=True)
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+def test_other_errors_keep_limit():
+    limiter = AdaptiveConcurrencyLimiter('test', initial_limit=8)
+    with pytest.raises(ValueError):
+        with limiter.slot():
+            raise ValueError("bad response")
+    assert limiter.limit == 8
+    assert not is_throttle_error(ValueError())
+    assert is_throttle_error(TimeoutError())
+
+def test_latency_is_compared_per_unit():
+    """Test that a request taking longer only because it is larger is not a latency spike."""
+    limiter = AdaptiveConcurrencyLimiter('test', initial_limit=8, latency_tolerance=0.0)
+    for _ in range(3):
+        with limiter.slot():
+            time.sleep(0.01)
+    with limiter.slot() as slot:
+        time.sleep(0.05)
+        slot.units = 10
+    assert limiter.decreases == 0
+
+    with limiter.slot():
+        time.sleep(0.05)
+    assert limiter.decreases == 1
+
+def test_mixed_prompt_latencies_do_not_collapse_the_limit(monkeypatch):
+    """Test that long charges completions sized by their tokens do not count as latency spikes."""
+    clock = [0.0]
+    monkeypatch.setattr(adaptive_concurrency.time, 'monotonic', lambda: clock[0])
+    limiter = AdaptiveConcurrencyLimiter('openai', initial_limit=8, max_limit=8)
+
+    # account_info, determinants and charges calls: (seconds, completion tokens)
+    prompts = [(1.0, 80), (1.5, 150), (12.0, 1200)]
+    for _ in range(200):
+        for seconds, tokens in prompts:
+            with limiter.slot() as slot:
+                clock[0] += seconds
+                slot.units = completion_units(tokens)
+    assert limiter.decreases == 0 and limiter.limit == 8
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from ..llm_extractors.azure_openai_extractor import AzureOpenAIExtractor
+from ..llm_extractors.azure_openai_batch import AzureOpenAIBatchExtractor, LocalBatchService
+
+ACCOUNT_INFO = {
+    "account_number": "123456789",
+    "invoice_number": "INV-001",
+    "invoice_date": "2024-03-01",
+    "billing_period_start": "2024-02-01",
+    "billing_period_end": "2024-02-29",
+    "vendor_name": "Pacific Power & Light",
+    "customer_name": "John Smith",
+    "service_address": "123 Main St",
+    "meter_numbers": ["P1"],
+    "subtotals": {"Electric Power": 100.0},
+    "total_amount": 100.0,
+    "commodities": ["Electric Power"]
+}
+
+DETERMINANTS = {"determinants": [
+    {"name": "Total Usage", "value": "1,000", "unit": "kWh", "commodity": "Electric Power", "meter_number": "P1"}
+]}
+
+CHARGES = {"charges": [
+    {"name": "Energy Charge 02/01-02/29", "amount": 100.0, "category": "energy",
+     "commodity": "Electric Power", "determinant_name": "Total Usage"}
+]}
+
+@pytest.fixture
+def extractor():
+    return AzureOpenAIExtractor(api_key="test", endpoint="https://example.openai.azure.com/", deployment="gpt-4o")
+
+def make_responder(extractor, seen):
+    prompt_names = {prompt['system']: name for name, prompt in extractor.prompts.items()}
+
+    def responder(body):
+        prompt_name = prompt_names[body['messages'][0]['content']]
+        user_content = body['messages'][1]['content']
+        seen.append(prompt_name)
+        if "broken" in user_content:
+            raise RuntimeError("content filtered")
+        if prompt_name == 'account_info':
+            return json.dumps(ACCOUNT_INFO)
+        if prompt_name == 'determinants':
+            return json.dumps(DETERMINANTS)
+        if prompt_name == 'charges':
+            # The second wave must see the first wave's determinants
+            assert "- Total Usage: 1000.0 kWh" in user_content
+            return json.dumps(CHARGES)
+        return json.dumps({"Energy Charge 02/01-02/29": "Energy Charge"})
+
+    return responder
+
+def test_extract_batch_runs_waves(extractor, tmp_path):
+    """Test that bulk mode fans batch results back into invoices."""
+    seen = []
+    service = LocalBatchService(str(tmp_path / "service"), make_responder(extractor, seen))
+    bulk = AzureOpenAIBatchExtractor(extractor, service, work_dir=str(tmp_path / "work"), poll_interval=0)
+
+    results = bulk.extract_batch([("invoice one", "one.pdf"), ("invoice two", "two.pdf")])
+
+    assert [result.ok for result in results] == [True, True]
+    invoice = results[0].invoice
+    assert invoice.source_file == "one.pdf"
+    assert invoice.determinants[0].value == 1000.0
+    assert invoice.charges[0].name == "Energy Charge"
+    assert invoice.charges[0].determinant.name == "Total Usage"
+    assert seen.count('charges') == 2
+    assert seen.index('charges') > max(i for i, name in enumerate(seen) if name == 'determinants')
+
+def test_failed_requests_fail_only_their_document(extractor, tmp_path):
+    """Test that a failed batch request skips later waves for that document."""
+    seen = []
+    service = LocalBatchService(str(tmp_path / "service"), make_responder(extractor, seen))
+    bulk = AzureOpenAIBatchExtractor(extractor, service, work_dir=str(tmp_path / "work"), poll_interval=0)
+
+    results = bulk.extract_batch([("broken invoice", "bad.pdf"), ("invoice two", "two.pdf")])
+
+    assert not results[0].ok
+    assert "content filtered" in results[0].error
+    assert results[1].ok
+    assert seen.count('charges') == 1
+
+def test_long_documents_are_chunked(tmp_path):
+    """Test that bulk mode sends long documents in chunks and merges results seen in an overlap."""
+    extractor = AzureOpenAIExtractor(api_key="test", endpoint="https://example.openai.azure.com/",
+                                     deployment="gpt-4o", chunk_max_tokens=80, chunk_overlap_tokens=20)
+    text = "\n".join([f"Service detail line {i} for meter P1" for i in range(5)] +
+                     ["Total Usage 1,000 kWh", "Energy Charge $100.00"] +
+                     [f"Payment history line {i}" for i in range(8)]) + "\n"
+    chunks = extractor.split_text(text)
+    # Both lines end the first chunk and are repeated at the start of the second
+    assert len(chunks) == 2 and all("Total Usage 1,000 kWh" in chunk for chunk in chunks)
+
+    seen = []
+    service = LocalBatchService(str(tmp_path / "service"), make_responder(extractor, seen))
+    bulk = AzureOpenAIBatchExtractor(extractor, service, work_dir=str(tmp_path / "work"), poll_interval=0)
+    result = bulk.extract_batch([(text, "long.pdf")])[0]
+
+    assert result.ok
+    assert seen.count('account_info') == 1
+    assert seen.count('determinants') == seen.count('charges') == 2
+    assert len(result.invoice.determinants) == 1 and len(result.invoice.charges) == 1
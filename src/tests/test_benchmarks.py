@@ -0,0 +1,28 @@
+from ..benchmarks.metrics import percentile, summarize
+from ..benchmarks.pipeline_benchmark import compare_results
+
+def test_percentile_interpolates():
+    """Test percentiles over a known sample."""
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.5
+    assert round(percentile(values, 95), 2) == 95.05
+    assert percentile([], 99) == 0.0
+    assert summarize([2.0, 1.0])['max'] == 2.0
+
+def test_compare_results_flags_regressions():
+    """Test that slower runs are flagged and noise within tolerance is not."""
+    baseline = {
+        'invoices_per_sec': 10.0,
+        'latency': {'p95': 1.0},
+        'stages': {'llm': {'p95': 0.5}},
+        'tokens': {'per_invoice': 2000}
+    }
+    current = {
+        'invoices_per_sec': 9.5,
+        'latency': {'p95': 1.5},
+        'stages': {'llm': {'p95': 0.52}},
+        'tokens': {'per_invoice': 2000}
+    }
+    regressions = compare_results(current, baseline, tolerance=0.10)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("latency.p95")
@@ -0,0 +1,36 @@
+import json
+
+from ..llm_extractors.charge_name_normalizer import ChargeNameNormalizer, strip_period_labels
+
+def test_rules_strip_dates_and_period_labels():
+    """Test the deterministic normalization rules."""
+    assert strip_period_labels("Basic Charge (6/1/23-6/15/23)") == "Basic Charge"
+    assert strip_period_labels("Distribution  Charge 06/01/2024 - 06/30/2024") == "Distribution Charge"
+    assert strip_period_labels("Delivery Chg Jun 1 - Jun 15, 2024") == "Delivery Chg"
+    assert strip_period_labels("Energy Charge Period 2") == "Energy Charge"
+    assert strip_period_labels("Customer Charge (1 of 2)") == "Customer Charge"
+    # Meter numbers, rate identifiers and tiers are kept
+    assert strip_period_labels("Meter 12345 Rate R-1 Energy 0-1000 kWh") == "Meter 12345 Rate R-1 Energy 0-1000 kWh"
+
+def test_unseen_names_are_learned_and_persisted(tmp_path):
+    """Test that only unseen names need the LLM, and its answers are reused across instances."""
+    mapping_file = tmp_path / "charge_names.json"
+    normalizer = ChargeNameNormalizer(str(mapping_file))
+
+    resolved, unseen = normalizer.resolve([
+        "Basic Charge (6/1/23-6/15/23)",
+        "BASIC CHARGE (6/16/23-6/30/23)",
+        "Dist Chg Smr",
+    ])
+    assert resolved == {
+        "Basic Charge (6/1/23-6/15/23)": "Basic Charge",
+        "BASIC CHARGE (6/16/23-6/30/23)": "Basic Charge",
+    }
+    assert unseen == ["Dist Chg Smr"]
+
+    assert normalizer.learn({"Dist Chg Smr": "Distribution Charge Summer"}) == {"Dist Chg Smr": "Distribution Charge Summer"}
+    assert json.loads(mapping_file.read_text())["dist chg smr"] == "Distribution Charge Summer"
+
+    resolved, unseen = ChargeNameNormalizer(str(mapping_file)).resolve(["dist chg  smr", "Basic Charge"])
+    assert unseen == []
+    assert resolved == {"dist chg  smr": "Distribution Charge Summer", "Basic Charge": "Basic Charge"}
@@ -0,0 +1,62 @@
+import json
+
+from ..core.checkpoint_store import CheckpointStore, config_hash
+from ..llm_extractors.azure_openai_extractor import AzureOpenAIExtractor
+from ..pipeline.extraction_pipeline import ExtractionPipeline
+
+RESPONSES = {
+    'account_info': {
+        "account_number": "123456789", "invoice_number": "INV-001", "invoice_date": "2024-03-01",
+        "billing_period_start": "2024-02-01", "billing_period_end": "2024-02-29",
+        "vendor_name": "Pacific Power & Light", "customer_name": "John Smith", "service_address": "123 Main St",
+        "meter_numbers": ["P1"], "subtotals": {"Electric Power": 100.0}, "total_amount": 100.0,
+        "commodities": ["Electric Power"]
+    },
+    'determinants': {"determinants": []},
+    'charges': {"charges": [
+        {"name": "Energy Chg Smr", "amount": 100.0, "category": "energy", "commodity": "Electric Power"}
+    ]}
+}
+
+def test_put_and_get_round_trip(tmp_path):
+    """Test that stored stage outputs are returned by stage and key, and misses are counted."""
+    store = CheckpointStore(str(tmp_path))
+    key = config_hash("text hash", {"table_format": "markdown"})
+    assert store.get('preprocess', key) is None
+
+    store.put('preprocess', key, {'text': "processed"})
+    assert store.get('preprocess', key) == {'text': "processed"}
+    assert store.get('ocr', key) is None
+    assert (store.hits, store.misses) == (1, 2)
+    assert not list(tmp_path.rglob("*.tmp"))
+
+def test_corrupt_checkpoint_is_discarded(tmp_path):
+    """Test that an unreadable entry counts as a miss and is removed."""
+    store = CheckpointStore(str(tmp_path))
+    store.put('invoice', "ab" * 32, {'account_number': "1"})
+    path = next(tmp_path.rglob("*.json"))
+    path.write_text("{truncated")
+
+    assert store.get('invoice', "ab" * 32) is None
+    assert not path.exists()
+
+def test_checkpointed_invoice_gets_newly_learned_charge_names(tmp_path):
+    """Test that learning a charge name keeps the invoice checkpoint and renames its charges on read."""
+    extractor = AzureOpenAIExtractor(api_key="test", endpoint="https://example.openai.azure.com/",
+                                     deployment="gpt-4o", charge_names_llm_fallback=False)
+    calls = []
+    def respond(prompt_name, content):
+        calls.append(prompt_name)
+        return json.dumps(RESPONSES[prompt_name])
+    extractor._call_azure_openai = respond
+    store = CheckpointStore(str(tmp_path))
+    pipeline = ExtractionPipeline(None, None, extractor, checkpoint_store=store)
+
+    assert pipeline.extract_data("Energy Chg Smr $100.00", "first.pdf").charges[0].name == "Energy Chg Smr"
+    extractor.name_normalizer.learn({"Energy Chg Smr": "Energy Charge Summer"})
+    invoice = pipeline.extract_data("Energy Chg Smr $100.00", "second.pdf")
+
+    assert invoice.charges[0].name == "Energy Charge Summer"
+    assert invoice.source_file == "second.pdf"
+    assert calls == ['account_info', 'determinants', 'charges']
+    assert store.hits == 1
@@ -0,0 +1,62 @@
+import os
+from pathlib import Path
+
+import yaml
+
+from ..core.models.invoice import Charge, Determinant
+from ..validators.business_rules_validator import BusinessRulesValidator
+from ..validators.compiled_rules import DEFAULT_RULES_PATH, RulesProvider
+from ..validators.json_validator import JSONValidator
+
+def write_rules(path, rules, mtime):
+    with open(path, 'w') as f:
+        yaml.safe_dump(rules, f)
+    # Distinct modification times regardless of filesystem timestamp resolution
+    os.utime(path, (mtime, mtime))
+
+def test_rules_reload_when_file_changes(tmp_path):
+    """Test that edits are picked up, and a broken edit keeps the previous rules."""
+    with open(DEFAULT_RULES_PATH) as f:
+        rules = yaml.safe_load(f)
+    path = tmp_path / "rules.yaml"
+    write_rules(path, rules, 1_000_000)
+
+    provider = RulesProvider(path, check_interval=0)
+    compiled = provider.get()
+    assert "kWh" in compiled.allowed_units and "KWH" in compiled.allowed_units_upper
+    assert compiled.commodity_for_unit("Therms") == "gas"
+    assert compiled.rate_ranges["demand"] == (1.00, 50.00)
+
+    rules['allowed_units'].append("GAL")
+    write_rules(path, rules, 1_000_100)
+    assert "GAL" in provider.get().allowed_units
+    assert provider.reloads == 1
+
+    path.write_text("allowed_units: [unterminated")
+    os.utime(path, (1_000_200, 1_000_200))
+    assert "GAL" in provider.get().allowed_units
+
+def test_validators_share_compiled_rules():
+    """Test that both validators use one compiled rules object, including rate ranges by commodity."""
+    business = BusinessRulesValidator()
+    assert business.rules is JSONValidator().rules
+
+    usage = Determinant(name="Total Usage", value=1000.0, unit="kWh")
+    charge = Charge(name="Energy Charge", amount=900.0, category="Usage", commodity="Electric Power",
+                    determinant=usage, unit_rate=0.9)
+    expensive = Charge(name="Energy Charge", amount=2000.0, category="Usage", commodity="Electric Power",
+                       determinant=usage, unit_rate=2.0)
+    assert business.validate_charges([charge], [usage]) == []
+    assert business.validate_charges([expensive], [usage]) == [
+        "Unit rate 2.0 for Energy Charge outside typical range [0.01, 1.0]"
+    ]
+
+def test_default_config_uses_packaged_rules(tmp_path, monkeypatch):
+    """Test that the shipped business_rules section loads the packaged rules from any working directory."""
+    with open(Path(__file__).parent.parent / "config" / "default_config.yaml") as f:
+        config = yaml.safe_load(f)
+    monkeypatch.chdir(tmp_path)
+
+    validator = BusinessRulesValidator.from_config(config['validators']['business_rules'])
+    assert validator.rules_path == DEFAULT_RULES_PATH.resolve()
+    assert validator.validation_rules
@@ -0,0 +1,90 @@
+import pytest
+
+from ..pipeline.dedupe_index import DedupeIndex
+from ..core.models.synthetic import make_invoices
+
+@pytest.fixture
+def dedupe_index(tmp_path):
+    index = DedupeIndex(str(tmp_path / "dedupe.db"))
+    yield index
+    index.close()
+
+def test_duplicates_found_by_file_and_text(dedupe_index, tmp_path):
+    """Test that a renamed copy matches by file hash and a re-scan by normalized text."""
+    original = tmp_path / "original.pdf"
+    original.write_bytes(b"%PDF scan 1")
+    copy = tmp_path / "renamed.pdf"
+    copy.write_bytes(b"%PDF scan 1")
+    rescan = tmp_path / "rescan.pdf"
+    rescan.write_bytes(b"%PDF scan 2")
+
+    invoice = make_invoices(1)[0]
+    assert dedupe_index.lookup_file(str(original)) is None
+    dedupe_index.add(str(original), "Account 100000\nTotal  $120.00", invoice)
+
+    duplicate = dedupe_index.lookup_file(str(copy))
+    assert duplicate.invoice_number == invoice.invoice_number
+    assert duplicate.source_file == str(copy)
+
+    assert dedupe_index.lookup_file(str(rescan)) is None
+    assert dedupe_index.lookup_text("ACCOUNT 100000 total $120.00 ", str(rescan)) is not None
+    # The re-scan is now indexed by its own file hash
+    rescan_copy = tmp_path / "rescan_copy.pdf"
+    rescan_copy.write_bytes(b"%PDF scan 2")
+    assert dedupe_index.lookup_file(str(rescan_copy)) is not None
+    assert [d['match'] for d in dedupe_index.duplicates()] == ['file', 'text', 'file']
+
+def test_reissued_invoice_number_keeps_new_extraction(dedupe_index, tmp_path):
+    """Test that a document with the same invoice number but different charges is not replaced."""
+    first, second, copy = tmp_path / "first.pdf", tmp_path / "second.pdf", tmp_path / "copy.pdf"
+    first.write_bytes(b"first")
+    second.write_bytes(b"second")
+    copy.write_bytes(b"second")
+    invoice, reissued = make_invoices(2)
+    reissued.account_number = invoice.account_number
+    reissued.invoice_number = invoice.invoice_number
+    reissued.charges[0].amount += 25.0
+    reissued.total_amount += 25.0
+
+    assert dedupe_index.add(str(first), "first text", invoice) is invoice
+    assert dedupe_index.add(str(second), "second text", reissued) is reissued
+    duplicate = dedupe_index.duplicates()[0]
+    assert (duplicate['match'], duplicate['original_file']) == ('invoice_number', str(first))
+
+    # The reissue is indexed with its own charges
+    copied = dedupe_index.lookup_file(str(copy))
+    assert copied.charges[0].amount == reissued.charges[0].amount
+    assert copied.total_amount == reissued.total_amount
+
+def utility_bill(month, usage, amount):
+    lines = [
+        "PACIFIC POWER & LIGHT", "Account Number 100000-1", "Service Address 123 Main St Springfield",
+        f"Billing Period 2024-{month:02d}-01 to 2024-{month:02d}-28",
+        f"Previous Reading {10000 + month * 900} Current Reading {10000 + month * 900 + usage}",
+        f"Total Usage {usage} kWh", f"Energy Charge {usage} kWh x $0.1123 ${usage * 0.1123:.2f}",
+        "Basic Charge $12.50", f"Total Amount Due ${amount:.2f}",
+        "Please pay by the due date to avoid a late fee of 1.5% per month. Thank you for your business."
+    ]
+    lines += [f"Conservation tip {i}: turn off lights and unplug unused devices in room {i}" for i in range(20)]
+    return "\n".join(lines)
+
+def test_near_duplicate_rescan_reuses_extraction(tmp_path):
+    """Test that a stamped re-scan reuses the extraction but next month's bill from the same account does not."""
+    index = DedupeIndex(str(tmp_path / "dedupe.db"), similarity_threshold=0.7, reuse_threshold=0.9)
+    paths = {}
+    for name in ["march.pdf", "rescan.pdf", "april.pdf"]:
+        paths[name] = tmp_path / name
+        paths[name].write_bytes(name.encode())
+
+    march = utility_bill(3, 1210, 190.55)
+    invoice = make_invoices(1)[0]
+    index.add(str(paths["march.pdf"]), march, invoice)
+
+    rescan = march.replace("Thank you", "PAID 03/15 Thank you").replace("Springfield", "Springfie1d")
+    duplicate = index.lookup_text(rescan, str(paths["rescan.pdf"]))
+    assert duplicate is not None and duplicate.invoice_number == invoice.invoice_number
+    assert index.duplicates()[-1]['match'] == 'near_text'
+
+    # Same layout and wording, different amounts and readings
+    assert index.lookup_text(utility_bill(4, 1012, 168.20), str(paths["april.pdf"])) is None
+    index.close()
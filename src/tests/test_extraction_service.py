@@ -0,0 +1,95 @@
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+import json
+import time
+
+import pytest
+
+from ..core.exceptions import ExtractionError
+from ..core.models.extraction_result import ExtractionResult
+from ..pipeline.batch_runner import BatchRunner
+from ..pipeline.job_store import JobStore, VALIDATED, FAILED
+from ..service.extraction_service import ExtractionService, BATCH_DONE
+from ..core.models.synthetic import make_invoices
+
+class StubPipeline:
+    """Pipeline stand-in that fails for files named 'bad' and counts invoices."""
+    checkpoint_store = None
+
+    def __init__(self):
+        self.processed = []
+
+    def _invoice(self, file_path):
+        if 'bad' in file_path:
+            raise ExtractionError("unreadable")
+        self.processed.append(file_path)
+        invoice = make_invoices(1)[0]
+        invoice.source_file = file_path
+        return invoice
+
+    def process(self, file_path):
+        return self._invoice(file_path)
+
+    def find_duplicate(self, file_path):
+        return None
+
+    def extract_text(self, file_path):
+        return ExtractionResult(raw_text="text", metadata={"file_path": file_path, "page_count": 1, "language": "en"})
+
+    def extract_invoice(self, extraction_result, file_path):
+        return self._invoice(file_path)
+
+    def validate(self, invoice):
+        return invoice
+
+def call(service, method, path, body=None, content_type='application/json'):
+    data = json.dumps(body).encode() if isinstance(body, dict) else body
+    request = Request(service.url + path.lstrip('/'), data=data, method=method,
+                      headers={'Content-Type': content_type} if data is not None else {})
+    try:
+        with urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except HTTPError as e:
+        return e.code, json.loads(e.read())
+
+@pytest.fixture
+def service(tmp_path):
+    pipeline = StubPipeline()
+    runner = BatchRunner(pipeline, JobStore(str(tmp_path / "jobs.db")))
+    with ExtractionService(pipeline, runner, port=0, upload_dir=str(tmp_path / "uploads")) as service:
+        yield service
+    runner.job_store.close()
+
+def test_extract_file_path_and_upload(service, tmp_path):
+    """Test synchronous extraction by path and by upload, and the error statuses."""
+    invoice_file = tmp_path / "invoice.pdf"
+    invoice_file.write_bytes(b"%PDF invoice")
+
+    status, invoice = call(service, 'POST', '/extract', {'file_path': str(invoice_file)})
+    assert status == 200 and invoice['account_info']['source_file'] == str(invoice_file)
+
+    status, invoice = call(service, 'POST', '/extract?filename=scan%201.pdf', b"%PDF upload", 'application/pdf')
+    assert status == 200 and invoice['account_info']['source_file'].endswith('-scan_1.pdf')
+
+    assert call(service, 'POST', '/extract', {'file_path': str(tmp_path / "missing.pdf")})[0] == 404
+    assert call(service, 'POST', '/extract?filename=bad.pdf', b"%PDF", 'application/pdf')[0] == 422
+    assert call(service, 'POST', '/extract', {})[0] == 400
+
+def test_batch_job_status_polling(service):
+    """Test that a submitted batch is processed in the background and reports each file."""
+    status, submitted = call(service, 'POST', '/batches', {'file_paths': ['a.pdf', 'bad.pdf']})
+    assert status == 202
+
+    deadline = time.time() + 10
+    while True:
+        status, batch = call(service, 'GET', f"{submitted['status_url']}?include=invoices")
+        if batch['status'] == BATCH_DONE or time.time() > deadline:
+            break
+        time.sleep(0.05)
+
+    assert status == 200 and batch['status'] == BATCH_DONE
+    assert batch['counts'] == {VALIDATED: 1, FAILED: 1}
+    good, bad = batch['files']
+    assert good['invoice']['account_info']['source_file'] == 'a.pdf'
+    assert 'unreadable' in bad['error']
+    assert call(service, 'GET', '/batches/' + '0' * 32)[0] == 404
@@ -0,0 +1,67 @@
+from datetime import date
+
+from ..validators.history_store import InvoiceHistoryStore
+from ..validators.history_validator import HistoricalAnomalyValidator, TOTAL_KEY
+from ..core.models.synthetic import make_invoices
+
+def monthly_invoice(month, usage):
+    invoice = make_invoices(1, charges_per_invoice=2)[0]
+    invoice.invoice_number = f"INV-{month}"
+    invoice.billing_period_start = date(2024, month, 1)
+    invoice.billing_period_end = date(2024, month, 28)
+    invoice.determinants[0].value = usage
+    return invoice
+
+def test_history_flags_outliers_after_warm_up(tmp_path):
+    """Test that usage far from the account's history is flagged and learned only clipped."""
+    store = InvoiceHistoryStore(str(tmp_path / "history.db"))
+    validator = HistoricalAnomalyValidator(store, min_history=3)
+
+    for month, usage in enumerate([1000.0, 1040.0, 980.0, 1010.0], start=1):
+        assert validator.validate(monthly_invoice(month, usage)) == (True, [])
+    # Reprocessing an invoice does not count it twice
+    assert not validator.record(monthly_invoice(4, 1010.0))
+
+    is_valid, errors = validator.validate(monthly_invoice(5, 9000.0))
+    assert not is_valid
+    assert any("z-score" in error for error in errors)
+    assert any("8.91x the previous period" in error for error in errors)
+
+    history = store.lookup("100000")
+    usage_stats = history[("M0", "Electric Power", "total usage [kWh]")]
+    assert usage_stats.count == 5 and usage_stats.last_value < 1300.0
+    assert usage_stats.mean < 1100.0
+    assert history[TOTAL_KEY].count == 5
+
+def test_history_follows_a_step_change(tmp_path):
+    """Test that a lasting change in usage stops being flagged after a few periods."""
+    validator = HistoricalAnomalyValidator(InvoiceHistoryStore(str(tmp_path / "history.db")), min_history=3)
+    for month, usage in enumerate([1000.0, 1040.0, 980.0, 1010.0], start=1):
+        validator.validate(monthly_invoice(month, usage))
+
+    flagged = [not validator.validate(monthly_invoice(month, 2500.0))[0] for month in range(5, 12)]
+    assert flagged[0] and not flagged[-1]
+
+def test_invoices_without_account_are_not_recorded(tmp_path):
+    """Test that invoices with an unread account number do not share a history."""
+    store = InvoiceHistoryStore(str(tmp_path / "history.db"))
+    validator = HistoricalAnomalyValidator(store, min_history=1)
+    for month, usage in [(1, 1000.0), (2, 9000.0)]:
+        invoice = monthly_invoice(month, usage)
+        invoice.account_number = "N/A"
+        assert validator.validate(invoice) == (True, [])
+        assert not validator.record(invoice)
+    assert store.lookup("N/A") == {}
+
+def test_revalidating_an_invoice_keeps_its_anomalies(tmp_path):
+    """Test that validating a recorded invoice again reports the anomalies of the first check."""
+    store = InvoiceHistoryStore(str(tmp_path / "history.db"))
+    validator = HistoricalAnomalyValidator(store, min_history=3)
+    for month, usage in enumerate([1000.0, 1040.0, 980.0, 1010.0, 995.0], start=1):
+        validator.validate(monthly_invoice(month, usage))
+
+    outlier = monthly_invoice(6, 1600.0)
+    first = validator.validate(outlier)
+    assert not first[0] and any("z-score" in error for error in first[1])
+    assert validator.validate(outlier) == first
+    assert store.lookup("100000")[TOTAL_KEY].count == 6
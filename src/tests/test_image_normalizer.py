@@ -0,0 +1,39 @@
+import io
+import re
+
+from PIL import Image
+
+from ..extractors.image_normalizer import ImageNormalizer, EXIF_ORIENTATION
+
+def encode(image, **params):
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', **params)
+    return buffer.getvalue()
+
+def test_photo_is_oriented_grayscale_and_downscaled():
+    """Test that a rotated 400 dpi colour photo is uprighted, converted and fits the size limit."""
+    photo = Image.effect_noise((4400, 3400), 64).convert('RGB')
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6  # Stored sideways, displayed rotated 90 degrees
+    data = encode(photo, quality=95, exif=exif.tobytes())
+
+    normalized = ImageNormalizer(target_dpi=200, max_bytes=1_000_000).normalize(data)
+
+    assert normalized.changed and normalized.content_type == 'image/jpeg'
+    assert normalized.size == (1700, 2200)
+    assert len(normalized.data) <= 1_000_000 < normalized.original_bytes
+    with Image.open(io.BytesIO(normalized.data)) as image:
+        assert image.mode == 'L'
+
+def test_small_scan_is_uploaded_unchanged():
+    """Test that an image that would not shrink is sent as it is."""
+    data = encode(Image.effect_noise((850, 1100), 64), quality=60)
+    normalized = ImageNormalizer().normalize(data)
+    assert not normalized.changed and normalized.data == data
+
+def test_bundle_builds_one_pdf_page_per_image():
+    """Test that page images are combined into one PDF with a page each."""
+    pages = [encode(Image.effect_noise((850, 1100), 32).convert('RGB')) for _ in range(3)]
+    bundle = ImageNormalizer().bundle(pages)
+    assert bundle.content_type == 'application/pdf' and bundle.data.startswith(b'%PDF')
+    assert len(re.findall(rb'/Type\s*/Page\b', bundle.data)) == 3
@@ -0,0 +1,68 @@
+import pytest
+
+from ..pipeline.job_store import JobStore, QUEUED, OCR_DONE, LLM_DONE, VALIDATED, FAILED
+
+@pytest.fixture
+def job_store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    yield store
+    store.close()
+
+def test_enqueue_ignores_known_files(job_store):
+    """Test that re-queueing a file keeps its progress."""
+    assert job_store.enqueue(["a.pdf", "b.pdf"]) == 2
+    job_store.mark_ocr_done("a.pdf", {"raw_text": "text"})
+    
+    assert job_store.enqueue(["a.pdf", "c.pdf"]) == 1
+    assert job_store.get("a.pdf").state == OCR_DONE
+    assert job_store.counts()[QUEUED] == 2
+
+def test_pending_excludes_finished_jobs(job_store):
+    """Test that validated and failed jobs are not pending."""
+    job_store.enqueue(["a.pdf", "b.pdf", "c.pdf"])
+    job_store.mark_validated("a.pdf", {"account_info": {}})
+    job_store.mark_failed("b.pdf", "ExtractionError: quota")
+    
+    assert [job.file_path for job in job_store.pending()] == ["c.pdf"]
+    assert job_store.get("a.pdf").state == VALIDATED
+
+def test_stage_outputs_survive_reopen(tmp_path):
+    """Test that completed stages are durable across restarts."""
+    db_path = str(tmp_path / "jobs.db")
+    store = JobStore(db_path)
+    store.enqueue(["a.pdf"])
+    store.start_attempt("a.pdf")
+    store.mark_llm_done("a.pdf", {"account_info": {"account_number": "123"}})
+    store.close()
+    
+    reopened = JobStore(db_path)
+    job = reopened.get("a.pdf")
+    assert job.state == LLM_DONE
+    assert job.attempts == 1
+    assert job.invoice["account_info"]["account_number"] == "123"
+    reopened.close()
+
+def test_requeue_failed_resumes_at_last_stage(job_store):
+    """Test that failed jobs are re-queued at their last completed stage."""
+    job_store.enqueue(["ocr.pdf", "llm.pdf", "none.pdf"])
+    job_store.mark_ocr_done("ocr.pdf", {"raw_text": "text"})
+    job_store.mark_llm_done("llm.pdf", {"account_info": {}})
+    for path in ["ocr.pdf", "llm.pdf", "none.pdf"]:
+        job_store.start_attempt(path)
+        job_store.mark_failed(path, "TimeoutError")
+    
+    assert job_store.requeue_failed() == 3
+    assert job_store.get("ocr.pdf").state == OCR_DONE
+    assert job_store.get("llm.pdf").state == LLM_DONE
+    assert job_store.get("none.pdf").state == QUEUED
+
+def test_requeue_failed_respects_max_attempts(job_store):
+    """Test that jobs out of attempts stay failed."""
+    job_store.enqueue(["a.pdf"])
+    for _ in range(3):
+        job_store.start_attempt("a.pdf")
+    job_store.mark_failed("a.pdf", "ExtractionError")
+    
+    assert job_store.requeue_failed(max_attempts=3) == 0
+    assert job_store.get("a.pdf").state == FAILED
+    assert job_store.get("a.pdf").error == "ExtractionError"
@@ -0,0 +1,21 @@
+from ..validators.json_validator import JSONValidator
+from ..core.models.synthetic import make_invoices
+
+def test_schemas_are_compiled_once():
+    """Test that validators share the compiled schemas."""
+    assert JSONValidator().invoice_validator is JSONValidator().invoice_validator
+
+def test_validate_batch_reports_schema_paths():
+    """Test that valid invoices pass and schema violations are reported with their path."""
+    valid, invalid = make_invoices(2, charges_per_invoice=2)
+    invalid.charges[1].category = "Energy"
+    invalid.determinants[0].start_date = "2024-02-30"
+    invalid.determinants[0].end_date = "2024-03-01"
+
+    results = JSONValidator().validate_batch([valid, invalid])
+
+    assert results[0] == (True, [])
+    is_valid, errors = results[1]
+    assert not is_valid
+    assert any(error.startswith("Schema validation failed at charges/1/category") for error in errors)
+    assert any(error.startswith("Schema validation failed at determinants/0/start_date") for error in errors)
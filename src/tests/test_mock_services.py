@@ -0,0 +1,76 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ..mock_services import FaultProfile, Recordings, MockDocIntelServer, MockOpenAIServer
+
+MESSAGES = [
+    {"role": "system", "content": "Return account information."},
+    {"role": "user", "content": "INVOICE TEXT: \n\nAccount 123"}
+]
+
+def post(url, body, content_type="application/json"):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode()
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": content_type}, method="POST")
+    return urllib.request.urlopen(request, timeout=5)
+
+@pytest.fixture
+def recordings(tmp_path):
+    recordings = Recordings(str(tmp_path / "recordings"))
+    recordings.save_docintel(b"%PDF-1.4 invoice", {"content": "Account 123", "pages": [{"pageNumber": 1}]})
+    recordings.save_chat(MESSAGES, '{"account_number": "123"}')
+    return recordings
+
+def test_docintel_analyze_and_poll(recordings):
+    """Test the analyze long-running operation protocol."""
+    with MockDocIntelServer(recordings, FaultProfile(latency_mean=0.2), poll_interval=0.05) as server:
+        url = f"{server.url}documentintelligence/documentModels/prebuilt-layout:analyze?api-version=2024-11-30"
+        response = post(url, b"%PDF-1.4 invoice", content_type="application/octet-stream")
+        assert response.status == 202
+        location = response.headers["Operation-Location"]
+        assert "/analyzeResults/" in location
+
+        first = json.load(urllib.request.urlopen(location, timeout=5))
+        assert first["status"] == "running"
+        time.sleep(0.25)
+        final = json.load(urllib.request.urlopen(location, timeout=5))
+        assert final["status"] == "succeeded"
+        assert final["analyzeResult"]["content"] == "Account 123"
+
+def test_openai_serves_recording_and_system_fallback(recordings):
+    """Test recorded chat completions, including unseen user content."""
+    with MockOpenAIServer(recordings) as server:
+        url = f"{server.url}openai/deployments/gpt-4o/chat/completions?api-version=2024-02-01"
+        body = json.load(post(url, {"messages": MESSAGES}))
+        assert body["choices"][0]["message"]["content"] == '{"account_number": "123"}'
+        assert body["usage"]["completion_tokens"] > 0
+
+        other = [MESSAGES[0], {"role": "user", "content": "INVOICE TEXT: \n\nAccount 456"}]
+        body = json.load(post(url, {"messages": other}))
+        assert body["choices"][0]["message"]["content"] == '{"account_number": "123"}'
+
+def test_openai_streams_chunks(recordings):
+    """Test server-sent event streaming of the recorded content."""
+    with MockOpenAIServer(recordings) as server:
+        url = f"{server.url}openai/deployments/gpt-4o/chat/completions"
+        lines = post(url, {"messages": MESSAGES, "stream": True}).read().decode().split("\n\n")
+        events = [line[len("data: "):] for line in lines if line.startswith("data: ")]
+        assert events[-1] == "[DONE]"
+        content = "".join(
+            json.loads(e)["choices"][0]["delta"].get("content", "") for e in events[:-1]
+        )
+        assert content == '{"account_number": "123"}'
+
+def test_throttling_sends_retry_after(recordings):
+    """Test injected 429 responses."""
+    faults = FaultProfile(throttle_rate=1.0, retry_after=3, seed=1)
+    with MockOpenAIServer(recordings, faults=faults) as server:
+        url = f"{server.url}openai/deployments/gpt-4o/chat/completions"
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(url, {"messages": MESSAGES})
+        assert error.value.code == 429
+        assert error.value.headers["Retry-After"] == "3"
+        assert server.stats()["status_counts"] == {429: 1}
@@ -0,0 +1,108 @@
+from types import SimpleNamespace
+
+import pytest
+from azure.core.exceptions import HttpResponseError
+
+from ..core.operation_store import OperationStore, operation_key
+from ..extractors.azure_docintel_extractor import AzureDocIntelExtractor
+
+def test_tokens_survive_reopening_and_expire(tmp_path):
+    """Test that a token saved by one process is found by the next until it is too old."""
+    db_path = str(tmp_path / "operations.db")
+    key = operation_key(b"%PDF invoice", "prebuilt-layout", None)
+    assert key != operation_key(b"%PDF invoice", "prebuilt-layout", "1-10")
+
+    store = OperationStore(db_path)
+    store.put(key, "token-1", "invoice.pdf")
+    store.close()
+
+    restarted = OperationStore(db_path)
+    assert restarted.get(key) == "token-1" and restarted.pending() == 1
+    restarted.delete(key)
+    assert restarted.get(key) is None
+
+    restarted.put(key, "token-2")
+    restarted.max_age = -1
+    assert restarted.get(key) is None and restarted.pending() == 0
+    restarted.close()
+
+class FakePoller:
+    """Poller stand-in checking which token is stored while the analysis runs."""
+
+    def __init__(self, token, result, error=None, on_result=None):
+        self.token = token
+        self._result = result
+        self.error = error
+        self.on_result = on_result
+
+    def continuation_token(self):
+        return self.token
+
+    def result(self):
+        if self.on_result is not None:
+            self.on_result()
+        if self.error is not None:
+            raise self.error
+        return self._result
+
+class FakeDocIntelClient:
+    """Document Intelligence client stand-in recording resumed and uploaded analyses."""
+
+    def __init__(self, resume_error=None, upload_error=None):
+        self.resume_error = resume_error
+        self.upload_error = upload_error
+        self.calls = []
+        self.on_upload_result = None
+
+    def begin_analyze_document(self, model_id, analyze_request=None, continuation_token=None, **kwargs):
+        if continuation_token is not None:
+            self.calls.append(('resume', continuation_token))
+            return FakePoller(continuation_token, SimpleNamespace(pages=[1, 2], source='resumed'), self.resume_error)
+        self.calls.append(('upload', analyze_request.read()))
+        return FakePoller("token-new", SimpleNamespace(pages=[1, 2], source='uploaded'),
+                          self.upload_error, self.on_upload_result)
+
+def make_extractor(tmp_path, client):
+    store = OperationStore(str(tmp_path / "operations.db"))
+    extractor = AzureDocIntelExtractor(endpoint="https://example.cognitiveservices.azure.com/", key="test",
+                                       operation_store=store)
+    extractor.client = client
+    return extractor, store
+
+def test_unfinished_analysis_is_resumed(tmp_path):
+    """Test that a stored continuation token is resumed instead of uploading again, then deleted."""
+    client = FakeDocIntelClient()
+    extractor, store = make_extractor(tmp_path, client)
+    key = operation_key(b"%PDF invoice", extractor.model_id, None)
+    store.put(key, "token-1", "invoice.pdf")
+
+    assert extractor._analyze(b"%PDF invoice", "invoice.pdf").source == 'resumed'
+    assert client.calls == [('resume', "token-1")]
+    assert store.get(key) is None
+    store.close()
+
+def test_failed_resume_uploads_the_document_again(tmp_path):
+    """Test that an expired token is deleted, the document is uploaded and its own token kept until done."""
+    client = FakeDocIntelClient(resume_error=HttpResponseError(message="Operation expired"))
+    extractor, store = make_extractor(tmp_path, client)
+    key = operation_key(b"%PDF invoice", extractor.model_id, None)
+    store.put(key, "token-expired", "invoice.pdf")
+    stored_during_upload = []
+    client.on_upload_result = lambda: stored_during_upload.append(store.get(key))
+
+    assert extractor._analyze(b"%PDF invoice", "invoice.pdf").source == 'uploaded'
+    assert client.calls == [('resume', "token-expired"), ('upload', b"%PDF invoice")]
+    assert stored_during_upload == ["token-new"]
+    assert store.get(key) is None
+    store.close()
+
+def test_failed_upload_deletes_its_token(tmp_path):
+    """Test that a failed analysis is not left to be resumed by the next run."""
+    client = FakeDocIntelClient(upload_error=HttpResponseError(message="InvalidContent"))
+    extractor, store = make_extractor(tmp_path, client)
+
+    with pytest.raises(HttpResponseError):
+        extractor._analyze(b"%PDF invoice", "invoice.pdf")
+    assert client.calls == [('upload', b"%PDF invoice")]
+    assert store.pending() == 0
+    store.close()
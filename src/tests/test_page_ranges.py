@@ -0,0 +1,48 @@
+import io
+
+from PIL import Image
+
+from ..extractors.page_ranges import count_pdf_pages, page_ranges, merge_analyze_results
+
+def part(first_page, content, paragraph_count):
+    """Synthetic analyzeResult of a page range with one table on its first page."""
+    return {
+        'apiVersion': '2024-02-29-preview',
+        'modelId': 'prebuilt-layout',
+        'content': content,
+        'pages': [{'pageNumber': first_page, 'spans': [{'offset': 0, 'length': len(content)}]}],
+        'paragraphs': [{'content': content, 'spans': [{'offset': 0, 'length': len(content)}]}
+                       for _ in range(paragraph_count)],
+        'tables': [{
+            'rowCount': 1, 'columnCount': 1,
+            'boundingRegions': [{'pageNumber': first_page, 'polygon': [0, 0, 1, 0, 1, 1, 0, 1]}],
+            'spans': [{'offset': 2, 'length': 3}]
+        }],
+        'sections': [{'spans': [{'offset': 0, 'length': len(content)}], 'elements': ['/paragraphs/0', '/tables/0']}]
+    }
+
+def test_merge_moves_spans_and_element_references():
+    """Test that a later range's offsets and references point into the merged content."""
+    first, second = part(1, 'first page', 2), part(11, 'eleventh page', 1)
+    merged = merge_analyze_results([first, second])
+
+    assert merged['content'] == 'first page\neleventh page'
+    assert merged['modelId'] == 'prebuilt-layout'
+    assert [page['pageNumber'] for page in merged['pages']] == [1, 11]
+    assert len(merged['paragraphs']) == 3 and len(merged['tables']) == 2
+    table = merged['tables'][1]
+    assert table['boundingRegions'][0]['pageNumber'] == 11
+    start = table['spans'][0]['offset']
+    assert merged['content'][start:start + 3] == 'eve'
+    assert merged['sections'][1]['elements'] == ['/paragraphs/2', '/tables/1']
+    assert first['tables'][0]['spans'][0]['offset'] == 2  # Parts are not modified
+
+def test_pdf_page_count_and_ranges():
+    """Test that the page tree of a PDF gives the ranges to analyze."""
+    buffer = io.BytesIO()
+    pages = [Image.new('L', (100, 100)) for _ in range(23)]
+    pages[0].save(buffer, format='PDF', save_all=True, append_images=pages[1:])
+
+    assert count_pdf_pages(buffer.getvalue()) == 23
+    assert count_pdf_pages(b'\xff\xd8 not a pdf') is None
+    assert page_ranges(23, 10) == ['1-10', '11-20', '21-23']
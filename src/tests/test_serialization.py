@@ -0,0 +1,37 @@
+import pytest
+
+from ..core import serialization
+from ..core.models.invoice import Invoice
+from ..core.serialization import NDJSONSink
+from ..core.models.synthetic import make_invoices
+
+@pytest.fixture(params=['orjson', 'json'])
+def backend(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setattr(serialization, 'orjson', None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+def test_ndjson_round_trip(backend, tmp_path):
+    """Test that invoices appended to NDJSON load back unchanged, with either encoder."""
+    invoices = make_invoices(3, charges_per_invoice=2)
+    path = tmp_path / "invoices.ndjson"
+    with NDJSONSink(str(path)) as sink:
+        for invoice in invoices[:2]:
+            sink.write(invoice)
+    # Appending to an existing file keeps earlier records
+    with NDJSONSink(str(path)) as sink:
+        sink.write(invoices[2])
+    # A writer interrupted mid-record leaves an incomplete last line
+    with open(path, 'ab') as f:
+        f.write(b'{"account_info": {"account_')
+
+    loaded = list(Invoice.iter_ndjson(str(path)))
+    assert [invoice.to_json() for invoice in loaded] == [invoice.to_json() for invoice in invoices]
+
+def test_save_and_load_json(backend, tmp_path):
+    """Test the single-file save_json/load_json path."""
+    invoice = make_invoices(1)[0]
+    json_path = invoice.save_json(str(tmp_path))
+    assert Invoice.load_json(json_path).to_json() == invoice.to_json()
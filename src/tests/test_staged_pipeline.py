@@ -0,0 +1,100 @@
+import threading
+
+from ..core.models.extraction_result import ExtractionResult
+from ..pipeline.extraction_pipeline import ExtractionPipeline
+from ..pipeline.staged_pipeline import StagedPipeline, StageConfig
+from ..core.models.synthetic import make_invoices
+
+class Recorder:
+    """Text extractor, preprocessor, data extractor and validator stand-in logging every call."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def _log(self, stage, file_path):
+        with self.lock:
+            self.calls.append((file_path, stage))
+
+    def extract(self, *args):
+        if len(args) == 1:
+            file_path = args[0]
+            self._log('ocr', file_path)
+            if 'unreadable' in file_path:
+                raise IOError("cannot open")
+            return ExtractionResult(raw_text=file_path, metadata={
+                'file_path': file_path, 'page_count': 1, 'language': 'en'})
+        processed_text, file_path = args
+        self._log('llm', file_path)
+        invoice = make_invoices(1)[0]
+        invoice.source_file = file_path
+        return invoice
+
+    def process(self, extraction_result):
+        self._log('preprocess', extraction_result.raw_text)
+        return extraction_result.raw_text
+
+    def validate(self, invoice):
+        self._log('validate', invoice.source_file)
+        return True, []
+
+def staged(recorder):
+    pipeline = ExtractionPipeline(recorder, recorder, recorder, validator=recorder)
+    config = {name: StageConfig(concurrency=2, executor='thread', queue_size=2)
+              for name in StagedPipeline.STAGES}
+    return StagedPipeline(pipeline, config)
+
+def run_with_timeout(staged_pipeline, file_paths, timeout=10):
+    """Collect run() results on a thread so a hang fails the test instead of blocking it."""
+    outcome = {}
+    def consume():
+        try:
+            outcome['results'] = list(staged_pipeline.run(file_paths))
+        except Exception as e:
+            outcome['error'] = e
+    thread = threading.Thread(target=consume, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "staged pipeline did not shut down"
+    return outcome
+
+def test_every_file_passes_the_stages_in_order():
+    """Test that each file runs ocr, preprocess, llm and validate once, in that order."""
+    recorder = Recorder()
+    files = [f"{i}.pdf" for i in range(12)]
+    outcome = run_with_timeout(staged(recorder), files)
+
+    assert sorted(r.file_path for r in outcome['results']) == sorted(files)
+    assert all(r.ok and r.invoice.source_file == r.file_path for r in outcome['results'])
+    for file_path in files:
+        stages = [stage for path, stage in recorder.calls if path == file_path]
+        assert stages == ['ocr', 'preprocess', 'llm', 'validate']
+
+def test_stage_failure_skips_later_stages():
+    """Test that a failed file is reported with its stage and not processed further."""
+    recorder = Recorder()
+    outcome = run_with_timeout(staged(recorder), ["a.pdf", "unreadable.pdf", "b.pdf"])
+
+    results = {r.file_path: r for r in outcome['results']}
+    assert results['unreadable.pdf'].error.startswith("ocr: OSError")
+    assert [stage for path, stage in recorder.calls if path == 'unreadable.pdf'] == ['ocr']
+    assert results['a.pdf'].ok and results['b.pdf'].ok
+
+def test_failing_input_shuts_down_and_raises():
+    """Test that an error reading the input drains the stages and is raised instead of hanging."""
+    def file_paths():
+        yield "a.pdf"
+        yield "b.pdf"
+        raise RuntimeError("listing failed")
+
+    recorder = Recorder()
+    outcome = run_with_timeout(staged(recorder), file_paths())
+    assert isinstance(outcome['error'], RuntimeError)
+    assert sorted(path for path, stage in recorder.calls if stage == 'validate') == ['a.pdf', 'b.pdf']
+
+def test_process_validates_once():
+    """Test that the synchronous pipeline validates each invoice a single time."""
+    recorder = Recorder()
+    pipeline = ExtractionPipeline(recorder, recorder, recorder, validator=recorder)
+    assert pipeline.process("a.pdf").source_file == "a.pdf"
+    assert [stage for _, stage in recorder.calls] == ['ocr', 'preprocess', 'llm', 'validate']
@@ -0,0 +1,51 @@
+import json
+from types import SimpleNamespace
+
+from ..llm_extractors.azure_openai_extractor import AzureOpenAIExtractor
+from ..llm_extractors.incremental_json import IncrementalArrayParser
+
+CHARGES = {"charges": [
+    {"name": "Customer Charge", "amount": 12.0, "category": "fixed", "commodity": "Electric Power"},
+    {"name": "Energy [Tier {1}]", "amount": 45.1, "category": "energy", "commodity": "Electric Power",
+     "notes": "quoted \"}]\" text"},
+]}
+
+def test_parser_emits_elements_as_they_complete():
+    """Test that array elements are returned as soon as they close, whatever the chunking."""
+    document = json.dumps(CHARGES)
+    parser = IncrementalArrayParser(array_key='charges')
+    emitted = []
+    for i in range(0, len(document), 7):
+        emitted.extend((i, element) for element in parser.feed(document[i:i + 7]))
+
+    assert [element for _, element in emitted] == CHARGES["charges"]
+    # The first charge is available before the document is complete
+    assert emitted[0][0] < len(document) // 2
+    assert parser.array_closed
+
+    top_level = IncrementalArrayParser()
+    assert top_level.feed(json.dumps(CHARGES["charges"])) == CHARGES["charges"]
+
+def test_streamed_charges_reach_callback_before_stream_ends():
+    """Test that iter_charges hands each charge over while the response is still streaming."""
+    document = json.dumps(CHARGES)
+    sent = []
+
+    def create(**kwargs):
+        assert kwargs['stream']
+        for i in range(0, len(document), 5):
+            sent.append(document[i:i + 5])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=document[i:i + 5]))], usage=None)
+
+    received = []
+    extractor = AzureOpenAIExtractor(api_key="test", endpoint="https://example.openai.azure.com/", deployment="gpt-4o",
+                                     charge_names_llm_fallback=False, stream_charges=True,
+                                     on_charge=lambda charge: received.append((charge, len(sent))))
+    extractor.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    charges = extractor.extract_charges("INVOICE", [])
+
+    assert [c.name for c in charges] == ["Customer Charge", "Energy [Tier {1}]"]
+    assert received[0][1] < len(sent)
+    assert len(extractor.stream_latencies['first_charge']) == 1
+    assert extractor.usage_snapshot()['calls'] == 1
@@ -0,0 +1,44 @@
+import json
+
+from ..core import TABLE_START_TOKEN, TABLE_END_TOKEN
+from ..preprocessors.basic_preprocessor_v2 import BasicPreprocessorV2
+from ..preprocessors.table_renderers import TABLE_RENDERERS, render_markdown, render_tsv, render_json_rows
+from ..preprocessors.token_estimator import estimate_tokens
+
+def make_table(rows):
+    return {'cells': [
+        {'rowIndex': r, 'columnIndex': c, 'content': value}
+        for r, row in enumerate(rows)
+        for c, value in enumerate(row)
+    ]}
+
+TABLE = make_table([
+    ["Description", "Usage", "Amount"],
+    ["Distribution Charge", "1,250 kWh", "$45.10"],
+    ["Customer Charge", "", "$12.00"],
+])
+
+def test_compact_renderers():
+    """Test the markdown, TSV and JSON-rows renderings of a table."""
+    assert render_markdown(TABLE).splitlines()[:3] == [
+        "|Description|Usage|Amount|",
+        "|-|-|-|",
+        "|Distribution Charge|1,250 kWh|$45.10|",
+    ]
+    assert render_tsv(TABLE).splitlines()[2] == "Customer Charge\t\t$12.00"
+    rows = [json.loads(line) for line in render_json_rows(TABLE).splitlines()]
+    assert rows[1] == {"Description": "Customer Charge", "Amount": "$12.00"}
+
+def test_compact_formats_use_fewer_tokens_than_grid():
+    """Test that every compact format is cheaper than the padded grid."""
+    grid_tokens = estimate_tokens(TABLE_RENDERERS['grid'](TABLE), encoding=None)
+    for name in ('markdown', 'tsv', 'json'):
+        assert estimate_tokens(TABLE_RENDERERS[name](TABLE), encoding=None) < grid_tokens
+
+def test_auto_format_picks_cheapest_rendering():
+    """Test that 'auto' renders each table in its cheapest compact format."""
+    text = BasicPreprocessorV2(table_format='auto')._format_table(TABLE)
+    lines = text.splitlines()
+    assert lines[0] == TABLE_START_TOKEN and lines[-1] == TABLE_END_TOKEN
+    body = "\n".join(lines[1:-1])
+    assert estimate_tokens(body) == min(estimate_tokens(TABLE_RENDERERS[name](TABLE)) for name in ('markdown', 'tsv', 'json'))
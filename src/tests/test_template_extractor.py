@@ -0,0 +1,93 @@
+from datetime import date
+
+import pytest
+
+from ..core.models.extraction_result import ExtractionResult
+from ..core.models.invoice import Invoice, Determinant, Charge
+from ..template_extractors.template_extractor import TemplateExtractor
+from ..template_extractors.template_registry import TemplateRegistry
+from ..template_extractors.fingerprint import compute_fingerprint
+
+def metadata(file_path):
+    return {"file_path": file_path, "page_count": 1, "language": "en"}
+
+def bill(account, usage, charges):
+    """OCR text of a bill of one made-up vendor layout, and its verified invoice."""
+    total = round(sum(amount for _, amount in charges), 2)
+    lines = [
+        "Cascade Valley Electric Cooperative",
+        "Residential Service Statement",
+        f"Account Number: {account}",
+        f"Invoice Number: INV-{account}-07",
+        "Invoice Date: 07/05/2024",
+        "Service Period: 06/01/2024 - 06/30/2024",
+        "Customer: Jordan Lee",
+        "Service Address: 42 Birch Lane",
+        f"Meter: MTR{account}",
+        f"Energy Used {usage} kWh",
+        *[f"{name} ${amount:.2f}" for name, amount in charges],
+        f"Total Amount Due ${total:.2f}",
+    ]
+    invoice = Invoice(
+        account_number=str(account),
+        invoice_number=f"INV-{account}-07",
+        invoice_date=date(2024, 7, 5),
+        billing_period_start=date(2024, 6, 1),
+        billing_period_end=date(2024, 6, 30),
+        vendor_name="Cascade Valley Electric Cooperative",
+        customer_name="Jordan Lee",
+        service_address="42 Birch Lane",
+        meter_numbers=[f"MTR{account}"],
+        determinants=[Determinant(name="Energy Used", value=float(usage), unit="kWh",
+                                  meter=f"MTR{account}", commodity="Electric Power")],
+        charges=[Charge(name=name, amount=amount, category="Usage", commodity="Electric Power",
+                        meter_number=f"MTR{account}") for name, amount in charges],
+        subtotals={},
+        total_amount=total,
+        source_file=f"{account}.pdf",
+        extraction_date=date(2024, 7, 6),
+        commodities=["Electric Power"]
+    )
+    return ExtractionResult(raw_text="\n".join(lines), metadata=metadata(f"{account}.pdf")), invoice
+
+CHARGES = [("Basic Charge", 12.5), ("Energy Charge", 88.4), ("City Tax", 5.1)]
+
+@pytest.fixture
+def extractor(tmp_path):
+    return TemplateExtractor(TemplateRegistry(tmp_path / "templates"), learn=True)
+
+def test_learned_template_extracts_next_bill(extractor, tmp_path):
+    """Test that a template learned from one bill matches and reads another account's bill."""
+    extraction_result, invoice = bill(5551234, 950, CHARGES)
+    assert extractor.learn(extraction_result, invoice)
+    assert len(TemplateRegistry(tmp_path / "templates")) == 1
+
+    next_result, expected = bill(7770001, 1210, [("Basic Charge", 12.5), ("Energy Charge", 112.6),
+                                                 ("City Tax", 6.3)])
+    template, score = extractor.identify(next_result)
+    assert template is not None and score >= extractor.match_threshold
+    assert template['fingerprint'] == compute_fingerprint(extraction_result).to_dict()
+
+    extracted = extractor.extract(next_result, "7770001.pdf")
+    assert extracted.account_number == "7770001"
+    assert extracted.total_amount == expected.total_amount
+    assert [c.amount for c in extracted.charges] == [12.5, 112.6, 6.3]
+    assert extracted.determinants[0].value == 1210.0
+
+def test_unknown_charge_line_falls_back_to_llm(extractor):
+    """Test that a bill with a charge the template cannot read is not extracted."""
+    extraction_result, invoice = bill(5551234, 950, CHARGES)
+    assert extractor.learn(extraction_result, invoice)
+
+    # The late fee is part of the total but has no rule in the template
+    next_result, _ = bill(7770001, 1210, CHARGES + [("Late Fee", 15.0)])
+    assert extractor.identify(next_result)[0] is not None
+    assert extractor.extract(next_result, "7770001.pdf") is None
+
+def test_unrelated_layout_does_not_match(extractor):
+    """Test that a document of another vendor does not match the learned template."""
+    extraction_result, invoice = bill(5551234, 950, CHARGES)
+    extractor.learn(extraction_result, invoice)
+    other = ExtractionResult(raw_text="Northwind Gas Utility\nMonthly Gas Bill\nTherms used 40\n",
+                             metadata=metadata("gas.pdf"))
+    assert extractor.identify(other)[0] is None
@@ -0,0 +1,64 @@
+from ..core import PAGE_TOKEN, TABLE_START_TOKEN, TABLE_END_TOKEN
+from ..core.models.invoice import Charge
+from ..llm_extractors.text_chunker import chunk_text, chunk_overlaps, merge_chunk_results, charge_key, charge_in_text
+from ..preprocessors.token_estimator import estimate_tokens
+
+def make_page(number):
+    lines = [f"Meter {number} service summary for the billing period"] * 5
+    table = [TABLE_START_TOKEN] + [f"|Charge {number}-{i}|$1{i}.00|" for i in range(10)] + [TABLE_END_TOKEN]
+    return f"\n{PAGE_TOKEN}\n" + "\n".join(lines + table) + "\n"
+
+def test_chunks_split_on_page_and_table_boundaries():
+    """Test that chunks respect the budget and never cut a table."""
+    text = "".join(make_page(n) for n in range(1, 9))
+    budget = estimate_tokens(make_page(1)) * 2
+    chunks = chunk_text(text, budget)
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == text
+    for chunk in chunks:
+        assert estimate_tokens(chunk) <= budget
+        assert chunk.count(TABLE_START_TOKEN) == chunk.count(TABLE_END_TOKEN)
+    assert chunk_text(text, estimate_tokens(text)) == [text]
+
+def test_chunks_with_overlap_stay_within_the_budget():
+    """Test that the repeated overlap counts toward each chunk's budget, also for oversized pages."""
+    big_page = f"\n{PAGE_TOKEN}\n" + "".join(f"Usage detail line {i} for meter 7\n" for i in range(60))
+    text = "".join(make_page(n) for n in range(1, 5)) + big_page + make_page(6)
+    budget = estimate_tokens(make_page(1)) * 2
+    overlap = estimate_tokens(make_page(1)) // 2
+    chunks = chunk_text(text, budget, overlap)
+
+    assert len(chunks) > 2
+    assert all(overlap_text for overlap_text in chunk_overlaps(chunks, overlap)[1:])
+    for chunk in chunks:
+        assert estimate_tokens(chunk) <= budget
+
+def test_merge_drops_boundary_duplicates_and_keeps_repeated_charges():
+    """Test that a charge seen by two chunks is kept once, and repeats within a chunk are kept."""
+    def charge(name, amount):
+        return Charge(name=name, amount=amount, category="Fixed", commodity="Electric")
+
+    first = [charge("Customer Charge", 10.0), charge("Tax", 1.5), charge("Tax", 1.5)]
+    second = [charge("tax", "1.50"), charge("Late Fee", 5.0)]
+    merged = merge_chunk_results([first, second], charge_key)
+
+    assert [c.name for c in merged] == ["Customer Charge", "Tax", "Tax", "Late Fee"]
+
+def test_merge_keeps_repeats_outside_the_overlap():
+    """Test that only items found in the text two chunks share are dropped as duplicates."""
+    def charge(name, amount):
+        return Charge(name=name, amount=amount, category="Fixed", commodity="Electric")
+
+    overlaps = chunk_overlaps(["Customer Charge $10.00\nTax $1.50\n", "Tax $1.50\nLate Fee $5.00\n"],
+                              estimate_tokens("Tax $1.50\n"))
+    assert overlaps == ["", "Tax $1.50\n"]
+    first = [charge("Customer Charge", 10.0), charge("Tax", 1.5)]
+    straddling = [charge("Tax", 1.5), charge("Late Fee", 5.0)]
+    assert [c.name for c in merge_chunk_results([first, straddling], charge_key, overlaps, charge_in_text)] \
+        == ["Customer Charge", "Tax", "Late Fee"]
+
+    # The customer charge is printed again on the second chunk's own lines
+    repeated = [charge("Customer Charge", 10.0), charge("Late Fee", 5.0)]
+    assert [c.name for c in merge_chunk_results([first, repeated], charge_key, overlaps, charge_in_text)] \
+        == ["Customer Charge", "Tax", "Customer Charge", "Late Fee"]
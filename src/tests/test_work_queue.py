@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from ..core.interfaces.work_queue import PENDING, LEASED, DONE, FAILED
+from ..pipeline.work_queue import SQLiteWorkQueue
+from ..pipeline.queue_worker import QueueWorker, COMPLETED, LOST
+from ..core.models.synthetic import make_invoices
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    yield queue
+    queue.close()
+
+def test_expired_lease_is_fenced_off(queue):
+    """Test that a task of a stalled worker is re-leased and the stale result rejected."""
+    queue.enqueue(["a.pdf"])
+    stalled = queue.lease("worker-1", lease_seconds=-1)[0]
+
+    takeover = queue.lease("worker-2", lease_seconds=60)
+    assert [lease.task_id for lease in takeover] == ["a.pdf"]
+    assert takeover[0].token > stalled.token and takeover[0].attempts == 2
+
+    assert queue.heartbeat(stalled, 60) is None
+    assert not queue.complete(stalled, {"worker": 1})
+    assert queue.complete(takeover[0], {"worker": 2})
+    assert not queue.complete(takeover[0], {"worker": 2})
+    assert queue.get("a.pdf")["result"] == {"worker": 2}
+
+def test_failures_are_retried_up_to_max_attempts(queue):
+    """Test that a failing task returns to the queue until its attempts run out."""
+    queue.enqueue(["a.pdf"])
+    assert queue.fail(queue.lease("w", 60)[0], "TimeoutError")
+    assert queue.counts()[PENDING] == 1
+    assert queue.fail(queue.lease("w", 60)[0], "TimeoutError")
+    assert queue.counts()[FAILED] == 1 and queue.lease("w", 60) == []
+
+class StubPipeline:
+    """Pipeline stand-in recording which worker processed which file."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.processed = []
+
+    def process(self, file_path):
+        time.sleep(0.01)
+        with self.lock:
+            self.processed.append(file_path)
+        invoice = make_invoices(1)[0]
+        invoice.source_file = file_path
+        return invoice
+
+def test_workers_share_the_queue_exactly_once(tmp_path):
+    """Test that concurrent workers on separate connections process every task once."""
+    db_path = str(tmp_path / "queue.db")
+    files = [f"{i}.pdf" for i in range(40)]
+    SQLiteWorkQueue(db_path).enqueue(files)
+
+    pipeline = StubPipeline()
+    workers = [QueueWorker(pipeline, SQLiteWorkQueue(db_path), worker_id=f"w{i}", concurrency=2,
+                           lease_seconds=30, poll_seconds=0.01) for i in range(3)]
+    results = []
+    threads = [threading.Thread(target=lambda w=w: results.append(w.run())) for w in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert sorted(pipeline.processed) == sorted(files)
+    assert sum(result[COMPLETED] for result in results) == 40
+    counts = workers[0].queue.counts()
+    assert counts[DONE] == 40 and counts[LEASED] == 0
+
+def test_lease_lost_during_processing_is_not_committed(queue):
+    """Test that a task whose heartbeat finds the lease taken over is counted lost and not renewed."""
+    queue.enqueue(["a.pdf"])
+    lease = queue.lease("worker-1", lease_seconds=-1)[0]
+
+    class TakenOverPipeline(StubPipeline):
+        def process(self, file_path):
+            # Another worker takes the expired task; the next heartbeat notices
+            queue.lease("worker-2", lease_seconds=60)
+            worker._renew_leases()
+            return super().process(file_path)
+
+    worker = QueueWorker(TakenOverPipeline(), queue, worker_id="worker-1", lease_seconds=60)
+    assert worker.run_task(lease) is None
+    assert worker._stats[LOST] == 1 and not worker._active and not worker._lost
+    assert queue.get("a.pdf")["lease_owner"] == "worker-2"
@@ -0,0 +1,42 @@
+import os
+
+from ..pipeline.worker_pool import PreforkWorkerPool
+from ..core.models.synthetic import make_invoices
+
+class StubPreprocessor:
+    """Preprocessor stand-in counting its warm-ups."""
+
+    def __init__(self):
+        self.warmups = 0
+
+    def warmup(self):
+        self.warmups += 1
+
+class StubPipeline:
+    """Pipeline stand-in reporting the process that built it and the one that used it."""
+
+    def __init__(self):
+        self.built_in = os.getpid()
+        self.preprocessor = StubPreprocessor()
+
+    def process(self, file_path):
+        invoice = make_invoices(1)[0]
+        invoice.source_file = f"{file_path}|{self.built_in}|{os.getpid()}|{self.preprocessor.warmups}"
+        return invoice
+
+def test_workers_reuse_the_pipeline_built_in_the_parent():
+    """Test that the factory and warm-up run once in the parent and every worker uses their result."""
+    built = []
+    def factory():
+        built.append(StubPipeline())
+        return built[-1]
+
+    with PreforkWorkerPool(factory, workers=2) as pool:
+        results = pool.map([f"{i}.pdf" for i in range(8)])
+
+    assert len(built) == 1 and built[0].preprocessor.warmups == 1
+    assert all(result.ok for result in results)
+    for i, result in enumerate(results):
+        file_path, built_in, used_in, warmups = result.invoice.source_file.split("|")
+        assert file_path == f"{i}.pdf" and warmups == "1"
+        assert int(built_in) == os.getpid() and int(used_in) != os.getpid()
@@ -1,39 +1,28 @@
 from typing import Dict, Any, List, Tuple
-from datetime import date, timedelta, datetime
-from pathlib import Path
-import yaml
+from datetime import date, datetime
 
 from ..core.interfaces.validator import Validator
 from ..core.models.invoice import Invoice, Determinant, Charge
 from ..core.exceptions import ValidationError
+from .compiled_rules import CompiledRules, get_rules_provider
 
 class BusinessRulesValidator(Validator):
     """Validates invoice data against business rules and industry standards."""
     
-    def __init__(self, rules_file: str = None):
+    def __init__(self, rules_file: str = None, reload_interval: float = 5.0):
         """Initialize the validator with business rules.
         
         Args:
             rules_file: Optional path to custom rules YAML file
+            reload_interval: Seconds between checks of the rules file for edits
         """
-        if rules_file:
-            self.rules_path = Path(rules_file)
-        else:
-            self.rules_path = Path(__file__).parent.parent / "core" / "rules" / "business_rules.yaml"
-            
-        if not self.rules_path.exists():
-            raise ValueError(f"Rules file not found: {self.rules_path}")
-            
-        with open(self.rules_path) as f:
-            self._rules = yaml.safe_load(f)
-            
-        # Convert day counts to timedelta
-        self._rules['determinants']['date_rules']['max_period'] = timedelta(
-            days=self._rules['determinants']['date_rules']['max_period_days']
-        )
-        self._rules['determinants']['date_rules']['future_tolerance'] = timedelta(
-            days=self._rules['determinants']['date_rules']['future_tolerance_days']
-        )
+        self._provider = get_rules_provider(rules_file, reload_interval)
+        self.rules_path = self._provider.rules_path
+
+    @property
+    def rules(self) -> CompiledRules:
+        """Compiled rules, reloaded when the rules file changes."""
+        return self._provider.get()
 
     def validate(self, invoice: Invoice) -> Tuple[bool, List[str]]:
         """Validate the extracted invoice data."""
@@ -60,14 +49,15 @@ class BusinessRulesValidator(Validator):
         """Validate invoice dates for consistency and reasonableness."""
         errors = []
         today = date.today()
+        rules = self.rules
         
         # Invoice date validations
-        if invoice.invoice_date > today + self._rules['determinants']['date_rules']['future_tolerance']:
+        if invoice.invoice_date > today + rules.future_tolerance:
             errors.append(f"Invoice date {invoice.invoice_date} is too far in the future")
             
         # Billing period validations
         period_length = invoice.billing_period_end - invoice.billing_period_start
-        if period_length > self._rules['determinants']['date_rules']['max_period']:
+        if period_length > rules.max_period:
             errors.append(f"Billing period {period_length.days} days exceeds maximum allowed")
             
         if invoice.billing_period_end < invoice.billing_period_start:
@@ -78,20 +68,20 @@ class BusinessRulesValidator(Validator):
     def validate_determinants(self, determinants: List[Determinant]) -> List[str]:
         """Validate extracted determinants."""
         errors = []
+        rules = self.rules
         
         for det in determinants:
             # Unit validation
-            if det.unit not in self._rules['allowed_units']:
+            if det.unit not in rules.allowed_units:
                 errors.append(f"Invalid unit '{det.unit}' for determinant {det.name}")
                 
             # Value range validation
             try:
                 value = float(det.value)
-                value_range = self._rules['determinants']['value_ranges']
-                if value < value_range['min'] or value > value_range['max']:
+                if value < rules.value_min or value > rules.value_max:
                     errors.append(
                         f"Determinant {det.name} value {value} outside "
-                        f"allowed range [{value_range['min']}, {value_range['max']}]"
+                        f"allowed range [{rules.value_min}, {rules.value_max}]"
                     )
             except ValueError:
                 errors.append(f"Non-numeric value for determinant: {det.name}")
@@ -104,16 +94,15 @@ class BusinessRulesValidator(Validator):
                     
                     # Check period length
                     period = end - start
-                    if period > self._rules['determinants']['date_rules']['max_period']:
+                    if period > rules.max_period:
                         errors.append(
                             f"Billing period {period.days} days exceeds maximum "
-                            f"allowed {self._rules['determinants']['date_rules']['max_period_days']} days"
+                            f"allowed {rules.max_period_days} days"
                         )
                         
                     # Check for future dates
                     today = date.today()
-                    future_tolerance = self._rules['determinants']['date_rules']['future_tolerance']
-                    if end > today + future_tolerance:
+                    if end > today + rules.future_tolerance:
                         errors.append(f"End date {end} is too far in the future")
                         
                 except ValueError:
@@ -127,27 +116,28 @@ class BusinessRulesValidator(Validator):
                         ) -> List[str]:
         """Validate charges and their relationships to determinants."""
         errors = []
+        rules = self.rules
         
         for charge in charges:
             # Category validation
-            if charge.category not in self._rules['charges']['categories']:
+            if charge.category not in rules.charge_categories:
                 errors.append(f"Invalid category '{charge.category}' for charge {charge.name}")
                 
             # Unit rate validation
             if charge.unit_rate and charge.determinant:
-                commodity = self._get_commodity_from_unit(charge.determinant.unit)
-                if commodity in self._rules['charges']['rate_ranges']:
-                    rate_range = self._rules['charges']['rate_ranges'][commodity]
-                    if not (rate_range['min'] <= charge.unit_rate <= rate_range['max']):
+                commodity = rules.commodity_for_unit(charge.determinant.unit)
+                if commodity in rules.rate_ranges:
+                    rate_min, rate_max = rules.rate_ranges[commodity]
+                    if not (rate_min <= charge.unit_rate <= rate_max):
                         errors.append(
                             f"Unit rate {charge.unit_rate} for {charge.name} "
-                            f"outside typical range [{rate_range['min']}, {rate_range['max']}]"
+                            f"outside typical range [{rate_min}, {rate_max}]"
                         )
                         
             # Charge calculation validation
             if charge.determinant and charge.unit_rate:
-                expected = round(charge.determinant.value * charge.unit_rate, 2)
-                if abs(charge.amount - expected) > self._rules['totals']['tolerance']:
+                expected = round(float(charge.determinant.value) * charge.unit_rate, 2)
+                if abs(charge.amount - expected) > rules.tolerance:
                     errors.append(
                         f"Charge amount {charge.amount} doesn't match "
                         f"calculation {expected} for {charge.name}"
@@ -162,7 +152,7 @@ class BusinessRulesValidator(Validator):
                        ) -> List[str]:
         """Validate financial totals and subtotals."""
         errors = []
-        tolerance = self._rules['totals']['tolerance']
+        tolerance = self.rules.tolerance
         
         # Group charges by category
         category_totals = {}
@@ -190,20 +180,13 @@ class BusinessRulesValidator(Validator):
             
         return errors
 
-    def _get_commodity_from_unit(self, unit: str) -> str:
-        """Helper to determine commodity type from unit."""
-        for commodity, units in self._rules['determinants']['allowed_units'].items():
-            if unit in units:
-                return commodity
-        return "unknown"
-
     @classmethod
     def from_config(cls, config: Dict[str, Any]) -> 'BusinessRulesValidator':
         """Create validator from configuration."""
         rules_file = config.get('rules_file')
-        return cls(rules_file=rules_file)
+        return cls(rules_file=rules_file, reload_interval=config.get('reload_interval', 5.0))
 
     @property
     def validation_rules(self) -> Dict[str, Dict[str, Any]]:
         """Return the current validation rules configuration."""
-        return self._rules
+        return self.rules.rules
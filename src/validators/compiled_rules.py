@@ -0,0 +1,169 @@
+from typing import Dict, Any, FrozenSet, Mapping, Optional, Tuple
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from types import MappingProxyType
+import copy
+import logging
+import os
+import threading
+import time
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = Path(__file__).parent.parent / "core" / "rules" / "business_rules.yaml"
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """Business rules indexed for fast lookups.
+
+    Built once per version of the rules file and never modified, so
+    validators on any thread can keep using a snapshot while a newer
+    version is loaded.
+    """
+    rules: Mapping[str, Any]
+    allowed_units: FrozenSet[str]
+    allowed_units_upper: FrozenSet[str]
+    unit_commodities: Mapping[str, str]
+    value_min: float
+    value_max: float
+    max_period_days: int
+    max_period: timedelta
+    future_tolerance: timedelta
+    charge_categories: FrozenSet[str]
+    rate_ranges: Mapping[str, Tuple[float, float]]
+    tolerance: float
+    require_subtotal_match: bool
+
+    def commodity_for_unit(self, unit: str) -> str:
+        """Commodity whose rate ranges apply to a determinant unit, or 'unknown'."""
+        return self.unit_commodities.get(unit, "unknown")
+
+    @classmethod
+    def compile(cls, rules: Dict[str, Any]) -> 'CompiledRules':
+        """Index parsed business_rules.yaml contents.
+
+        Args:
+            rules: Parsed rules file
+
+        Returns:
+            The compiled rules
+
+        Raises:
+            KeyError: If a required section is missing
+        """
+        determinants = rules['determinants']
+        date_rules = determinants['date_rules']
+        charges = rules['charges']
+        totals = rules['totals']
+
+        unit_commodities = {
+            unit: commodity
+            for commodity, units in determinants.get('unit_commodities', {}).items()
+            for unit in units
+        }
+        allowed_units = frozenset(rules['allowed_units'])
+
+        return cls(
+            rules=MappingProxyType(copy.deepcopy(rules)),
+            allowed_units=allowed_units,
+            allowed_units_upper=frozenset(unit.upper() for unit in allowed_units),
+            unit_commodities=MappingProxyType(unit_commodities),
+            value_min=determinants['value_ranges']['min'],
+            value_max=determinants['value_ranges']['max'],
+            max_period_days=date_rules['max_period_days'],
+            max_period=timedelta(days=date_rules['max_period_days']),
+            future_tolerance=timedelta(days=date_rules['future_tolerance_days']),
+            charge_categories=frozenset(charges['categories']),
+            rate_ranges=MappingProxyType({
+                commodity: (bounds['min'], bounds['max'])
+                for commodity, bounds in charges.get('rate_ranges', {}).items()
+            }),
+            tolerance=totals['tolerance'],
+            require_subtotal_match=totals.get('require_subtotal_match', True)
+        )
+
+class RulesProvider:
+    """Serves the compiled rules of a YAML file, reloading them when it changes.
+
+    ``get`` checks the file's modification time at most every
+    ``check_interval`` seconds. A changed file is compiled first and then
+    swapped in with a single assignment, so callers see either the old or
+    the new rules, never a mix. A file that fails to load keeps the
+    previous rules in service.
+    """
+
+    def __init__(self, rules_path: Path, check_interval: float = 5.0):
+        """Load the rules.
+
+        Args:
+            rules_path: Path of the rules YAML file
+            check_interval: Minimum seconds between modification checks, 0 to
+                            check on every call
+
+        Raises:
+            ValueError: If the file does not exist
+        """
+        self.rules_path = Path(rules_path)
+        if not self.rules_path.exists():
+            raise ValueError(f"Rules file not found: {self.rules_path}")
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._signature = self._stat()
+        self._rules = self._load()
+        self._checked = time.monotonic()
+
+    def get(self) -> CompiledRules:
+        """Current compiled rules."""
+        if time.monotonic() - self._checked >= self.check_interval:
+            self._reload_if_changed()
+        return self._rules
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.rules_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self) -> CompiledRules:
+        with open(self.rules_path) as f:
+            return CompiledRules.compile(yaml.safe_load(f))
+
+    def _reload_if_changed(self) -> None:
+        with self._lock:
+            self._checked = time.monotonic()
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                return
+            try:
+                rules = self._load()
+            except Exception as e:
+                logger.error(f"Keeping previous business rules, failed to reload {self.rules_path}: {str(e)}")
+                return
+            finally:
+                self._signature = signature
+            self._rules = rules
+            self.reloads += 1
+            logger.info(f"Reloaded business rules from {self.rules_path}")
+
+_providers: Dict[Path, RulesProvider] = {}
+_providers_lock = threading.Lock()
+
+def get_rules_provider(rules_file: Optional[str] = None, check_interval: float = 5.0) -> RulesProvider:
+    """Shared provider for a rules file, created on first use.
+
+    Validators of the same file share one provider, so the rules are parsed
+    and compiled once per version however many validators exist.
+
+    Args:
+        rules_file: Path of the rules YAML file, defaults to the packaged rules
+        check_interval: Seconds between modification checks for a new provider
+    """
+    rules_path = Path(rules_file).resolve() if rules_file else DEFAULT_RULES_PATH.resolve()
+    with _providers_lock:
+        if rules_path not in _providers:
+            _providers[rules_path] = RulesProvider(rules_path, check_interval)
+        return _providers[rules_path]
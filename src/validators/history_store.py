@@ -0,0 +1,234 @@
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# (meter, commodity, metric) within one account
+SeriesKey = Tuple[str, str, str]
+
+@dataclass(frozen=True)
+class SeriesStats:
+    """Rolling statistics of one metric of one account.
+
+    ``mean`` and ``variance`` are exponentially weighted, so the baseline
+    follows gradual changes in consumption instead of averaging over the
+    account's whole history.
+    """
+    count: int
+    mean: float
+    variance: float
+    last_value: float
+    last_period_end: Optional[str]
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(max(self.variance, 0.0))
+
+    def updated(self, value: float, period_end: Optional[str], alpha: float) -> 'SeriesStats':
+        """Statistics after observing one more value.
+
+        The first ``1 / alpha`` observations are weighted equally, so the
+        baseline is not dominated by the very first invoice.
+
+        Args:
+            value: Observed value
+            period_end: ISO end date of the billing period of the value
+            alpha: Weight of the new value once warmed up
+        """
+        count = self.count + 1
+        weight = max(alpha, 1.0 / count)
+        diff = value - self.mean
+        increment = weight * diff
+        mean = self.mean + increment
+        variance = (1.0 - weight) * (self.variance + diff * increment)
+        # Month-over-month comparisons use the latest period, so a late
+        # invoice for an earlier period does not replace it
+        if self.last_period_end and period_end and period_end < self.last_period_end:
+            return SeriesStats(count, mean, variance, self.last_value, self.last_period_end)
+        return SeriesStats(count, mean, variance, value, period_end)
+
+class InvoiceHistoryStore:
+    """SQLite store of rolling per-account statistics.
+
+    One row per (account, meter, commodity, metric) holds the running
+    statistics, so checking an invoice is a single primary key range lookup
+    for its account however many invoices came before. Invoices already
+    recorded are remembered and not counted twice when reprocessed.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS series (
+            account_number TEXT NOT NULL,
+            meter TEXT NOT NULL,
+            commodity TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            mean REAL NOT NULL,
+            variance REAL NOT NULL,
+            last_value REAL NOT NULL,
+            last_period_end TEXT,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (account_number, meter, commodity, metric)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS recorded_invoices (
+            account_number TEXT NOT NULL,
+            invoice_number TEXT NOT NULL,
+            recorded_at REAL NOT NULL,
+            values_hash TEXT,
+            anomalies TEXT,
+            PRIMARY KEY (account_number, invoice_number)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, db_path: str, alpha: float = 0.2):
+        """Open (or create) the history database.
+
+        Args:
+            db_path: Path to the SQLite database file
+            alpha: EWMA weight of each new observation
+        """
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        self.db_path = db_path
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self) -> None:
+        self._pid = os.getpid()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        # Databases created before the validation results were kept
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(recorded_invoices)")}
+        for column in ('values_hash', 'anomalies'):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE recorded_invoices ADD COLUMN {column} TEXT")
+
+    def _check_fork(self) -> None:
+        # Pre-forked workers inherit the store; SQLite connections must not
+        # cross a fork, so each process opens its own
+        if self._pid != os.getpid():
+            self._open()
+
+    def lookup(self, account_number: str) -> Dict[SeriesKey, SeriesStats]:
+        """Statistics of every series of an account.
+
+        Args:
+            account_number: Account to look up
+
+        Returns:
+            Statistics keyed by (meter, commodity, metric)
+        """
+        with self._lock:
+            self._check_fork()
+            return self._select(account_number)
+
+    def recorded(self, account_number: str, invoice_number: str) -> Optional[Tuple[Optional[str], List[str]]]:
+        """How an invoice was checked when it was recorded.
+
+        Args:
+            account_number: Account of the invoice
+            invoice_number: Invoice number
+
+        Returns:
+            The hash of its checked values and the anomalies found then, or
+            None if the invoice has not been recorded
+        """
+        with self._lock:
+            self._check_fork()
+            row = self._conn.execute(
+                "SELECT values_hash, anomalies FROM recorded_invoices "
+                "WHERE account_number = ? AND invoice_number = ?",
+                (account_number, invoice_number)
+            ).fetchone()
+        if row is None:
+            return None
+        values_hash, anomalies = row
+        return values_hash, json.loads(anomalies) if anomalies else []
+
+    def record(self,
+               account_number: str,
+               invoice_number: str,
+               observations: Dict[SeriesKey, float],
+               period_end: Optional[str] = None,
+               values_hash: Optional[str] = None,
+               anomalies: Optional[List[str]] = None) -> bool:
+        """Fold an invoice's values into the account's statistics.
+
+        Args:
+            account_number: Account of the invoice
+            invoice_number: Invoice number, used to skip invoices recorded before
+            observations: Values keyed by (meter, commodity, metric)
+            period_end: ISO end date of the billing period
+            values_hash: Hash of the values the invoice was checked with
+            anomalies: History anomalies found by that check
+
+        Returns:
+            False if the invoice had already been recorded
+        """
+        now = time.time()
+        with self._lock:
+            self._check_fork()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO recorded_invoices (account_number, invoice_number, recorded_at, "
+                    "values_hash, anomalies) VALUES (?, ?, ?, ?, ?)",
+                    (account_number, invoice_number, now, values_hash,
+                     json.dumps(anomalies) if anomalies is not None else None)
+                ).rowcount
+                if inserted:
+                    self._fold(account_number, observations, period_end, now)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return bool(inserted)
+
+    def _select(self, account_number: str) -> Dict[SeriesKey, SeriesStats]:
+        rows = self._conn.execute(
+            "SELECT meter, commodity, metric, count, mean, variance, last_value, last_period_end "
+            "FROM series WHERE account_number = ?",
+            (account_number,)
+        ).fetchall()
+        return {
+            (meter, commodity, metric): SeriesStats(count, mean, variance, last_value, last_period_end)
+            for meter, commodity, metric, count, mean, variance, last_value, last_period_end in rows
+        }
+
+    def _fold(self,
+              account_number: str,
+              observations: Dict[SeriesKey, float],
+              period_end: Optional[str],
+              now: float) -> None:
+        existing = self._select(account_number)
+        empty = SeriesStats(0, 0.0, 0.0, 0.0, None)
+        rows = []
+        for key, value in observations.items():
+            stats = existing.get(key, empty).updated(value, period_end, self.alpha)
+            rows.append((account_number, *key, stats.count, stats.mean, stats.variance,
+                         stats.last_value, stats.last_period_end, now))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO series (account_number, meter, commodity, metric, count, mean, "
+            "variance, last_value, last_period_end, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'InvoiceHistoryStore':
+        """Create a history store from the 'validators.history' configuration section."""
+        return cls(db_path=config.get('db_path', '.invoice_history.db'), alpha=config.get('alpha', 0.2))
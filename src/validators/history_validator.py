@@ -0,0 +1,219 @@
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from ..core.interfaces.validator import Validator
+from ..core.checkpoint_store import config_hash
+from ..core.models.invoice import Invoice, Determinant, Charge
+from .history_store import InvoiceHistoryStore, SeriesKey, SeriesStats
+
+logger = logging.getLogger(__name__)
+
+TOTAL_KEY: SeriesKey = ("*", "*", "total_amount")
+
+class HistoricalAnomalyValidator(Validator):
+    """Flags invoices whose values are out of line with the account's history.
+
+    Each determinant (by meter, commodity, name and unit) and the invoice
+    total are compared with the account's rolling statistics: a value is
+    reported when its z-score against the weighted mean exceeds
+    ``z_threshold``, or when it changed by more than ``max_ratio`` times
+    since the latest billing period. Series with fewer than ``min_history``
+    invoices are not checked.
+
+    When ``learn`` is set, invoices are folded into the history. Values of
+    an invoice with history anomalies are first clipped to the edge of the
+    accepted band, so a single misread moves the baseline only a little
+    while a real step change (new equipment, a rate change) pulls it over
+    within a few billing periods instead of being flagged forever.
+    Invoices failing the base validator are not recorded. Invoices without
+    an account or invoice number are neither checked nor recorded.
+
+    An invoice validated again with the same values (a re-run, a resumed
+    job) gets the anomalies found when it was recorded, since the history
+    now includes its own values. A recorded invoice whose values changed
+    is checked against that history as it is and not recorded again.
+    """
+
+    def __init__(self,
+                 store: InvoiceHistoryStore,
+                 base_validator: Optional[Validator] = None,
+                 z_threshold: float = 4.0,
+                 max_ratio: float = 3.0,
+                 min_history: int = 3,
+                 min_relative_std: float = 0.05,
+                 learn: bool = True):
+        """Initialize the validator.
+
+        Args:
+            store: Per-account history store
+            base_validator: Validator run first, whose errors are reported too
+            z_threshold: Largest accepted absolute z-score
+            max_ratio: Largest accepted change factor from the latest period
+            min_history: Invoices needed in a series before it is checked
+            min_relative_std: Floor on the standard deviation as a fraction of
+                              the mean, so steady accounts do not flag tiny changes
+            learn: Record validated invoices into the history
+        """
+        self.store = store
+        self.base_validator = base_validator
+        self.z_threshold = z_threshold
+        self.max_ratio = max_ratio
+        self.min_history = min_history
+        self.min_relative_std = min_relative_std
+        self.learn = learn
+
+    @staticmethod
+    def observations(invoice: Invoice) -> Dict[SeriesKey, float]:
+        """Values of an invoice tracked in the history, keyed by series.
+
+        Determinants sharing a series on one invoice (e.g. usage split over
+        rate periods) are summed. Non-numeric values are skipped.
+        """
+        values: Dict[SeriesKey, float] = {}
+        for det in invoice.determinants:
+            try:
+                value = float(det.value)
+            except (TypeError, ValueError):
+                continue
+            key = (det.meter or 'N/A', det.commodity or 'N/A', f"{det.name.strip().casefold()} [{det.unit}]")
+            values[key] = values.get(key, 0.0) + value
+        if invoice.total_amount is not None:
+            values[TOTAL_KEY] = float(invoice.total_amount)
+        return values
+
+    @staticmethod
+    def _invoice_key(invoice: Invoice) -> Optional[Tuple[str, str]]:
+        key = (str(invoice.account_number or '').strip(), str(invoice.invoice_number or '').strip())
+        return key if all(part and part != 'N/A' for part in key) else None
+
+    def validate(self, invoice: Invoice) -> Tuple[bool, List[str]]:
+        """Validate the invoice with the base validator and against its account's history."""
+        errors = []
+        if self.base_validator:
+            _, errors = self.base_validator.validate(invoice)
+
+        key = self._invoice_key(invoice)
+        if key is None:
+            # Unrelated invoices with unread numbers would share one history
+            return len(errors) == 0, errors
+
+        observations = self.observations(invoice)
+        values_hash = config_hash(sorted(observations.items()))
+        recorded = self.store.recorded(*key)
+        if recorded is not None and recorded[0] == values_hash:
+            errors = errors + recorded[1]
+            return len(errors) == 0, errors
+
+        history = self.store.lookup(key[0])
+        anomalies = []
+        for series, value in observations.items():
+            stats = history.get(series)
+            if stats and stats.count >= self.min_history:
+                series_anomalies = self._check(series, value, stats)
+                if series_anomalies:
+                    anomalies.extend(series_anomalies)
+                    observations[series] = self._clip(value, stats)
+
+        if self.learn and not errors and recorded is None:
+            self.store.record(*key, observations, self._period_end(invoice), values_hash, anomalies)
+        errors = errors + anomalies
+        return len(errors) == 0, errors
+
+    def record(self, invoice: Invoice, observations: Optional[Dict[SeriesKey, float]] = None) -> bool:
+        """Add an invoice to its account's history.
+
+        Args:
+            invoice: Invoice to record
+            observations: Precomputed values, taken from the invoice if omitted
+
+        Returns:
+            False if the invoice had already been recorded or lacks an
+            account or invoice number
+        """
+        key = self._invoice_key(invoice)
+        if key is None:
+            return False
+        if observations is None:
+            observations = self.observations(invoice)
+        return self.store.record(*key, observations, self._period_end(invoice))
+
+    @staticmethod
+    def _period_end(invoice: Invoice) -> Optional[str]:
+        return invoice.billing_period_end.isoformat() if invoice.billing_period_end else None
+
+    def _std(self, stats: SeriesStats) -> float:
+        return max(stats.std, abs(stats.mean) * self.min_relative_std)
+
+    def _clip(self, value: float, stats: SeriesStats) -> float:
+        band = self.z_threshold * self._std(stats)
+        return min(max(value, stats.mean - band), stats.mean + band)
+
+    def _check(self, key: SeriesKey, value: float, stats: SeriesStats) -> List[str]:
+        meter, _, metric = key
+        label = metric if key == TOTAL_KEY else f"{metric} on meter {meter}"
+        errors = []
+
+        std = self._std(stats)
+        if std > 0:
+            z_score = (value - stats.mean) / std
+            if abs(z_score) > self.z_threshold:
+                errors.append(
+                    f"Historical anomaly: {label} is {value}, z-score {z_score:.1f} against "
+                    f"mean {stats.mean:.2f} over {stats.count} invoices"
+                )
+
+        previous = stats.last_value
+        if previous > 0 and value > 0:
+            ratio = value / previous
+            if ratio > self.max_ratio or ratio < 1.0 / self.max_ratio:
+                errors.append(
+                    f"Historical anomaly: {label} is {value}, {ratio:.2f}x the previous "
+                    f"period ({previous}, ending {stats.last_period_end})"
+                )
+        return errors
+
+    def validate_determinants(self, determinants: List[Determinant]) -> List[str]:
+        """Validate determinants with the base validator; history checks need the invoice's account."""
+        return self.base_validator.validate_determinants(determinants) if self.base_validator else []
+
+    def validate_charges(self,
+                        charges: List[Charge],
+                        determinants: List[Determinant]
+                        ) -> List[str]:
+        """Validate charges with the base validator."""
+        return self.base_validator.validate_charges(charges, determinants) if self.base_validator else []
+
+    def validate_totals(self,
+                       charges: List[Charge],
+                       subtotals: Dict[str, float],
+                       total_amount: float
+                       ) -> List[str]:
+        """Validate totals with the base validator; history checks need the invoice's account."""
+        if not self.base_validator:
+            return []
+        return self.base_validator.validate_totals(charges, subtotals, total_amount)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], base_validator: Optional[Validator] = None) -> 'HistoricalAnomalyValidator':
+        """Create validator from the 'validators.history' configuration section."""
+        return cls(
+            store=InvoiceHistoryStore.from_config(config),
+            base_validator=base_validator,
+            z_threshold=config.get('z_threshold', 4.0),
+            max_ratio=config.get('max_ratio', 3.0),
+            min_history=config.get('min_history', 3),
+            min_relative_std=config.get('min_relative_std', 0.05),
+            learn=config.get('learn', True)
+        )
+
+    @property
+    def validation_rules(self) -> Dict[str, Dict[str, Any]]:
+        """Return the base validator's rules with the history thresholds."""
+        rules = dict(self.base_validator.validation_rules) if self.base_validator else {}
+        rules['history'] = {
+            'z_threshold': self.z_threshold,
+            'max_ratio': self.max_ratio,
+            'min_history': self.min_history,
+            'min_relative_std': self.min_relative_std
+        }
+        return rules
@@ -1,26 +1,46 @@
-from typing import List, Dict, Tuple, Any
-from jsonschema import validate, ValidationError as JsonSchemaError
+from typing import List, Dict, Tuple, Any, Iterable, Optional
+from jsonschema import Draft7Validator, FormatChecker
 from datetime import datetime
-import yaml
 
 from ..core.interfaces.validator import Validator
 from ..core.models.invoice import Invoice, Determinant, Charge
 from ..core.exceptions import ValidationError
+from .compiled_rules import CompiledRules, get_rules_provider
+
+def _nullable(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Schema that also accepts null, for the optional fields to_json() writes as None."""
+    return {**schema, "type": [schema["type"], "null"]}
+
+def _schema_errors(validator: Draft7Validator, instance: Any) -> List[str]:
+    """All schema violations of an instance, with the path to each."""
+    errors = []
+    for error in validator.iter_errors(instance):
+        path = "/".join(str(part) for part in error.absolute_path)
+        errors.append(f"{path or '<root>'}: {error.message}")
+    return errors
 
 class JSONValidator(Validator):
-    """JSON Schema validator for invoice data."""
+    """JSON Schema validator for invoice data.
+    
+    Schemas describe the ``Invoice.to_json()`` layout. They are checked and
+    compiled once per class into Draft 7 validators with date format
+    checking, and an invoice is validated as a single ``to_json()``
+    projection. Schema violations are reported with their JSON path, and
+    the semantic checks (units, values, dates, totals) run on the objects.
+    """
     
     DETERMINANT_SCHEMA = {
         "type": "object",
         "required": ["name", "value", "unit"],
         "properties": {
             "name": {"type": "string"},
-            "value": {"type": "number"},
+            "value": {"type": ["number", "string"]},
             "unit": {"type": "string"},
-            "meter_number": {"type": "string"},
-            "reading_type": {"type": "string"},
-            "start_date": {"type": "string", "format": "date"},
-            "end_date": {"type": "string", "format": "date"}
+            "meter": _nullable({"type": "string"}),
+            "commodity": _nullable({"type": "string"}),
+            "reading_type": _nullable({"type": "string"}),
+            "start_date": _nullable({"type": "string", "format": "date"}),
+            "end_date": _nullable({"type": "string", "format": "date"})
         }
     }
     
@@ -34,36 +54,42 @@ class JSONValidator(Validator):
                 "type": "string",
                 "enum": ["Usage", "Demand", "Fixed", "Tax"]
             },
-            "unit_rate": {"type": "number"},
-            "meter_number": {"type": "string"},
-            "determinant": {
-                "type": "object",
-                "properties": DETERMINANT_SCHEMA["properties"]
-            }
+            "commodity": {"type": "string"},
+            "currency": {"type": "string"},
+            "unit_rate": _nullable({"type": "number"}),
+            "meter_number": _nullable({"type": "string"}),
+            "notes": _nullable({"type": "string"})
         }
     }
     
     INVOICE_SCHEMA = {
         "type": "object",
-        "required": [
-            "account_number",
-            "invoice_number",
-            "invoice_date",
-            "due_date",
-            "vendor_name",
-            "customer_name",
-            "determinants",
-            "charges"
-        ],
+        "required": ["account_info", "determinants", "charges", "summary"],
         "properties": {
-            "account_number": {"type": "string"},
-            "invoice_number": {"type": "string"},
-            "invoice_date": {"type": "string", "format": "date"},
-            "due_date": {"type": "string", "format": "date"},
-            "vendor_name": {"type": "string"},
-            "customer_name": {"type": "string"},
-            "service_address": {"type": "string"},
-            "billing_address": {"type": "string"},
+            "account_info": {
+                "type": "object",
+                "required": [
+                    "account_number",
+                    "invoice_number",
+                    "invoice_date",
+                    "due_date",
+                    "vendor_name",
+                    "customer_name"
+                ],
+                "properties": {
+                    "account_number": {"type": "string"},
+                    "invoice_number": {"type": "string"},
+                    "invoice_date": {"type": "string", "format": "date"},
+                    "billing_period_start": {"type": "string", "format": "date"},
+                    "billing_period_end": {"type": "string", "format": "date"},
+                    "due_date": _nullable({"type": "string", "format": "date"}),
+                    "vendor_name": {"type": "string"},
+                    "customer_name": {"type": "string"},
+                    "service_address": {"type": "string"},
+                    "billing_address": _nullable({"type": "string"}),
+                    "meter_numbers": {"type": "array", "items": {"type": "string"}}
+                }
+            },
             "determinants": {
                 "type": "array",
                 "items": DETERMINANT_SCHEMA
@@ -71,115 +97,169 @@ class JSONValidator(Validator):
             "charges": {
                 "type": "array",
                 "items": CHARGE_SCHEMA
+            },
+            "summary": {
+                "type": "object",
+                "required": ["subtotals", "total_amount"],
+                "properties": {
+                    "subtotals": {"type": "object", "additionalProperties": {"type": "number"}},
+                    "total_amount": {"type": "number"}
+                }
             }
         }
     }
 
-    def __init__(self):
-        """Initialize validator with business rules."""
-        with open('src/core/rules/business_rules.yaml', 'r') as f:
-            self.rules = yaml.safe_load(f)
+    _compiled: Dict[str, Draft7Validator] = {}
+
+    def __init__(self, rules_file: Optional[str] = None, reload_interval: float = 5.0):
+        """Initialize validator with business rules.
+        
+        Args:
+            rules_file: Optional path to custom rules YAML file
+            reload_interval: Seconds between checks of the rules file for edits
+        """
+        self._provider = get_rules_provider(rules_file, reload_interval)
+        
+        self.invoice_validator = self._compile('INVOICE_SCHEMA')
+        self.determinant_validator = self._compile('DETERMINANT_SCHEMA')
+        self.charge_validator = self._compile('CHARGE_SCHEMA')
+
+    @classmethod
+    def _compile(cls, schema_name: str) -> Draft7Validator:
+        """Checked and compiled validator for a schema attribute, cached per class."""
+        key = f"{cls.__qualname__}.{schema_name}"
+        if key not in JSONValidator._compiled:
+            schema = getattr(cls, schema_name)
+            Draft7Validator.check_schema(schema)
+            JSONValidator._compiled[key] = Draft7Validator(schema, format_checker=FormatChecker())
+        return JSONValidator._compiled[key]
+    
+    @property
+    def rules(self) -> CompiledRules:
+        """Compiled rules, shared with the other validators of the same rules file."""
+        return self._provider.get()
     
     def validate_unit(self, unit: str) -> bool:
         """Validate that a unit is in the allowed list."""
-        return unit.upper() in [u.upper() for u in self.rules['allowed_units']]
+        return unit.upper() in self.rules.allowed_units_upper
     
     def validate(self, invoice: Invoice) -> Tuple[bool, List[str]]:
         """Validate the extracted invoice data."""
-        errors = []
+        errors = [
+            f"Schema validation failed at {error}"
+            for error in _schema_errors(self.invoice_validator, invoice.to_json())
+        ]
         
-        try:
-            # Validate against JSON schema
-            validate(instance=invoice.dict(), schema=self.INVOICE_SCHEMA)
-            
-            # Validate components
-            errors.extend(self.validate_determinants(invoice.determinants))
-            errors.extend(self.validate_charges(invoice.charges, invoice.determinants))
-            
-            # Validate totals if available
-            if hasattr(invoice, 'subtotals') and hasattr(invoice, 'total_amount'):
-                errors.extend(self.validate_totals(
-                    invoice.charges,
-                    invoice.subtotals,
-                    invoice.total_amount
-                ))
-                
-        except JsonSchemaError as e:
-            errors.append(f"Schema validation failed: {str(e)}")
+        # Item schemas were covered by the invoice schema
+        errors.extend(self.validate_determinants(invoice.determinants, check_schema=False))
+        errors.extend(self.validate_charges(invoice.charges, invoice.determinants, check_schema=False))
+        
+        # Validate totals if available
+        if hasattr(invoice, 'subtotals') and hasattr(invoice, 'total_amount'):
+            errors.extend(self.validate_totals(
+                invoice.charges,
+                invoice.subtotals,
+                invoice.total_amount
+            ))
             
         return len(errors) == 0, errors
 
-    def validate_determinants(self, determinants: List[Determinant]) -> List[str]:
-        """Validate extracted determinants."""
+    def validate_batch(self, invoices: Iterable[Invoice]) -> List[Tuple[bool, List[str]]]:
+        """Validate many invoices with the compiled schemas.
+        
+        Args:
+            invoices: Invoices to validate
+            
+        Returns:
+            (is_valid, errors) for each invoice, in order
+        """
+        return [self.validate(invoice) for invoice in invoices]
+
+    def validate_determinants(self, determinants: List[Determinant], check_schema: bool = True) -> List[str]:
+        """Validate extracted determinants.
+        
+        Args:
+            determinants: Determinants to validate
+            check_schema: Also validate each determinant against DETERMINANT_SCHEMA
+        """
         errors = []
         
         for det in determinants:
+            # Schema validation (to_json() writes the attributes as they are)
+            if check_schema:
+                errors.extend(
+                    f"Invalid determinant {det.name}: {error}"
+                    for error in _schema_errors(self.determinant_validator, vars(det))
+                )
+            
+            # Unit validation
+            if not self.validate_unit(det.unit):
+                errors.append(f"Invalid unit '{det.unit}' for determinant: {det.name}")
+            
+            # Value validation
             try:
-                # Schema validation
-                validate(instance=det.dict(), schema=self.DETERMINANT_SCHEMA)
-                
-                # Unit validation
-                if not self.validate_unit(det.unit):
-                    errors.append(f"Invalid unit '{det.unit}' for determinant: {det.name}")
-                
-                # Value validation
+                value = float(det.value)
+                if value < 0:
+                    errors.append(f"Negative value for determinant: {det.name}")
+            except (TypeError, ValueError):
+                errors.append(f"Non-numeric value for determinant: {det.name}")
+            
+            # Date validation if present
+            if det.start_date and det.end_date:
                 try:
-                    value = float(det.value)
-                    if value < 0:
-                        errors.append(f"Negative value for determinant: {det.name}")
+                    start = datetime.strptime(det.start_date, '%Y-%m-%d').date()
+                    end = datetime.strptime(det.end_date, '%Y-%m-%d').date()
+                    if start > end:
+                        errors.append(
+                            f"Invalid date range for {det.name}: "
+                            f"{det.start_date} > {det.end_date}"
+                        )
                 except ValueError:
-                    errors.append(f"Non-numeric value for determinant: {det.name}")
-                
-                # Date validation if present
-                if det.start_date and det.end_date:
-                    try:
-                        start = datetime.strptime(det.start_date, '%Y-%m-%d').date()
-                        end = datetime.strptime(det.end_date, '%Y-%m-%d').date()
-                        if start > end:
-                            errors.append(
-                                f"Invalid date range for {det.name}: "
-                                f"{det.start_date} > {det.end_date}"
-                            )
-                    except ValueError:
-                        errors.append(f"Invalid date format for determinant: {det.name}")
-                
-            except JsonSchemaError as e:
-                errors.append(f"Invalid determinant {det.name}: {str(e)}")
+                    errors.append(f"Invalid date format for determinant: {det.name}")
         
         return errors
 
     def validate_charges(self, 
                         charges: List[Charge], 
-                        determinants: List[Determinant]
+                        determinants: List[Determinant],
+                        check_schema: bool = True
                         ) -> List[str]:
-        """Validate charges and their relationships to determinants."""
+        """Validate charges and their relationships to determinants.
+        
+        Args:
+            charges: Charges to validate
+            determinants: Determinants of the invoice
+            check_schema: Also validate each charge against CHARGE_SCHEMA
+        """
         errors = []
         
         for charge in charges:
-            try:
-                validate(instance=charge.dict(), schema=self.CHARGE_SCHEMA)
-                
-                # Validate determinant reference if present
-                if charge.determinant:
-                    if charge.determinant not in determinants:
+            if check_schema:
+                # to_json() layout: the attributes without the linked determinant
+                charge_json = {k: v for k, v in vars(charge).items() if k != 'determinant'}
+                errors.extend(
+                    f"Invalid charge {charge.name}: {error}"
+                    for error in _schema_errors(self.charge_validator, charge_json)
+                )
+            
+            # Validate determinant reference if present
+            if charge.determinant:
+                if charge.determinant not in determinants:
+                    errors.append(
+                        f"Charge {charge.name} references unknown "
+                        f"determinant: {charge.determinant.name}"
+                    )
+                    
+                # Validate unit rate calculation
+                if charge.unit_rate:
+                    expected_amount = (
+                        charge.unit_rate * float(charge.determinant.value)
+                    )
+                    if not abs(charge.amount - expected_amount) <= 0.01:
                         errors.append(
-                            f"Charge {charge.name} references unknown "
-                            f"determinant: {charge.determinant.name}"
+                            f"Charge amount mismatch for {charge.name}: "
+                            f"got {charge.amount}, expected {expected_amount}"
                         )
-                        
-                    # Validate unit rate calculation
-                    if charge.unit_rate:
-                        expected_amount = (
-                            charge.unit_rate * charge.determinant.value
-                        )
-                        if not abs(charge.amount - expected_amount) <= 0.01:
-                            errors.append(
-                                f"Charge amount mismatch for {charge.name}: "
-                                f"got {charge.amount}, expected {expected_amount}"
-                            )
-                            
-            except JsonSchemaError as e:
-                errors.append(f"Invalid charge {charge.name}: {str(e)}")
                 
         return errors
 
@@ -213,4 +293,9 @@ class JSONValidator(Validator):
     @classmethod
     def from_config(cls, config: Dict[str, Any]) -> 'JSONValidator':
         """Create validator from configuration."""
-        return cls()
+        return cls(rules_file=config.get('rules_file'), reload_interval=config.get('reload_interval', 5.0))
+
+    @property
+    def validation_rules(self) -> Dict[str, Dict[str, Any]]:
+        """Return the current validation rules configuration."""
+        return self.rules.rules